@@ -0,0 +1,93 @@
+"""Бенчмарк: стоимость одной записи предупреждения при 100k предупреждений.
+
+Сравнивает полную перезапись JSON (`JsonStore`) и дозапись в журнал
+(`JournaledJsonStore`).
+
+Запуск: python benchmarks/bench_journal_store.py [--warnings 100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from infrastructure.config import JournaledJsonStore, JsonStore  # noqa: E402
+
+
+def build_warnings(total: int, guilds: int = 100, per_user: int = 2) -> dict:
+    """Сгенерировать `total` предупреждений: по `per_user` на пользователя."""
+
+    users_per_guild = max(total // guilds // per_user, 1)
+    warning = {
+        "reason": "Спам в чате",
+        "moderator": 123456789012345678,
+        "timestamp": "2026-01-01T12:00:00",
+    }
+    return {
+        str(1000 + g): {
+            str(10**17 + u): [dict(warning) for _ in range(per_user)]
+            for u in range(users_per_guild)
+        }
+        for g in range(guilds)
+    }
+
+
+def bench(total: int, full_writes: int, journal_writes: int) -> None:
+    data = build_warnings(total)
+    warning = {"reason": "bench", "moderator": 1, "timestamp": "2026-01-01T12:00:00"}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        plain = JsonStore("warnings.json", dict)
+        plain.path = Path(tmp) / "plain.json"
+        plain.save(data)
+        size = plain.path.stat().st_size
+
+        started = time.perf_counter()
+        for i in range(full_writes):
+            data["1000"].setdefault("bench", []).append(warning)
+            plain.save(data)
+        full_cost = (time.perf_counter() - started) / full_writes
+
+        journal = JournaledJsonStore("warnings.json", dict, compact_ratio=1.0)
+        journal.path = Path(tmp) / "journal.json"
+        journal.save(build_warnings(total))
+        journal_data = journal.load()
+
+        started = time.perf_counter()
+        for i in range(journal_writes):
+            user = journal_data["1000"].setdefault("bench", [])
+            user.append(warning)
+            journal.set(["1000", "bench"], user[-5:])
+        journal_cost = (time.perf_counter() - started) / journal_writes
+        journal.flush_sync()
+
+        started = time.perf_counter()
+        reload_store = JournaledJsonStore("warnings.json", dict)
+        reload_store.path = journal.path
+        reload_store.load()
+        reload_cost = time.perf_counter() - started
+
+    print(f"Предупреждений: {total}, размер снапшота: {size / 1024 / 1024:.1f} MiB")
+    print(f"Полная перезапись:  {full_cost * 1000:9.3f} мс на запись")
+    print(f"Журнал (JSONL):     {journal_cost * 1000:9.3f} мс на запись")
+    print(f"Ускорение:          {full_cost / journal_cost:9.0f}x")
+    print(f"Загрузка снапшот+журнал: {reload_cost * 1000:.1f} мс")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--warnings", type=int, default=100_000)
+    parser.add_argument("--full-writes", type=int, default=10)
+    parser.add_argument("--journal-writes", type=int, default=2000)
+    args = parser.parse_args()
+    bench(args.warnings, args.full_writes, args.journal_writes)
+
+
+if __name__ == "__main__":
+    main()
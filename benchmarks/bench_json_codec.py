@@ -0,0 +1,92 @@
+"""Бенчмарк: загрузка и сохранение `levels.json` разными JSON кодеками.
+
+Генерирует файл уровней заданного размера (по умолчанию ~50 MB в pretty
+формате) и измеряет `JsonStore.load`/`JsonStore.save` для каждого
+установленного кодека в компактном и pretty режимах.
+
+Запуск: python benchmarks/bench_json_codec.py [--size-mb 50] [--repeat 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from infrastructure.config import JsonStore, configure_json_codec  # noqa: E402
+from infrastructure.config.json_codec import CODECS, JsonCodec  # noqa: E402
+
+
+# Примерный размер одной записи пользователя в pretty формате
+_USER_BYTES = 155
+
+
+def build_levels(size_mb: int, guilds: int = 200) -> dict:
+    """Сгенерировать данные уровней примерно на `size_mb` мегабайт."""
+
+    users_per_guild = max(size_mb * 1024 * 1024 // _USER_BYTES // guilds, 1)
+    return {
+        str(10**17 + g): {
+            str(2 * 10**17 + u): {
+                "xp": u * 37 % 100_000,
+                "level": u % 60,
+                "last_message_time": "2026-01-01T12:00:00.000000",
+            }
+            for u in range(users_per_guild)
+        }
+        for g in range(guilds)
+    }
+
+
+def best_of(repeat: int, func) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def bench(size_mb: int, repeat: int) -> None:
+    data = build_levels(size_mb)
+    rows = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in CODECS:
+            for pretty in (False, True):
+                codec = configure_json_codec(name, pretty=pretty)
+                if codec.name != name and type(codec) is JsonCodec:
+                    print(f"{name}: не установлен, пропускаем")
+                    break
+                store = JsonStore("levels.json", dict)
+                store.path = Path(tmp) / f"{name}-{int(pretty)}.json"
+
+                save = best_of(repeat, lambda: store.save(data))
+                load = best_of(repeat, store.load)
+                size = store.path.stat().st_size
+                rows.append((name, "pretty" if pretty else "compact", size, save, load))
+                store.path.unlink()
+
+    print(f"{'кодек':<8} {'режим':<8} {'размер':>10} {'save':>10} {'load':>10}")
+    for name, mode, size, save, load in rows:
+        print(
+            f"{name:<8} {mode:<8} {size / 1024 / 1024:>7.1f} MB "
+            f"{save * 1000:>7.0f} мс {load * 1000:>7.0f} мс"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    bench(args.size_mb, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Бенчмарк: аллокации на одно сообщение до и после `MessageContext`.
+
+Сравнивает прежний разбор сообщения, когда каждая стадия сама приводила
+текст к нижнему регистру и собирала строковые ключи (`track_message`,
+автомодерация, система уровней), с одним `MessageContext` на сообщение.
+Память измеряется через `tracemalloc`: объекты, созданные для сообщения,
+удерживаются до конца прохода, как во время обработки в конвейере.
+
+Запуск: python benchmarks/bench_message_context.py [--messages 100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from domain.message_context import MessageContext  # noqa: E402
+
+
+def build_messages(count: int) -> list:
+    """Сгенерировать сообщения с разными авторами и серверами."""
+
+    guilds = [SimpleNamespace(id=10**17 + g) for g in range(50)]
+    channel = SimpleNamespace(id=3 * 10**17)
+    return [
+        SimpleNamespace(
+            author=SimpleNamespace(id=2 * 10**17 + i % 5000, bot=False),
+            guild=guilds[i % len(guilds)],
+            channel=channel,
+            content=f"Привет, это Сообщение номер {i} для проверки автомодерации",
+            mentions=[],
+        )
+        for i in range(count)
+    ]
+
+
+def legacy(message) -> tuple:
+    """Разбор сообщения стадиями по отдельности, как до `MessageContext`."""
+
+    # Bot.on_message -> track_message
+    label = str(message.guild.id) if message.guild else "dm"
+    # AutoMod.check_message
+    content = message.content.lower()
+    now = datetime.now()
+    spam_key = f"{message.author.id}_{message.guild.id}"
+    mentions = len(message.mentions)
+    # LevelingSystem.add_experience
+    user_id = str(message.author.id)
+    guild_id = str(message.guild.id)
+    cooldown_key = f"{user_id}_{guild_id}"
+    current_time = datetime.now()
+    return label, content, now, spam_key, mentions, cooldown_key, current_time
+
+
+def with_context(message) -> MessageContext:
+    """Разбор сообщения один раз."""
+
+    context = MessageContext(message)
+    # track_message получает метку из контекста
+    context.guild_label
+    return context
+
+
+def measure(func, messages: list) -> tuple:
+    tracemalloc.start()
+    started = time.perf_counter()
+    retained = [func(message) for message in messages]
+    elapsed = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    tracemalloc.stop()
+    del retained
+    return current, blocks, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=100_000)
+    args = parser.parse_args()
+
+    messages = build_messages(args.messages)
+    print(f"{'вариант':<10} {'байт/сообщ.':>12} {'блоков/сообщ.':>14} {'мкс/сообщ.':>11}")
+    for name, func in (("legacy", legacy), ("context", with_context)):
+        current, blocks, elapsed = measure(func, messages)
+        print(
+            f"{name:<10} {current / args.messages:>12.0f} {blocks / args.messages:>14.1f} "
+            f"{elapsed / args.messages * 1e6:>11.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,10 @@ import sys
 
 sys.path.append(os.path.join(os.path.dirname(__file__), "src"))
 
-from app.bot import Bot, main
+from app.bot import Bot, ShardedBot, create_bot, main
 
 
-__all__ = ["Bot", "main"]
+__all__ = ["Bot", "ShardedBot", "create_bot", "main"]
 
 
 if __name__ == "__main__":
@@ -0,0 +1,12 @@
+"""Запуск бота кластером процессов (по диапазону шардов на процесс)."""
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "src"))
+
+from app.cluster import main
+
+
+if __name__ == "__main__":
+    main()
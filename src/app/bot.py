@@ -3,10 +3,14 @@
 from __future__ import annotations
 
 import asyncio
+import functools
 import logging
 import os
+import signal
 import sys
+import time
 from pathlib import Path
+from typing import Optional
 
 import discord
 from discord.ext import commands, tasks
@@ -15,12 +19,22 @@ from dotenv import load_dotenv
 from database.db import get_db, get_redis
 from utils.monitoring import (
     capture_error,
+    recompute_guild_labels,
+    start_guild_metrics_server,
     start_metrics_server,
     track_message,
     update_active_users,
+    update_guilds_count,
+    update_shard_latency,
+    update_time_to_ready,
 )
 
+from app.cache_profile import CacheProfile, trim_member_cache
 from app.container import Container
+from app.sharding import shard_guild_counts, shard_latencies
+from app.shutdown import ShutdownManager, ShutdownReport
+from app.startup import StartupGraph
+from infrastructure.config import flush_json_stores
 
 from application.contracts import (
     AutomodServiceContract,
@@ -29,6 +43,8 @@ from application.contracts import (
     TicketsServiceContract,
     WarningsServiceContract,
 )
+from application.message_pipeline import MessagePipeline
+from domain.message_context import MessageContext
 
 
 log_dir = Path("data") / "logs"
@@ -58,14 +74,24 @@ intents.moderation = True
 class Bot(commands.Bot):
     """Основной класс бота."""
 
-    def __init__(self, container: Container) -> None:
-        """Инициализация бота."""
-        super().__init__(command_prefix="!", intents=intents)
+    def __init__(
+        self, container: Container, cache_profile: Optional[CacheProfile] = None, **options
+    ) -> None:
+        """Инициализация бота.
+
+        Args:
+            container: DI-контейнер
+            cache_profile: Профиль кэша discord.py (по умолчанию — поведение discord.py)
+            **options: Параметры gateway клиента (шарды)
+        """
+        self.cache_profile = (cache_profile or CacheProfile()).effective(intents)
+        options = {**self.cache_profile.client_options(intents), **options}
+        super().__init__(command_prefix="!", intents=intents, **options)
         self.container = container
         self.db = container.db
         self.initial_extensions = container.initial_extensions
         self.use_metrics = container.use_metrics
-        self.image_generator = container.image_generator
+        self.guild_settings = container.guild_settings
         services = container.build_services(self)
         self.moderation = services.moderation
         self.welcome = services.welcome
@@ -76,105 +102,217 @@ class Bot(commands.Bot):
         self.tickets: TicketsServiceContract = services.tickets
         self.temp_voice = services.temp_voice
         self.warnings: WarningsServiceContract = services.warnings
+        self.message_pipeline = MessagePipeline(self.automod, self.leveling, self.process_commands)
+        self.dispatcher = container.message_dispatcher
+        self.identify_scheduler = container.build_identify_scheduler()
         self.db_pool = None
+        self.created_at = time.monotonic()
+        self.ready_after: Optional[float] = None
+        self.accepting_messages = True
+        self.shutdown: Optional[ShutdownManager] = None
 
     async def setup_hook(self) -> None:
-        """Инициализация бота при запуске."""
+        """Инициализация бота при запуске.
+
+        Фазы запуска выполняются параллельно, если не зависят друг от друга:
+        подключение к БД, загрузка когов и шрифтов идут одновременно,
+        синхронизация команд ждет коги и БД, фоновые задачи — загрузку данных.
+        """
         try:
             logger.info("Начало инициализации бота...")
+            primary = self.container.is_primary
+
+            startup = StartupGraph()
+            startup.add("database", self.db.setup)
+            startup.add("fonts", self._preload_fonts, critical=False)
+            startup.add("extensions", self._load_extensions)
+            # В кластере однократные задачи запуска выполняет только процесс 0
+            startup.add("guild_settings", self._load_guild_settings, after=["database"])
+            if primary:
+                startup.add(
+                    "command_sync", self._sync_command_tree, after=["database", "extensions"]
+                )
+                startup.add("migrations", self._migrate_legacy_data, after=["database"])
+            startup.add("automod_counters", self._restore_automod_counters, after=["database"])
+            startup.add("log_outbox", self._start_log_outbox, after=["database"])
+            startup.add(
+                "tasks",
+                self._start_background_tasks,
+                after=[
+                    phase
+                    for phase in ("guild_settings", "migrations", "automod_counters")
+                    if phase in startup.phases
+                ],
+            )
+            # В кластере метрики процессов отдает супервизор
+            if self.use_metrics and self.container.cluster_id is None:
+                startup.add("metrics_server", self._start_metrics_server)
+            if self.use_metrics and self.container.guild_metrics_port:
+                startup.add("guild_metrics_server", self._start_guild_metrics_server)
 
-            # Инициализация базы данных
-            logger.info("Инициализация базы данных...")
-            await self.db.setup()
-            logger.info("База данных успешно инициализирована")
-
-            # Загрузка когов
-            logger.info("Загрузка когов...")
-            for extension in self.initial_extensions:
-                try:
-                    # Проверяем существование файла кога
-                    cog_path = os.path.join(
-                        os.path.dirname(__file__),
-                        "..",
-                        extension.replace(".", "/") + ".py",
-                    )
-                    if not os.path.exists(cog_path):
-                        logger.warning(f"Файл кога {cog_path} не найден, пропускаем")
-                        continue
-
-                    await self.load_extension(extension)
-                    logger.info(f"Загружен ког: {extension}")
-                except Exception as e:
-                    logger.error(f"Ошибка при загрузке кога {extension}: {str(e)}")
-                    capture_error(e)
-
-            for cog_factory in self.container.build_cogs():
-                try:
-                    await self.add_cog(cog_factory(self))
-                    logger.info(f"Загружен ког: {cog_factory.__name__}")
-                except Exception as e:
-                    logger.error(f"Ошибка при загрузке кога {cog_factory.__name__}: {str(e)}")
-                    capture_error(e)
-
-            # Синхронизация команд с Discord
-            logger.info("Синхронизация команд...")
+            await startup.run()
+            logger.info("Инициализация бота завершена успешно!")
 
-            try:
-                # Сначала получаем существующие команды
-                existing_commands = await self.http.get_global_commands(self.application_id)
+        except Exception as e:
+            logger.error(f"Критическая ошибка в setup_hook: {str(e)}", exc_info=True)
+            raise
 
-                # Находим Entry Point команду, если она существует
-                entry_point_command = next(
-                    (cmd for cmd in existing_commands if cmd.get("name") == "entry-point-command"),
-                    None,
+    @property
+    def image_generator(self):
+        """Генератор карточек из контейнера (создается при первом обращении)."""
+        return self.container.image_generator
+
+    async def _preload_fonts(self) -> None:
+        """Загрузка PIL и шрифтов карточек в фоне, вне event loop."""
+        generator = await asyncio.to_thread(lambda: self.image_generator)
+        await generator.preload_fonts()
+
+    async def _load_guild_settings(self) -> None:
+        """Перенос старых JSON настроек серверов и прогрев кэша."""
+        if self.container.is_primary:
+            await self.guild_settings.import_legacy_json(self._resolve_channel_guild)
+        configured = await self.guild_settings.load()
+        logger.info(f"Загружены настройки серверов: {configured}")
+
+    async def _load_extensions(self) -> None:
+        """Загрузка расширений и когов контейнера."""
+        logger.info("Загрузка когов...")
+        for extension in self.initial_extensions:
+            try:
+                # Проверяем существование файла кога
+                cog_path = os.path.join(
+                    os.path.dirname(__file__),
+                    "..",
+                    extension.replace(".", "/") + ".py",
                 )
+                if not os.path.exists(cog_path):
+                    logger.warning(f"Файл кога {cog_path} не найден, пропускаем")
+                    continue
 
-                # Синхронизируем команды
-                if entry_point_command is not None:
-                    logger.info("Найдена Entry Point команда, сохраняем ее при синхронизации")
+                await self.load_extension(extension)
+                logger.info(f"Загружен ког: {extension}")
+            except Exception as e:
+                logger.error(f"Ошибка при загрузке кога {extension}: {str(e)}")
+                capture_error(e)
 
-                await self.tree.sync()
-                logger.info("Глобальные команды синхронизированы")
+        for cog_factory in self.container.build_cogs():
+            try:
+                await self.add_cog(cog_factory(self))
+                logger.info(f"Загружен ког: {cog_factory.__name__}")
             except Exception as e:
-                logger.error(f"Ошибка при синхронизации глобальных команд: {str(e)}")
+                logger.error(f"Ошибка при загрузке кога {cog_factory.__name__}: {str(e)}")
                 capture_error(e)
 
-            # Синхронизируем команды для каждого сервера
-            for guild in self.guilds:
-                try:
-                    self.tree.copy_global_to(guild=guild)
-                    await self.tree.sync(guild=guild)
-                    logger.info(f"Команды синхронизированы для сервера: {guild.name}")
-                except Exception as e:
-                    logger.error(
-                        f"Ошибка при синхронизации команд для сервера {guild.name}: {str(e)}"
-                    )
-                    capture_error(e)
-
-            logger.info("Все команды успешно синхронизированы!")
-
-            # Миграция уровней из JSON в БД (fallback)
-            if self.leveling:
-                await self.leveling.migrate_to_db()
-
-            if self.warnings:
-                await self.warnings.migrate_to_db()
-
-            # Запуск фоновых задач
-            logger.info("Запуск фоновых задач...")
-            self.cleanup_tasks.start()
-            self.update_metrics.start()
-
-            # Инициализация метрик
-            if self.use_metrics:
-                logger.info(f"Запуск сервера метрик на порту {self.container.metrics_port}...")
-                start_metrics_server(self.container.metrics_port)
+    async def _sync_command_tree(self) -> None:
+        """Синхронизация команд с Discord (только изменившиеся области)."""
+        try:
+            planner = self.container.build_command_sync(self.tree, self._sync_commands)
+            await planner.run()
+        except Exception as e:
+            logger.error(f"Ошибка при синхронизации команд: {str(e)}")
+            capture_error(e)
+
+    async def _migrate_legacy_data(self) -> None:
+        """Миграция уровней и предупреждений из JSON в БД (fallback)."""
+        if self.leveling:
+            await self.leveling.migrate_to_db()
+        if self.warnings:
+            await self.warnings.migrate_to_db()
+
+    async def _restore_automod_counters(self) -> None:
+        """Восстановление счетчиков предупреждений автомодерации."""
+        if self.automod:
+            restored = await self.automod.load_warning_counters()
+            if restored:
+                logger.info(f"Восстановлено счетчиков предупреждений: {restored}")
+
+    async def _start_log_outbox(self) -> None:
+        """Запуск отправки логов, включая оставшиеся с прошлого запуска."""
+        restored = await self.container.log_outbox.start(self.get_channel, self.wait_until_ready)
+        if restored:
+            logger.info(f"Логов к отправке с прошлого запуска: {restored}")
+
+    async def _start_background_tasks(self) -> None:
+        logger.info("Запуск фоновых задач...")
+        self.cleanup_tasks.start()
+        self.update_metrics.start()
+        self.flush_counters.start()
+        self.flush_voice_activity.start()
+        self.refresh_config.change_interval(seconds=self.container.config_refresh_interval)
+        self.refresh_config.start()
+
+    async def _start_metrics_server(self) -> None:
+        logger.info(f"Запуск сервера метрик на порту {self.container.metrics_port}...")
+        start_metrics_server(self.container.metrics_port)
+
+    async def _start_guild_metrics_server(self) -> None:
+        # Процессы кластера отдают свои серверы на соседних портах
+        port = self.container.guild_metrics_port + (self.container.cluster_id or 0)
+        start_guild_metrics_server(port)
+
+    async def on_ready(self) -> None:
+        if self.ready_after is None:
+            self.ready_after = time.monotonic() - self.created_at
+            update_time_to_ready(self.ready_after)
+            logger.info(f"Бот готов через {self.ready_after:.1f} с после запуска")
+
+    async def _sync_commands(self, guild: Optional[discord.abc.Snowflake]) -> None:
+        """Синхронизировать одну область команд (None — глобальные)."""
+
+        if guild is not None:
+            await self.tree.sync(guild=guild)
+            logger.info(f"Команды синхронизированы для сервера: {guild.id}")
+            return
+
+        # Сначала получаем существующие команды
+        existing_commands = await self.http.get_global_commands(self.application_id)
 
-            logger.info("Инициализация бота завершена успешно!")
+        # Находим Entry Point команду, если она существует
+        entry_point_command = next(
+            (cmd for cmd in existing_commands if cmd.get("name") == "entry-point-command"),
+            None,
+        )
+        if entry_point_command is not None:
+            logger.info("Найдена Entry Point команда, сохраняем ее при синхронизации")
 
-        except Exception as e:
-            logger.error(f"Критическая ошибка в setup_hook: {str(e)}", exc_info=True)
-            raise
+        await self.tree.sync()
+        logger.info("Глобальные команды синхронизированы")
+
+    async def before_identify_hook(self, shard_id: Optional[int], *, initial: bool = False) -> None:
+        """Ожидание слота IDENTIFY с учетом `max_concurrency` Discord."""
+        await self.identify_scheduler.wait(shard_id or 0)
+
+    async def on_shard_connect(self, shard_id: int) -> None:
+        logger.info(f"Шард {shard_id} подключен к gateway")
+
+    async def on_shard_ready(self, shard_id: int) -> None:
+        guilds = sum(1 for guild in self.guilds if guild.shard_id == shard_id)
+        logger.info(f"Шард {shard_id} готов: {guilds} серверов")
+
+    async def on_shard_resumed(self, shard_id: int) -> None:
+        logger.info(f"Шард {shard_id} восстановил сессию")
+
+    async def on_shard_disconnect(self, shard_id: int) -> None:
+        logger.warning(f"Шард {shard_id} отключен от gateway")
+
+    def update_shard_metrics(self) -> None:
+        """Обновление количества серверов и задержки по шардам."""
+        latencies = shard_latencies(self)
+        counts = shard_guild_counts(self.guilds, (shard_id for shard_id, _ in latencies))
+        for shard_id, count in counts.items():
+            update_guilds_count(count, str(shard_id))
+        for shard_id, latency in latencies:
+            update_shard_latency(str(shard_id), latency)
+
+    async def _resolve_channel_guild(self, channel_id: int) -> Optional[int]:
+        """ID сервера, которому принадлежит канал (None, если канал удален)."""
+
+        try:
+            channel = self.get_channel(channel_id) or await self.fetch_channel(channel_id)
+        except discord.NotFound:
+            return None
+        guild = getattr(channel, "guild", None)
+        return guild.id if guild else None
 
     @tasks.loop(hours=1)
     async def cleanup_tasks(self) -> None:
@@ -191,6 +329,11 @@ class Bot(commands.Bot):
             await self.temp_voice.cleanup_inactive_channels()
             logger.debug("Очистка неактивных голосовых каналов выполнена")
 
+            # Ограничение кэша участников по профилю
+            trimmed = self.trim_member_caches()
+            if trimmed:
+                logger.debug(f"Из кэша участников вытеснено {trimmed} записей")
+
             # Очистка кэша Redis
             redis = get_redis()
             if redis:
@@ -213,6 +356,39 @@ class Bot(commands.Bot):
             logger.error(f"Ошибка в задаче cleanup_tasks: {str(e)}", exc_info=True)
             capture_error(e, {"task": "cleanup_tasks"})
 
+    @tasks.loop(seconds=30)
+    async def flush_counters(self) -> None:
+        """Пакетное сохранение счетчиков предупреждений автомодерации."""
+        try:
+            if self.automod:
+                flushed = await self.automod.flush_warning_counters()
+                if flushed:
+                    logger.debug(f"Сохранено счетчиков предупреждений: {flushed}")
+        except Exception as e:
+            logger.error(f"Ошибка в задаче flush_counters: {str(e)}", exc_info=True)
+            capture_error(e, {"task": "flush_counters"})
+
+    @tasks.loop(seconds=15)
+    async def flush_voice_activity(self) -> None:
+        """Отправка сводок завершенных голосовых сессий."""
+        try:
+            await self.logging.flush_voice_activity()
+        except Exception as e:
+            logger.error(f"Ошибка в задаче flush_voice_activity: {str(e)}", exc_info=True)
+            capture_error(e, {"task": "flush_voice_activity"})
+
+    @tasks.loop(seconds=5)
+    async def refresh_config(self) -> None:
+        """Получение конфигов, измененных другими процессами кластера."""
+        try:
+            # Чтение версии в WAL не ждет пишущие процессы
+            for service in (self.automod, self.tickets, self.warnings):
+                if service and service.refresh_config():
+                    logger.info(f"Конфигурация {type(service).__name__} обновлена из БД")
+        except Exception as e:
+            logger.error(f"Ошибка в задаче refresh_config: {str(e)}", exc_info=True)
+            capture_error(e, {"task": "refresh_config"})
+
     @tasks.loop(minutes=5)
     async def update_metrics(self) -> None:
         """Обновление метрик бота."""
@@ -225,6 +401,8 @@ class Bot(commands.Bot):
             # Общее количество пользователей во всех серверах
             total_users = sum(guild.member_count for guild in self.guilds)
             update_active_users(total_users)
+            self.update_shard_metrics()
+            recompute_guild_labels()
 
             logger.debug(f"Метрики обновлены: {total_users} пользователей")
 
@@ -238,24 +416,32 @@ class Bot(commands.Bot):
         Args:
             message: Объект сообщения
         """
-        # Игнорируем сообщения от ботов
-        if message.author.bot:
+        # Игнорируем сообщения от ботов и новые сообщения во время остановки
+        if message.author.bot or not self.accepting_messages:
             return
 
         try:
-            # Трекинг сообщения для метрик
-            guild_id = str(message.guild.id) if message.guild else "dm"
-            track_message(guild_id)
-
-            # Обработка сообщения системами бота
-            if self.automod:
-                await self.automod.check_message(message)
+            # Разбор сообщения один раз для всех стадий
+            context = MessageContext(message)
 
-            if self.leveling:
-                await self.leveling.process_message(message)
+            # Трекинг сообщения для метрик
+            track_message(context.guild_label)
+
+            # Текст для логов удаления и редактирования (без кэша discord.py)
+            self.logging.remember_message(message)
+
+            # Сообщение уходит в очередь воркера сервера; при перегрузке опыт не начисляется,
+            # а в полную очередь сообщение не ставится
+            award_xp = self.dispatcher.admit(context.guild_id, "leveling")
+            self.dispatcher.submit(
+                context.guild_id,
+                functools.partial(
+                    self.message_pipeline.process, context, award_xp, commands=False
+                ),
+            )
 
-            # Обработка команд
-            await self.process_commands(message)
+            # Команды выполняются в задаче события, вне очереди воркера
+            await self.message_pipeline.run_commands(context)
 
         except Exception as e:
             logger.error(f"Ошибка в on_message: {str(e)}", exc_info=True)
@@ -268,6 +454,88 @@ class Bot(commands.Bot):
                 },
             )
 
+    async def close(self) -> None:
+        """Согласованная остановка бота без потери данных.
+
+        Прием сообщений останавливается, очереди воркеров дорабатывают
+        в пределах `SHUTDOWN_DRAIN_TIMEOUT`, отложенные записи сбрасываются,
+        и только потом закрываются соединение с Discord и БД (с checkpoint WAL).
+        """
+        if self.shutdown is None:
+            self.shutdown = self._build_shutdown()
+        await self.shutdown.run()
+
+    def _build_shutdown(self) -> ShutdownManager:
+        shutdown = ShutdownManager(self.container.shutdown_timeout)
+        shutdown.add("intake", self._stop_intake)
+        shutdown.add("dispatcher", self._drain_dispatcher)
+        shutdown.add("automod_counters", self._flush_automod_counters)
+        # Незавершенные голосовые сессии попадают в логи до сброса очереди логов
+        shutdown.add("voice_activity", self._flush_voice_summaries)
+        shutdown.add("log_outbox", self._flush_log_outbox)
+        shutdown.add("json_stores", flush_json_stores)
+        # Discord закрывается после очередей: обработчикам нужен HTTP клиент
+        shutdown.add("discord", super().close)
+        shutdown.add("sqlite_checkpoint", self.db.checkpoint)
+        shutdown.add("database", self.db.close)
+        shutdown.add("regex_pool", self._close_regex_pool)
+        return shutdown
+
+    @property
+    def shutdown_report(self) -> Optional[ShutdownReport]:
+        """Отчет остановки (None, пока остановка не завершена)."""
+        return self.shutdown.report if self.shutdown else None
+
+    def trim_member_caches(self) -> int:
+        """Применить `member_cache_cap` профиля ко всем серверам."""
+        cap = self.cache_profile.member_cache_cap
+        if not cap:
+            return 0
+        keep_id = self.user.id if self.user else None
+        return sum(trim_member_cache(guild, cap, keep_id) for guild in self.guilds)
+
+    async def _stop_intake(self) -> None:
+        """Прекратить прием сообщений и остановить фоновые задачи."""
+        self.accepting_messages = False
+        loops = (
+            self.cleanup_tasks,
+            self.update_metrics,
+            self.flush_counters,
+            self.flush_voice_activity,
+            self.refresh_config,
+        )
+        running = [loop.get_task() for loop in loops if loop.is_running()]
+        for loop in loops:
+            loop.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+
+    async def _drain_dispatcher(self) -> int:
+        """Дождаться обработки очередей; возвращает число брошенных событий."""
+        pending = await self.dispatcher.close(timeout=self.container.shutdown_drain_timeout)
+        if pending:
+            logger.warning(f"Не обработано событий из очередей: {pending}")
+        return pending
+
+    async def _flush_voice_summaries(self) -> int:
+        return await self.logging.flush_voice_activity(force=True)
+
+    async def _flush_log_outbox(self) -> int:
+        """Отправить или сохранить накопленные логи; возвращает число потерянных."""
+        lost = await self.container.log_outbox.close(
+            timeout=self.container.shutdown_drain_timeout
+        )
+        if lost:
+            logger.warning(f"Потеряно логов при остановке: {lost}")
+        return lost
+
+    async def _flush_automod_counters(self) -> Optional[int]:
+        if self.automod:
+            return await self.automod.flush_warning_counters()
+        return None
+
+    async def _close_regex_pool(self) -> None:
+        self.container.regex_pool.close()
+
     async def on_error(self, event_method, *args, **kwargs) -> None:
         """Обработка ошибок событий бота.
 
@@ -322,12 +590,59 @@ class Bot(commands.Bot):
 
     @cleanup_tasks.before_loop
     @update_metrics.before_loop
+    @flush_counters.before_loop
+    @flush_voice_activity.before_loop
+    @refresh_config.before_loop
     async def before_tasks(self) -> None:
         """Ожидание, пока бот будет готов перед запуском задач."""
         await self.wait_until_ready()
         logger.info("Бот готов, запуск фоновых задач...")
 
 
+class ShardedBot(Bot, commands.AutoShardedBot):
+    """Бот с несколькими gateway соединениями (`AutoShardedBot`)."""
+
+    def __init__(self, container: Container, cache_profile: Optional[CacheProfile] = None) -> None:
+        super().__init__(
+            container,
+            cache_profile,
+            shard_count=container.shard_count,
+            shard_ids=container.shard_ids,
+        )
+
+
+def create_bot(container: Container) -> Bot:
+    """Создать бота в режиме, выбранном в контейнере."""
+
+    if container.sharding:
+        logger.info(
+            f"Режим AutoShardedBot: шардов {container.shard_count or 'auto'}, "
+            f"max_concurrency {container.shard_max_concurrency}"
+        )
+        bot: Bot = ShardedBot(container, container.cache_profile)
+    else:
+        bot = Bot(container, container.cache_profile)
+    logger.info(f"Кэш discord.py: {bot.cache_profile.describe()}")
+    return bot
+
+
+def install_signal_handlers(bot: Bot) -> None:
+    """SIGTERM/SIGINT запускают согласованную остановку вместо прерывания процесса."""
+
+    loop = asyncio.get_running_loop()
+
+    def request_close(sig: signal.Signals) -> None:
+        logger.info(f"Получен сигнал {sig.name}, остановка бота...")
+        asyncio.ensure_future(bot.close())
+
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, request_close, sig)
+        except (NotImplementedError, RuntimeError):
+            # Windows: SIGINT приходит как KeyboardInterrupt, бот закрывает `async with`
+            pass
+
+
 async def main() -> None:
     """Основная функция запуска бота."""
     try:
@@ -345,8 +660,11 @@ async def main() -> None:
 
         # Создание и запуск бота
         container = Container()
-        bot = Bot(container)
-        await bot.start(token)
+        bot = create_bot(container)
+        install_signal_handlers(bot)
+        # Выход из контекста вызывает bot.close(), если бот еще не остановлен
+        async with bot:
+            await bot.start(token)
 
     except discord.errors.LoginFailure as e:
         logger.critical(f"Ошибка авторизации в Discord: {str(e)}")
@@ -0,0 +1,141 @@
+"""Профили кэша состояния discord.py: сообщения, участники, chunking."""
+
+from __future__ import annotations
+
+import dataclasses
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+# Политики кэша участников (`MemberCacheFlags`)
+MEMBER_CACHE_POLICIES = ("none", "voice", "joined", "intents")
+# Политики загрузки участников серверов (chunking)
+CHUNKING_POLICIES = ("off", "startup", "lazy")
+
+
+@dataclass(frozen=True)
+class CacheProfile:
+    """Что и сколько discord.py держит в памяти.
+
+    Attributes:
+        name: Имя профиля
+        max_messages: Размер кэша сообщений (None — кэш отключен)
+        member_cache: Какие участники кэшируются: `none`, `voice` (в голосовых
+            каналах), `joined` (пришедшие после запуска), `intents` (все, что
+            разрешают интенты)
+        chunking: Загрузка всех участников сервера: `off`, `startup` (при
+            запуске) или `lazy` (при первом запросе команды)
+        member_cache_cap: Максимум закэшированных участников на сервер
+            (0 — без ограничения)
+    """
+
+    name: str = "default"
+    max_messages: Optional[int] = 1000
+    member_cache: str = "intents"
+    chunking: str = "off"
+    member_cache_cap: int = 0
+
+    def __post_init__(self) -> None:
+        if self.member_cache not in MEMBER_CACHE_POLICIES:
+            raise ValueError(f"Неизвестная политика кэша участников: {self.member_cache}")
+        if self.chunking not in CHUNKING_POLICIES:
+            raise ValueError(f"Неизвестная политика chunking: {self.chunking}")
+
+    @classmethod
+    def preset(cls, name: str) -> CacheProfile:
+        """Готовый профиль по имени (`default`, `lean`)."""
+
+        try:
+            return PRESETS[name]
+        except KeyError:
+            raise ValueError(
+                f"Неизвестный профиль кэша: {name} (доступны: {', '.join(PRESETS)})"
+            ) from None
+
+    def replace(self, **changes: Any) -> CacheProfile:
+        return dataclasses.replace(self, **changes)
+
+    def member_cache_flags(self, intents: discord.Intents) -> discord.MemberCacheFlags:
+        if self.member_cache == "none":
+            return discord.MemberCacheFlags.none()
+        if self.member_cache == "voice":
+            return discord.MemberCacheFlags(voice=intents.voice_states, joined=False)
+        if self.member_cache == "joined":
+            return discord.MemberCacheFlags(voice=False, joined=intents.members)
+        return discord.MemberCacheFlags.from_intents(intents)
+
+    def effective(self, intents: discord.Intents) -> CacheProfile:
+        """Профиль, приведенный к интентам.
+
+        Без интента members discord.py не умеет загружать участников, поэтому
+        chunking отключается с предупреждением вместо ошибки при запуске.
+        """
+
+        if self.chunking != "off" and not intents.members:
+            logger.warning(
+                f"Chunking '{self.chunking}' требует интент members, используется 'off'"
+            )
+            return self.replace(chunking="off")
+        return self
+
+    def client_options(self, intents: discord.Intents) -> Dict[str, Any]:
+        """Параметры `discord.Client` для этого профиля."""
+
+        profile = self.effective(intents)
+        return {
+            "max_messages": profile.max_messages,
+            "member_cache_flags": profile.member_cache_flags(intents),
+            "chunk_guilds_at_startup": profile.chunking == "startup",
+        }
+
+    def describe(self) -> str:
+        messages = "выкл" if self.max_messages is None else str(self.max_messages)
+        cap = self.member_cache_cap or "без ограничения"
+        return (
+            f"профиль {self.name}: сообщений {messages}, участники {self.member_cache} "
+            f"(до {cap} на сервер), chunking {self.chunking}"
+        )
+
+
+PRESETS: Dict[str, CacheProfile] = {
+    # Поведение discord.py по умолчанию
+    "default": CacheProfile(),
+    # Без кэша сообщений (логи берут текст из MessageContentCache) и только
+    # участники голосовых каналов (нужны временным голосовым каналам)
+    "lean": CacheProfile(
+        name="lean",
+        max_messages=None,
+        member_cache="voice",
+        member_cache_cap=1000,
+    ),
+}
+
+
+def trim_member_cache(guild: discord.Guild, cap: int, keep_id: Optional[int] = None) -> int:
+    """Ограничить число закэшированных участников сервера.
+
+    Вытесняются участники, добавленные в кэш раньше остальных. Участники в
+    голосовых каналах и сам бот (`keep_id`) остаются: без них не работают
+    временные голосовые каналы и проверки прав.
+
+    Returns:
+        int: Количество вытесненных участников
+    """
+
+    members = list(guild._members.values())
+    excess = len(members) - cap
+    if cap <= 0 or excess <= 0:
+        return 0
+    removed = 0
+    for member in members:
+        if removed >= excess:
+            break
+        if member.id == keep_id or member.voice is not None:
+            continue
+        guild._remove_member(member)
+        removed += 1
+    return removed
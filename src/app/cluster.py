@@ -0,0 +1,342 @@
+"""Кластер процессов бота: каждый процесс владеет непрерывным диапазоном шардов."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import random
+import shutil
+import signal
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+WorkerTarget = Callable[[int, List[int], int], None]
+
+
+def plan_clusters(shard_count: int, processes: int) -> List[List[int]]:
+    """Разбить шарды на непрерывные диапазоны, по одному на процесс.
+
+    Args:
+        shard_count: Общее количество шардов
+        processes: Желаемое количество процессов
+
+    Returns:
+        List[List[int]]: ID шардов каждого процесса (размеры отличаются не больше чем на 1)
+    """
+
+    if shard_count < 1:
+        raise ValueError("Нужен хотя бы один шард")
+    processes = max(min(processes, shard_count), 1)
+    base, extra = divmod(shard_count, processes)
+    ranges = []
+    start = 0
+    for index in range(processes):
+        size = base + (1 if index < extra else 0)
+        ranges.append(list(range(start, start + size)))
+        start += size
+    return ranges
+
+
+def cluster_env(cluster_id: int, shard_ids: Sequence[int], shard_count: int) -> Dict[str, str]:
+    """Переменные окружения процесса кластера для `Container`."""
+
+    return {
+        "SHARDING": "True",
+        "CLUSTER_ID": str(cluster_id),
+        "SHARD_COUNT": str(shard_count),
+        "SHARD_IDS": ",".join(str(shard_id) for shard_id in shard_ids),
+    }
+
+
+def run_bot_worker(cluster_id: int, shard_ids: List[int], shard_count: int) -> None:
+    """Точка входа процесса кластера: обычный бот со своим диапазоном шардов."""
+
+    os.environ.update(cluster_env(cluster_id, shard_ids, shard_count))
+    # Супервизор останавливает процессы через SIGTERM. До запуска цикла
+    # сигнал прерывает процесс, затем main() перехватывает его и
+    # останавливает бота согласованно (app.shutdown)
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    from app.bot import main
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+
+
+def run_fake_worker(cluster_id: int, shard_ids: List[int], shard_count: int) -> None:
+    """Процесс кластера с имитацией gateway для локальной проверки.
+
+    Вместо подключения к Discord процесс "получает" серверы своих шардов из
+    `FAKE_GUILDS` сгенерированных snowflake, публикует метрики шардов и
+    сообщений и работает до остановки. `FAKE_CRASH_AFTER` завершает процесс
+    с ошибкой через заданное число секунд, чтобы проверить перезапуск.
+    """
+
+    os.environ.update(cluster_env(cluster_id, shard_ids, shard_count))
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(processName)s - %(message)s")
+    from utils.monitoring import (
+        track_message,
+        update_guilds_count,
+        update_shard_latency,
+    )
+
+    guilds = int(os.getenv("FAKE_GUILDS", "1000"))
+    crash_after = float(os.getenv("FAKE_CRASH_AFTER", "0"))
+    owned: Dict[int, List[int]] = {shard_id: [] for shard_id in shard_ids}
+    for index in range(guilds):
+        guild_id = (1_400_000_000_000 + index * 7919) << 22
+        shard_id = (guild_id >> 22) % shard_count
+        if shard_id in owned:
+            owned[shard_id].append(guild_id)
+
+    for shard_id, shard_guilds in owned.items():
+        update_guilds_count(len(shard_guilds), str(shard_id))
+        update_shard_latency(str(shard_id), random.uniform(0.03, 0.08))
+        logger.info(f"Шард {shard_id} готов: {len(shard_guilds)} серверов")
+
+    started = time.monotonic()
+    try:
+        while True:
+            for shard_guilds in owned.values():
+                for guild_id in shard_guilds[:10]:
+                    track_message(str(guild_id))
+            if crash_after and time.monotonic() - started >= crash_after:
+                raise SystemExit(1)
+            time.sleep(0.1)
+    except KeyboardInterrupt:
+        pass
+
+
+@dataclass
+class ClusterProcess:
+    """Состояние одного процесса кластера."""
+
+    cluster_id: int
+    shard_ids: List[int]
+    process: Optional[multiprocessing.process.BaseProcess] = None
+    started_at: float = 0.0
+    restarts: int = 0
+    failures: int = 0
+    restart_at: Optional[float] = None
+    exit_codes: List[int] = field(default_factory=list)
+
+
+class ClusterSupervisor:
+    """Запуск, наблюдение и перезапуск процессов кластера.
+
+    Упавший процесс перезапускается с экспоненциальной задержкой
+    (`restart_delay` * 2^n, не больше `max_restart_delay`); счетчик
+    сбрасывается, если процесс проработал дольше `stable_after` секунд.
+    Метрики процессов пишутся в `metrics_dir` (multiprocess режим
+    prometheus_client) и отдаются супервизором одним эндпоинтом.
+    """
+
+    def __init__(
+        self,
+        shard_count: int,
+        processes: int,
+        target: WorkerTarget = run_bot_worker,
+        metrics_dir: Optional[Path] = None,
+        restart_delay: float = 1.0,
+        max_restart_delay: float = 60.0,
+        stable_after: float = 60.0,
+    ) -> None:
+        self.shard_count = shard_count
+        self.target = target
+        self.metrics_dir = metrics_dir
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.stable_after = stable_after
+        self.clusters = [
+            ClusterProcess(cluster_id, shard_ids)
+            for cluster_id, shard_ids in enumerate(plan_clusters(shard_count, processes))
+        ]
+        self._context = multiprocessing.get_context("spawn")
+        self._stopping = False
+
+    def start(self) -> None:
+        """Подготовить каталог метрик и запустить все процессы."""
+
+        if self.metrics_dir is not None:
+            # Файлы прошлого запуска искажают агрегированные значения
+            shutil.rmtree(self.metrics_dir, ignore_errors=True)
+            self.metrics_dir.mkdir(parents=True)
+            os.environ["PROMETHEUS_MULTIPROC_DIR"] = str(self.metrics_dir)
+        # Фактическое число процессов (не больше числа шардов): по нему
+        # процессы забирают очередь логов отключенных процессов
+        os.environ["CLUSTER_SIZE"] = str(len(self.clusters))
+        for cluster in self.clusters:
+            self._spawn(cluster)
+
+    def _spawn(self, cluster: ClusterProcess) -> None:
+        process = self._context.Process(
+            target=self.target,
+            args=(cluster.cluster_id, cluster.shard_ids, self.shard_count),
+            name=f"cluster-{cluster.cluster_id}",
+        )
+        process.start()
+        cluster.process = process
+        cluster.started_at = time.monotonic()
+        cluster.restart_at = None
+        logger.info(
+            f"Процесс кластера {cluster.cluster_id} запущен (pid {process.pid}), "
+            f"шарды {cluster.shard_ids[0]}-{cluster.shard_ids[-1]}"
+        )
+
+    def poll(self) -> None:
+        """Проверить процессы: запланировать перезапуск упавших и выполнить созревшие."""
+
+        now = time.monotonic()
+        for cluster in self.clusters:
+            process = cluster.process
+            if process is not None and not process.is_alive():
+                self._on_exit(cluster, now)
+            if cluster.restart_at is not None and now >= cluster.restart_at and not self._stopping:
+                cluster.restarts += 1
+                self._spawn(cluster)
+
+    def _on_exit(self, cluster: ClusterProcess, now: float) -> None:
+        process = cluster.process
+        cluster.process = None
+        cluster.exit_codes.append(process.exitcode)
+        self._mark_dead(process.pid)
+        if self._stopping:
+            return
+        if now - cluster.started_at >= self.stable_after:
+            cluster.failures = 0
+        delay = min(self.restart_delay * 2**cluster.failures, self.max_restart_delay)
+        cluster.failures += 1
+        cluster.restart_at = now + delay
+        logger.warning(
+            f"Процесс кластера {cluster.cluster_id} завершился с кодом {process.exitcode}, "
+            f"перезапуск через {delay:.0f} с"
+        )
+
+    def _mark_dead(self, pid: int) -> None:
+        if self.metrics_dir is None:
+            return
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(pid, str(self.metrics_dir))
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """Остановить все процессы: SIGTERM, затем kill по истечении `timeout`."""
+
+        self._stopping = True
+        running = [cluster.process for cluster in self.clusters if cluster.process is not None]
+        for process in running:
+            process.terminate()
+        deadline = time.monotonic() + timeout
+        for process in running:
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                logger.warning(f"Процесс {process.name} не остановился, принудительное завершение")
+                process.kill()
+                process.join()
+        for cluster in self.clusters:
+            if cluster.process is not None:
+                self._on_exit(cluster, time.monotonic())
+
+    def serve_metrics(self, port: int) -> None:
+        """Отдавать агрегированные метрики всех процессов на `port`."""
+
+        from prometheus_client import CollectorRegistry, multiprocess, start_http_server
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry, path=str(self.metrics_dir))
+        start_http_server(port, registry=registry)
+        logger.info(f"Метрики кластера доступны на порту {port}")
+
+    def run(self, poll_interval: float = 1.0, metrics_port: Optional[int] = None) -> None:
+        """Запустить кластер и наблюдать за процессами до SIGINT/SIGTERM."""
+
+        def request_stop(signum, frame) -> None:
+            self._stopping = True
+
+        signal.signal(signal.SIGINT, request_stop)
+        signal.signal(signal.SIGTERM, request_stop)
+        self.start()
+        if metrics_port is not None and self.metrics_dir is not None:
+            self.serve_metrics(metrics_port)
+        try:
+            while not self._stopping:
+                self.poll()
+                time.sleep(poll_interval)
+        finally:
+            logger.info("Остановка кластера...")
+            self.stop()
+
+
+async def fetch_gateway_limits(token: str) -> tuple:
+    """Рекомендованное Discord число шардов и `max_concurrency`."""
+
+    import discord
+
+    http = discord.http.HTTPClient()
+    try:
+        await http.static_login(token)
+        shards, _, session_start_limit = await http.get_bot_gateway()
+        return shards, session_start_limit.get("max_concurrency", 1)
+    finally:
+        await http.close()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Точка входа `cluster.py`."""
+
+    from dotenv import load_dotenv
+
+    load_dotenv(Path("data") / ".env")
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(message)s")
+
+    parser = argparse.ArgumentParser(description="Запуск бота несколькими процессами")
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=int(os.getenv("CLUSTER_PROCESSES", "0")) or os.cpu_count() or 1,
+    )
+    parser.add_argument("--shards", type=int, default=int(os.getenv("SHARD_COUNT", "0")))
+    parser.add_argument("--metrics-port", type=int, default=int(os.getenv("METRICS_PORT", "8000")))
+    parser.add_argument(
+        "--metrics-dir", type=Path, default=Path(os.getenv("CLUSTER_METRICS_DIR", "data/metrics"))
+    )
+    parser.add_argument(
+        "--fake-gateway",
+        action="store_true",
+        help="Не подключаться к Discord, имитировать шарды (для локальной проверки)",
+    )
+    args = parser.parse_args(argv)
+
+    shard_count = args.shards
+    if args.fake_gateway:
+        shard_count = shard_count or args.processes * 2
+        target = run_fake_worker
+    else:
+        target = run_bot_worker
+        token = os.getenv("DISCORD_TOKEN")
+        if not token:
+            raise SystemExit("DISCORD_TOKEN не найден в .env файле")
+        if not shard_count or "SHARD_MAX_CONCURRENCY" not in os.environ:
+            recommended, max_concurrency = asyncio.run(fetch_gateway_limits(token))
+            shard_count = shard_count or recommended
+            os.environ.setdefault("SHARD_MAX_CONCURRENCY", str(max_concurrency))
+
+    # Очередность IDENTIFY общая для всех процессов
+    os.environ.setdefault("SHARD_IDENTIFY_DB", str(Path("data") / "identify.db"))
+
+    supervisor = ClusterSupervisor(shard_count, args.processes, target, args.metrics_dir)
+    logger.info(
+        f"Кластер: {len(supervisor.clusters)} процессов, {shard_count} шардов"
+        + (" (имитация gateway)" if args.fake_gateway else "")
+    )
+    use_metrics = os.getenv("USE_METRICS", "False").lower() == "true" or args.fake_gateway
+    supervisor.run(metrics_port=args.metrics_port if use_metrics else None)
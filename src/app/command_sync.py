@@ -0,0 +1,156 @@
+"""Синхронизация slash-команд только для изменившихся областей."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import discord
+from discord import app_commands
+
+from utils.monitoring import capture_error
+
+from application.contracts import CommandSyncRepositoryContract
+
+logger = logging.getLogger(__name__)
+
+SyncScope = Callable[[Optional[discord.abc.Snowflake]], Awaitable[Any]]
+
+GLOBAL_SCOPE = "global"
+
+
+def command_tree_hash(
+    tree: app_commands.CommandTree, guild: Optional[discord.abc.Snowflake] = None
+) -> str:
+    """Стабильный хеш команд области (глобальной или сервера).
+
+    Хешируется тот же payload, который `tree.sync` отправляет в Discord,
+    отсортированный по типу и имени, поэтому порядок регистрации команд
+    на хеш не влияет.
+    """
+
+    payload = sorted(
+        (command.to_dict(tree) for command in tree.get_commands(guild=guild)),
+        key=lambda command: (command.get("type", 1), command["name"]),
+    )
+    encoded = json.dumps(
+        payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class SyncReport:
+    """Результат синхронизации: области по исходу и длительность этапов."""
+
+    synced: List[str] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def total(self) -> float:
+        return sum(self.timings.values())
+
+    def summary(self) -> str:
+        stages = ", ".join(
+            f"{stage} {seconds * 1000:.0f} мс" for stage, seconds in self.timings.items()
+        )
+        return (
+            f"синхронизировано {len(self.synced)}, без изменений {len(self.skipped)}, "
+            f"ошибок {len(self.failed)} за {self.total * 1000:.0f} мс ({stages})"
+        )
+
+
+class CommandSyncPlanner:
+    """Планировщик синхронизации дерева команд по хешам.
+
+    Для каждой области (глобальные команды и серверы из `guild_ids`)
+    считается хеш дерева и сравнивается с последним успешно
+    синхронизированным из репозитория. REST-запрос выполняется только для
+    изменившихся областей или для всех при `force`. Хеш сохраняется после
+    успешной синхронизации, поэтому неудачная область повторится при
+    следующем запуске.
+    """
+
+    def __init__(
+        self,
+        tree: app_commands.CommandTree,
+        repository: CommandSyncRepositoryContract,
+        guild_ids: Sequence[int] = (),
+        force: bool = False,
+        sync: Optional[SyncScope] = None,
+    ) -> None:
+        self.tree = tree
+        self.repository = repository
+        self.guild_ids = list(guild_ids)
+        self.force = force
+        self._sync = sync or (lambda guild: tree.sync(guild=guild))
+
+    def scopes(self) -> List[Tuple[str, Optional[discord.Object]]]:
+        """Области синхронизации: глобальная и серверы разработки."""
+
+        scopes: List[Tuple[str, Optional[discord.Object]]] = [(GLOBAL_SCOPE, None)]
+        scopes.extend(
+            (f"guild:{guild_id}", discord.Object(guild_id)) for guild_id in self.guild_ids
+        )
+        return scopes
+
+    def scope_key(self, scope: str) -> str:
+        """Ключ хранения: команды разных приложений не должны смешиваться."""
+
+        return f"{self.tree.client.application_id}:{scope}"
+
+    async def plan(
+        self, report: Optional[SyncReport] = None
+    ) -> List[Tuple[str, Optional[discord.Object], str]]:
+        """Области, которые нужно синхронизировать, с их текущими хешами."""
+
+        report = report or SyncReport()
+        started = time.perf_counter()
+        hashes = {}
+        for scope, guild in self.scopes():
+            if guild is not None:
+                # Серверная область содержит копию глобальных команд
+                self.tree.copy_global_to(guild=guild)
+            hashes[scope] = (guild, command_tree_hash(self.tree, guild))
+        report.timings["hash"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        stored = await self.repository.load_hashes()
+        report.timings["state"] = time.perf_counter() - started
+
+        changed = []
+        for scope, (guild, tree_hash) in hashes.items():
+            if self.force or stored.get(self.scope_key(scope)) != tree_hash:
+                changed.append((scope, guild, tree_hash))
+            else:
+                report.skipped.append(scope)
+        return changed
+
+    async def run(self) -> SyncReport:
+        """Синхронизировать изменившиеся области и вернуть отчет."""
+
+        report = SyncReport()
+        for scope, guild, tree_hash in await self.plan(report):
+            started = time.perf_counter()
+            try:
+                await self._sync(guild)
+                await self.repository.save_hash(self.scope_key(scope), tree_hash)
+                report.synced.append(scope)
+            except Exception as e:
+                logger.error(f"Ошибка при синхронизации команд ({scope}): {str(e)}")
+                capture_error(e)
+                report.failed.append(scope)
+            report.timings[scope] = time.perf_counter() - started
+
+        if report.skipped:
+            logger.info(
+                f"Команды не изменились, синхронизация пропущена: {', '.join(report.skipped)}"
+            )
+        logger.info(f"Синхронизация команд: {report.summary()}")
+        return report
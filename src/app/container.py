@@ -2,14 +2,15 @@
 
 from __future__ import annotations
 
+import functools
 import os
 from pathlib import Path
 from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional, Union
 
 import leveling_system
 from automod import AutoMod
 from database.db import Database
-from image_generator import ImageGenerator
 from logging_system import LoggingSystem
 from moderation import Moderation
 from roles import RoleRewards
@@ -18,16 +19,41 @@ from tickets import TicketSystem
 from warning_system import WarningSystem
 from welcome import Welcome
 
+from app.cache_profile import CacheProfile
+from app.command_sync import CommandSyncPlanner
+from app.sharding import IdentifyScheduler
 from infrastructure.config import (
     AutomodConfigStore,
     LevelsStore,
     TicketsConfigStore,
     WarningsConfigStore,
     WarningsStore,
+    configure_json_codec,
 )
+from infrastructure.cache import AuditLogCache, MessageContentCache
 from infrastructure.monitoring import init_monitoring
-from infrastructure.db import LevelsRepository, TicketsRepository, WarningsRepository
+from infrastructure.workers import (
+    DurableLogOutbox,
+    GuildDispatcher,
+    LogOutbox,
+    RegexWorkerPool,
+    WebhookSink,
+    send_embeds,
+)
+from infrastructure.db import (
+    AutomodCountersRepository,
+    CommandSyncRepository,
+    DataMigrationsRepository,
+    GuildSettingsRepository,
+    LevelsRepository,
+    LogOutboxRepository,
+    TicketsRepository,
+    WarningsRepository,
+)
 
+from application.data_migrations import DataMigrationRunner
+from application.guild_settings import GuildSettingsService
+from application.voice_activity import VoiceActivityAggregator
 from application.contracts import (
     AutomodServiceContract,
     LevelingServiceContract,
@@ -36,6 +62,9 @@ from application.contracts import (
     WarningsServiceContract,
 )
 
+if TYPE_CHECKING:
+    from image_generator import ImageGenerator
+
 
 @dataclass(frozen=True)
 class BotServices:
@@ -60,13 +89,78 @@ class Container:
         os.environ.setdefault("DB_PATH", str(Path("data") / "bot.db"))
         self.use_metrics = os.getenv("USE_METRICS", "False").lower() == "true"
         self.metrics_port = int(os.getenv("METRICS_PORT", "8000"))
+        # Отдельный эндпоинт метрик по всем серверам (0 — отключен)
+        self.guild_metrics_port = int(os.getenv("METRICS_GUILD_PORT", "0"))
+        self.persist_automod_warnings = (
+            os.getenv("AUTOMOD_PERSIST_WARNINGS", "False").lower() == "true"
+        )
+        self.automod_warning_cache_size = int(os.getenv("AUTOMOD_WARNING_CACHE_SIZE", "10000"))
         self.db = Database()
-        self.image_generator = ImageGenerator()
-        self.levels_store = LevelsStore()
-        self.tickets_store = TicketsConfigStore()
-        self.automod_store = AutomodConfigStore()
-        self.warnings_store = WarningsStore()
-        self.warnings_config_store = WarningsConfigStore()
+        configure_json_codec(
+            os.getenv("JSON_CODEC", "auto"),
+            pretty=os.getenv("JSON_PRETTY", "True").lower() == "true",
+        )
+        self.json_save_debounce = float(os.getenv("JSON_SAVE_DEBOUNCE", "1.0"))
+        self.json_journal = os.getenv("JSON_JOURNAL", "False").lower() == "true"
+        cluster_id = os.getenv("CLUSTER_ID")
+        self.cluster_id = int(cluster_id) if cluster_id else None
+        # Уровни и предупреждения хранятся в БД, JSON — источник их миграции
+        self.levels_store = LevelsStore(
+            debounce=self.json_save_debounce,
+            journal=self.json_journal,
+        )
+        self.warnings_store = WarningsStore(
+            debounce=self.json_save_debounce,
+            journal=self.json_journal,
+        )
+        # Конфиги общие для процессов кластера (таблица config_documents)
+        self.tickets_store = TicketsConfigStore(db_path=self.db.db_path)
+        self.automod_store = AutomodConfigStore(db_path=self.db.db_path)
+        self.warnings_config_store = WarningsConfigStore(db_path=self.db.db_path)
+        self.config_refresh_interval = float(os.getenv("CONFIG_REFRESH_INTERVAL", "5"))
+        self.guild_settings = GuildSettingsService(GuildSettingsRepository(self.db))
+        self.data_migrations = DataMigrationRunner(DataMigrationsRepository(self.db))
+        self.regex_pool = RegexWorkerPool(
+            size=int(os.getenv("AUTOMOD_REGEX_WORKERS", "2")),
+            timeout=float(os.getenv("AUTOMOD_REGEX_TIMEOUT", "0.5")),
+        )
+        self.sharding = os.getenv("SHARDING", "False").lower() == "true"
+        self.shard_count = int(os.getenv("SHARD_COUNT", "0")) or None
+        shard_ids = os.getenv("SHARD_IDS", "")
+        self.shard_ids = [int(shard_id) for shard_id in shard_ids.split(",")] if shard_ids else None
+        self.shard_max_concurrency = int(os.getenv("SHARD_MAX_CONCURRENCY", "1"))
+        self.identify_slots_path = os.getenv("SHARD_IDENTIFY_DB")
+        self.message_dispatcher = GuildDispatcher(
+            workers=int(os.getenv("MESSAGE_WORKERS", "4")),
+            queue_size=int(os.getenv("MESSAGE_QUEUE_SIZE", "100")),
+        )
+        self.cache_profile = self._cache_profile_from_env()
+        self.message_cache = MessageContentCache(
+            maxsize=int(os.getenv("MESSAGE_LOG_CACHE_SIZE", "50000")),
+            content_limit=int(os.getenv("MESSAGE_LOG_CONTENT_LIMIT", "1000")),
+        )
+        self.log_webhooks = os.getenv("LOG_WEBHOOKS", "False").lower() == "true"
+        self.log_outbox_store = os.getenv("LOG_OUTBOX_STORE", "sqlite").lower()
+        self.log_outbox = self._build_log_outbox()
+        self.voice_activity = (
+            VoiceActivityAggregator(
+                settle=float(os.getenv("VOICE_LOG_SETTLE", "60")),
+                interval=float(os.getenv("VOICE_LOG_INTERVAL", "900")),
+            )
+            if os.getenv("VOICE_LOG_MODE", "events").lower() == "aggregate"
+            else None
+        )
+        self.audit_log_cache = AuditLogCache(
+            ttl=float(os.getenv("AUDIT_LOG_CACHE_TTL", "60")),
+            wait=float(os.getenv("AUDIT_LOG_WAIT", "2.0")),
+        )
+        self.shutdown_timeout = float(os.getenv("SHUTDOWN_TIMEOUT", "25"))
+        self.shutdown_drain_timeout = float(os.getenv("SHUTDOWN_DRAIN_TIMEOUT", "10"))
+        self.command_sync_force = os.getenv("COMMAND_SYNC_FORCE", "False").lower() == "true"
+        sync_guilds = os.getenv("COMMAND_SYNC_GUILDS", "")
+        self.command_sync_guilds = [
+            int(guild_id) for guild_id in sync_guilds.split(",") if guild_id.strip()
+        ]
         self.initial_extensions = [
             "cogs.events",
             "cogs.commands",
@@ -74,6 +168,83 @@ class Container:
             "presentation.moderation",
         ]
 
+    @staticmethod
+    def _cache_profile_from_env() -> CacheProfile:
+        """Профиль `CACHE_PROFILE` с переопределениями отдельных параметров."""
+
+        profile = CacheProfile.preset(os.getenv("CACHE_PROFILE", "default"))
+        changes = {}
+        if os.getenv("MESSAGE_CACHE_SIZE"):
+            # 0 отключает кэш сообщений (discord.py считает 0 значением по умолчанию)
+            changes["max_messages"] = int(os.environ["MESSAGE_CACHE_SIZE"]) or None
+        if os.getenv("MEMBER_CACHE"):
+            changes["member_cache"] = os.environ["MEMBER_CACHE"].lower()
+        if os.getenv("GUILD_CHUNKING"):
+            changes["chunking"] = os.environ["GUILD_CHUNKING"].lower()
+        if os.getenv("MEMBER_CACHE_CAP"):
+            changes["member_cache_cap"] = int(os.environ["MEMBER_CACHE_CAP"])
+        return profile.replace(**changes) if changes else profile
+
+    def _build_log_outbox(self) -> Union[LogOutbox, DurableLogOutbox]:
+        """Очередь логов: в SQLite (`LOG_OUTBOX_STORE=sqlite`) или в памяти."""
+
+        options = dict(
+            window=float(os.getenv("LOG_BATCH_WINDOW", "1.0")),
+            shed_threshold=int(os.getenv("LOG_BACKLOG_SHED", "50")),
+            max_backlog=int(os.getenv("LOG_BACKLOG_MAX", "500")),
+            send=WebhookSink() if self.log_webhooks else send_embeds,
+        )
+        if self.log_outbox_store == "memory":
+            return LogOutbox(**options)
+        if self.log_outbox_store != "sqlite":
+            raise ValueError(f"Неизвестное хранилище очереди логов: {self.log_outbox_store}")
+        return DurableLogOutbox(
+            LogOutboxRepository(self.db),
+            owner=self.cluster_id or 0,
+            owners=self._cluster_size(),
+            max_attempts=int(os.getenv("LOG_RETRY_MAX_ATTEMPTS", "8")),
+            max_backoff=float(os.getenv("LOG_RETRY_MAX_BACKOFF", "300")),
+            **options,
+        )
+
+    def _cluster_size(self) -> Optional[int]:
+        """Число процессов кластера (None — неизвестно, строки не перераспределяются)."""
+
+        if self.cluster_id is None:
+            return 1
+        size = os.getenv("CLUSTER_SIZE")
+        return int(size) if size else None
+
+    @functools.cached_property
+    def image_generator(self) -> ImageGenerator:
+        """Генератор карточек (PIL загружается при первом обращении)."""
+
+        from image_generator import ImageGenerator
+
+        return ImageGenerator()
+
+    @property
+    def is_primary(self) -> bool:
+        """Выполняет ли процесс однократные задачи запуска (процесс 0 кластера)."""
+
+        return self.cluster_id in (None, 0)
+
+    def build_identify_scheduler(self) -> IdentifyScheduler:
+        """Создать планировщик IDENTIFY (общий для кластера, если задан файл слотов)."""
+
+        return IdentifyScheduler(self.shard_max_concurrency, slots_path=self.identify_slots_path)
+
+    def build_command_sync(self, tree, sync=None) -> CommandSyncPlanner:
+        """Создать планировщик синхронизации slash-команд."""
+
+        return CommandSyncPlanner(
+            tree,
+            CommandSyncRepository(self.db),
+            guild_ids=self.command_sync_guilds,
+            force=self.command_sync_force,
+            sync=sync,
+        )
+
     def build_cogs(self) -> list:
         """Создать коги, требующие независимой инициализации."""
 
@@ -88,28 +259,48 @@ class Container:
         levels_repository = LevelsRepository(self.db)
         tickets_repository = TicketsRepository(self.db)
         warnings_repository = WarningsRepository(self.db)
+        automod_counters_repository = (
+            AutomodCountersRepository(self.db) if self.persist_automod_warnings else None
+        )
 
         return BotServices(
             moderation=Moderation(bot),
-            welcome=Welcome(bot),
-            role_rewards=RoleRewards(bot),
+            welcome=Welcome(bot, self.guild_settings),
+            role_rewards=RoleRewards(bot, self.guild_settings),
             leveling=leveling_system.init_leveling(
                 bot,
                 levels_repository,
                 self.levels_store,
+                self.data_migrations,
+                # Общий levels.json процессы кластера переписывали бы целиком
+                file_fallback=self.cluster_id is None,
+            ),
+            automod=AutoMod(
+                bot,
+                self.automod_store,
+                self.regex_pool,
+                automod_counters_repository,
+                self.automod_warning_cache_size,
+            ),
+            logging=LoggingSystem(
+                bot,
+                self.guild_settings,
+                self.message_cache,
+                self.log_outbox,
+                self.audit_log_cache,
+                self.voice_activity,
             ),
-            automod=AutoMod(bot, self.automod_store),
-            logging=LoggingSystem(bot),
             tickets=TicketSystem(
                 bot,
                 tickets_repository,
                 self.tickets_store,
             ),
-            temp_voice=TempVoice(bot),
+            temp_voice=TempVoice(bot, self.guild_settings),
             warnings=WarningSystem(
                 bot,
                 warnings_repository,
                 self.warnings_store,
                 self.warnings_config_store,
+                self.data_migrations,
             ),
         )
@@ -0,0 +1,113 @@
+"""Шардирование gateway: очередность IDENTIFY и статистика шардов."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sqlite3
+import time
+from contextlib import closing
+from typing import Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Discord разрешает одну идентификацию на бакет раз в 5 секунд
+IDENTIFY_INTERVAL = 5.0
+
+
+class SqliteIdentifySlots:
+    """Слоты IDENTIFY в общем SQLite файле для нескольких процессов кластера.
+
+    `BEGIN IMMEDIATE` сериализует резервирование между процессами, поэтому
+    процессы с разными диапазонами шардов не идентифицируются в одном бакете
+    одновременно.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with closing(sqlite3.connect(self.path, timeout=30)) as conn:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS identify_slots "
+                "(bucket INTEGER PRIMARY KEY, next_slot REAL NOT NULL)"
+            )
+            conn.commit()
+
+    def reserve(self, bucket: int, interval: float) -> float:
+        """Зарезервировать ближайший слот бакета и вернуть задержку до него."""
+
+        with closing(sqlite3.connect(self.path, timeout=30, isolation_level=None)) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT next_slot FROM identify_slots WHERE bucket = ?", (bucket,)
+            ).fetchone()
+            now = time.time()
+            slot = max(now, row[0] if row else now)
+            conn.execute(
+                "INSERT INTO identify_slots (bucket, next_slot) VALUES (?, ?) "
+                "ON CONFLICT(bucket) DO UPDATE SET next_slot = excluded.next_slot",
+                (bucket, slot + interval),
+            )
+            conn.execute("COMMIT")
+        return slot - now
+
+
+class IdentifyScheduler:
+    """Разнесение IDENTIFY шардов по бакетам `shard_id % max_concurrency`.
+
+    Шарды из разных бакетов идентифицируются одновременно, из одного —
+    не чаще раза в `interval` секунд. При `max_concurrency=1` поведение
+    совпадает со стандартной паузой discord.py в 5 секунд. С `slots_path`
+    слоты общие для всех процессов кластера.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 1,
+        interval: float = IDENTIFY_INTERVAL,
+        slots_path: Optional[str] = None,
+    ) -> None:
+        self.max_concurrency = max(max_concurrency, 1)
+        self.interval = interval
+        self.slots = SqliteIdentifySlots(slots_path) if slots_path else None
+        self._next_slot: Dict[int, float] = {}
+
+    def delay_for(self, shard_id: int) -> float:
+        """Зарезервировать слот бакета шарда и вернуть задержку до него."""
+
+        bucket = shard_id % self.max_concurrency
+        if self.slots is not None:
+            return self.slots.reserve(bucket, self.interval)
+        now = time.monotonic()
+        slot = max(now, self._next_slot.get(bucket, now))
+        self._next_slot[bucket] = slot + self.interval
+        return slot - now
+
+    async def wait(self, shard_id: int) -> None:
+        """Дождаться разрешения на IDENTIFY."""
+
+        if self.slots is not None:
+            delay = await asyncio.to_thread(self.delay_for, shard_id)
+        else:
+            delay = self.delay_for(shard_id)
+        if delay > 0:
+            logger.debug(f"Шард {shard_id}: IDENTIFY через {delay:.1f} с")
+            await asyncio.sleep(delay)
+
+
+def shard_guild_counts(guilds: Iterable, shard_ids: Iterable[int]) -> Dict[int, int]:
+    """Количество серверов на каждом шарде (включая пустые шарды)."""
+
+    counts = {shard_id: 0 for shard_id in shard_ids}
+    for guild in guilds:
+        counts[guild.shard_id] = counts.get(guild.shard_id, 0) + 1
+    return counts
+
+
+def shard_latencies(bot) -> Tuple[Tuple[int, float], ...]:
+    """Задержки heartbeat по шардам (для нешардированного бота — шард 0)."""
+
+    latencies = getattr(bot, "latencies", None)
+    if latencies is not None:
+        return tuple(latencies)
+    return ((bot.shard_id or 0, bot.latency),)
@@ -0,0 +1,105 @@
+"""Согласованная остановка бота: шаги по порядку с общим дедлайном."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from utils.monitoring import capture_error
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ShutdownStep:
+    """Шаг остановки и его собственный лимит времени."""
+
+    name: str
+    run: Callable[[], Awaitable[Any]]
+    timeout: Optional[float] = None
+
+
+@dataclass
+class ShutdownReport:
+    """Что удалось сохранить при остановке и сколько заняли шаги."""
+
+    results: Dict[str, Any] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    timed_out: List[str] = field(default_factory=list)
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def clean(self) -> bool:
+        return not self.errors and not self.timed_out
+
+    def summary(self) -> str:
+        parts = []
+        for name, seconds in self.timings.items():
+            if name in self.timed_out:
+                outcome = "таймаут"
+            elif name in self.errors:
+                outcome = f"ошибка: {self.errors[name]}"
+            else:
+                result = self.results.get(name)
+                outcome = "ok" if result is None else str(result)
+            parts.append(f"{name} {outcome} ({seconds * 1000:.0f} мс)")
+        return ", ".join(parts)
+
+
+class ShutdownManager:
+    """Последовательное выполнение шагов остановки.
+
+    Каждый шаг ограничен своим `timeout` и оставшимся временем общего
+    `deadline`. Ошибка или таймаут шага логируется и не мешает следующим
+    шагам: сохранить нужно как можно больше. Повторный вызов `run`
+    дожидается первой остановки и возвращает тот же отчет.
+    """
+
+    def __init__(self, deadline: float = 25.0) -> None:
+        self.deadline = deadline
+        self.steps: List[ShutdownStep] = []
+        self.report: Optional[ShutdownReport] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def add(
+        self, name: str, run: Callable[[], Awaitable[Any]], timeout: Optional[float] = None
+    ) -> None:
+        self.steps.append(ShutdownStep(name, run, timeout))
+
+    @property
+    def started(self) -> bool:
+        return self._task is not None
+
+    async def run(self) -> ShutdownReport:
+        """Выполнить шаги (один раз) и вернуть отчет."""
+
+        if self._task is None:
+            self._task = asyncio.create_task(self._run_steps(), name="shutdown")
+        # Отмена вызывающей задачи (повторный сигнал) не прерывает остановку
+        return await asyncio.shield(self._task)
+
+    async def _run_steps(self) -> ShutdownReport:
+        report = ShutdownReport()
+        finish_by = time.monotonic() + self.deadline
+        for step in self.steps:
+            remaining = max(finish_by - time.monotonic(), 0.0)
+            timeout = remaining if step.timeout is None else min(step.timeout, remaining)
+            started = time.perf_counter()
+            try:
+                report.results[step.name] = await asyncio.wait_for(step.run(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Шаг остановки {step.name} не завершился за {timeout:.1f} с")
+                report.timed_out.append(step.name)
+            except Exception as e:
+                logger.error(f"Ошибка на шаге остановки {step.name}: {str(e)}")
+                capture_error(e, {"event": "shutdown", "step": step.name})
+                report.errors[step.name] = str(e)
+            report.timings[step.name] = time.perf_counter() - started
+
+        log = logger.info if report.clean else logger.warning
+        log(f"Остановка завершена: {report.summary()}")
+        self.report = report
+        return report
@@ -0,0 +1,98 @@
+"""Граф фаз запуска бота: независимые фазы выполняются параллельно."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Sequence, Tuple
+
+from utils.monitoring import capture_error, observe_startup_phase
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class StartupPhase:
+    """Фаза запуска и фазы, которые должны завершиться до нее."""
+
+    name: str
+    run: Callable[[], Awaitable[Any]]
+    after: Tuple[str, ...] = ()
+    critical: bool = True
+
+
+class StartupGraph:
+    """Запуск фаз по зависимостям с замером длительности каждой.
+
+    Фаза стартует, как только завершились все фазы из `after`. Ошибка
+    критической фазы отменяет остальные и пробрасывается; ошибка
+    некритической логируется, и зависящие от нее фазы все равно выполняются.
+    """
+
+    def __init__(self) -> None:
+        self.phases: Dict[str, StartupPhase] = {}
+        self.durations: Dict[str, float] = {}
+
+    def add(
+        self,
+        name: str,
+        run: Callable[[], Awaitable[Any]],
+        after: Sequence[str] = (),
+        critical: bool = True,
+    ) -> None:
+        """Добавить фазу (зависимости должны быть добавлены раньше)."""
+
+        if name in self.phases:
+            raise ValueError(f"Фаза {name} уже добавлена")
+        unknown = [dependency for dependency in after if dependency not in self.phases]
+        if unknown:
+            raise ValueError(f"Фаза {name} зависит от неизвестных фаз: {', '.join(unknown)}")
+        self.phases[name] = StartupPhase(name, run, tuple(after), critical)
+
+    async def run(self) -> Dict[str, float]:
+        """Выполнить все фазы и вернуть их длительности в секундах."""
+
+        started = time.perf_counter()
+        tasks: Dict[str, asyncio.Task] = {}
+        for phase in self.phases.values():
+            tasks[phase.name] = asyncio.create_task(
+                self._run_phase(phase, [tasks[dependency] for dependency in phase.after]),
+                name=f"startup:{phase.name}",
+            )
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+
+        total = time.perf_counter() - started
+        breakdown = ", ".join(
+            f"{name} {seconds * 1000:.0f} мс" for name, seconds in self.durations.items()
+        )
+        logger.info(f"Фазы запуска завершены за {total * 1000:.0f} мс ({breakdown})")
+        return dict(self.durations)
+
+    async def _run_phase(self, phase: StartupPhase, dependencies: Sequence[asyncio.Task]) -> None:
+        if dependencies:
+            await asyncio.wait(dependencies)
+            # Некритические фазы не пробрасывают ошибки, значит упала критическая
+            if any(task.cancelled() or task.exception() for task in dependencies):
+                return
+
+        started = time.perf_counter()
+        try:
+            await phase.run()
+        except Exception as e:
+            if phase.critical:
+                logger.error(f"Ошибка критической фазы запуска {phase.name}: {str(e)}")
+                raise
+            logger.error(f"Ошибка фазы запуска {phase.name}: {str(e)}")
+            capture_error(e)
+        finally:
+            seconds = time.perf_counter() - started
+            self.durations[phase.name] = seconds
+            observe_startup_phase(phase.name, seconds)
@@ -1,7 +1,11 @@
 """Слой application (сервисы и use-cases)."""
 
 from application.contracts import (
+    AutomodCountersRepositoryContract,
     AutomodServiceContract,
+    CommandSyncRepositoryContract,
+    DataMigrationsRepositoryContract,
+    GuildSettingsRepositoryContract,
     LevelingServiceContract,
     LoggingServiceContract,
     LevelsRepositoryContract,
@@ -12,7 +16,11 @@ from application.contracts import (
 )
 
 __all__ = [
+    "AutomodCountersRepositoryContract",
     "AutomodServiceContract",
+    "CommandSyncRepositoryContract",
+    "DataMigrationsRepositoryContract",
+    "GuildSettingsRepositoryContract",
     "LevelingServiceContract",
     "LoggingServiceContract",
     "LevelsRepositoryContract",
@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
-from typing import Dict, List, Optional, Protocol, Tuple, Union
+from typing import Awaitable, Dict, List, Mapping, Optional, Protocol, Tuple, Union
+
+from domain.message_context import MessageContext
 
 
 class LevelsRepositoryContract(Protocol):
@@ -30,7 +32,7 @@ class LevelsRepositoryContract(Protocol):
 
     async def get_leaderboard(self, guild_id: int, limit: int) -> List[Dict[str, int]]: ...
 
-    async def migrate_from_json(self, data: Dict) -> None: ...
+    async def migrate_from_json(self, data: Dict, chunk_size: int = ...) -> int: ...
 
 
 class TicketsRepositoryContract(Protocol):
@@ -67,13 +69,79 @@ class WarningsRepositoryContract(Protocol):
 
     async def cleanup_expired(self, days: int = 30) -> None: ...
 
-    async def migrate_from_json(self, data: Dict) -> None: ...
+    async def migrate_from_json(self, data: Dict, chunk_size: int = ...) -> int: ...
+
+    async def delete_duplicates(self) -> int: ...
+
+
+class AutomodCountersRepositoryContract(Protocol):
+    async def load_active(self, now: float) -> List[Dict[str, float]]: ...
+
+    async def upsert_many(self, rows: List[Tuple[int, int, int, float]]) -> None: ...
+
+    async def delete_many(self, keys: List[Tuple[int, int]]) -> None: ...
+
+    async def delete_expired(self, now: float) -> None: ...
+
+
+class LogOutboxRepositoryContract(Protocol):
+    async def append_many(self, rows: List[Tuple[int, int, str, str, float, float]]) -> None: ...
+
+    async def fetch_due(self, owner: int, now: float, limit: int) -> List[Dict]: ...
+
+    async def delete_many(self, ids: List[int]) -> None: ...
+
+    async def reschedule_many(self, rows: List[Tuple[int, float, int]]) -> None: ...
+
+    async def depth_by_channel(self, owner: int) -> Dict[int, int]: ...
+
+    async def reclaim(self, owner: int, owners: int) -> int: ...
+
+    async def stats(self, owner: int) -> Tuple[int, Optional[float], Optional[float]]: ...
+
+
+class GuildSettingsRepositoryContract(Protocol):
+    async def load_settings(self) -> List[Dict[str, Optional[int]]]: ...
+
+    async def load_role_rewards(self) -> List[Dict[str, int]]: ...
+
+    async def upsert(self, guild_id: int, fields: Dict[str, Optional[int]]) -> None: ...
+
+    async def import_settings(self, rows: List[Tuple[Optional[int], ...]]) -> None: ...
+
+    async def set_role_reward(self, guild_id: int, level: int, role_id: int) -> None: ...
+
+    async def delete_role_reward(self, guild_id: int, level: int) -> None: ...
+
+    async def import_role_rewards(self, rows: List[Tuple[int, int, int]]) -> None: ...
+
+
+class DataMigrationsRepositoryContract(Protocol):
+    async def get_checksum(self, name: str) -> Optional[str]: ...
+
+    async def record(self, name: str, checksum: str, row_count: int) -> None: ...
+
+
+class CommandSyncRepositoryContract(Protocol):
+    async def load_hashes(self) -> Dict[str, str]: ...
+
+    async def save_hash(self, scope: str, tree_hash: str) -> None: ...
 
 
 class LevelingServiceContract(Protocol):
-    async def process_message(self, message) -> Tuple[bool, Optional[int]]: ...
+    async def process_message(
+        self,
+        message,
+        gate: Optional[Awaitable[bool]] = None,
+        context: Optional[MessageContext] = None,
+    ) -> Tuple[bool, Optional[int]]: ...
 
-    async def add_experience(self, member) -> Tuple[bool, Optional[int]]: ...
+    async def add_experience(
+        self,
+        member,
+        gate: Optional[Awaitable[bool]] = None,
+        context: Optional[MessageContext] = None,
+    ) -> Tuple[bool, Optional[int]]: ...
 
     async def get_level_xp(
         self,
@@ -91,13 +159,28 @@ class LevelingServiceContract(Protocol):
 
 
 class AutomodServiceContract(Protocol):
-    config: Dict
+    @property
+    def config(self) -> Mapping: ...
 
     def load_config(self) -> Dict: ...
 
     def save_config(self) -> None: ...
 
-    async def check_message(self, message) -> bool: ...
+    def update_config(self, **changes) -> Mapping: ...
+
+    def refresh_config(self) -> bool: ...
+
+    async def check_message(self, message, context: Optional[MessageContext] = None) -> bool: ...
+
+    def add_regex_rule(self, pattern: str) -> Dict: ...
+
+    def remove_regex_rule(self, rule_id: int) -> bool: ...
+
+    def enable_regex_rule(self, rule_id: int) -> bool: ...
+
+    async def load_warning_counters(self) -> int: ...
+
+    async def flush_warning_counters(self) -> int: ...
 
 
 class TicketsServiceContract(Protocol):
@@ -107,6 +190,8 @@ class TicketsServiceContract(Protocol):
 
     def save_config(self) -> None: ...
 
+    def refresh_config(self) -> bool: ...
+
 
 class WarningsServiceContract(Protocol):
     warnings: Dict
@@ -118,15 +203,25 @@ class WarningsServiceContract(Protocol):
 
     def save_warnings(self) -> None: ...
 
+    def refresh_config(self) -> bool: ...
+
+    async def fetch_user_warnings(self, guild_id: int, user_id: int) -> List[Dict]: ...
+
     async def migrate_to_db(self) -> None: ...
 
     async def cleanup_expired_warnings(self, db) -> None: ...
 
 
 class LoggingServiceContract(Protocol):
-    async def log_message_delete(self, message) -> None: ...
+    def record_audit_log_entry(self, entry) -> None: ...
+
+    def remember_message(self, message) -> None: ...
+
+    async def log_raw_message_delete(self, payload) -> None: ...
 
-    async def log_message_edit(self, before, after) -> None: ...
+    async def log_raw_bulk_message_delete(self, payload) -> None: ...
+
+    async def log_raw_message_edit(self, payload) -> None: ...
 
     async def log_member_join(self, member) -> None: ...
 
@@ -136,6 +231,8 @@ class LoggingServiceContract(Protocol):
 
     async def log_voice_state_update(self, member, before, after) -> None: ...
 
+    async def flush_voice_activity(self, force: bool = False) -> int: ...
+
     async def log_ban(self, guild, user) -> None: ...
 
     async def log_unban(self, guild, user) -> None: ...
@@ -0,0 +1,92 @@
+"""Однократный перенос данных из JSON в БД по контрольным суммам источников."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Iterable, Optional
+
+from application.contracts import DataMigrationsRepositoryContract
+
+logger = logging.getLogger(__name__)
+
+# Контрольная сумма миграций без файла-источника
+APPLIED = "applied"
+
+
+def source_checksum(paths: Iterable[Path], block_size: int = 1 << 20) -> Optional[str]:
+    """SHA-256 существующих файлов-источников (None, если файлов нет).
+
+    Файлы читаются блоками, поэтому большой JSON не загружается в память
+    целиком ради контрольной суммы.
+    """
+
+    digest = hashlib.sha256()
+    found = False
+    for path in paths:
+        path = Path(path)
+        if not path.exists():
+            continue
+        found = True
+        digest.update(path.name.encode("utf-8") + b"\0")
+        with path.open("rb") as file:
+            for block in iter(lambda: file.read(block_size), b""):
+                digest.update(block)
+        digest.update(b"\0")
+    return digest.hexdigest() if found else None
+
+
+class DataMigrationRunner:
+    """Запуск миграций данных с журналом в таблице `data_migrations`.
+
+    Миграция выполняется, только если контрольная сумма ее источников
+    отличается от записанной при последнем успешном переносе. Ошибка
+    миграции пробрасывается и не записывается в журнал, поэтому перенос
+    повторится при следующем запуске.
+    """
+
+    def __init__(self, repository: DataMigrationsRepositoryContract) -> None:
+        self.repository = repository
+
+    async def run(
+        self,
+        name: str,
+        sources: Iterable[Path],
+        migrate: Callable[[], Awaitable[int]],
+    ) -> Optional[int]:
+        """Выполнить миграцию, если источник изменился.
+
+        Returns:
+            Optional[int]: Количество обработанных записей или None, если миграция пропущена
+        """
+
+        checksum = await asyncio.to_thread(source_checksum, list(sources))
+        if checksum is None:
+            logger.debug(f"Миграция {name}: источник не найден, пропускаем")
+            return None
+        if await self.repository.get_checksum(name) == checksum:
+            logger.info(f"Миграция {name}: источник не изменился, пропускаем")
+            return None
+        return await self._apply(name, checksum, migrate)
+
+    async def run_once(self, name: str, migrate: Callable[[], Awaitable[int]]) -> Optional[int]:
+        """Выполнить миграцию без источника, если она еще не применялась."""
+
+        if await self.repository.get_checksum(name) is not None:
+            return None
+        return await self._apply(name, APPLIED, migrate)
+
+    async def _apply(
+        self, name: str, checksum: str, migrate: Callable[[], Awaitable[int]]
+    ) -> int:
+        started = time.perf_counter()
+        rows = await migrate()
+        await self.repository.record(name, checksum, rows)
+        logger.info(
+            f"Миграция {name}: обработано {rows} записей "
+            f"за {(time.perf_counter() - started) * 1000:.0f} мс"
+        )
+        return rows
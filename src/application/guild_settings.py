@@ -0,0 +1,256 @@
+"""Сервис настроек серверов с кэшем в памяти."""
+
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import dataclass, field, replace
+from functools import cached_property
+from pathlib import Path
+from types import MappingProxyType
+from typing import Awaitable, Callable, Dict, List, Mapping, Optional, Tuple
+
+from application.contracts import GuildSettingsRepositoryContract
+
+
+logger = logging.getLogger(__name__)
+
+# Поля GuildSettings, совпадающие с колонками таблицы settings
+SETTINGS_FIELDS = (
+    "welcome_channel_id",
+    "logs_channel_id",
+    "voice_creation_channel_id",
+    "voice_category_id",
+)
+
+# Старые JSON файлы: имя файла -> поле настроек
+LEGACY_CHANNEL_FILES = {
+    "welcome_config.json": "welcome_channel_id",
+    "logging_config.json": "logs_channel_id",
+}
+LEGACY_ROLE_REWARDS_FILE = "role_rewards.json"
+LEGACY_VOICE_FILE = "voice_config.json"
+
+ChannelGuildResolver = Callable[[int], Awaitable[Optional[int]]]
+
+
+@dataclass(frozen=True)
+class GuildSettings:
+    """Неизменяемый снапшот настроек одного сервера.
+
+    Изменение настроек создает новый экземпляр со следующей версией, поэтому
+    производные данные кэшируются в самом снапшоте.
+    """
+
+    welcome_channel_id: Optional[int] = None
+    logs_channel_id: Optional[int] = None
+    voice_creation_channel_id: Optional[int] = None
+    voice_category_id: Optional[int] = None
+    # Уровень -> ID роли
+    role_rewards: Mapping[int, int] = field(default_factory=dict)
+    version: int = field(default=0, compare=False)
+
+    def __post_init__(self) -> None:
+        if not isinstance(self.role_rewards, MappingProxyType):
+            object.__setattr__(self, "role_rewards", MappingProxyType(dict(self.role_rewards)))
+
+    @cached_property
+    def reward_thresholds(self) -> Tuple[Tuple[int, int], ...]:
+        """Пары (уровень, ID роли), отсортированные по уровню."""
+
+        return tuple(sorted(self.role_rewards.items()))
+
+
+class GuildSettingsService:
+    """Настройки серверов: чтение из памяти, запись сразу в БД.
+
+    Кэш прогревается целиком в `load()`, поэтому чтение на горячих путях
+    (канал логов на каждое событие, роли за уровень) — поиск в словаре.
+    Изменения сначала записываются одной строкой в БД, затем в кэше
+    подменяется снапшот сервера.
+    """
+
+    def __init__(
+        self,
+        repository: GuildSettingsRepositoryContract,
+        data_dir: Path = Path("data"),
+    ) -> None:
+        self.repository = repository
+        self.data_dir = Path(data_dir)
+        self.cache: Dict[int, GuildSettings] = {}
+        self.version = 0
+
+    async def load(self) -> int:
+        """Загрузить все настройки из БД в кэш.
+
+        Returns:
+            int: Количество серверов с настройками
+        """
+
+        fields: Dict[int, Dict[str, Optional[int]]] = {}
+        rewards: Dict[int, Dict[int, int]] = {}
+        for row in await self.repository.load_settings():
+            fields[int(row["guild_id"])] = {name: row.get(name) for name in SETTINGS_FIELDS}
+        for row in await self.repository.load_role_rewards():
+            rewards.setdefault(int(row["guild_id"]), {})[int(row["level"])] = int(row["role_id"])
+
+        self.version += 1
+        self.cache = {
+            guild_id: GuildSettings(
+                **fields.get(guild_id, {}),
+                role_rewards=rewards.get(guild_id, {}),
+                version=self.version,
+            )
+            for guild_id in fields.keys() | rewards.keys()
+        }
+        return len(self.cache)
+
+    def get(self, guild_id: int) -> GuildSettings:
+        """Настройки сервера (пустые, если сервер не настроен)."""
+
+        settings = self.cache.get(guild_id)
+        return settings if settings is not None else GuildSettings()
+
+    async def update(self, guild_id: int, **fields: Optional[int]) -> GuildSettings:
+        """Изменить настройки сервера.
+
+        Args:
+            guild_id: ID сервера
+            **fields: Поля из SETTINGS_FIELDS и их новые значения
+
+        Returns:
+            GuildSettings: Обновленные настройки
+        """
+
+        unknown = set(fields) - set(SETTINGS_FIELDS)
+        if unknown:
+            raise ValueError(f"Неизвестные настройки: {', '.join(sorted(unknown))}")
+        await self.repository.upsert(guild_id, fields)
+        return self._publish(guild_id, **fields)
+
+    def _publish(self, guild_id: int, **changes) -> GuildSettings:
+        """Подменить снапшот сервера новой версией."""
+
+        self.version += 1
+        settings = replace(self.get(guild_id), **changes, version=self.version)
+        self.cache[guild_id] = settings
+        return settings
+
+    async def set_role_reward(self, guild_id: int, level: int, role_id: int) -> None:
+        """Назначить роль-награду за уровень."""
+
+        await self.repository.set_role_reward(guild_id, level, role_id)
+        rewards = {
+            other_level: other_role_id
+            for other_level, other_role_id in self.get(guild_id).role_rewards.items()
+            if other_role_id != role_id
+        }
+        rewards[level] = role_id
+        self._publish(guild_id, role_rewards=rewards)
+
+    async def remove_role_reward(self, guild_id: int, level: int) -> Optional[int]:
+        """Удалить роль-награду за уровень.
+
+        Returns:
+            Optional[int]: ID удаленной роли или None, если награды не было
+        """
+
+        rewards = dict(self.get(guild_id).role_rewards)
+        if level not in rewards:
+            return None
+        await self.repository.delete_role_reward(guild_id, level)
+        role_id = rewards.pop(level)
+        self._publish(guild_id, role_rewards=rewards)
+        return role_id
+
+    async def import_legacy_json(
+        self, resolve_channel_guild: Optional[ChannelGuildResolver] = None
+    ) -> int:
+        """Однократно перенести настройки из старых JSON файлов в БД.
+
+        Успешно импортированные файлы переименовываются в `*.imported`.
+        Настройки голосовых каналов хранились без ID сервера, поэтому сервер
+        определяется по каналу через `resolve_channel_guild`.
+
+        Returns:
+            int: Количество импортированных файлов
+        """
+
+        settings: Dict[int, Dict[str, Optional[int]]] = {}
+        rewards: List[Tuple[int, int, int]] = []
+        imported: List[Path] = []
+
+        for filename, field_name in LEGACY_CHANNEL_FILES.items():
+            data = self._read_legacy(filename)
+            if data is None:
+                continue
+            for guild_id, channel_id in data.items():
+                settings.setdefault(int(guild_id), {})[field_name] = channel_id
+            imported.append(self.data_dir / filename)
+
+        data = self._read_legacy(LEGACY_ROLE_REWARDS_FILE)
+        if data is not None:
+            for guild_id, levels in data.items():
+                for level, role_id in levels.items():
+                    rewards.append((int(guild_id), int(role_id), int(level)))
+            imported.append(self.data_dir / LEGACY_ROLE_REWARDS_FILE)
+
+        data = self._read_legacy(LEGACY_VOICE_FILE)
+        if data is not None:
+            if await self._import_voice(data, settings, resolve_channel_guild):
+                imported.append(self.data_dir / LEGACY_VOICE_FILE)
+
+        if not imported:
+            return 0
+
+        await self.repository.import_settings(
+            [
+                (guild_id, *(fields.get(name) for name in SETTINGS_FIELDS))
+                for guild_id, fields in settings.items()
+            ]
+        )
+        await self.repository.import_role_rewards(rewards)
+
+        for path in imported:
+            path.rename(path.with_name(path.name + ".imported"))
+        logger.info(
+            f"Импортированы настройки из JSON: {', '.join(path.name for path in imported)}"
+        )
+        return len(imported)
+
+    def _read_legacy(self, filename: str) -> Optional[Dict]:
+        path = self.data_dir / filename
+        if not path.exists():
+            return None
+        try:
+            with path.open("r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error(f"Не удалось прочитать {path}: {e}")
+            return None
+
+    async def _import_voice(
+        self,
+        data: Dict,
+        settings: Dict[int, Dict[str, Optional[int]]],
+        resolve_channel_guild: Optional[ChannelGuildResolver],
+    ) -> bool:
+        creation_channel = data.get("creation_channel")
+        if not creation_channel:
+            # Система не была настроена — переносить нечего
+            return True
+        if resolve_channel_guild is None:
+            return False
+        try:
+            guild_id = await resolve_channel_guild(creation_channel)
+        except Exception as e:
+            # Повторим при следующем запуске
+            logger.warning(f"Не удалось определить сервер канала {creation_channel}: {e}")
+            return False
+        if guild_id is None:
+            logger.warning(f"Канал {creation_channel} из {LEGACY_VOICE_FILE} не найден, пропускаем")
+            return True
+        fields = settings.setdefault(guild_id, {})
+        fields["voice_creation_channel_id"] = creation_channel
+        fields["voice_category_id"] = data.get("temp_category")
+        return True
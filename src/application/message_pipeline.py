@@ -0,0 +1,114 @@
+"""Конвейер обработки входящих сообщений."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from application.contracts import AutomodServiceContract, LevelingServiceContract
+from domain.message_context import MessageContext
+from utils.monitoring import capture_error, observe_message_latency, observe_message_stage
+
+
+logger = logging.getLogger(__name__)
+
+
+class MessagePipeline:
+    """Параллельный запуск независимых стадий обработки сообщения.
+
+    Автомодерация, начисление опыта и обработка команд выполняются
+    одновременно, поэтому задержки БД и REST не складываются. Автомодерация
+    может запретить начисление опыта: уровень получает ее вердикт как `gate`
+    и ждет его только перед записью. Ошибка одной стадии не прерывает другие.
+
+    Команды можно выполнять отдельно (`run_commands`), вне очереди воркера
+    сервера: медленная команда тогда не задерживает другие серверы воркера.
+    """
+
+    def __init__(
+        self,
+        automod: Optional[AutomodServiceContract],
+        leveling: Optional[LevelingServiceContract],
+        process_commands: Callable[[Any], Awaitable[None]],
+    ) -> None:
+        self.automod = automod
+        self.leveling = leveling
+        self.process_commands = process_commands
+
+    async def process(
+        self, context: MessageContext, award_xp: bool = True, commands: bool = True
+    ) -> Dict[str, float]:
+        """Обработать сообщение всеми стадиями.
+
+        Args:
+            context: Предразобранное входящее сообщение, общее для всех стадий
+            award_xp: Начислять ли опыт (False, когда очередь перегружена)
+            commands: Обрабатывать ли команды (False, если их запускает `run_commands`)
+
+        Returns:
+            Dict[str, float]: Время каждой стадии в секундах
+        """
+        started = time.perf_counter()
+        verdict: asyncio.Future[bool] = asyncio.get_running_loop().create_future()
+
+        stages: Dict[str, Awaitable[Any]] = {}
+        if self.automod:
+            stages["automod"] = self._run_automod(context, verdict)
+        else:
+            verdict.set_result(True)
+        if self.leveling and award_xp:
+            stages["leveling"] = self.leveling.process_message(
+                context.message, gate=verdict, context=context
+            )
+        if commands:
+            stages["commands"] = self.process_commands(context.message)
+
+        timings: Dict[str, float] = {}
+        await asyncio.gather(
+            *(self._timed(name, stage, context, timings) for name, stage in stages.items())
+        )
+        observe_message_latency(time.perf_counter() - started)
+        return timings
+
+    async def run_commands(self, context: MessageContext) -> float:
+        """Обработать команды сообщения отдельно от остальных стадий.
+
+        Returns:
+            float: Время обработки в секундах
+        """
+        timings: Dict[str, float] = {}
+        await self._timed("commands", self.process_commands(context.message), context, timings)
+        return timings["commands"]
+
+    async def _run_automod(self, context: MessageContext, verdict: asyncio.Future) -> bool:
+        try:
+            allowed = await self.automod.check_message(context.message, context)
+        except BaseException:
+            # Без вердикта автомодерации опыт не начисляем
+            verdict.set_result(False)
+            raise
+        verdict.set_result(bool(allowed))
+        return allowed
+
+    async def _timed(
+        self, name: str, stage: Awaitable[Any], context: MessageContext, timings: Dict[str, float]
+    ) -> None:
+        started = time.perf_counter()
+        try:
+            await stage
+        except Exception as e:
+            logger.error(f"Ошибка стадии {name} при обработке сообщения: {e}", exc_info=True)
+            capture_error(
+                e,
+                {
+                    "event": "on_message",
+                    "stage": name,
+                    "channel": context.channel_id,
+                    "author": context.user_id,
+                },
+            )
+        finally:
+            timings[name] = time.perf_counter() - started
+            observe_message_stage(name, timings[name])
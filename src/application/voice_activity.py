@@ -0,0 +1,139 @@
+"""Сводки голосовой активности вместо лога на каждый вход и переход."""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Лимит шагов в одной сводке: описание embed не длиннее 4096 символов
+MAX_STEPS = 20
+
+
+@dataclass(frozen=True)
+class VoiceStep:
+    """Одно изменение голосового канала участника (None — не в голосе)."""
+
+    at: float
+    before: Optional[str]
+    after: Optional[str]
+
+
+@dataclass
+class VoiceSession:
+    """Состояние участника: текущий канал и шаги, еще не попавшие в лог."""
+
+    guild_id: int
+    member_id: int
+    mention: str
+    name: str
+    # None — участник был в голосе до запуска бота
+    started_at: Optional[float]
+    channel: Optional[str] = None
+    updated_at: float = 0.0
+    steps: List[VoiceStep] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class VoiceSummary:
+    """Часть сессии для одной записи лога."""
+
+    guild_id: int
+    member_id: int
+    mention: str
+    name: str
+    started_at: Optional[float]
+    steps: Tuple[VoiceStep, ...]
+    # Участник все еще в голосовом канале
+    ongoing: bool
+    ended_at: float
+
+
+class VoiceActivityAggregator:
+    """Сессии участников в голосовых каналах, отдаваемые сводками.
+
+    Сессия закрывается, когда участник вышел и не вернулся за `settle`
+    секунд: короткие переподключения попадают в ту же сводку. Пока участник
+    в голосе, накопленные шаги отдаются не реже раза в `interval` секунд
+    или при накоплении `max_steps` шагов, поэтому в логах остается вся
+    последовательность переходов.
+    """
+
+    def __init__(
+        self,
+        settle: float = 60.0,
+        interval: float = 900.0,
+        max_steps: int = MAX_STEPS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.settle = settle
+        self.interval = interval
+        self.max_steps = max_steps
+        self._clock = clock
+        self._sessions: Dict[Tuple[int, int], VoiceSession] = {}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def record(
+        self,
+        guild_id: int,
+        member_id: int,
+        mention: str,
+        name: str,
+        before: Optional[str],
+        after: Optional[str],
+    ) -> None:
+        """Запомнить вход (before=None), переход или выход (after=None)."""
+
+        now = self._clock()
+        key = (guild_id, member_id)
+        session = self._sessions.get(key)
+        if session is None:
+            started_at = now if before is None else None
+            session = self._sessions[key] = VoiceSession(
+                guild_id, member_id, mention, name, started_at
+            )
+        session.mention = mention
+        session.name = name
+        session.channel = after
+        session.updated_at = now
+        session.steps.append(VoiceStep(now, before, after))
+
+    def due(self, force: bool = False) -> List[VoiceSummary]:
+        """Забрать сводки завершенных сессий и накопившихся шагов.
+
+        Args:
+            force: Отдать все накопленное (при остановке бота)
+
+        Returns:
+            List[VoiceSummary]: Сводки в порядке первых шагов
+        """
+
+        now = self._clock()
+        summaries = []
+        for key, session in list(self._sessions.items()):
+            if not session.steps:
+                continue
+            settled = session.channel is None and now - session.updated_at >= self.settle
+            overdue = now - session.steps[0].at >= self.interval
+            if not (force or settled or overdue or len(session.steps) >= self.max_steps):
+                continue
+            summaries.append(
+                VoiceSummary(
+                    session.guild_id,
+                    session.member_id,
+                    session.mention,
+                    session.name,
+                    session.started_at,
+                    tuple(session.steps),
+                    ongoing=session.channel is not None,
+                    ended_at=session.updated_at if session.channel is None else now,
+                )
+            )
+            if session.channel is None:
+                del self._sessions[key]
+            else:
+                session.steps = []
+        summaries.sort(key=lambda summary: summary.steps[0].at)
+        return summaries
@@ -1,28 +1,80 @@
 """Модуль автомодерации для Discord бота."""
 
+import logging
+import re
+import time
 from datetime import datetime
+from typing import Any, Mapping, NamedTuple, Optional
 
 import discord
 
-from infrastructure.config import AutomodConfigStore
-from application.contracts import AutomodServiceContract
+from infrastructure.cache import TTLCache
+from infrastructure.config import AutomodConfigStore, ConfigSnapshot, SnapshotRef, thaw
+from infrastructure.workers import RegexTimeoutError, RegexWorkerPool, is_heavy_pattern
+from application.contracts import AutomodCountersRepositoryContract, AutomodServiceContract
+from domain.message_context import MessageContext
 from utils.discord_helpers import parse_duration
 
+logger = logging.getLogger(__name__)
+
+
+class CompiledRule(NamedTuple):
+    rule_id: str
+    pattern: str
+    heavy: bool
+    regex: Optional[re.Pattern]
+
+
+def _compile_banned_words(config: Mapping[str, Any]) -> Optional[re.Pattern]:
+    words = [re.escape(word.lower()) for word in config.get("banned_words", ()) if word]
+    return re.compile("|".join(words)) if words else None
+
+
+def _compile_regex_rules(config: Mapping[str, Any]) -> tuple[CompiledRule, ...]:
+    return tuple(
+        CompiledRule(
+            str(rule["id"]),
+            rule["pattern"],
+            bool(rule.get("heavy")),
+            None if rule.get("heavy") else re.compile(rule["pattern"], re.IGNORECASE),
+        )
+        for rule in config.get("regex_rules", ())
+        if rule.get("enabled", True)
+    )
+
 
 class AutoMod(AutomodServiceContract):
     """Класс для управления автомодерацией на сервере."""
 
-    def __init__(self, bot, store: AutomodConfigStore | None = None):
+    def __init__(
+        self,
+        bot,
+        store: AutomodConfigStore | None = None,
+        rule_pool: RegexWorkerPool | None = None,
+        counters_repository: AutomodCountersRepositoryContract | None = None,
+        warning_cache_size: int = 10000,
+    ):
         """Инициализация автомодерации.
 
         Args:
             bot: Экземпляр бота
+            store: Хранилище конфигурации
+            rule_pool: Пул процессов для тяжелых regex-правил
+            counters_repository: Репозиторий для сохранения счетчиков предупреждений
+            warning_cache_size: Максимальное число счетчиков в памяти
         """
         self.bot = bot
         self.store = store or AutomodConfigStore()
-        self.config = self.load_config()
+        self.rule_pool = rule_pool or RegexWorkerPool()
+        self.counters_repository = counters_repository
+        self._config = SnapshotRef(self.load_config())
         self.spam_counter = {}
-        self.warning_counter = {}
+        self.warning_counter: TTLCache[tuple[int, int], int] = TTLCache(
+            ttl=self.config.get("warning_ttl", 3600),
+            maxsize=warning_cache_size,
+            name="automod_warnings",
+        )
+        self._dirty_counters: set[tuple[int, int]] = set()
         self._last_cleanup = datetime.now()
 
     def load_config(self):
@@ -33,9 +85,43 @@ class AutoMod(AutomodServiceContract):
         """
         return self.store.load()
 
+    @property
+    def config(self) -> ConfigSnapshot:
+        """Текущий неизменяемый снапшот конфигурации."""
+        return self._config.current
+
     def save_config(self):
         """Сохранение конфигурации в файл."""
-        self.store.save(self.config)
+        self.store.save(thaw(self.config.data))
+
+    def update_config(self, **changes) -> ConfigSnapshot:
+        """Публикация новой версии конфигурации и ее сохранение.
+
+        В хранилище записываются только измененные ключи, поэтому изменения
+        других процессов кластера, еще не полученные `refresh_config`,
+        не затираются.
+
+        Args:
+            **changes: Ключи верхнего уровня и их новые значения
+
+        Returns:
+            ConfigSnapshot: Новый снапшот
+        """
+        snapshot = self._config.update(**changes)
+        self.store.update({key: thaw(snapshot[key]) for key in changes})
+        return snapshot
+
+    def refresh_config(self) -> bool:
+        """Публикация конфигурации, измененной другим процессом кластера.
+
+        Returns:
+            bool: True если конфигурация изменилась
+        """
+        data = self.store.refresh()
+        if data is None:
+            return False
+        self._config.replace(data)
+        return True
 
     def _cleanup_old_entries(self) -> None:
         """Периодическая очистка устаревших счетчиков для предотвращения утечки памяти."""
@@ -58,40 +144,95 @@ class AutoMod(AutomodServiceContract):
             if not self.spam_counter[user_key]:
                 del self.spam_counter[user_key]
 
-        # Очистка warning_counter - сбрасываем все счетчики старше 1 часа
-        # Для полноценной очистки нужно отслеживать время последнего предупреждения
-        # Пока просто очищаем весь словарь если прошло больше часа с последней очистки
-        if (now - self._last_cleanup).total_seconds() > 3600:
-            self.warning_counter.clear()
+        # Очистка warning_counter - у каждого счетчика свой TTL
+        self.warning_counter.purge_expired()
 
         self._last_cleanup = now
 
-    async def check_message(self, message: discord.Message) -> bool:
+    async def load_warning_counters(self) -> int:
+        """Загрузка неистекших счетчиков предупреждений из БД.
+
+        Returns:
+            int: Количество загруженных счетчиков
+        """
+        if not self.counters_repository:
+            return 0
+
+        rows = await self.counters_repository.load_active(time.time())
+        for row in rows:
+            self.warning_counter.set(
+                (row["user_id"], row["guild_id"]), row["count"], expires_at=row["expires_at"]
+            )
+        return len(rows)
+
+    async def flush_warning_counters(self) -> int:
+        """Пакетное сохранение измененных счетчиков предупреждений в БД.
+
+        Returns:
+            int: Количество записанных счетчиков
+        """
+        if not self.counters_repository or not self._dirty_counters:
+            return 0
+
+        dirty, self._dirty_counters = self._dirty_counters, set()
+        rows = []
+        removed = []
+        for key in dirty:
+            count = self.warning_counter.get(key)
+            if count is None:
+                removed.append(key)
+            else:
+                rows.append((key[0], key[1], count, self.warning_counter.expires_at(key)))
+
+        try:
+            await self.counters_repository.upsert_many(rows)
+            await self.counters_repository.delete_many(removed)
+            await self.counters_repository.delete_expired(time.time())
+        except Exception as e:
+            # Вернем ключи, чтобы сохранить их при следующей попытке
+            self._dirty_counters |= dirty
+            logger.error(f"Ошибка при сохранении счетчиков предупреждений: {e}")
+            return 0
+        return len(rows)
+
+    async def check_message(
+        self, message: discord.Message, context: Optional[MessageContext] = None
+    ) -> bool:
         """Проверка сообщения на нарушения.
 
         Args:
             message: Проверяемое сообщение
+            context: Предразобранное сообщение (создается, если не передано)
 
         Returns:
             bool: True если сообщение прошло проверку
         """
         if message.author.bot or not message.guild:
             return True
+        ctx = context or MessageContext(message)
 
         # Периодическая очистка устаревших счетчиков
         self._cleanup_old_entries()
 
+        # Одна версия конфигурации на все проверки сообщения
+        config = self.config
+
         # Проверка запрещенных слов
-        content = message.content.lower()
-        for word in self.config["banned_words"]:
-            if word.lower() in content:
-                await message.delete()
-                await self.add_warning(message.author, "Использование запрещенных слов")
-                return False
+        banned_words = config.derive("banned_words", _compile_banned_words)
+        if banned_words is not None and banned_words.search(ctx.content):
+            await message.delete()
+            await self.add_warning(message.author, "Использование запрещенных слов")
+            return False
+
+        # Проверка пользовательских regex-правил
+        if await self.match_regex_rules(ctx.content, config):
+            await message.delete()
+            await self.add_warning(message.author, "Нарушение правила автомодерации")
+            return False
 
         # Проверка спама
-        now = datetime.now()
-        user_key = f"{message.author.id}_{message.guild.id}"
+        now = ctx.received_at
+        user_key = ctx.key
 
         if user_key not in self.spam_counter:
             self.spam_counter[user_key] = []
@@ -102,24 +243,114 @@ class AutoMod(AutomodServiceContract):
         self.spam_counter[user_key] = [
             t
             for t in self.spam_counter[user_key]
-            if (now - t).total_seconds() <= self.config["spam_interval"]
+            if (now - t).total_seconds() <= config["spam_interval"]
         ]
 
-        if len(self.spam_counter[user_key]) > self.config["spam_threshold"]:
+        if len(self.spam_counter[user_key]) > config["spam_threshold"]:
             await message.channel.purge(
-                limit=self.config["spam_threshold"], check=lambda m: m.author == message.author
+                limit=config["spam_threshold"], check=lambda m: m.author == message.author
             )
             await self.add_warning(message.author, "Спам")
             return False
 
         # Проверка массовых упоминаний
-        if len(message.mentions) > self.config["max_mentions"]:
+        if ctx.mention_count > config["max_mentions"]:
             await message.delete()
             await self.add_warning(message.author, "Массовые упоминания")
             return False
 
         return True
 
+    def add_regex_rule(self, pattern: str) -> dict:
+        """Добавление пользовательского regex-правила.
+
+        Args:
+            pattern: Регулярное выражение
+
+        Returns:
+            dict: Созданное правило
+
+        Raises:
+            re.error: Если выражение некорректно
+        """
+        re.compile(pattern)
+        rules = thaw(self.config.get("regex_rules", ()))
+        rules.append(
+            {
+                "id": max((r["id"] for r in rules), default=0) + 1,
+                "pattern": pattern,
+                "heavy": is_heavy_pattern(pattern),
+                "enabled": True,
+            }
+        )
+        return self.update_config(regex_rules=rules)["regex_rules"][-1]
+
+    def remove_regex_rule(self, rule_id: int) -> bool:
+        """Удаление regex-правила по ID."""
+        rules = thaw(self.config.get("regex_rules", ()))
+        remaining = [rule for rule in rules if rule["id"] != rule_id]
+        if len(remaining) == len(rules):
+            return False
+        self.update_config(regex_rules=remaining)
+        return True
+
+    def _set_regex_rule_enabled(self, rule_id: int, enabled: bool) -> bool:
+        rules = thaw(self.config.get("regex_rules", ()))
+        for rule in rules:
+            if rule["id"] == rule_id:
+                rule["enabled"] = enabled
+                self.update_config(regex_rules=rules)
+                return True
+        return False
+
+    def enable_regex_rule(self, rule_id: int) -> bool:
+        """Повторное включение regex-правила (например, после авто-отключения)."""
+        if not self._set_regex_rule_enabled(rule_id, True):
+            return False
+        self.rule_pool.stats.pop(str(rule_id), None)
+        return True
+
+    async def match_regex_rules(self, content: str, config: ConfigSnapshot | None = None) -> bool:
+        """Проверка текста пользовательскими regex-правилами.
+
+        Простые правила выполняются прямо в event loop, тяжелые (с риском
+        катастрофического бэктрекинга) отправляются в пул процессов с таймаутом.
+        Правило, превысившее таймаут `regex_max_timeouts` раз подряд, отключается.
+
+        Args:
+            content: Текст сообщения в нижнем регистре
+            config: Снапшот конфигурации (по умолчанию текущий)
+
+        Returns:
+            bool: True если сработало хотя бы одно правило
+        """
+        config = config or self.config
+        for rule in config.derive("regex_rules", _compile_regex_rules):
+            rule_id = rule.rule_id
+            if rule.regex is not None:
+                started = time.process_time()
+                matched = rule.regex.search(content) is not None
+                self.rule_pool.record(rule_id, time.process_time() - started)
+            else:
+                try:
+                    matched = await self.rule_pool.search(rule_id, rule.pattern, content)
+                except RegexTimeoutError:
+                    timeouts = self.rule_pool.stats[rule_id].consecutive_timeouts
+                    if timeouts >= config.get("regex_max_timeouts", 3):
+                        self._set_regex_rule_enabled(int(rule_id), False)
+                        logger.warning(
+                            f"Regex-правило {rule_id} отключено после {timeouts} таймаутов"
+                        )
+                    continue
+                except Exception as e:
+                    logger.error(f"Ошибка при проверке regex-правила {rule_id}: {e}")
+                    continue
+
+            if matched:
+                return True
+
+        return False
+
     async def add_warning(self, member: discord.Member, reason: str):
         """Добавление предупреждения пользователю.
 
@@ -127,12 +358,11 @@ class AutoMod(AutomodServiceContract):
             member: Пользователь
             reason: Причина предупреждения
         """
-        user_key = f"{member.id}_{member.guild.id}"
-
-        if user_key not in self.warning_counter:
-            self.warning_counter[user_key] = 0
-
-        self.warning_counter[user_key] += 1
+        config = self.config
+        user_key = (member.id, member.guild.id)
+        warning_count = self.warning_counter.get(user_key, 0) + 1
+        self.warning_counter[user_key] = warning_count
+        self._dirty_counters.add(user_key)
 
         embed = discord.Embed(
             title="⚠️ Предупреждение",
@@ -142,7 +372,7 @@ class AutoMod(AutomodServiceContract):
         embed.add_field(name="Причина", value=reason)
         embed.add_field(
             name="Всего предупреждений",
-            value=f"{self.warning_counter[user_key]}/{self.config['max_warnings']}",
+            value=f"{warning_count}/{config['max_warnings']}",
         )
 
         try:
@@ -150,15 +380,16 @@ class AutoMod(AutomodServiceContract):
         except discord.HTTPException:
             pass
 
-        if self.warning_counter[user_key] >= self.config["max_warnings"]:
-            duration = parse_duration(self.config["mute_duration"])
+        if warning_count >= config["max_warnings"]:
+            duration = parse_duration(config["mute_duration"])
             try:
                 await member.timeout(duration, reason="Превышение лимита предупреждений")
                 self.warning_counter[user_key] = 0  # Сброс счетчика
+                self._dirty_counters.add(user_key)
 
                 mute_embed = discord.Embed(
                     title="🔇 Мут",
-                    description=f"{member.mention} получил мут на {self.config['mute_duration']}!",
+                    description=f"{member.mention} получил мут на {config['mute_duration']}!",
                     color=discord.Color.red(),
                 )
                 mute_embed.add_field(name="Причина", value="Превышение лимита предупреждений")
@@ -6,6 +6,7 @@ import discord
 from typing import Optional
 import logging
 
+from utils.memory_report import build_memory_report
 from utils.monitoring import monitor_command
 
 logger = logging.getLogger(__name__)
@@ -297,10 +298,20 @@ class Commands(commands.Cog):
         # Считаем эмодзи
         emoji_count = len(guild.emojis)
 
-        # Считаем пользователей и ботов
+        # Считаем пользователей и ботов. Без загруженного списка участников
+        # (chunking) guild.members содержит только закэшированных участников
         member_count = guild.member_count
-        bot_count = sum(1 for member in guild.members if member.bot)
-        human_count = member_count - bot_count
+        if not guild.chunked and self.bot.cache_profile.chunking == "lazy":
+            # Загрузка участников большого сервера дольше 3 секунд на ответ interaction
+            await ctx.defer()
+            await guild.chunk()
+        if guild.chunked:
+            bot_count = sum(1 for member in guild.members if member.bot)
+            members_value = (
+                f"Всего: {member_count}\nЛюди: {member_count - bot_count}\nБоты: {bot_count}"
+            )
+        else:
+            members_value = f"Всего: {member_count}"
 
         # Создаем эмбед
         embed = discord.Embed(
@@ -321,7 +332,7 @@ class Commands(commands.Cog):
         # Добавляем статистику
         embed.add_field(
             name="Участники",
-            value=f"Всего: {member_count}\nЛюди: {human_count}\nБоты: {bot_count}",
+            value=members_value,
             inline=True,
         )
         embed.add_field(
@@ -346,6 +357,24 @@ class Commands(commands.Cog):
 
         await ctx.send(embed=embed)
 
+    @commands.hybrid_command(
+        name="memory", description="Память кэшей бота по серверам (только для владельца бота)"
+    )
+    @commands.is_owner()
+    @monitor_command
+    async def memory(self, ctx, top: int = 10):
+        """Показывает, сколько памяти занимают кэши discord.py и словари бота.
+
+        Args:
+            ctx: Контекст команды
+            top: Сколько крупнейших серверов показать
+        """
+        report = build_memory_report(self.bot)
+        profile = self.bot.cache_profile.describe()
+        text = f"Кэш discord.py: {profile}\n{report.format(max(1, min(top, 25)))}"
+        # Лимит сообщения Discord — 2000 символов
+        await ctx.send(f"```\n{text[:1900]}\n```", ephemeral=True)
+
     @commands.hybrid_command(name="userinfo", description="Показывает информацию о пользователе")
     @app_commands.describe(member="Пользователь, информацию о котором нужно показать")
     @monitor_command
@@ -46,13 +46,23 @@ class Events(commands.Cog):
         print("/listroles - Список ролей за уровни")
         print("/automod - Настройка автомодерации")
 
+    # Raw события приходят и для сообщений вне кэша discord.py: текст для
+    # логов берется из компактного кэша LoggingSystem
     @commands.Cog.listener()
-    async def on_message_delete(self, message):
-        await self.bot.logging.log_message_delete(message)
+    async def on_raw_message_delete(self, payload):
+        await self.bot.logging.log_raw_message_delete(payload)
 
     @commands.Cog.listener()
-    async def on_message_edit(self, before, after):
-        await self.bot.logging.log_message_edit(before, after)
+    async def on_raw_bulk_message_delete(self, payload):
+        await self.bot.logging.log_raw_bulk_message_delete(payload)
+
+    @commands.Cog.listener()
+    async def on_raw_message_edit(self, payload):
+        await self.bot.logging.log_raw_message_edit(payload)
+
+    @commands.Cog.listener()
+    async def on_audit_log_entry_create(self, entry):
+        self.bot.logging.record_audit_log_entry(entry)
 
     @commands.Cog.listener()
     async def on_member_join(self, member):
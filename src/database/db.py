@@ -1,9 +1,9 @@
 """Модуль для работы с базой данных."""
 
+import asyncio
 import os
 import sqlite3
 from contextlib import contextmanager, asynccontextmanager
-import redis
 import aiosqlite
 import logging
 from typing import Optional, List, Dict, Any
@@ -21,14 +21,12 @@ class Database:
         self.redis = None
         self.pool = None
         self.pool_size = int(os.getenv("DB_POOL_SIZE", "5"))
+        self._closed = False
 
     async def setup(self):
         """Настройка базы данных."""
-        # Инициализация SQLite
-        await self._init_sqlite()
-
-        # Инициализация Redis если доступен
-        await self._init_redis()
+        # SQLite и Redis (если доступен) независимы, подключаемся параллельно
+        await asyncio.gather(self._init_sqlite(), self._init_redis())
 
     async def _init_sqlite(self):
         """Инициализация SQLite базы данных."""
@@ -43,6 +41,7 @@ class Database:
                 logger.info(f"База данных {self.db_path} создана")
 
             # Создаем пул соединений
+            self._closed = False
             self.pool = []
             for _ in range(self.pool_size):
                 conn = await aiosqlite.connect(self.db_path)
@@ -109,6 +108,7 @@ class Database:
                         logs_channel_id INTEGER,
                         tickets_category_id INTEGER,
                         voice_category_id INTEGER,
+                        voice_creation_channel_id INTEGER,
                         auto_roles TEXT,
                         prefix TEXT DEFAULT '!'
                     )
@@ -136,6 +136,19 @@ class Database:
                     except Exception as e:
                         logger.error(f"Ошибка при добавлении колонки prefix: {e}")
 
+                if "voice_creation_channel_id" not in column_names:
+                    try:
+                        await conn.execute(
+                            "ALTER TABLE settings ADD COLUMN voice_creation_channel_id INTEGER"
+                        )
+                        logger.info(
+                            "Добавлена колонка voice_creation_channel_id в таблицу settings"
+                        )
+                    except Exception as e:
+                        logger.error(
+                            f"Ошибка при добавлении колонки voice_creation_channel_id: {e}"
+                        )
+
             if "role_rewards" not in tables:
                 await conn.execute("""
                     CREATE TABLE IF NOT EXISTS role_rewards (
@@ -175,6 +188,54 @@ class Database:
                 """)
                 logger.info("Создана таблица tickets")
 
+            if "automod_warnings" not in tables:
+                await conn.execute("""
+                    CREATE TABLE IF NOT EXISTS automod_warnings (
+                        user_id INTEGER,
+                        guild_id INTEGER,
+                        count INTEGER DEFAULT 0,
+                        expires_at REAL,
+                        PRIMARY KEY (user_id, guild_id)
+                    )
+                """)
+                logger.info("Создана таблица automod_warnings")
+
+            if "command_sync_state" not in tables:
+                await conn.execute("""
+                    CREATE TABLE IF NOT EXISTS command_sync_state (
+                        scope TEXT PRIMARY KEY,
+                        hash TEXT NOT NULL,
+                        synced_at TIMESTAMP
+                    )
+                """)
+                logger.info("Создана таблица command_sync_state")
+
+            if "data_migrations" not in tables:
+                await conn.execute("""
+                    CREATE TABLE IF NOT EXISTS data_migrations (
+                        name TEXT PRIMARY KEY,
+                        checksum TEXT NOT NULL,
+                        row_count INTEGER DEFAULT 0,
+                        applied_at TIMESTAMP
+                    )
+                """)
+                logger.info("Создана таблица data_migrations")
+
+            if "log_outbox" not in tables:
+                await conn.execute("""
+                    CREATE TABLE IF NOT EXISTS log_outbox (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        owner INTEGER NOT NULL DEFAULT 0,
+                        channel_id INTEGER NOT NULL,
+                        kind TEXT NOT NULL,
+                        payload TEXT NOT NULL,
+                        created_at REAL NOT NULL,
+                        attempts INTEGER DEFAULT 0,
+                        next_attempt_at REAL NOT NULL
+                    )
+                """)
+                logger.info("Создана таблица log_outbox")
+
             # Создание индексов для оптимизации запросов
             await conn.execute("CREATE INDEX IF NOT EXISTS idx_levels_guild ON levels(guild_id)")
             await conn.execute(
@@ -190,6 +251,13 @@ class Database:
                 "CREATE INDEX IF NOT EXISTS idx_tickets_channel ON tickets(channel_id)"
             )
             await conn.execute("CREATE INDEX IF NOT EXISTS idx_tickets_guild ON tickets(guild_id)")
+            await conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_log_outbox_due ON log_outbox(owner, next_attempt_at)"
+            )
+            await conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_log_outbox_channel "
+                "ON log_outbox(owner, channel_id, id)"
+            )
             logger.info("Созданы индексы для оптимизации запросов")
 
             # Фиксируем изменения
@@ -198,9 +266,13 @@ class Database:
     async def _init_redis(self):
         """Инициализация Redis."""
         if self.redis_url:
+            # Клиент Redis загружается только при настроенном REDIS_URL
+            import redis
+
             try:
                 self.redis = redis.from_url(self.redis_url)
-                self.redis.ping()
+                # Клиент синхронный: ping не должен блокировать event loop
+                await asyncio.to_thread(self.redis.ping)
                 logger.info("Подключение к Redis успешно установлено")
             except redis.ConnectionError:
                 logger.warning("Redis недоступен. Используется локальное кэширование.")
@@ -230,22 +302,38 @@ class Database:
             yield conn
         finally:
             # Возвращаем соединение в пул
-            if self.pool is not None and len(self.pool) < self.pool_size:
+            if self.pool is not None and not self._closed and len(self.pool) < self.pool_size:
                 self.pool.append(conn)
             else:
                 await conn.close()
 
-    async def execute(self, query: str, params: tuple = ()):
-        """Выполнение SQL запроса."""
+    async def execute(self, query: str, params: tuple = ()) -> int:
+        """Выполнение SQL запроса.
+
+        Returns:
+            int: Количество затронутых строк
+        """
         async with self.get_connection() as conn:
             try:
-                await conn.execute(query, params)
+                cursor = await conn.execute(query, params)
                 await conn.commit()
+                return cursor.rowcount
             except Exception as e:
                 logger.error(f"Ошибка выполнения SQL запроса: {e}")
                 logger.error(f"Запрос: {query}, Параметры: {params}")
                 raise
 
+    async def execute_many(self, query: str, params_seq: List[tuple]):
+        """Выполнение SQL запроса для набора параметров в одной транзакции."""
+        async with self.get_connection() as conn:
+            try:
+                await conn.executemany(query, params_seq)
+                await conn.commit()
+            except Exception as e:
+                logger.error(f"Ошибка выполнения пакетного SQL запроса: {e}")
+                logger.error(f"Запрос: {query}, Записей: {len(params_seq)}")
+                raise
+
     async def fetch_one(self, query: str, params: tuple = ()) -> Optional[Dict[str, Any]]:
         """Получение одной записи."""
         async with self.get_connection() as conn:
@@ -272,8 +360,27 @@ class Database:
                 logger.error(f"Запрос: {query}, Параметры: {params}")
                 return []
 
+    async def checkpoint(self) -> int:
+        """Перенос WAL в основной файл БД перед остановкой.
+
+        Без этого следующий запуск восстанавливает изменения из WAL.
+
+        Returns:
+            int: Размер перенесенного WAL в байтах
+        """
+        wal_path = f"{self.db_path}-wal"
+        wal_size = os.path.getsize(wal_path) if os.path.exists(wal_path) else 0
+        async with self.get_connection() as conn:
+            cursor = await conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            row = await cursor.fetchone()
+        if row and row[0]:
+            logger.warning("Checkpoint WAL не завершен: БД занята другим соединением")
+            return 0
+        return wal_size
+
     async def close(self):
         """Закрытие всех соединений."""
+        self._closed = True
         if self.pool:
             for conn in self.pool:
                 try:
@@ -281,6 +388,12 @@ class Database:
                 except Exception as e:
                     logger.error(f"Ошибка при закрытии соединения: {e}")
             self.pool = []
+        if self.redis is not None:
+            try:
+                self.redis.close()
+            except Exception as e:
+                logger.error(f"Ошибка при закрытии Redis: {e}")
+            self.redis = None
 
 
 @contextmanager
@@ -305,6 +418,8 @@ def get_redis():
     """Получение подключения к Redis."""
     redis_url = os.getenv("REDIS_URL")
     if redis_url:
+        import redis
+
         try:
             redis_client = redis.from_url(redis_url)
             redis_client.ping()
@@ -343,6 +458,7 @@ def init_db():
                     logs_channel_id INTEGER,
                     tickets_category_id INTEGER,
                     voice_category_id INTEGER,
+                    voice_creation_channel_id INTEGER,
                     auto_roles TEXT,
                     prefix TEXT DEFAULT '!'
                 )
@@ -381,6 +497,46 @@ def init_db():
                 )
             """)
 
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS automod_warnings (
+                    user_id INTEGER,
+                    guild_id INTEGER,
+                    count INTEGER DEFAULT 0,
+                    expires_at REAL,
+                    PRIMARY KEY (user_id, guild_id)
+                )
+            """)
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS command_sync_state (
+                    scope TEXT PRIMARY KEY,
+                    hash TEXT NOT NULL,
+                    synced_at TIMESTAMP
+                )
+            """)
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS data_migrations (
+                    name TEXT PRIMARY KEY,
+                    checksum TEXT NOT NULL,
+                    row_count INTEGER DEFAULT 0,
+                    applied_at TIMESTAMP
+                )
+            """)
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS log_outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    owner INTEGER NOT NULL DEFAULT 0,
+                    channel_id INTEGER NOT NULL,
+                    kind TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    attempts INTEGER DEFAULT 0,
+                    next_attempt_at REAL NOT NULL
+                )
+            """)
+
             conn.commit()
             logger.info("База данных инициализирована")
     except Exception as e:
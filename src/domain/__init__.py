@@ -1 +1,5 @@
 """Слой domain (бизнес-правила)."""
+
+from domain.message_context import MessageContext
+
+__all__ = ["MessageContext"]
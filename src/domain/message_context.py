@@ -0,0 +1,53 @@
+"""Предразобранное входящее сообщение."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Optional, Tuple
+
+
+class MessageContext:
+    """Данные сообщения, вычисляемые один раз и общие для всех стадий.
+
+    Создается в `Bot.on_message` и передается автомодерации, системе уровней
+    и метрикам, чтобы каждая стадия не приводила текст к нижнему регистру,
+    не считала упоминания и не собирала строковые ключи заново.
+    """
+
+    __slots__ = (
+        "message",
+        "author",
+        "guild",
+        "user_id",
+        "guild_id",
+        "channel_id",
+        "key",
+        "is_bot",
+        "content",
+        "mention_count",
+        "received_at",
+    )
+
+    def __init__(self, message: Any, received_at: Optional[datetime] = None) -> None:
+        author = message.author
+        guild = message.guild
+        self.message = message
+        self.author = author
+        self.guild = guild
+        self.user_id: int = author.id
+        self.guild_id: Optional[int] = guild.id if guild else None
+        self.channel_id: int = message.channel.id
+        self.key: Tuple[int, Optional[int]] = (self.user_id, self.guild_id)
+        self.is_bot: bool = author.bot
+        self.content: str = message.content.lower()
+        self.mention_count: int = len(message.mentions)
+        self.received_at = received_at or datetime.now()
+
+    @property
+    def guild_label(self) -> str:
+        """ID сервера для меток метрик (`dm` для личных сообщений)."""
+
+        return str(self.guild_id) if self.guild_id else "dm"
+
+    def __repr__(self) -> str:
+        return f"MessageContext(guild_id={self.guild_id}, user_id={self.user_id})"
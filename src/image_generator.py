@@ -1,5 +1,6 @@
 """Модуль для генерации изображений для Discord бота."""
 
+import functools
 import os
 from io import BytesIO
 
@@ -8,6 +9,23 @@ from PIL import Image, ImageDraw, ImageFont, ImageFilter
 import aiohttp
 import asyncio
 
+FONT_NAME = "arial.ttf"
+# Размеры шрифта, используемые карточками
+FONT_SIZES = (20, 24, 32, 36, 48)
+
+
+@functools.lru_cache(maxsize=None)
+def load_font(size: int) -> ImageFont.FreeTypeFont:
+    """Загрузка шрифта карточек (файл шрифта читается один раз на размер).
+
+    Args:
+        size: Размер шрифта
+
+    Returns:
+        ImageFont.FreeTypeFont: Загруженный шрифт
+    """
+    return ImageFont.truetype(FONT_NAME, size)
+
 
 class ImageGenerator:
     """Класс для генерации различных изображений."""
@@ -17,6 +35,20 @@ class ImageGenerator:
         self.font_path = os.path.join("assets", "fonts")
         os.makedirs(self.font_path, exist_ok=True)
 
+    async def preload_fonts(self) -> int:
+        """Предзагрузка шрифтов карточек вне event loop при запуске бота.
+
+        Returns:
+            int: Количество загруженных размеров шрифта
+        """
+
+        def load_all():
+            for size in FONT_SIZES:
+                load_font(size)
+            return len(FONT_SIZES)
+
+        return await asyncio.to_thread(load_all)
+
     async def download_avatar(self, avatar_url: str) -> Image.Image:
         """Загрузка аватара пользователя.
 
@@ -74,12 +106,12 @@ class ImageGenerator:
         draw = ImageDraw.Draw(card)
 
         await asyncio.to_thread(
-            draw.text, (300, 50), user.name, (255, 255, 255), ImageFont.truetype("arial.ttf", 48)
+            draw.text, (300, 50), user.name, (255, 255, 255), load_font(48)
         )
 
         level_text = f"УРОВЕНЬ {level}"
         await asyncio.to_thread(
-            draw.text, (300, 120), level_text, (200, 200, 200), ImageFont.truetype("arial.ttf", 24)
+            draw.text, (300, 120), level_text, (200, 200, 200), load_font(24)
         )
 
         progress = (xp / next_level_xp) * 100
@@ -93,7 +125,7 @@ class ImageGenerator:
 
         xp_text = f"{xp:,} / {next_level_xp:,} XP"
         await asyncio.to_thread(
-            draw.text, (300, 210), xp_text, (200, 200, 200), ImageFont.truetype("arial.ttf", 20)
+            draw.text, (300, 210), xp_text, (200, 200, 200), load_font(20)
         )
 
         buffer = BytesIO()
@@ -129,13 +161,13 @@ class ImageGenerator:
                 (50, 50),
                 "ТАБЛИЦА ЛИДЕРОВ",
                 fill=(255, 255, 255),
-                font=ImageFont.truetype("arial.ttf", 48),
+                font=load_font(48),
             )
             draw.text(
                 (50, 110),
                 guild_name,
                 fill=(200, 200, 200),
-                font=ImageFont.truetype("arial.ttf", 24),
+                font=load_font(24),
             )
             for i, (user, level, xp) in enumerate(leaders):
                 y = 200 + (i * 100)
@@ -158,20 +190,20 @@ class ImageGenerator:
                     (150, y + 30),
                     position_text,
                     fill=(255, 255, 255),
-                    font=ImageFont.truetype("arial.ttf", 32),
+                    font=load_font(32),
                 )
                 draw.text(
                     (250, y + 20),
                     user.name,
                     fill=(255, 255, 255),
-                    font=ImageFont.truetype("arial.ttf", 32),
+                    font=load_font(32),
                 )
                 stats_text = f"УРОВЕНЬ {level}  •  {xp:,} XP"
                 draw.text(
                     (250, y + 55),
                     stats_text,
                     fill=(200, 200, 200),
-                    font=ImageFont.truetype("arial.ttf", 20),
+                    font=load_font(20),
                 )
             buffer = BytesIO()
             card.save(buffer, format="PNG")
@@ -222,8 +254,8 @@ class ImageGenerator:
         card.paste(avatar, (avatar_x + 10, 50), mask)
 
         welcome_text = "ДОБРО ПОЖАЛОВАТЬ"
-        welcome_font = ImageFont.truetype("arial.ttf", 48)
-        name_font = ImageFont.truetype("arial.ttf", 36)
+        welcome_font = load_font(48)
+        name_font = load_font(36)
         draw = ImageDraw.Draw(card)
         welcome_bbox = draw.textbbox((0, 0), welcome_text, font=welcome_font)
         welcome_width = welcome_bbox[2] - welcome_bbox[0]
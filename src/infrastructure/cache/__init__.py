@@ -1 +1,7 @@
 """Адаптеры кэша."""
+
+from infrastructure.cache.audit_log_cache import AuditLogCache, AuditRecord
+from infrastructure.cache.message_content_cache import CachedMessage, MessageContentCache
+from infrastructure.cache.ttl_cache import TTLCache
+
+__all__ = ["AuditLogCache", "AuditRecord", "CachedMessage", "MessageContentCache", "TTLCache"]
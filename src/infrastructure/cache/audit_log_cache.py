@@ -0,0 +1,150 @@
+"""Кэш записей журнала аудита для атрибуции действий без REST запросов."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import discord
+
+from infrastructure.cache.ttl_cache import TTLCache
+from utils.monitoring import track_audit_log_lookup
+
+logger = logging.getLogger(__name__)
+
+AuditKey = Tuple[int, discord.AuditLogAction, int]
+
+
+class AuditRecord(NamedTuple):
+    """Кто и почему выполнил действие."""
+
+    entry_id: int
+    user_id: Optional[int]
+    user: Any
+    reason: Optional[str]
+
+
+class AuditLogCache:
+    """Записи журнала аудита по ключу (сервер, действие, цель) с коротким TTL.
+
+    Записи приходят gateway событием `on_audit_log_entry_create` (интент
+    moderation и право View Audit Log). Событие самого действия (бан,
+    изменение ролей) может прийти раньше записи, поэтому при промахе поиск
+    ждет запись до `wait` секунд и только потом запрашивает последние
+    `fetch_limit` записей одним REST запросом; одновременные промахи по
+    одному серверу и действию делят этот запрос.
+
+    Найденная запись забирается из кэша: два изменения ролей одного
+    участника подряд не получат одну и ту же запись.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 60.0,
+        wait: float = 2.0,
+        fetch_limit: int = 10,
+        maxsize: int = 10_000,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.ttl = ttl
+        self.wait = wait
+        self.fetch_limit = fetch_limit
+        self._clock = clock
+        self._entries: TTLCache[AuditKey, AuditRecord] = TTLCache(
+            ttl=ttl, maxsize=maxsize, name="audit_log", clock=clock
+        )
+        # Уже использованные записи, чтобы REST запрос не вернул их снова
+        self._used: TTLCache[int, bool] = TTLCache(
+            ttl=ttl * 2, maxsize=maxsize, name="audit_log_used", clock=clock
+        )
+        self._waiters: Dict[AuditKey, List[asyncio.Future]] = {}
+        self._fetches: Dict[Tuple[int, discord.AuditLogAction], asyncio.Task] = {}
+
+    def add(
+        self,
+        entry: discord.AuditLogEntry,
+        guild_id: Optional[int] = None,
+        action: Optional[discord.AuditLogAction] = None,
+    ) -> None:
+        """Запомнить запись журнала аудита."""
+
+        target_id = getattr(entry.target, "id", None)
+        if target_id is None or entry.id in self._used:
+            return
+        expires_at = entry.created_at.timestamp() + self.ttl
+        if expires_at <= self._clock():
+            return
+        key = (guild_id or entry.guild.id, action or entry.action, target_id)
+        record = AuditRecord(entry.id, entry.user_id, entry.user, entry.reason)
+        self._entries.set(key, record, expires_at)
+        for waiter in self._waiters.pop(key, []):
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def take(
+        self, guild_id: int, action: discord.AuditLogAction, target_id: int
+    ) -> Optional[AuditRecord]:
+        """Забрать запись из кэша без ожидания и запросов."""
+
+        record = self._entries.pop((guild_id, action, target_id), None)
+        if record is not None:
+            self._used[record.entry_id] = True
+        return record
+
+    async def find(
+        self, guild: discord.Guild, action: discord.AuditLogAction, target_id: int
+    ) -> Optional[AuditRecord]:
+        """Найти запись о действии над `target_id`.
+
+        Returns:
+            Optional[AuditRecord]: Запись или None, если журнал недоступен
+        """
+
+        record = self.take(guild.id, action, target_id)
+        if record is not None:
+            track_audit_log_lookup("cache")
+            return record
+
+        if self.wait > 0:
+            record = await self._wait_for((guild.id, action, target_id))
+            if record is not None:
+                track_audit_log_lookup("gateway")
+                return record
+
+        await self._fetch(guild, action)
+        record = self.take(guild.id, action, target_id)
+        track_audit_log_lookup("fetch" if record is not None else "miss")
+        return record
+
+    async def _wait_for(self, key: AuditKey) -> Optional[AuditRecord]:
+        waiter = asyncio.get_running_loop().create_future()
+        waiters = self._waiters.setdefault(key, [])
+        waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.wait)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            if waiter in waiters:
+                waiters.remove(waiter)
+            if not waiters and self._waiters.get(key) is waiters:
+                del self._waiters[key]
+        return self.take(*key)
+
+    async def _fetch(self, guild: discord.Guild, action: discord.AuditLogAction) -> None:
+        key = (guild.id, action)
+        task = self._fetches.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch_entries(guild, action))
+            self._fetches[key] = task
+            task.add_done_callback(lambda _: self._fetches.pop(key, None))
+        await task
+
+    async def _fetch_entries(self, guild: discord.Guild, action: discord.AuditLogAction) -> None:
+        try:
+            async for entry in guild.audit_logs(limit=self.fetch_limit, action=action):
+                self.add(entry, guild.id, action)
+        except (discord.Forbidden, discord.HTTPException) as e:
+            logger.debug(f"Журнал аудита сервера {guild.id} недоступен: {e}")
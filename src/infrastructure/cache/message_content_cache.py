@@ -0,0 +1,80 @@
+"""Компактный кэш текста сообщений для логов удаления и редактирования."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Dict, Iterable, NamedTuple, Optional
+
+from utils.monitoring import track_cache_eviction, update_cache_entries
+
+
+class CachedMessage(NamedTuple):
+    """Все, что нужно логам от удаленного или измененного сообщения."""
+
+    author_id: int
+    channel_id: int
+    content: str
+
+
+class MessageContentCache:
+    """Ограниченный кэш `message_id -> CachedMessage` с LRU-вытеснением.
+
+    Хранит только автора, канал и обрезанный текст вместо объектов
+    `discord.Message` со всеми связанными данными, поэтому кэш сообщений
+    discord.py можно уменьшить или отключить без потери логов.
+    """
+
+    def __init__(
+        self, maxsize: int = 50_000, content_limit: int = 1000, name: str = "message_content"
+    ) -> None:
+        self.maxsize = maxsize
+        self.content_limit = content_limit
+        self.name = name
+        self._data: "OrderedDict[int, CachedMessage]" = OrderedDict()
+
+    def truncate(self, content: str) -> str:
+        if len(content) <= self.content_limit:
+            return content
+        return content[: self.content_limit - 1] + "…"
+
+    def remember(self, message_id: int, author_id: int, channel_id: int, content: str) -> None:
+        self._data[message_id] = CachedMessage(author_id, channel_id, self.truncate(content))
+        self._data.move_to_end(message_id)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            track_cache_eviction(self.name, "lru")
+        update_cache_entries(self.name, len(self._data))
+
+    def get(self, message_id: int) -> Optional[CachedMessage]:
+        return self._data.get(message_id)
+
+    def update(self, message_id: int, content: str) -> Optional[CachedMessage]:
+        """Заменить текст измененного сообщения и вернуть прежнюю запись."""
+
+        previous = self._data.get(message_id)
+        if previous is not None:
+            self._data[message_id] = previous._replace(content=self.truncate(content))
+        return previous
+
+    def pop(self, message_id: int) -> Optional[CachedMessage]:
+        entry = self._data.pop(message_id, None)
+        if entry is not None:
+            update_cache_entries(self.name, len(self._data))
+        return entry
+
+    def pop_many(self, message_ids: Iterable[int]) -> Dict[int, CachedMessage]:
+        """Удалить записи пакета сообщений и вернуть найденные."""
+
+        found = {}
+        for message_id in message_ids:
+            entry = self._data.pop(message_id, None)
+            if entry is not None:
+                found[message_id] = entry
+        update_cache_entries(self.name, len(self._data))
+        return found
+
+    def __contains__(self, message_id: object) -> bool:
+        return message_id in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,133 @@
+"""Ограниченный словарь с TTL на каждую запись и LRU-вытеснением."""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Generic, Hashable, Iterator, Optional, Tuple, TypeVar
+
+from utils.monitoring import track_cache_eviction, update_cache_entries
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class TTLCache(Generic[K, V]):
+    """Словарь с истечением записей и ограничением размера.
+
+    Каждая запись живет `ttl` секунд с момента последней записи. При
+    превышении `maxsize` вытесняется наименее недавно использованная запись.
+    Истекшие записи удаляются лениво при обращении и пакетно в `purge_expired`.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        maxsize: int,
+        name: str = "cache",
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.name = name
+        self._clock = clock
+        self._data: "OrderedDict[K, Tuple[V, float]]" = OrderedDict()
+        self.evictions: Dict[str, int] = {"expired": 0, "lru": 0}
+
+    def _evict(self, key: K, reason: str) -> None:
+        del self._data[key]
+        self.evictions[reason] += 1
+        track_cache_eviction(self.name, reason)
+
+    def _update_gauge(self) -> None:
+        update_cache_entries(self.name, len(self._data))
+
+    def get(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        """Получить значение, если запись существует и не истекла."""
+
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        value, expires_at = entry
+        if expires_at <= self._clock():
+            self._evict(key, "expired")
+            self._update_gauge()
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V, expires_at: Optional[float] = None) -> None:
+        """Записать значение с TTL от текущего момента или явным сроком."""
+
+        if expires_at is None:
+            expires_at = self._clock() + self.ttl
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            oldest = next(iter(self._data))
+            self._evict(oldest, "lru")
+        self._update_gauge()
+
+    def expires_at(self, key: K) -> Optional[float]:
+        """Срок истечения записи или None."""
+
+        entry = self._data.get(key)
+        return entry[1] if entry else None
+
+    def pop(self, key: K, default=_MISSING):
+        entry = self._data.pop(key, None)
+        self._update_gauge()
+        if entry is None or entry[1] <= self._clock():
+            if default is _MISSING:
+                raise KeyError(key)
+            return default
+        return entry[0]
+
+    def purge_expired(self) -> int:
+        """Удалить все истекшие записи.
+
+        Returns:
+            int: Количество удаленных записей
+        """
+
+        now = self._clock()
+        expired = [key for key, (_, expires_at) in self._data.items() if expires_at <= now]
+        for key in expired:
+            self._evict(key, "expired")
+        if expired:
+            self._update_gauge()
+        return len(expired)
+
+    def items(self) -> Iterator[Tuple[K, V, float]]:
+        """Живые записи в виде (key, value, expires_at)."""
+
+        now = self._clock()
+        for key, (value, expires_at) in list(self._data.items()):
+            if expires_at > now:
+                yield key, value, expires_at
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._update_gauge()
+
+    def __getitem__(self, key: K) -> V:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: K, value: V) -> None:
+        self.set(key, value)
+
+    def __delitem__(self, key: K) -> None:
+        del self._data[key]
+        self._update_gauge()
+
+    def __contains__(self, key: object) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
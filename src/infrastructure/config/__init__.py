@@ -1,14 +1,28 @@
 """Конфигурации и хранилища JSON."""
 
 from infrastructure.config.automod_store import AutomodConfigStore
-from infrastructure.config.json_store import JsonStore
+from infrastructure.config.journal_store import JournaledJsonStore
+from infrastructure.config.json_codec import JsonCodec, configure_json_codec, get_codec
+from infrastructure.config.json_store import JsonStore, flush_json_stores
 from infrastructure.config.levels_store import LevelsStore
+from infrastructure.config.snapshot import ConfigSnapshot, SnapshotRef, freeze, thaw
+from infrastructure.config.sqlite_store import SqliteDocumentStore
 from infrastructure.config.tickets_store import TicketsConfigStore
 from infrastructure.config.warnings_store import WarningsConfigStore, WarningsStore
 
 __all__ = [
     "JsonStore",
+    "JournaledJsonStore",
+    "JsonCodec",
+    "configure_json_codec",
+    "get_codec",
+    "flush_json_stores",
+    "SqliteDocumentStore",
     "LevelsStore",
+    "ConfigSnapshot",
+    "SnapshotRef",
+    "freeze",
+    "thaw",
     "TicketsConfigStore",
     "AutomodConfigStore",
     "WarningsConfigStore",
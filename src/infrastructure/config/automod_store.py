@@ -1,10 +1,11 @@
-"""JSON конфиг автомодерации."""
+"""Конфиг автомодерации."""
 
 from __future__ import annotations
 
-from typing import Dict
+from typing import Dict, Optional, Union
 
 from infrastructure.config.json_store import JsonStore
+from infrastructure.config.sqlite_store import SqliteDocumentStore
 
 
 def _default_automod() -> Dict:
@@ -15,17 +16,48 @@ def _default_automod() -> Dict:
         "max_mentions": 3,
         "max_warnings": 3,
         "mute_duration": "1h",
+        "regex_rules": [],
+        "regex_max_timeouts": 3,
+        "warning_ttl": 3600,
     }
 
 
 class AutomodConfigStore:
-    """Хранилище конфигурации автомодерации в JSON."""
-
-    def __init__(self, path: str = "automod_config.json") -> None:
-        self._store = JsonStore(path, _default_automod)
+    """Хранилище конфигурации автомодерации.
+
+    С `db_path` конфиг хранится в таблице `config_documents` и общий
+    для процессов кластера, иначе — в JSON файле.
+    """
+
+    def __init__(
+        self,
+        path: str = "automod_config.json",
+        debounce: float = 0.0,
+        db_path: Optional[str] = None,
+    ) -> None:
+        self._store: Union[JsonStore, SqliteDocumentStore]
+        if db_path:
+            self._store = SqliteDocumentStore(
+                db_path, "automod_config", _default_automod, seed_path=path
+            )
+        else:
+            self._store = JsonStore(path, _default_automod, debounce)
 
     def load(self) -> Dict:
         return self._store.load()
 
     def save(self, data: Dict) -> None:
         self._store.save(data)
+
+    async def flush(self) -> bool:
+        return await self._store.flush()
+
+    def update(self, changes: Dict) -> None:
+        """Изменить ключи верхнего уровня, не затирая остальные."""
+
+        self._store.update(lambda data: data.update(changes))
+
+    def refresh(self) -> Optional[Dict]:
+        """Конфиг, если его изменил другой процесс кластера."""
+
+        return self._store.refresh()
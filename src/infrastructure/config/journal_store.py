@@ -0,0 +1,253 @@
+"""JSON хранилище с append-only журналом изменений и компакцией."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Optional, Sequence
+
+from infrastructure.config.json_codec import get_codec
+from infrastructure.config.json_store import _running_loop, _write_behind_stores, write_atomic
+from utils.monitoring import observe_json_save
+
+
+logger = logging.getLogger(__name__)
+
+_SERIALISE_ATTEMPTS = 3
+
+
+def _apply(data: Dict, op: str, keys: Sequence[str], value: Any = None) -> None:
+    node = data
+    for key in keys[:-1]:
+        if op == "del" and key not in node:
+            return
+        node = node.setdefault(key, {})
+    if op == "set":
+        node[keys[-1]] = value
+    else:
+        node.pop(keys[-1], None)
+        # Убираем опустевшие родительские словари
+        if not node and len(keys) > 1:
+            _apply(data, "del", keys[:-1])
+
+
+class JournaledJsonStore:
+    """Снапшот JSON + журнал JSON lines с идемпотентными операциями.
+
+    Каждое изменение дописывает в журнал одну строку вида
+    `{"op": "set", "k": [...], "v": ...}` или `{"op": "del", "k": [...]}`,
+    поэтому стоимость записи не зависит от общего объема данных. При загрузке
+    состояние восстанавливается из снапшота и журнала. Когда журнал
+    становится больше `compact_ratio` размеров снапшота, фоновая компакция
+    переписывает снапшот атомарно и обнуляет журнал.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        default_factory: Callable[[], Dict],
+        compact_ratio: float = 1.0,
+        min_compact_bytes: int = 64 * 1024,
+        fsync: bool = False,
+    ) -> None:
+        self.path = Path("data") / path
+        self.default_factory = default_factory
+        self.compact_ratio = compact_ratio
+        self.min_compact_bytes = min_compact_bytes
+        self.fsync = fsync
+        self.compactions = 0
+        self._data: Optional[Dict] = None
+        self._journal: Optional[BinaryIO] = None
+        self._journal_bytes = 0
+        self._snapshot_bytes = 0
+        self._compact_task: Optional[asyncio.Task] = None
+        _write_behind_stores.add(self)
+
+    @property
+    def journal_path(self) -> Path:
+        return self.path.with_name(self.path.name + ".journal")
+
+    @property
+    def compacting_path(self) -> Path:
+        return self.path.with_name(self.path.name + ".journal.compacting")
+
+    def load(self) -> Dict:
+        """Восстановить состояние из снапшота и журнала."""
+
+        if self.path.exists():
+            data = get_codec().loads(self.path.read_bytes())
+            self._snapshot_bytes = self.path.stat().st_size
+        else:
+            data = self.default_factory()
+
+        replayed = 0
+        for journal in (self.compacting_path, self.journal_path):
+            if journal.exists():
+                replayed += self._replay(journal, data)
+
+        self._data = data
+        self._journal_bytes = (
+            self.journal_path.stat().st_size if self.journal_path.exists() else 0
+        )
+        if self.compacting_path.exists() or not self.path.exists():
+            # Прерванная компакция или первый запуск — фиксируем снапшот сразу
+            self.compact_sync()
+        elif replayed:
+            logger.info(f"{self.path}: применено {replayed} записей журнала")
+        return data
+
+    def _replay(self, journal: Path, data: Dict) -> int:
+        codec = get_codec()
+        applied = 0
+        with journal.open("rb") as file:
+            for line in file:
+                try:
+                    entry = codec.loads(line)
+                except ValueError:
+                    # Оборванная последняя строка после аварийного завершения
+                    logger.warning(f"{journal}: пропущена поврежденная запись журнала")
+                    continue
+                _apply(data, entry["op"], entry["k"], entry.get("v"))
+                applied += 1
+        return applied
+
+    def _ensure_data(self) -> Dict:
+        if self._data is None:
+            self.load()
+        return self._data
+
+    def set(self, keys: Sequence[str], value: Any) -> None:
+        """Записать значение по пути ключей."""
+
+        self._append("set", keys, value)
+
+    def delete(self, keys: Sequence[str]) -> None:
+        """Удалить значение по пути ключей."""
+
+        self._append("del", keys)
+
+    def _append(self, op: str, keys: Sequence[str], value: Any = None) -> None:
+        data = self._ensure_data()
+        _apply(data, op, list(keys), value)
+
+        entry: Dict[str, Any] = {"op": op, "k": list(keys)}
+        if op == "set":
+            entry["v"] = value
+        line = get_codec().dumps(entry, pretty=False) + b"\n"
+
+        if self._journal is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._journal = self.journal_path.open("ab")
+        self._journal.write(line)
+        self._journal.flush()
+        if self.fsync:
+            os.fsync(self._journal.fileno())
+        self._journal_bytes += len(line)
+
+        self._maybe_compact()
+
+    def _needs_compaction(self) -> bool:
+        threshold = max(self.min_compact_bytes, self.compact_ratio * self._snapshot_bytes)
+        return self._journal_bytes > threshold
+
+    def _maybe_compact(self) -> None:
+        if not self._needs_compaction():
+            return
+        if self._compact_task is not None and not self._compact_task.done():
+            return
+        loop = _running_loop()
+        if loop is None:
+            self.compact_sync()
+        else:
+            self._compact_task = loop.create_task(self.compact())
+
+    def _rotate_journal(self) -> None:
+        """Отложить текущий журнал для компакции и начать новый."""
+
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        if self.journal_path.exists():
+            if self.compacting_path.exists():
+                # Предыдущая компакция не завершилась — объединяем журналы
+                with self.compacting_path.open("ab") as target:
+                    target.write(self.journal_path.read_bytes())
+                self.journal_path.unlink()
+            else:
+                os.replace(self.journal_path, self.compacting_path)
+        self._journal_bytes = 0
+
+    def _write_snapshot(self, data: Dict) -> int:
+        payload = None
+        for _ in range(_SERIALISE_ATTEMPTS):
+            try:
+                payload = get_codec().dumps(data)
+                break
+            except RuntimeError:
+                # Данные изменились во время сериализации в потоке — повторяем
+                continue
+        if payload is None:
+            raise RuntimeError(f"Не удалось сериализовать снапшот {self.path}")
+        write_atomic(self.path, payload, fsync=True)
+        # Операции идемпотентны: даже если снапшот новее журнала, повторное
+        # применение журнала при загрузке даст то же состояние
+        if self.compacting_path.exists():
+            self.compacting_path.unlink()
+        return len(payload)
+
+    def compact_sync(self) -> None:
+        """Синхронно переписать снапшот и очистить журнал."""
+
+        data = self._ensure_data()
+        started = time.perf_counter()
+        self._rotate_journal()
+        self._snapshot_bytes = self._write_snapshot(data)
+        self.compactions += 1
+        observe_json_save(self.path.name, time.perf_counter() - started)
+
+    async def compact(self) -> None:
+        """Переписать снапшот в фоне, не блокируя event loop."""
+
+        data = self._ensure_data()
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        self._rotate_journal()
+        try:
+            self._snapshot_bytes = await loop.run_in_executor(None, self._write_snapshot, data)
+        except Exception as e:
+            # Журнал сохранен в .compacting и будет применен при следующей загрузке
+            logger.error(f"Ошибка компакции {self.path}: {e}")
+            return
+        self.compactions += 1
+        observe_json_save(self.path.name, time.perf_counter() - started)
+
+    def save(self, data: Dict) -> None:
+        """Полностью заменить данные (снапшот без журнала)."""
+
+        self._data = data
+        self.compact_sync()
+
+    @property
+    def dirty(self) -> bool:
+        return self._compact_task is not None and not self._compact_task.done()
+
+    async def flush(self) -> bool:
+        """Дождаться фоновой компакции и закрыть журнал."""
+
+        waited = False
+        if self._compact_task is not None and not self._compact_task.done():
+            await self._compact_task
+            waited = True
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        return waited
+
+    def flush_sync(self) -> bool:
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        return False
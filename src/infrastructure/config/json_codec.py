@@ -0,0 +1,124 @@
+"""Сменные JSON кодеки (stdlib / ujson / orjson)."""
+
+from __future__ import annotations
+
+import json
+import logging
+from typing import Any, Dict, Optional, Union
+
+
+logger = logging.getLogger(__name__)
+
+
+class JsonCodec:
+    """JSON кодек на стандартной библиотеке.
+
+    `dumps` возвращает UTF-8 байты, `loads` принимает байты или строку и
+    при ошибке разбора бросает `ValueError`.
+    """
+
+    name = "json"
+
+    def __init__(self, pretty: bool = False) -> None:
+        self.pretty = pretty
+
+    def dumps(self, obj: Any, pretty: Optional[bool] = None) -> bytes:
+        if self.pretty if pretty is None else pretty:
+            text = json.dumps(obj, indent=4, ensure_ascii=False)
+        else:
+            text = json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+        return text.encode("utf-8")
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+
+class UjsonCodec(JsonCodec):
+    name = "ujson"
+
+    def __init__(self, pretty: bool = False) -> None:
+        super().__init__(pretty)
+        import ujson
+
+        self._ujson = ujson
+
+    def dumps(self, obj: Any, pretty: Optional[bool] = None) -> bytes:
+        indent = 4 if (self.pretty if pretty is None else pretty) else 0
+        text = self._ujson.dumps(
+            obj, ensure_ascii=False, escape_forward_slashes=False, indent=indent
+        )
+        return text.encode("utf-8")
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return self._ujson.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    name = "orjson"
+
+    def __init__(self, pretty: bool = False) -> None:
+        super().__init__(pretty)
+        import orjson
+
+        self._orjson = orjson
+
+    def dumps(self, obj: Any, pretty: Optional[bool] = None) -> bytes:
+        # Нестроковые ключи приводятся к строкам, как в stdlib json
+        option = self._orjson.OPT_NON_STR_KEYS
+        if self.pretty if pretty is None else pretty:
+            # orjson поддерживает только отступ в 2 пробела
+            option |= self._orjson.OPT_INDENT_2
+        return self._orjson.dumps(obj, option=option)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return self._orjson.loads(data)
+
+
+CODECS: Dict[str, type] = {
+    "orjson": OrjsonCodec,
+    "ujson": UjsonCodec,
+    "json": JsonCodec,
+}
+
+_codec: JsonCodec = JsonCodec(pretty=True)
+
+
+def create_codec(name: str = "auto", pretty: bool = False) -> JsonCodec:
+    """Создать кодек по имени.
+
+    Args:
+        name: `orjson`, `ujson`, `json` или `auto` (самый быстрый из установленных)
+        pretty: Форматировать файлы с отступами для чтения человеком
+
+    Returns:
+        JsonCodec: Кодек
+    """
+
+    if name == "auto":
+        for candidate in CODECS.values():
+            try:
+                return candidate(pretty)
+            except ImportError:
+                continue
+    if name not in CODECS:
+        raise ValueError(f"Неизвестный JSON кодек: {name}")
+    try:
+        return CODECS[name](pretty)
+    except ImportError:
+        logger.warning(f"JSON кодек {name} не установлен, используется стандартный json")
+        return JsonCodec(pretty)
+
+
+def configure_json_codec(name: str = "auto", pretty: bool = False) -> JsonCodec:
+    """Выбрать кодек для всех хранилищ при запуске."""
+
+    global _codec
+    _codec = create_codec(name, pretty)
+    logger.info(f"JSON кодек: {_codec.name} ({'pretty' if pretty else 'compact'})")
+    return _codec
+
+
+def get_codec() -> JsonCodec:
+    """Текущий кодек хранилищ."""
+
+    return _codec
@@ -2,36 +2,235 @@
 
 from __future__ import annotations
 
-import json
+import asyncio
+import atexit
+import logging
+import os
+import tempfile
+import time
+import weakref
 from pathlib import Path
-from typing import Callable, Generic, TypeVar
+from typing import Any, Callable, Generic, Optional, TypeVar, Union
+
+from infrastructure.config.json_codec import get_codec
+from utils.monitoring import observe_json_save, track_json_coalesced_write
 
 
 T = TypeVar("T")
+R = TypeVar("R")
+
+logger = logging.getLogger(__name__)
+
+# Сторы с отложенной записью, которые нужно сбросить при остановке
+_write_behind_stores: "weakref.WeakSet[JsonStore]" = weakref.WeakSet()
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def snapshot(value: Any) -> Any:
+    """Копия JSON-дерева (словари и списки), не связанная с исходными данными.
+
+    Отложенная запись сериализует данные в потоке, пока event loop продолжает
+    их менять; копия, снятая на event loop, гарантирует, что в файл попадет
+    состояние на момент одного сохранения, а не смесь старого и нового.
+    """
+
+    if isinstance(value, dict):
+        return {key: snapshot(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [snapshot(item) for item in value]
+    return value
+
+
+def write_atomic(path: Path, data: Union[str, bytes], fsync: bool = False) -> None:
+    """Записать файл через временный файл и `os.replace`.
+
+    Читатель всегда видит либо старую, либо новую версию файла целиком.
+    """
+
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+            if fsync:
+                file.flush()
+                os.fsync(file.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
 
 
 class JsonStore(Generic[T]):
-    """Хранилище JSON с ленивым созданием по умолчанию."""
+    """Хранилище JSON с ленивым созданием по умолчанию.
+
+    При `debounce > 0` и запущенном event loop `save` работает в режиме
+    отложенной записи: данные помечаются грязными, сохранения в пределах окна
+    объединяются, а сериализация и запись выполняются вне event loop.
+    """
 
-    def __init__(self, path: str, default_factory: Callable[[], T]) -> None:
+    def __init__(
+        self,
+        path: str,
+        default_factory: Callable[[], T],
+        debounce: float = 0.0,
+    ) -> None:
         base_dir = Path("data")
         self.path = base_dir / path
         self.default_factory = default_factory
+        self.debounce = debounce
+        self.coalesced_writes = 0
+        self._pending: Optional[T] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._write_lock: Optional[asyncio.Lock] = None
+        if debounce > 0:
+            _write_behind_stores.add(self)
+
+    @property
+    def dirty(self) -> bool:
+        """Есть ли несохраненные изменения."""
+
+        return self._pending is not None
 
     def load(self) -> T:
         """Загрузить данные или создать дефолтный файл."""
 
+        if self._pending is not None:
+            return self._pending
+
         if self.path.exists():
-            with self.path.open("r", encoding="utf-8") as file:
-                return json.load(file)
+            return get_codec().loads(self.path.read_bytes())
 
         data = self.default_factory()
         self.save(data)
         return data
 
     def save(self, data: T) -> None:
-        """Сохранить данные в JSON файл."""
+        """Сохранить данные в JSON файл (или запланировать отложенную запись)."""
+
+        if self.debounce > 0:
+            loop = _running_loop()
+            if loop is not None:
+                self._schedule(data, loop)
+                return
+
+        started = time.perf_counter()
+        write_atomic(self.path, self._serialise(data))
+        observe_json_save(self.path.name, time.perf_counter() - started)
+
+    def update(self, mutate: Callable[[T], R]) -> R:
+        """Изменить данные на месте и сохранить их.
+
+        Args:
+            mutate: Функция, меняющая данные
+
+        Returns:
+            Результат `mutate`
+        """
+
+        data = self.load()
+        result = mutate(data)
+        self.save(data)
+        return result
+
+    def refresh(self) -> Optional[T]:
+        """Файл меняет только этот процесс, поэтому перечитывать нечего."""
+
+        return None
+
+    def _serialise(self, data: T) -> bytes:
+        return get_codec().dumps(data)
+
+    def _schedule(self, data: T, loop: asyncio.AbstractEventLoop) -> None:
+        if self._pending is not None:
+            self.coalesced_writes += 1
+            track_json_coalesced_write(self.path.name)
+        self._pending = data
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self) -> None:
+        while self._pending is not None:
+            await asyncio.sleep(self.debounce)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Ошибка отложенной записи {self.path}: {e}")
+                return
+
+    def _serialise_and_write(self, data: T) -> None:
+        write_atomic(self.path, self._serialise(data), fsync=True)
+
+    async def flush(self) -> bool:
+        """Немедленно записать отложенные изменения.
+
+        Returns:
+            bool: True если что-то было записано
+        """
+
+        if self._write_lock is None:
+            self._write_lock = asyncio.Lock()
+
+        async with self._write_lock:
+            data, self._pending = self._pending, None
+            if data is None:
+                return False
+
+            loop = asyncio.get_running_loop()
+            started = time.perf_counter()
+            try:
+                # Копия снимается на event loop: поток сериализует состояние,
+                # которое вызывающий код уже не меняет
+                await loop.run_in_executor(None, self._serialise_and_write, snapshot(data))
+            except BaseException:
+                if self._pending is None:
+                    self._pending = data
+                raise
+            observe_json_save(self.path.name, time.perf_counter() - started)
+            return True
+
+    def flush_sync(self) -> bool:
+        """Синхронно записать отложенные изменения (без event loop)."""
+
+        data, self._pending = self._pending, None
+        if data is None:
+            return False
+        write_atomic(self.path, self._serialise(data), fsync=True)
+        return True
+
+
+async def flush_json_stores() -> int:
+    """Сбросить все сторы с отложенной записью.
+
+    Returns:
+        int: Количество записанных файлов
+    """
+
+    flushed = 0
+    for store in list(_write_behind_stores):
+        try:
+            if await store.flush():
+                flushed += 1
+        except Exception as e:
+            logger.error(f"Ошибка при сбросе {store.path}: {e}")
+    return flushed
+
 
-        self.path.parent.mkdir(parents=True, exist_ok=True)
-        with self.path.open("w", encoding="utf-8") as file:
-            json.dump(data, file, indent=4, ensure_ascii=False)
+@atexit.register
+def _flush_on_exit() -> None:
+    for store in list(_write_behind_stores):
+        try:
+            store.flush_sync()
+        except Exception as e:
+            logger.error(f"Ошибка при сбросе {store.path} на выходе: {e}")
@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
-from typing import Dict
+from pathlib import Path
+from typing import Dict, List, Optional
 
+from infrastructure.config.journal_store import JournaledJsonStore
 from infrastructure.config.json_store import JsonStore
 
 
@@ -12,13 +14,50 @@ def _default_levels() -> Dict:
 
 
 class LevelsStore:
-    """Хранилище уровней в JSON как fallback."""
-
-    def __init__(self, path: str = "levels.json") -> None:
-        self._store = JsonStore(path, _default_levels)
+    """Хранилище уровней в JSON как fallback.
+
+    С `journal=True` изменения отдельных пользователей дописываются в журнал,
+    а не переписывают весь файл.
+    """
+
+    def __init__(
+        self,
+        path: str = "levels.json",
+        debounce: float = 0.0,
+        journal: bool = False,
+    ) -> None:
+        if journal:
+            self._store = JournaledJsonStore(path, _default_levels)
+        else:
+            self._store = JsonStore(path, _default_levels, debounce)
+        self._data: Optional[Dict] = None
+
+    @property
+    def source_paths(self) -> List[Path]:
+        """Файлы, из которых собираются данные (снапшот и журналы)."""
+
+        if isinstance(self._store, JournaledJsonStore):
+            return [self._store.path, self._store.compacting_path, self._store.journal_path]
+        return [self._store.path]
 
     def load(self) -> Dict:
-        return self._store.load()
+        self._data = self._store.load()
+        return self._data
 
     def save(self, data: Dict) -> None:
+        self._data = data
         self._store.save(data)
+
+    def set_user(self, guild_id: str, user_id: str, record: Dict) -> None:
+        """Сохранить уровень и опыт одного пользователя."""
+
+        if isinstance(self._store, JournaledJsonStore):
+            self._store.set([guild_id, user_id], record)
+            return
+
+        data = self._data if self._data is not None else self.load()
+        data.setdefault(guild_id, {})[user_id] = record
+        self.save(data)
+
+    async def flush(self) -> bool:
+        return await self._store.flush()
@@ -0,0 +1,95 @@
+"""Неизменяемые версионированные снапшоты конфигурации."""
+
+from __future__ import annotations
+
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterator, Mapping, TypeVar
+
+
+D = TypeVar("D")
+
+
+def freeze(value: Any) -> Any:
+    """Рекурсивно сделать данные неизменяемыми (dict -> mappingproxy, list -> tuple)."""
+
+    if isinstance(value, (dict, MappingProxyType)):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Изменяемая копия замороженных данных (для записи и сериализации)."""
+
+    if isinstance(value, (dict, MappingProxyType)):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(item) for item in value]
+    return value
+
+
+class ConfigSnapshot(Mapping[str, Any]):
+    """Одна версия конфигурации.
+
+    Данные не меняются после создания, поэтому производные структуры
+    (скомпилированные выражения, отсортированные пороги) кэшируются прямо
+    в снапшоте и живут, пока живет эта версия.
+    """
+
+    __slots__ = ("version", "data", "_derived")
+
+    def __init__(self, version: int, data: Mapping[str, Any]) -> None:
+        self.version = version
+        self.data = freeze(data)
+        self._derived: Dict[str, Any] = {}
+
+    def derive(self, key: str, factory: Callable[[Mapping[str, Any]], D]) -> D:
+        """Вычислить производную структуру один раз для этой версии."""
+
+        try:
+            return self._derived[key]
+        except KeyError:
+            value = self._derived[key] = factory(self.data)
+            return value
+
+    def __getitem__(self, key: str) -> Any:
+        return self.data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.data)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __repr__(self) -> str:
+        return f"ConfigSnapshot(version={self.version}, data={dict(self.data)!r})"
+
+
+class SnapshotRef:
+    """Ссылка на текущий снапшот.
+
+    Читатели берут `current` без копирования и блокировок; писатели строят
+    новый снапшот и подменяют ссылку одним присваиванием.
+    """
+
+    def __init__(self, data: Mapping[str, Any]) -> None:
+        self._current = ConfigSnapshot(1, data)
+
+    @property
+    def current(self) -> ConfigSnapshot:
+        return self._current
+
+    def replace(self, data: Mapping[str, Any]) -> ConfigSnapshot:
+        """Опубликовать новую версию с данными `data`."""
+
+        snapshot = ConfigSnapshot(self._current.version + 1, data)
+        self._current = snapshot
+        return snapshot
+
+    def update(self, **changes: Any) -> ConfigSnapshot:
+        """Опубликовать новую версию с измененными ключами верхнего уровня."""
+
+        data = dict(self._current.data)
+        data.update(changes)
+        return self.replace(data)
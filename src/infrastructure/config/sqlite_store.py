@@ -0,0 +1,134 @@
+"""JSON конфиги в общем SQLite файле."""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple, TypeVar
+
+from infrastructure.config.json_codec import get_codec
+
+R = TypeVar("R")
+
+
+class SqliteDocumentStore:
+    """JSON документ в таблице `config_documents`.
+
+    Документ общий для всех процессов кластера: каждое сохранение увеличивает
+    его версию, а `refresh` возвращает документ, если его версия новее
+    прочитанной этим процессом. Собственная запись версию не продвигает,
+    поэтому после `update` процесс получит и изменения других процессов,
+    слитые в той же транзакции (`BEGIN IMMEDIATE`).
+
+    При первом обращении документ заполняется из старого JSON файла `seed_path`
+    (относительно `data/`), который затем переименовывается в `*.imported`.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        name: str,
+        default_factory: Callable[[], Dict],
+        seed_path: Optional[str] = None,
+    ) -> None:
+        self.path = path
+        self.name = name
+        self.default_factory = default_factory
+        self.seed_path = Path("data") / seed_path if seed_path else None
+        self.version = 0
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with closing(sqlite3.connect(self.path, timeout=30)) as conn:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS config_documents ("
+                "name TEXT PRIMARY KEY, data TEXT NOT NULL, "
+                "version INTEGER NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.commit()
+
+    def _connect(self) -> "closing[sqlite3.Connection]":
+        return closing(sqlite3.connect(self.path, timeout=30, isolation_level=None))
+
+    def _write(self, conn: sqlite3.Connection, data: Dict) -> None:
+        conn.execute(
+            "INSERT INTO config_documents (name, data, version, updated_at) VALUES (?, ?, 1, ?) "
+            "ON CONFLICT(name) DO UPDATE SET data = excluded.data, "
+            "version = config_documents.version + 1, updated_at = excluded.updated_at",
+            (self.name, get_codec().dumps(data, pretty=False), time.time()),
+        )
+
+    def _transaction(self, mutate: Optional[Callable[[Dict], R]]) -> Tuple[Dict, Optional[R]]:
+        seeded = None
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT data, version FROM config_documents WHERE name = ?", (self.name,)
+            ).fetchone()
+            if row is not None:
+                data = get_codec().loads(row[0])
+                self.version = row[1]
+            elif self.seed_path is not None and self.seed_path.exists():
+                seeded = self.seed_path
+                data = get_codec().loads(seeded.read_bytes())
+            else:
+                data = self.default_factory()
+            result = mutate(data) if mutate is not None else None
+            if row is None or mutate is not None:
+                self._write(conn, data)
+            if row is None:
+                # Первая версия документа — ровно то, что прочитал этот процесс
+                self.version = 1
+            conn.execute("COMMIT")
+        if seeded is not None:
+            # Файл переименовывается только после фиксации импорта
+            seeded.rename(seeded.with_name(seeded.name + ".imported"))
+        return data, result
+
+    def load(self) -> Dict:
+        """Загрузить документ (при первом обращении — импортировать JSON)."""
+
+        return self._transaction(None)[0]
+
+    def save(self, data: Dict) -> None:
+        """Заменить документ целиком."""
+
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            self._write(conn, data)
+            conn.execute("COMMIT")
+
+    def update(self, mutate: Callable[[Dict], R]) -> R:
+        """Изменить документ в одной транзакции.
+
+        Args:
+            mutate: Функция, меняющая документ на месте
+
+        Returns:
+            Результат `mutate`
+        """
+
+        return self._transaction(mutate)[1]
+
+    def refresh(self) -> Optional[Dict]:
+        """Документ, если его версия новее загруженной этим процессом.
+
+        Returns:
+            Optional[Dict]: Новые данные или None, если документ не менялся
+        """
+
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT data, version FROM config_documents WHERE name = ? AND version > ?",
+                (self.name, self.version),
+            ).fetchone()
+        if row is None:
+            return None
+        self.version = row[1]
+        return get_codec().loads(row[0])
+
+    async def flush(self) -> bool:
+        """Отложенных записей нет: документ сохраняется сразу."""
+
+        return False
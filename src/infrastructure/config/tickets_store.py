@@ -1,10 +1,11 @@
-"""JSON конфиг тикетов."""
+"""Конфиг тикетов."""
 
 from __future__ import annotations
 
-from typing import Dict
+from typing import Dict, Optional, Union
 
 from infrastructure.config.json_store import JsonStore
+from infrastructure.config.sqlite_store import SqliteDocumentStore
 
 
 def _default_tickets() -> Dict:
@@ -16,13 +17,50 @@ def _default_tickets() -> Dict:
 
 
 class TicketsConfigStore:
-    """Хранилище конфигурации тикетов в JSON."""
+    """Хранилище конфигурации тикетов.
 
-    def __init__(self, path: str = "tickets_config.json") -> None:
-        self._store = JsonStore(path, _default_tickets)
+    С `db_path` конфиг и счетчик тикетов хранятся в таблице `config_documents`
+    и общие для процессов кластера, иначе — в JSON файле.
+    """
+
+    def __init__(
+        self,
+        path: str = "tickets_config.json",
+        debounce: float = 0.0,
+        db_path: Optional[str] = None,
+    ) -> None:
+        self._store: Union[JsonStore, SqliteDocumentStore]
+        if db_path:
+            self._store = SqliteDocumentStore(
+                db_path, "tickets_config", _default_tickets, seed_path=path
+            )
+        else:
+            self._store = JsonStore(path, _default_tickets, debounce)
 
     def load(self) -> Dict:
         return self._store.load()
 
     def save(self, data: Dict) -> None:
         self._store.save(data)
+
+    async def flush(self) -> bool:
+        return await self._store.flush()
+
+    def update(self, changes: Dict) -> None:
+        """Изменить ключи верхнего уровня, не затирая остальные."""
+
+        self._store.update(lambda data: data.update(changes))
+
+    def refresh(self) -> Optional[Dict]:
+        """Конфиг, если его изменил другой процесс кластера."""
+
+        return self._store.refresh()
+
+    def next_ticket_number(self) -> int:
+        """Увеличить счетчик тикетов и вернуть новый номер."""
+
+        def increment(data: Dict) -> int:
+            data["ticket_counter"] = data.get("ticket_counter", 0) + 1
+            return data["ticket_counter"]
+
+        return self._store.update(increment)
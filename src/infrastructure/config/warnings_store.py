@@ -2,9 +2,12 @@
 
 from __future__ import annotations
 
-from typing import Dict
+from pathlib import Path
+from typing import Dict, List, Optional, Union
 
+from infrastructure.config.journal_store import JournaledJsonStore
 from infrastructure.config.json_store import JsonStore
+from infrastructure.config.sqlite_store import SqliteDocumentStore
 
 
 def _default_warnings() -> Dict:
@@ -23,26 +26,86 @@ def _default_warnings_config() -> Dict:
 
 
 class WarningsStore:
-    """Хранилище предупреждений в JSON."""
-
-    def __init__(self, path: str = "warnings.json") -> None:
-        self._store = JsonStore(path, _default_warnings)
+    """Хранилище предупреждений в JSON.
+
+    С `journal=True` изменения отдельных пользователей дописываются в журнал,
+    а не переписывают весь файл.
+    """
+
+    def __init__(
+        self,
+        path: str = "warnings.json",
+        debounce: float = 0.0,
+        journal: bool = False,
+    ) -> None:
+        if journal:
+            self._store = JournaledJsonStore(path, _default_warnings)
+        else:
+            self._store = JsonStore(path, _default_warnings, debounce)
+        self._data: Optional[Dict] = None
+
+    @property
+    def source_paths(self) -> List[Path]:
+        """Файлы, из которых собираются данные (снапшот и журналы)."""
+
+        if isinstance(self._store, JournaledJsonStore):
+            return [self._store.path, self._store.compacting_path, self._store.journal_path]
+        return [self._store.path]
 
     def load(self) -> Dict:
-        return self._store.load()
+        self._data = self._store.load()
+        return self._data
 
     def save(self, data: Dict) -> None:
+        self._data = data
         self._store.save(data)
 
+    def set_user_warnings(self, guild_id: str, user_id: str, warnings: List[Dict]) -> None:
+        """Сохранить предупреждения одного пользователя."""
 
-class WarningsConfigStore:
-    """Хранилище конфигурации предупреждений в JSON."""
+        if isinstance(self._store, JournaledJsonStore):
+            self._store.set([guild_id, user_id], warnings)
+            return
+
+        data = self._data if self._data is not None else self.load()
+        data.setdefault(guild_id, {})[user_id] = warnings
+        self.save(data)
+
+    async def flush(self) -> bool:
+        return await self._store.flush()
 
-    def __init__(self, path: str = "warnings_config.json") -> None:
-        self._store = JsonStore(path, _default_warnings_config)
+
+class WarningsConfigStore:
+    """Хранилище конфигурации предупреждений.
+
+    С `db_path` конфиг хранится в таблице `config_documents` и общий
+    для процессов кластера, иначе — в JSON файле.
+    """
+
+    def __init__(
+        self,
+        path: str = "warnings_config.json",
+        debounce: float = 0.0,
+        db_path: Optional[str] = None,
+    ) -> None:
+        self._store: Union[JsonStore, SqliteDocumentStore]
+        if db_path:
+            self._store = SqliteDocumentStore(
+                db_path, "warnings_config", _default_warnings_config, seed_path=path
+            )
+        else:
+            self._store = JsonStore(path, _default_warnings_config, debounce)
 
     def load(self) -> Dict:
         return self._store.load()
 
     def save(self, data: Dict) -> None:
         self._store.save(data)
+
+    async def flush(self) -> bool:
+        return await self._store.flush()
+
+    def refresh(self) -> Optional[Dict]:
+        """Конфиг, если его изменил другой процесс кластера."""
+
+        return self._store.refresh()
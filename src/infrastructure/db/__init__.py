@@ -1,11 +1,21 @@
 """Инфраструктурные адаптеры БД."""
 
+from infrastructure.db.automod_repository import AutomodCountersRepository
+from infrastructure.db.command_sync_repository import CommandSyncRepository
 from infrastructure.db.levels_repository import LevelsRepository
+from infrastructure.db.log_outbox_repository import LogOutboxRepository
+from infrastructure.db.migrations_repository import DataMigrationsRepository
+from infrastructure.db.settings_repository import GuildSettingsRepository
 from infrastructure.db.tickets_repository import TicketsRepository
 from infrastructure.db.warnings_repository import WarningsRepository
 
 __all__ = [
+    "AutomodCountersRepository",
+    "CommandSyncRepository",
+    "DataMigrationsRepository",
+    "GuildSettingsRepository",
     "LevelsRepository",
+    "LogOutboxRepository",
     "TicketsRepository",
     "WarningsRepository",
 ]
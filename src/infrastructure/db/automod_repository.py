@@ -0,0 +1,39 @@
+"""Репозиторий счетчиков предупреждений автомодерации (SQLite)."""
+
+from __future__ import annotations
+
+from typing import Dict, List, Tuple
+
+from database.db import Database
+
+from application.contracts import AutomodCountersRepositoryContract
+
+
+class AutomodCountersRepository(AutomodCountersRepositoryContract):
+    """Пакетное хранение счетчиков предупреждений с истечением."""
+
+    def __init__(self, db: Database) -> None:
+        self._db = db
+
+    async def load_active(self, now: float) -> List[Dict[str, float]]:
+        return await self._db.fetch_all(
+            "SELECT user_id, guild_id, count, expires_at FROM automod_warnings WHERE expires_at > ?",
+            (now,),
+        )
+
+    async def upsert_many(self, rows: List[Tuple[int, int, int, float]]) -> None:
+        if rows:
+            await self._db.execute_many(
+                "INSERT OR REPLACE INTO automod_warnings (user_id, guild_id, count, expires_at) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+
+    async def delete_many(self, keys: List[Tuple[int, int]]) -> None:
+        if keys:
+            await self._db.execute_many(
+                "DELETE FROM automod_warnings WHERE user_id = ? AND guild_id = ?",
+                keys,
+            )
+
+    async def delete_expired(self, now: float) -> None:
+        await self._db.execute("DELETE FROM automod_warnings WHERE expires_at <= ?", (now,))
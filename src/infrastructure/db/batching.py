@@ -0,0 +1,21 @@
+"""Разбиение больших пакетных вставок на части."""
+
+from __future__ import annotations
+
+from itertools import islice
+from typing import Iterable, Iterator, List, TypeVar
+
+T = TypeVar("T")
+
+# Строк в одной транзакции executemany при импорте данных
+MIGRATION_CHUNK_SIZE = 1000
+
+
+def iter_chunks(rows: Iterable[T], size: int = MIGRATION_CHUNK_SIZE) -> Iterator[List[T]]:
+    """Отдавать строки списками не длиннее `size`, не собирая все строки в память."""
+
+    if size < 1:
+        raise ValueError("Размер части должен быть положительным")
+    iterator = iter(rows)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
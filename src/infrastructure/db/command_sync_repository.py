@@ -0,0 +1,28 @@
+"""Репозиторий хешей синхронизированных slash-команд (SQLite)."""
+
+from __future__ import annotations
+
+from typing import Dict
+
+from database.db import Database
+
+from application.contracts import CommandSyncRepositoryContract
+
+
+class CommandSyncRepository(CommandSyncRepositoryContract):
+    """Последний синхронизированный хеш дерева команд для каждой области."""
+
+    def __init__(self, db: Database) -> None:
+        self._db = db
+
+    async def load_hashes(self) -> Dict[str, str]:
+        rows = await self._db.fetch_all("SELECT scope, hash FROM command_sync_state")
+        return {row["scope"]: row["hash"] for row in rows}
+
+    async def save_hash(self, scope: str, tree_hash: str) -> None:
+        await self._db.execute(
+            "INSERT INTO command_sync_state (scope, hash, synced_at) "
+            "VALUES (?, ?, CURRENT_TIMESTAMP) "
+            "ON CONFLICT(scope) DO UPDATE SET hash = excluded.hash, synced_at = excluded.synced_at",
+            (scope, tree_hash),
+        )
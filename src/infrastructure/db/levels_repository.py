@@ -7,6 +7,7 @@ from typing import Dict, List, Optional
 
 from database.db import Database
 
+from infrastructure.db.batching import MIGRATION_CHUNK_SIZE, iter_chunks
 from application.contracts import LevelsRepositoryContract
 
 
@@ -70,27 +71,27 @@ class LevelsRepository(LevelsRepositoryContract):
             for row in leaderboard_data
         ]
 
-    async def migrate_from_json(self, data: Dict) -> None:
+    async def migrate_from_json(self, data: Dict, chunk_size: int = MIGRATION_CHUNK_SIZE) -> int:
+        """Перенести уровни из JSON частями по `chunk_size` строк.
+
+        Возвращает количество обработанных записей JSON.
+        """
+
         await self.ensure_last_message_time_column()
         current_time = datetime.now().isoformat()
 
-        # Собираем все записи для батчинга
-        batch = []
-        for guild_id, guild_data in data.items():
-            for user_id, user_data in guild_data.items():
-                batch.append(
-                    (
-                        int(user_id),
-                        int(guild_id),
-                        user_data["xp"],
-                        user_data["level"],
-                        current_time,
-                    )
-                )
-
-        # Вставляем все записи одним запросом (игнорируем дубликаты)
-        if batch:
+        rows = (
+            (int(user_id), int(guild_id), user_data["xp"], user_data["level"], current_time)
+            for guild_id, guild_data in data.items()
+            for user_id, user_data in guild_data.items()
+        )
+
+        processed = 0
+        for chunk in iter_chunks(rows, chunk_size):
+            # Уже перенесенные пользователи не перезаписываются
             await self._db.execute_many(
                 "INSERT OR IGNORE INTO levels (user_id, guild_id, xp, level, last_message_time) VALUES (?, ?, ?, ?, ?)",
-                batch,
+                chunk,
             )
+            processed += len(chunk)
+        return processed
@@ -0,0 +1,87 @@
+"""Репозиторий очереди логов (SQLite)."""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Tuple
+
+from database.db import Database
+
+from application.contracts import LogOutboxRepositoryContract
+from infrastructure.db.batching import iter_chunks
+
+# Параметров в одном DELETE ... IN (...) (лимит SQLite — 999)
+DELETE_CHUNK_SIZE = 500
+
+
+class LogOutboxRepository(LogOutboxRepositoryContract):
+    """Пакетная запись, выборка и удаление событий логов."""
+
+    def __init__(self, db: Database) -> None:
+        self._db = db
+
+    async def append_many(self, rows: List[Tuple[int, int, str, str, float, float]]) -> None:
+        if rows:
+            await self._db.execute_many(
+                "INSERT INTO log_outbox "
+                "(owner, channel_id, kind, payload, created_at, next_attempt_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    async def fetch_due(self, owner: int, now: float, limit: int) -> List[Dict]:
+        # Строка канала не выбирается, пока более раннее событие того же канала
+        # ждет повтора: порядок сообщений в канале сохраняется
+        return await self._db.fetch_all(
+            "SELECT id, channel_id, kind, payload, created_at, attempts FROM log_outbox AS queued "
+            "WHERE owner = ? AND next_attempt_at <= ? AND NOT EXISTS ("
+            "SELECT 1 FROM log_outbox AS earlier WHERE earlier.owner = queued.owner "
+            "AND earlier.channel_id = queued.channel_id AND earlier.id < queued.id "
+            "AND earlier.next_attempt_at > ?) "
+            "ORDER BY id LIMIT ?",
+            (owner, now, now, limit),
+        )
+
+    async def delete_many(self, ids: List[int]) -> None:
+        for chunk in iter_chunks(ids, DELETE_CHUNK_SIZE):
+            placeholders = ", ".join("?" * len(chunk))
+            await self._db.execute(
+                f"DELETE FROM log_outbox WHERE id IN ({placeholders})", tuple(chunk)
+            )
+
+    async def reschedule_many(self, rows: List[Tuple[int, float, int]]) -> None:
+        if rows:
+            await self._db.execute_many(
+                "UPDATE log_outbox SET attempts = ?, next_attempt_at = ? WHERE id = ?", rows
+            )
+
+    async def depth_by_channel(self, owner: int) -> Dict[int, int]:
+        rows = await self._db.fetch_all(
+            "SELECT channel_id, COUNT(*) AS depth FROM log_outbox "
+            "WHERE owner = ? GROUP BY channel_id",
+            (owner,),
+        )
+        return {row["channel_id"]: row["depth"] for row in rows}
+
+    async def reclaim(self, owner: int, owners: int) -> int:
+        """Забрать строки процессов с номером `owners` и выше.
+
+        Строки владельца `n` достаются процессу `n % owners`, поэтому
+        каждую строку забирает ровно один из оставшихся процессов.
+        """
+
+        return await self._db.execute(
+            "UPDATE log_outbox SET owner = ? WHERE owner >= ? AND owner % ? = ?",
+            (owner, owners, owners, owner),
+        )
+
+    async def stats(self, owner: int) -> Tuple[int, Optional[float], Optional[float]]:
+        """Глубина очереди, время самого старого события и ближайшей попытки."""
+
+        row = await self._db.fetch_one(
+            "SELECT COUNT(*) AS depth, MIN(created_at) AS oldest, "
+            "MIN(next_attempt_at) AS next_due FROM log_outbox WHERE owner = ?",
+            (owner,),
+        )
+        if not row:
+            return 0, None, None
+        return row["depth"], row["oldest"], row["next_due"]
@@ -0,0 +1,31 @@
+"""Журнал примененных миграций данных (SQLite)."""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from database.db import Database
+
+from application.contracts import DataMigrationsRepositoryContract
+
+
+class DataMigrationsRepository(DataMigrationsRepositoryContract):
+    """Контрольные суммы источников уже перенесенных данных."""
+
+    def __init__(self, db: Database) -> None:
+        self._db = db
+
+    async def get_checksum(self, name: str) -> Optional[str]:
+        row = await self._db.fetch_one(
+            "SELECT checksum FROM data_migrations WHERE name = ?", (name,)
+        )
+        return row["checksum"] if row else None
+
+    async def record(self, name: str, checksum: str, row_count: int) -> None:
+        await self._db.execute(
+            "INSERT INTO data_migrations (name, checksum, row_count, applied_at) "
+            "VALUES (?, ?, ?, CURRENT_TIMESTAMP) "
+            "ON CONFLICT(name) DO UPDATE SET checksum = excluded.checksum, "
+            "row_count = excluded.row_count, applied_at = excluded.applied_at",
+            (name, checksum, row_count),
+        )
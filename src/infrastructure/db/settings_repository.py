@@ -0,0 +1,91 @@
+"""Репозиторий настроек серверов и ролей-наград (SQLite)."""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Tuple
+
+from database.db import Database
+
+from application.contracts import GuildSettingsRepositoryContract
+
+
+# Колонки таблицы settings, которыми управляет сервис настроек
+SETTINGS_COLUMNS = (
+    "welcome_channel_id",
+    "logs_channel_id",
+    "voice_creation_channel_id",
+    "voice_category_id",
+)
+
+
+class GuildSettingsRepository(GuildSettingsRepositoryContract):
+    """Хранение настроек серверов в таблицах settings и role_rewards."""
+
+    def __init__(self, db: Database) -> None:
+        self._db = db
+
+    async def load_settings(self) -> List[Dict[str, Optional[int]]]:
+        return await self._db.fetch_all(
+            f"SELECT guild_id, {', '.join(SETTINGS_COLUMNS)} FROM settings"
+        )
+
+    async def load_role_rewards(self) -> List[Dict[str, int]]:
+        return await self._db.fetch_all("SELECT guild_id, role_id, level FROM role_rewards")
+
+    async def upsert(self, guild_id: int, fields: Dict[str, Optional[int]]) -> None:
+        """Обновить одну строку настроек, не затрагивая остальные колонки."""
+
+        unknown = set(fields) - set(SETTINGS_COLUMNS)
+        if unknown:
+            raise ValueError(f"Неизвестные настройки: {', '.join(sorted(unknown))}")
+        columns = list(fields)
+        placeholders = ", ".join("?" for _ in columns)
+        updates = ", ".join(f"{column} = excluded.{column}" for column in columns)
+        await self._db.execute(
+            f"INSERT INTO settings (guild_id, {', '.join(columns)}) VALUES (?, {placeholders}) "
+            f"ON CONFLICT(guild_id) DO UPDATE SET {updates}",
+            (guild_id, *(fields[column] for column in columns)),
+        )
+
+    async def import_settings(self, rows: List[Tuple[Optional[int], ...]]) -> None:
+        """Пакетно записать строки (guild_id, *SETTINGS_COLUMNS).
+
+        Значения None не затирают уже сохраненные настройки.
+        """
+
+        if rows:
+            updates = ", ".join(
+                f"{column} = COALESCE(excluded.{column}, {column})" for column in SETTINGS_COLUMNS
+            )
+            placeholders = ", ".join("?" for _ in SETTINGS_COLUMNS)
+            await self._db.execute_many(
+                f"INSERT INTO settings (guild_id, {', '.join(SETTINGS_COLUMNS)}) "
+                f"VALUES (?, {placeholders}) ON CONFLICT(guild_id) DO UPDATE SET {updates}",
+                rows,
+            )
+
+    async def set_role_reward(self, guild_id: int, level: int, role_id: int) -> None:
+        # За уровень выдается одна роль, а роль привязана к одному уровню
+        await self._db.execute(
+            "DELETE FROM role_rewards WHERE guild_id = ? AND level = ? AND role_id != ?",
+            (guild_id, level, role_id),
+        )
+        await self._db.execute(
+            "INSERT OR REPLACE INTO role_rewards (guild_id, role_id, level) VALUES (?, ?, ?)",
+            (guild_id, role_id, level),
+        )
+
+    async def delete_role_reward(self, guild_id: int, level: int) -> None:
+        await self._db.execute(
+            "DELETE FROM role_rewards WHERE guild_id = ? AND level = ?",
+            (guild_id, level),
+        )
+
+    async def import_role_rewards(self, rows: List[Tuple[int, int, int]]) -> None:
+        """Пакетно записать строки (guild_id, role_id, level)."""
+
+        if rows:
+            await self._db.execute_many(
+                "INSERT OR REPLACE INTO role_rewards (guild_id, role_id, level) VALUES (?, ?, ?)",
+                rows,
+            )
@@ -7,6 +7,7 @@ from typing import Dict, List, Optional
 
 from database.db import Database
 
+from infrastructure.db.batching import MIGRATION_CHUNK_SIZE, iter_chunks
 from application.contracts import WarningsRepositoryContract
 
 
@@ -59,26 +60,45 @@ class WarningsRepository(WarningsRepositoryContract):
             (cutoff.isoformat(),),
         )
 
-    async def migrate_from_json(self, data: Dict) -> None:
-        # Собираем все записи для батчинга
-        batch = []
-        for guild_id, guild_data in data.items():
-            for user_id, warnings in guild_data.items():
-                for warning in warnings:
-                    batch.append(
-                        (
+    async def migrate_from_json(self, data: Dict, chunk_size: int = MIGRATION_CHUNK_SIZE) -> int:
+        """Перенести предупреждения из JSON частями по `chunk_size` строк.
+
+        Возвращает количество обработанных записей JSON.
+
+        Предупреждение, которое уже есть в таблице (тот же пользователь,
+        сервер, модератор, причина и время), повторно не вставляется.
+        """
+
+        def rows():
+            for guild_id, guild_data in data.items():
+                for user_id, warnings in guild_data.items():
+                    for warning in warnings:
+                        row = (
                             int(user_id),
                             int(guild_id),
                             warning.get("reason", ""),
                             int(warning.get("moderator", 0)),
                             warning.get("timestamp"),
-                            None,
                         )
-                    )
+                        yield (*row, None, *row)
 
-        # Вставляем все записи одним запросом
-        if batch:
+        processed = 0
+        for chunk in iter_chunks(rows(), chunk_size):
             await self._db.execute_many(
-                "INSERT INTO warnings (user_id, guild_id, reason, issued_by, issued_at, expires_at) VALUES (?, ?, ?, ?, ?, ?)",
-                batch,
+                "INSERT INTO warnings "
+                "(user_id, guild_id, reason, issued_by, issued_at, expires_at) "
+                "SELECT ?, ?, ?, ?, ?, ? WHERE NOT EXISTS (SELECT 1 FROM warnings "
+                "WHERE user_id = ? AND guild_id = ? AND reason = ? AND issued_by = ? "
+                "AND issued_at IS ?)",
+                chunk,
             )
+            processed += len(chunk)
+        return processed
+
+    async def delete_duplicates(self) -> int:
+        """Удалить копии предупреждений, вставленные повторными миграциями."""
+
+        return await self._db.execute(
+            "DELETE FROM warnings WHERE id NOT IN (SELECT MIN(id) FROM warnings "
+            "GROUP BY user_id, guild_id, reason, issued_by, issued_at)"
+        )
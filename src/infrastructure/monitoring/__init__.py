@@ -5,7 +5,7 @@ from __future__ import annotations
 import os
 import logging
 
-from utils.monitoring import init_sentry
+from utils.monitoring import configure_guild_labels, init_sentry
 
 logger = logging.getLogger(__name__)
 
@@ -16,4 +16,9 @@ def init_monitoring() -> None:
     dsn = os.getenv("SENTRY_DSN")
     environment = os.getenv("ENVIRONMENT", "production")
     init_sentry(dsn, environment)
+    allowlist = os.getenv("METRICS_GUILD_ALLOWLIST", "")
+    configure_guild_labels(
+        int(os.getenv("METRICS_GUILD_TOP_K", "20")),
+        [guild_id.strip() for guild_id in allowlist.split(",") if guild_id.strip()],
+    )
     logger.info("Мониторинг инициализирован")
@@ -0,0 +1,24 @@
+"""Фоновые воркеры для изоляции тяжелых вычислений."""
+
+from infrastructure.workers.durable_log_outbox import DurableLogOutbox
+from infrastructure.workers.guild_dispatcher import GuildDispatcher
+from infrastructure.workers.log_outbox import LogOutbox, send_embeds
+from infrastructure.workers.log_webhooks import WebhookSink
+from infrastructure.workers.regex_pool import (
+    RegexTimeoutError,
+    RegexWorkerPool,
+    RuleStats,
+    is_heavy_pattern,
+)
+
+__all__ = [
+    "DurableLogOutbox",
+    "GuildDispatcher",
+    "LogOutbox",
+    "RegexTimeoutError",
+    "RegexWorkerPool",
+    "RuleStats",
+    "WebhookSink",
+    "is_heavy_pattern",
+    "send_embeds",
+]
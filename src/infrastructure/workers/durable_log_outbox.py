@@ -0,0 +1,363 @@
+"""Очередь логов в SQLite: события переживают перезапуск и недоступность Discord."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import random
+import time
+from collections import Counter, defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+import discord
+
+from application.contracts import LogOutboxRepositoryContract
+from infrastructure.workers.log_outbox import (
+    HIGH,
+    LOW,
+    Send,
+    batch_size,
+    dropped_summary,
+    send_embeds,
+)
+from utils.monitoring import (
+    capture_error,
+    observe_log_batch,
+    observe_log_delivery,
+    track_log_dropped,
+    track_log_retry,
+    update_log_backlog,
+    update_log_outbox_lag,
+)
+
+logger = logging.getLogger(__name__)
+
+Resolve = Callable[[int], Any]
+
+# Сетевые ошибки, после которых отправку стоит повторить
+TRANSIENT_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError, OSError)
+
+
+def is_retryable(error: Exception) -> bool:
+    """Стоит ли повторять отправку: сетевые сбои, 429 и ответы 5xx.
+
+    Остальные ответы 4xx (например, 400 на слишком большой embed) при
+    повторе не изменятся.
+    """
+
+    if isinstance(error, discord.HTTPException):
+        return error.status == 429 or error.status >= 500
+    return isinstance(error, TRANSIENT_ERRORS)
+
+
+class DurableLogOutbox:
+    """Очередь логов в таблице `log_outbox` с отправкой отдельной задачей.
+
+    `submit` только добавляет событие в буфер, раз в `window` секунд буфер
+    записывается в БД одной пакетной вставкой. Задача отправки забирает
+    готовые строки, объединяет события канала в сообщения до 10 embed и
+    отправляет каналы параллельно, а сообщения одного канала — по порядку;
+    ожидание лимитов Discord остается на HTTP клиенте. Отправленные строки
+    удаляются одним запросом на проход.
+
+    Сетевые ошибки, 429 и ответы 5xx повторяются с экспоненциальной задержкой
+    до `max_attempts` раз. Без доступа к каналу (403, 404) или после его
+    удаления события отбрасываются сразу, как и пачка, отклоненная другим
+    ответом 4xx. Неотправленные события остаются в БД и отправляются после
+    перезапуска; в кластере каждый процесс отправляет только свои строки
+    (`owner`). Если процессов стало меньше (`owners`), при запуске процесс
+    забирает строки отключенных процессов с тем же остатком `owner % owners`.
+
+    Ограничения очереди канала (`shed_threshold`, `max_backlog`) те же,
+    что у `LogOutbox`, и считаются вместе со строками в БД.
+    """
+
+    def __init__(
+        self,
+        repository: LogOutboxRepositoryContract,
+        owner: int = 0,
+        owners: Optional[int] = None,
+        window: float = 1.0,
+        shed_threshold: int = 50,
+        max_backlog: int = 500,
+        fetch_limit: int = 200,
+        max_attempts: int = 8,
+        base_backoff: float = 2.0,
+        max_backoff: float = 300.0,
+        idle_poll: float = 30.0,
+        send: Send = send_embeds,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._repository = repository
+        self.owner = owner
+        self.owners = owners
+        self.window = window
+        self.shed_threshold = shed_threshold
+        self.max_backlog = max(max_backlog, shed_threshold)
+        self.fetch_limit = fetch_limit
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.idle_poll = idle_poll
+        self._send = send
+        self._clock = clock
+        self._pending: List[Tuple[int, int, str, str, float, float]] = []
+        # Событий канала в буфере и в БД
+        self._depth: Counter = Counter()
+        self._dropped: Dict[int, Counter] = defaultdict(Counter)
+        self._has_pending = asyncio.Event()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._resolve: Optional[Resolve] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._drainer: Optional[asyncio.Task] = None
+
+    @property
+    def backlog(self) -> int:
+        """Количество событий, ожидающих отправки во всех каналах."""
+        return sum(self._depth.values())
+
+    async def start(
+        self, resolve: Resolve, ready: Optional[Callable[[], Awaitable[Any]]] = None
+    ) -> int:
+        """Запустить запись и отправку.
+
+        Args:
+            resolve: Канал по ID (None — канал удален или недоступен)
+            ready: Ожидание готовности кэша каналов перед первой отправкой
+
+        Returns:
+            int: Количество событий, оставшихся с прошлого запуска
+        """
+
+        if self._drainer is not None:
+            return 0
+        if self.owners:
+            reclaimed = await self._repository.reclaim(self.owner, self.owners)
+            if reclaimed:
+                logger.info(f"Забрано событий логов отключенных процессов: {reclaimed}")
+        restored = await self._repository.depth_by_channel(self.owner)
+        self._depth.update(restored)
+        update_log_backlog(self.backlog)
+        self._resolve = resolve
+        self._writer = asyncio.create_task(self._write_loop(), name="log-outbox-writer")
+        self._drainer = asyncio.create_task(self._drain_loop(ready), name="log-outbox-drainer")
+        return sum(restored.values())
+
+    def submit(self, channel: Any, embed: discord.Embed, kind: str, priority: str = HIGH) -> bool:
+        """Добавить событие в буфер записи без ожидания БД.
+
+        Returns:
+            bool: False, если событие отброшено из-за переполнения очереди
+        """
+
+        depth = self._depth[channel.id]
+        if depth >= self.max_backlog or (priority == LOW and depth >= self.shed_threshold):
+            self._dropped[channel.id][kind] += 1
+            track_log_dropped(kind)
+            return False
+
+        now = self._clock()
+        payload = json.dumps(embed.to_dict(), ensure_ascii=False)
+        self._pending.append((self.owner, channel.id, kind, payload, now, now))
+        self._depth[channel.id] += 1
+        update_log_backlog(self.backlog)
+        self._has_pending.set()
+        return True
+
+    async def _flush(self) -> int:
+        """Записать буфер в БД; при ошибке строки остаются в буфере."""
+
+        if not self._pending:
+            return 0
+        rows, self._pending = self._pending, []
+        self._has_pending.clear()
+        try:
+            await self._repository.append_many(rows)
+        except Exception as e:
+            logger.error(f"Не удалось записать логи в очередь БД: {e}")
+            self._pending = rows + self._pending
+            self._has_pending.set()
+            return 0
+        self._wakeup.set()
+        return len(rows)
+
+    async def _write_loop(self) -> None:
+        while True:
+            await self._has_pending.wait()
+            # Окно собирает всплеск событий в одну вставку
+            await asyncio.sleep(self.window)
+            await self._flush()
+
+    async def _drain_loop(self, ready: Optional[Callable[[], Awaitable[Any]]]) -> None:
+        if ready is not None:
+            await ready()
+        while True:
+            self._wakeup.clear()
+            next_due = None
+            try:
+                rows = await self._repository.fetch_due(self.owner, self._clock(), self.fetch_limit)
+                if rows:
+                    await self._deliver(rows)
+                    continue
+                next_due = await self._report()
+            except Exception as e:
+                logger.error(f"Ошибка отправки очереди логов: {e}", exc_info=True)
+                capture_error(e, {"event": "log_outbox_drain"})
+            if self._stopping:
+                return
+            timeout = self.idle_poll
+            if next_due is not None:
+                timeout = min(max(next_due - self._clock(), 0.0), self.idle_poll)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _report(self) -> Optional[float]:
+        """Обновить метрику задержки; возвращает время ближайшей попытки."""
+
+        _, oldest, next_due = await self._repository.stats(self.owner)
+        update_log_outbox_lag(self._clock() - oldest if oldest is not None else 0.0)
+        return next_due
+
+    async def _deliver(self, rows: List[Dict]) -> None:
+        by_channel: Dict[int, List[Dict]] = defaultdict(list)
+        for row in rows:
+            by_channel[row["channel_id"]].append(row)
+        results = await asyncio.gather(
+            *(self._deliver_channel(channel_id, items) for channel_id, items in by_channel.items())
+        )
+
+        done = [row for finished, _ in results for row in finished]
+        retries = [retry for _, channel_retries in results for retry in channel_retries]
+        if done:
+            await self._repository.delete_many([row["id"] for row in done])
+            for row in done:
+                self._forget(row["channel_id"])
+            update_log_backlog(self.backlog)
+        await self._repository.reschedule_many(retries)
+        await self._report()
+
+    def _forget(self, channel_id: int) -> None:
+        self._depth[channel_id] -= 1
+        if self._depth[channel_id] <= 0:
+            del self._depth[channel_id]
+
+    async def _deliver_channel(
+        self, channel_id: int, rows: List[Dict]
+    ) -> Tuple[List[Dict], List[Tuple[int, float, int]]]:
+        """Отправить события канала по порядку.
+
+        Returns:
+            Tuple: Строки для удаления (отправленные и отброшенные) и
+            новые попытки `(attempts, next_attempt_at, id)`
+        """
+
+        channel = self._resolve(channel_id) if self._resolve else None
+        if channel is None:
+            logger.warning(f"Канал логов {channel_id} недоступен, отброшено событий: {len(rows)}")
+            return self._drop(rows), []
+
+        embeds = [discord.Embed.from_dict(json.loads(row["payload"])) for row in rows]
+        done: List[Dict] = []
+        start = 0
+        while start < len(rows):
+            # Счетчик отброшенных событий очищается только после отправки
+            # сводки: при ошибке она уйдет со следующим сообщением
+            dropped = self._dropped.get(channel_id)
+            reported = Counter(dropped) if dropped else None
+            summary = dropped_summary(reported) if reported else None
+            count = batch_size(embeds[start:], summary)
+            if count == 0:
+                # Сводка не помещается рядом с первым событием
+                summary = reported = None
+                count = batch_size(embeds[start:])
+            batch = rows[start : start + count]
+            message = embeds[start : start + count]
+            if summary is not None:
+                message.append(summary)
+            try:
+                await self._send(channel, message)
+            except (discord.Forbidden, discord.NotFound) as e:
+                logger.warning(f"Нет доступа к каналу логов {channel_id}: {e}")
+                return done + self._drop(rows[start:]), []
+            except (discord.HTTPException, *TRANSIENT_ERRORS) as e:
+                if is_retryable(e):
+                    logger.warning(f"Не удалось отправить логи в канал {channel_id}, повтор: {e}")
+                    return self._retry(done, rows[start:])
+                logger.warning(f"Discord отклонил логи для канала {channel_id}: {e}")
+                done.extend(self._drop(batch))
+                start += count
+                continue
+            except Exception as e:
+                logger.error(f"Ошибка отправки логов в канал {channel_id}: {e}", exc_info=True)
+                capture_error(e, {"event": "log_outbox", "channel": channel_id})
+                return self._retry(done, rows[start:])
+
+            sent_at = self._clock()
+            for row in batch:
+                observe_log_delivery(sent_at - row["created_at"])
+            observe_log_batch(len(message))
+            if reported:
+                dropped -= reported
+                if not dropped:
+                    del self._dropped[channel_id]
+            done.extend(batch)
+            start += count
+        return done, []
+
+    def _drop(self, rows: List[Dict]) -> List[Dict]:
+        for row in rows:
+            track_log_dropped(row["kind"])
+        return rows
+
+    def _retry(
+        self, done: List[Dict], rows: List[Dict]
+    ) -> Tuple[List[Dict], List[Tuple[int, float, int]]]:
+        kept = []
+        for row in rows:
+            attempts = row["attempts"] + 1
+            if attempts >= self.max_attempts:
+                done.extend(self._drop([row]))
+                continue
+            track_log_retry(row["kind"])
+            kept.append((attempts, row["id"]))
+        if not kept:
+            return done, []
+        # Одно время повтора на все строки канала, иначе разброс задержки
+        # перемешает их порядок
+        due = self._clock() + self._backoff(max(attempts for attempts, _ in kept))
+        return done, [(attempts, due, row_id) for attempts, row_id in kept]
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.base_backoff * 2 ** (attempts - 1), self.max_backoff)
+        # Разброс, чтобы каналы после общего сбоя не повторяли отправку одновременно
+        return delay * random.uniform(0.8, 1.2)
+
+    async def close(self, timeout: float = 5.0) -> int:
+        """Записать буфер в БД и отправить готовые события за `timeout`.
+
+        Неотправленные события остаются в БД до следующего запуска.
+
+        Returns:
+            int: Количество событий, которые не удалось записать в БД
+        """
+
+        if self._writer is not None:
+            self._writer.cancel()
+            await asyncio.gather(self._writer, return_exceptions=True)
+            self._writer = None
+        await self._flush()
+
+        if self._drainer is not None:
+            self._stopping = True
+            self._wakeup.set()
+            _, pending = await asyncio.wait([self._drainer], timeout=timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(self._drainer, return_exceptions=True)
+            self._drainer = None
+        return len(self._pending)
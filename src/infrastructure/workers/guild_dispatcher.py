@@ -0,0 +1,157 @@
+"""Шардированные по серверам очереди обработки событий."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+from utils.monitoring import (
+    capture_error,
+    observe_dispatch_wait,
+    track_dispatch_drop,
+    update_dispatch_queue_depth,
+)
+
+logger = logging.getLogger(__name__)
+
+Job = Callable[[], Awaitable[Any]]
+
+_MASK64 = (1 << 64) - 1
+
+
+def _mix(value: int) -> int:
+    """Перемешать биты ID (финализатор splitmix64).
+
+    Формула шардов Discord `(id >> 22) % shard_count` уже отобрала серверы
+    процесса, поэтому тот же остаток для воркеров свел бы их на один-два
+    воркера. Хеш от полного ID не зависит от распределения шардов.
+    """
+
+    value = (value ^ (value >> 30)) * 0xBF58476D1CE4E5B9 & _MASK64
+    value = (value ^ (value >> 27)) * 0x94D049BB133111EB & _MASK64
+    return value ^ (value >> 31)
+
+
+class GuildDispatcher:
+    """N воркеров с ограниченными очередями, сервер закреплен за одним воркером.
+
+    События одного сервера попадают в одну очередь и выполняются по порядку,
+    поэтому всплеск на одном сервере (рейд с чистками и предупреждениями)
+    задерживает только серверы своего воркера. В полную очередь событие не
+    ставится и сбрасывается, а низкоприоритетная работа сбрасывается раньше —
+    когда очередь заполнена на `shed_ratio`.
+    """
+
+    def __init__(self, workers: int = 4, queue_size: int = 100, shed_ratio: float = 0.5) -> None:
+        if workers < 1 or queue_size < 1:
+            raise ValueError("Нужен хотя бы один воркер и место в очереди")
+        self.workers = workers
+        self.queue_size = queue_size
+        self.shed_threshold = max(int(queue_size * shed_ratio), 1)
+        self._queues: List[asyncio.Queue] = []
+        self._tasks: List[asyncio.Task] = []
+
+    def worker_for(self, guild_id: Optional[int]) -> int:
+        """Номер воркера для сервера (личные сообщения — воркер 0)."""
+
+        if guild_id is None:
+            return 0
+        return _mix(guild_id) % self.workers
+
+    def depth(self, guild_id: Optional[int]) -> int:
+        """Количество событий в очереди воркера сервера."""
+
+        if not self._queues:
+            return 0
+        return self._queues[self.worker_for(guild_id)].qsize()
+
+    def admit(self, guild_id: Optional[int], kind: str) -> bool:
+        """Решить, выполнять ли низкоприоритетную работу.
+
+        Args:
+            guild_id: ID сервера
+            kind: Тип работы для метрики сброса
+
+        Returns:
+            bool: False, если очередь воркера перегружена и работа сброшена
+        """
+
+        if self.depth(guild_id) < self.shed_threshold:
+            return True
+        track_dispatch_drop(str(self.worker_for(guild_id)), kind)
+        return False
+
+    def submit(self, guild_id: Optional[int], job: Job, kind: str = "message") -> bool:
+        """Поставить задачу в очередь сервера без ожидания.
+
+        Каждое событие discord.py и так выполняется отдельной задачей, поэтому
+        ожидание места в очереди только копило бы ждущие задачи в памяти.
+
+        Args:
+            guild_id: ID сервера
+            job: Задача
+            kind: Тип работы для метрики сброса
+
+        Returns:
+            bool: False, если очередь воркера заполнена и задача сброшена
+        """
+
+        self._ensure_started()
+        index = self.worker_for(guild_id)
+        queue = self._queues[index]
+        try:
+            queue.put_nowait((time.perf_counter(), job))
+        except asyncio.QueueFull:
+            track_dispatch_drop(str(index), kind)
+            return False
+        update_dispatch_queue_depth(str(index), queue.qsize())
+        return True
+
+    def _ensure_started(self) -> None:
+        if self._tasks:
+            return
+        self._queues = [asyncio.Queue(maxsize=self.queue_size) for _ in range(self.workers)]
+        self._tasks = [
+            asyncio.create_task(self._run(index, queue), name=f"guild-dispatcher-{index}")
+            for index, queue in enumerate(self._queues)
+        ]
+
+    async def _run(self, index: int, queue: asyncio.Queue) -> None:
+        worker = str(index)
+        while True:
+            enqueued, job = await queue.get()
+            update_dispatch_queue_depth(worker, queue.qsize())
+            observe_dispatch_wait(worker, time.perf_counter() - enqueued)
+            try:
+                await job()
+            except Exception as e:
+                logger.error(f"Ошибка в воркере событий {worker}: {e}", exc_info=True)
+                capture_error(e, {"event": "dispatch", "worker": worker})
+            finally:
+                queue.task_done()
+
+    async def close(self, timeout: float = 5.0) -> int:
+        """Дождаться выполнения очередей и остановить воркеры.
+
+        Returns:
+            int: Количество задач, не выполненных за `timeout`
+        """
+
+        if not self._tasks:
+            return 0
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(queue.join() for queue in self._queues)), timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Очереди событий не опустели до остановки")
+        pending = sum(queue.qsize() for queue in self._queues)
+        tasks: Tuple[asyncio.Task, ...] = tuple(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._queues = []
+        return pending
@@ -0,0 +1,225 @@
+"""Очередь отправки логов по каналам с объединением embed в одно сообщение."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+import discord
+
+from utils.monitoring import (
+    capture_error,
+    observe_log_batch,
+    observe_log_delivery,
+    observe_log_sink_send,
+    track_log_dropped,
+    update_log_backlog,
+)
+
+logger = logging.getLogger(__name__)
+
+# Приоритеты событий: низкоприоритетные сбрасываются при большой очереди
+HIGH = "high"
+LOW = "low"
+
+# Ограничения Discord на одно сообщение
+MAX_EMBEDS = 10
+MAX_EMBED_CHARS = 6000
+
+Send = Callable[[Any, List[discord.Embed]], Awaitable[Any]]
+
+
+async def send_embeds(channel: Any, embeds: List[discord.Embed]) -> None:
+    started = time.perf_counter()
+    await channel.send(embeds=embeds)
+    observe_log_sink_send("channel", len(embeds), time.perf_counter() - started)
+
+
+def batch_size(
+    embeds: Iterable[discord.Embed], summary: Optional[discord.Embed] = None
+) -> int:
+    """Сколько первых embed помещается в одно сообщение.
+
+    Без `summary` в сообщение всегда попадает хотя бы один embed. Со сводкой
+    под нее резервируются место и размер; если рядом со сводкой не помещается
+    даже первый embed, возвращается 0.
+    """
+
+    slots = MAX_EMBEDS
+    budget = MAX_EMBED_CHARS
+    if summary is not None:
+        slots -= 1
+        budget -= len(summary)
+    count = 0
+    chars = 0
+    for embed in embeds:
+        size = len(embed)
+        if count >= slots or ((count or summary is not None) and chars + size > budget):
+            break
+        count += 1
+        chars += size
+    return count
+
+
+def dropped_summary(dropped: Counter) -> discord.Embed:
+    """Сводка отброшенных событий по типам.
+
+    Счетчик не очищается: отправитель вычитает из него показанные события
+    только после успешной отправки.
+    """
+
+    total = sum(dropped.values())
+    kinds = ", ".join(f"{kind}: {count}" for kind, count in dropped.most_common())
+    return discord.Embed(
+        title="⚠️ Часть событий не записана",
+        description=f"Слишком много событий за короткое время, пропущено {total} ({kinds})",
+        color=discord.Color.orange(),
+    )
+
+
+@dataclass
+class _ChannelQueue:
+    channel: Any
+    entries: Deque["_Entry"] = field(default_factory=deque)
+    dropped: Counter = field(default_factory=Counter)
+    task: "asyncio.Task | None" = None
+
+
+@dataclass(frozen=True)
+class _Entry:
+    embed: discord.Embed
+    kind: str
+    enqueued: float
+
+
+class LogOutbox:
+    """Очереди логов по каналам с отправкой вне обработчиков событий.
+
+    Первое событие в пустой очереди канала ждет `window` секунд, чтобы
+    собрать всплеск (правки, перемещения по голосовым каналам) в одно
+    сообщение до 10 embed. Пока очередь канала не пуста, следующие пачки
+    отправляются сразу, а ожидание лимитов Discord остается на HTTP клиенте.
+
+    При очереди канала длиннее `shed_threshold` низкоприоритетные события
+    отбрасываются и попадают в сводку «пропущено N событий» в следующем
+    сообщении; выше `max_backlog` отбрасываются любые события.
+    """
+
+    def __init__(
+        self,
+        window: float = 1.0,
+        shed_threshold: int = 50,
+        max_backlog: int = 500,
+        send: Send = send_embeds,
+    ) -> None:
+        self.window = window
+        self.shed_threshold = shed_threshold
+        self.max_backlog = max(max_backlog, shed_threshold)
+        self._send = send
+        self._queues: Dict[int, _ChannelQueue] = {}
+        self._backlog = 0
+        self._flush_now = asyncio.Event()
+
+    @property
+    def backlog(self) -> int:
+        """Количество событий, ожидающих отправки во всех каналах."""
+        return self._backlog
+
+    def submit(self, channel: Any, embed: discord.Embed, kind: str, priority: str = HIGH) -> bool:
+        """Поставить embed в очередь канала без ожидания отправки.
+
+        Returns:
+            bool: False, если событие отброшено из-за переполнения очереди
+        """
+
+        queue = self._queues.get(channel.id)
+        if queue is None:
+            queue = self._queues[channel.id] = _ChannelQueue(channel)
+        queue.channel = channel
+
+        depth = len(queue.entries)
+        if depth >= self.max_backlog or (priority == LOW and depth >= self.shed_threshold):
+            queue.dropped[kind] += 1
+            track_log_dropped(kind)
+            return False
+
+        queue.entries.append(_Entry(embed, kind, time.perf_counter()))
+        self._backlog += 1
+        update_log_backlog(self._backlog)
+        if queue.task is None:
+            queue.task = asyncio.create_task(self._run(channel.id, queue), name="log-outbox")
+        return True
+
+    async def start(self, resolve: Any = None, ready: Any = None) -> int:
+        """Очередь в памяти готова сразу, восстанавливать нечего."""
+        return 0
+
+    def _next_batch(self, queue: _ChannelQueue) -> Tuple[List[_Entry], Optional[Counter]]:
+        """Следующая пачка событий и отброшенные события для сводки при ней."""
+
+        reported = Counter(queue.dropped) if queue.dropped else None
+        summary = dropped_summary(reported) if reported else None
+        count = batch_size((entry.embed for entry in queue.entries), summary)
+        if count == 0 and queue.entries:
+            # Сводка не помещается рядом с большим embed и уйдет следующим сообщением
+            reported = None
+            count = batch_size(entry.embed for entry in queue.entries)
+        return [queue.entries.popleft() for _ in range(count)], reported
+
+    async def _run(self, channel_id: int, queue: _ChannelQueue) -> None:
+        try:
+            try:
+                await asyncio.wait_for(self._flush_now.wait(), self.window)
+            except asyncio.TimeoutError:
+                pass
+            while queue.entries or queue.dropped:
+                batch, reported = self._next_batch(queue)
+                embeds = [entry.embed for entry in batch]
+                if reported:
+                    embeds.append(dropped_summary(reported))
+                try:
+                    await self._send(queue.channel, embeds)
+                    if reported:
+                        # События, отброшенные во время отправки, войдут в следующую сводку
+                        queue.dropped -= reported
+                except discord.HTTPException as e:
+                    logger.warning(f"Не удалось отправить логи в канал {channel_id}: {e}")
+                    if not batch:
+                        # Сводку без событий повторит следующая пачка канала
+                        break
+                except Exception as e:
+                    logger.error(f"Ошибка отправки логов в канал {channel_id}: {e}", exc_info=True)
+                    capture_error(e, {"event": "log_outbox", "channel": channel_id})
+                    if not batch:
+                        break
+                finally:
+                    sent_at = time.perf_counter()
+                    for entry in batch:
+                        observe_log_delivery(sent_at - entry.enqueued)
+                    observe_log_batch(len(embeds))
+                    self._backlog -= len(batch)
+                    update_log_backlog(self._backlog)
+        finally:
+            queue.task = None
+            if not queue.entries and not queue.dropped and self._queues.get(channel_id) is queue:
+                del self._queues[channel_id]
+
+    async def close(self, timeout: float = 5.0) -> int:
+        """Отправить накопленные логи без ожидания окна объединения.
+
+        Returns:
+            int: Количество событий, не отправленных за `timeout`
+        """
+
+        self._flush_now.set()
+        tasks = [queue.task for queue in self._queues.values() if queue.task is not None]
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        return self._backlog
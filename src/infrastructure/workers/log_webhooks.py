@@ -0,0 +1,97 @@
+"""Отправка логов через webhook канала вместо маршрута сообщений бота."""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import discord
+
+from infrastructure.workers.log_outbox import send_embeds
+from utils.monitoring import observe_log_sink_send
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookSink:
+    """Отправка пачек embed через webhook канала логов.
+
+    Webhook имеет собственный лимит запросов, поэтому поток логов не
+    расходует лимит `channel.send`, которым бот отвечает пользователям.
+    Для каждого канала используется webhook, созданный ботом (найденный
+    среди webhook канала или созданный при первой отправке), и он
+    кэшируется в памяти.
+
+    Без права Manage Webhooks, в каналах без webhook (ветки) или после
+    удаления webhook логи отправляются в канал обычным сообщением; новая
+    попытка получить webhook — не раньше чем через `retry_after` секунд.
+    """
+
+    def __init__(
+        self,
+        name: str = "Логи",
+        retry_after: float = 600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.retry_after = retry_after
+        self._clock = clock
+        self._webhooks: Dict[int, discord.Webhook] = {}
+        # Каналы, где webhook недоступен: channel_id -> время следующей попытки
+        self._unavailable: Dict[int, float] = {}
+
+    async def __call__(self, channel: Any, embeds: List[discord.Embed]) -> None:
+        webhook = await self._webhook(channel)
+        if webhook is not None:
+            me = channel.guild.me
+            started = time.perf_counter()
+            try:
+                await webhook.send(
+                    embeds=embeds,
+                    username=me.display_name,
+                    avatar_url=me.display_avatar.url,
+                )
+            except discord.NotFound:
+                logger.info(f"Webhook логов канала {channel.id} удален, отправка в канал")
+                self.forget(channel.id)
+            else:
+                observe_log_sink_send("webhook", len(embeds), time.perf_counter() - started)
+                return
+        await send_embeds(channel, embeds)
+
+    def forget(self, channel_id: int) -> None:
+        """Забыть webhook канала, чтобы получить его заново при следующей отправке."""
+
+        self._webhooks.pop(channel_id, None)
+
+    async def _webhook(self, channel: Any) -> Optional[discord.Webhook]:
+        webhook = self._webhooks.get(channel.id)
+        if webhook is not None:
+            return webhook
+        if self._unavailable.get(channel.id, 0.0) > self._clock():
+            return None
+
+        webhook = await self._provision(channel)
+        if webhook is None:
+            self._unavailable[channel.id] = self._clock() + self.retry_after
+            return None
+        self._unavailable.pop(channel.id, None)
+        self._webhooks[channel.id] = webhook
+        return webhook
+
+    async def _provision(self, channel: Any) -> Optional[discord.Webhook]:
+        if not hasattr(channel, "create_webhook"):
+            return None
+        me = channel.guild.me
+        if not channel.permissions_for(me).manage_webhooks:
+            return None
+        try:
+            for webhook in await channel.webhooks():
+                # Токен есть только у webhook, созданных этим ботом
+                if webhook.user is not None and webhook.user.id == me.id and webhook.token:
+                    return webhook
+            return await channel.create_webhook(name=self.name, reason="Канал логов бота")
+        except discord.HTTPException as e:
+            logger.warning(f"Не удалось получить webhook канала логов {channel.id}: {e}")
+            return None
@@ -0,0 +1,195 @@
+"""Изолированный пул процессов для тяжелых regex-правил автомодерации."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from utils.monitoring import track_automod_rule
+
+logger = logging.getLogger(__name__)
+
+# Квантифицированная группа, обратная ссылка или lookaround —
+# конструкции, на которых возможен катастрофический бэктрекинг
+_HEAVY_TOKENS = re.compile(r"\)[*+?{]|\\[1-9]|\(\?P=|\(\?<?[=!]")
+_MAX_INLINE_LENGTH = 200
+
+
+def is_heavy_pattern(pattern: str) -> bool:
+    """Определить, нужно ли выполнять паттерн в изолированном процессе."""
+
+    return len(pattern) > _MAX_INLINE_LENGTH or bool(_HEAVY_TOKENS.search(pattern))
+
+
+def _worker_main(conn) -> None:
+    """Цикл воркера: принимает (pattern, text), отвечает (matched, cpu, error)."""
+
+    compiled: Dict[str, re.Pattern] = {}
+    conn.send("ready")
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            return
+        if request is None:
+            return
+
+        pattern, text = request
+        started = time.process_time()
+        try:
+            regex = compiled.get(pattern)
+            if regex is None:
+                regex = compiled[pattern] = re.compile(pattern, re.IGNORECASE)
+            matched = regex.search(text) is not None
+            conn.send((matched, time.process_time() - started, None))
+        except re.error as e:
+            conn.send((False, time.process_time() - started, str(e)))
+
+
+class RegexTimeoutError(Exception):
+    """Вычисление regex-правила превысило лимит времени."""
+
+
+@dataclass
+class RuleStats:
+    """Статистика выполнения одного правила."""
+
+    evaluations: int = 0
+    cpu_time: float = 0.0
+    timeouts: int = 0
+    consecutive_timeouts: int = 0
+
+
+class _Worker:
+    def __init__(self, process, conn) -> None:
+        self.process = process
+        self.conn = conn
+
+    def kill(self) -> None:
+        try:
+            self.conn.close()
+        finally:
+            if self.process.is_alive():
+                self.process.kill()
+            self.process.join(timeout=1)
+
+
+class RegexWorkerPool:
+    """Пул процессов с таймаутом на каждое вычисление.
+
+    Воркеры запускаются лениво при первом тяжелом правиле. Воркер, превысивший
+    таймаут, убивается и пересоздается при следующем обращении, поэтому
+    зависший паттерн не блокирует ни event loop, ни остальные правила.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        timeout: float = 0.5,
+        startup_timeout: float = 30.0,
+    ) -> None:
+        self.size = size
+        self.timeout = timeout
+        self.startup_timeout = startup_timeout
+        self.stats: Dict[str, RuleStats] = {}
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: Optional[asyncio.Queue] = None
+
+    def _ensure_queue(self) -> asyncio.Queue:
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            for _ in range(self.size):
+                self._idle.put_nowait(None)
+        return self._idle
+
+    def _spawn(self) -> _Worker:
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        process.start()
+        child_conn.close()
+        if not parent_conn.poll(self.startup_timeout) or parent_conn.recv() != "ready":
+            worker = _Worker(process, parent_conn)
+            worker.kill()
+            raise RuntimeError("Воркер regex-правил не запустился")
+        return _Worker(process, parent_conn)
+
+    def record(self, rule_id: str, cpu_time: float, timed_out: bool = False) -> RuleStats:
+        """Учесть выполнение правила (в том числе инлайн-правила)."""
+
+        stats = self.stats.setdefault(rule_id, RuleStats())
+        stats.evaluations += 1
+        stats.cpu_time += cpu_time
+        if timed_out:
+            stats.timeouts += 1
+            stats.consecutive_timeouts += 1
+        else:
+            stats.consecutive_timeouts = 0
+        track_automod_rule(rule_id, cpu_time, timed_out)
+        return stats
+
+    async def search(self, rule_id: str, pattern: str, text: str) -> bool:
+        """Выполнить поиск паттерна в отдельном процессе.
+
+        Raises:
+            RegexTimeoutError: Если вычисление не уложилось в таймаут
+        """
+
+        loop = asyncio.get_running_loop()
+        idle = self._ensure_queue()
+        worker = await idle.get()
+        try:
+            if worker is None or not worker.process.is_alive():
+                worker = await loop.run_in_executor(None, self._spawn)
+
+            worker.conn.send((pattern, text))
+            ready = await loop.run_in_executor(None, worker.conn.poll, self.timeout)
+            if not ready:
+                # join убитого процесса может занять до секунды — не в event loop
+                await loop.run_in_executor(None, worker.kill)
+                worker = None
+                self.record(rule_id, self.timeout, timed_out=True)
+                raise RegexTimeoutError(f"Правило {rule_id} превысило {self.timeout} с")
+
+            matched, cpu_time, error = worker.conn.recv()
+        except (EOFError, OSError, BrokenPipeError) as e:
+            if worker is not None:
+                await loop.run_in_executor(None, worker.kill)
+            worker = None
+            logger.error(f"Воркер regex-правил завершился аварийно: {e}")
+            return False
+        finally:
+            idle.put_nowait(worker)
+
+        self.record(rule_id, cpu_time)
+        if error:
+            logger.warning(f"Ошибка компиляции правила {rule_id}: {error}")
+        return matched
+
+    def get_stats(self) -> Dict[str, Tuple[int, float, int]]:
+        """Снимок статистики: rule_id -> (вычисления, CPU секунд, таймауты)."""
+
+        return {
+            rule_id: (stats.evaluations, stats.cpu_time, stats.timeouts)
+            for rule_id, stats in self.stats.items()
+        }
+
+    def close(self) -> None:
+        """Остановить все воркеры."""
+
+        if self._idle is None:
+            return
+        while not self._idle.empty():
+            worker = self._idle.get_nowait()
+            if worker is None:
+                continue
+            try:
+                worker.conn.send(None)
+            except (OSError, BrokenPipeError):
+                pass
+            worker.kill()
+        self._idle = None
@@ -1,15 +1,18 @@
 """Модуль системы уровней для Discord бота."""
 
+import asyncio
 import random
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Awaitable, Dict, List, Optional, Tuple, Union
 import logging
 import discord
 import os
 
-from infrastructure.config import LevelsStore
+from infrastructure.config import LevelsStore, get_codec
 
 from application.contracts import LevelingServiceContract, LevelsRepositoryContract
+from application.data_migrations import DataMigrationRunner
+from domain.message_context import MessageContext
 
 logger = logging.getLogger(__name__)
 
@@ -22,17 +25,25 @@ class LevelingSystem(LevelingServiceContract):
         bot,
         repository: LevelsRepositoryContract,
         store: LevelsStore,
+        migrations: Optional[DataMigrationRunner] = None,
+        file_fallback: bool = True,
     ):
         """Инициализация системы уровней.
 
         Args:
             bot: Экземпляр бота
+            migrations: Журнал миграций, чтобы не переносить неизмененный JSON повторно
+            file_fallback: Переходить на `levels.json` при ошибке БД. Процессы
+                кластера отключают его: общий файл они переписывали бы целиком
+                и теряли бы опыт друг друга
         """
         self.bot = bot
         self.repository = repository
         self.store = store
+        self.migrations = migrations
+        self.file_fallback = file_fallback
         self.data = self.load_data()
-        self.xp_cooldowns: Dict[str, datetime] = {}
+        self.xp_cooldowns: Dict[Tuple[int, int], datetime] = {}
         self.use_db = True
         self._last_cooldown_cleanup = datetime.now()
         self._schema_checked = False
@@ -54,6 +65,16 @@ class LevelingSystem(LevelingServiceContract):
         if not self.use_db:
             self.store.save(self.data)
 
+    def save_user_data(self, guild_id: str, user_id: str) -> None:
+        """Сохранение данных одного пользователя в файл.
+
+        Args:
+            guild_id: ID сервера
+            user_id: ID пользователя
+        """
+        if not self.use_db:
+            self.store.set_user(guild_id, user_id, self.data[guild_id][user_id])
+
     def _cleanup_old_cooldowns(self) -> None:
         """Периодическая очистка устаревших кулдаунов для предотвращения утечки памяти."""
         now = datetime.now()
@@ -97,57 +118,113 @@ class LevelingSystem(LevelingServiceContract):
             level += 1
         return level
 
-    async def process_message(self, message: discord.Message) -> Tuple[bool, Optional[int]]:
+    async def process_message(
+        self,
+        message: discord.Message,
+        gate: Optional[Awaitable[bool]] = None,
+        context: Optional[MessageContext] = None,
+    ) -> Tuple[bool, Optional[int]]:
         """Обработка сообщения для начисления опыта.
 
         Args:
             message: Сообщение пользователя
+            gate: Вердикт автомодерации; при False опыт не начисляется
+            context: Предразобранное сообщение (уже проверено в `Bot.on_message`)
 
         Returns:
             Tuple[bool, Optional[int]]: (Было ли повышение уровня, Новый уровень)
         """
-        # Проверяем, что сообщение из гильдии и не от бота
-        if not message.guild or message.author.bot:
+        if context is None:
+            # Проверяем, что сообщение из гильдии и не от бота
+            if not message.guild or message.author.bot:
+                return False, None
+        elif context.guild_id is None or context.is_bot:
             return False, None
 
-        return await self.add_experience(message.author)
+        return await self.add_experience(message.author, gate, context)
 
-    async def add_experience(self, member: discord.Member) -> Tuple[bool, Optional[int]]:
+    async def add_experience(
+        self,
+        member: discord.Member,
+        gate: Optional[Awaitable[bool]] = None,
+        context: Optional[MessageContext] = None,
+    ) -> Tuple[bool, Optional[int]]:
         """Добавление опыта пользователю.
 
+        Чтение текущих данных выполняется параллельно с автомодерацией,
+        а запись — только после разрешения `gate`.
+
         Args:
             member: Пользователь
+            gate: Вердикт автомодерации; при False опыт не начисляется
+            context: Предразобранное сообщение, из которого берутся ключ и время
 
         Returns:
             Tuple[bool, Optional[int]]: (Было ли повышение уровня, Новый уровень)
         """
-        user_id = str(member.id)
-        guild_id = str(member.guild.id)
+        if context is not None:
+            cooldown_key = context.key
+            current_time = context.received_at
+        else:
+            cooldown_key = (member.id, member.guild.id)
+            current_time = datetime.now()
+        user_id, guild_id = cooldown_key
 
         # Периодическая очистка устаревших кулдаунов
         self._cleanup_old_cooldowns()
 
         # Проверка кулдауна
-        cooldown_key = f"{user_id}_{guild_id}"
-        current_time = datetime.now()
         if cooldown_key in self.xp_cooldowns:
             if current_time < self.xp_cooldowns[cooldown_key]:
                 return False, None
 
-        # Устанавливаем кулдаун 60 секунд
-        self.xp_cooldowns[cooldown_key] = current_time + timedelta(seconds=60)
+        # Устанавливаем кулдаун 60 секунд сразу, чтобы параллельные сообщения
+        # не прошли проверку; при отказе автомодерации он снимается
+        previous = self.xp_cooldowns.get(cooldown_key)
+        expiry = current_time + timedelta(seconds=60)
+        self.xp_cooldowns[cooldown_key] = expiry
+        if gate is not None:
+            # Задачу можно ожидать повторно: при ошибке БД вердикт нужен
+            # запасной записи в файл
+            gate = asyncio.ensure_future(
+                self._release_cooldown_on_veto(gate, cooldown_key, expiry, previous)
+            )
 
         # Используем БД если доступна
         if self.use_db:
             try:
-                return await self._add_experience_db(member, user_id, guild_id, current_time)
+                return await self._add_experience_db(
+                    member, user_id, guild_id, current_time, gate
+                )
             except Exception as e:
                 logger.error(f"Ошибка при добавлении опыта в БД: {e}")
+                if not self.file_fallback:
+                    return False, None
                 # Если произошла ошибка, то используем файловую систему
                 self.use_db = False
 
         # Используем файловую систему как запасной вариант
-        return await self._add_experience_file(member, user_id, guild_id)
+        return await self._add_experience_file(member, str(user_id), str(guild_id), gate)
+
+    async def _release_cooldown_on_veto(
+        self,
+        gate: Awaitable[bool],
+        cooldown_key: Tuple[int, int],
+        expiry: datetime,
+        previous: Optional[datetime],
+    ) -> bool:
+        """Дождаться вердикта автомодерации и откатить кулдаун при отказе.
+
+        Сообщение, удаленное автомодерацией, не должно расходовать кулдаун:
+        следующее чистое сообщение пользователя снова получает опыт.
+        """
+        allowed = await gate
+        if not allowed and self.xp_cooldowns.get(cooldown_key) == expiry:
+            if previous is None:
+                del self.xp_cooldowns[cooldown_key]
+            else:
+                self.xp_cooldowns[cooldown_key] = previous
+        return allowed
 
     async def _ensure_schema_once(self) -> None:
         """Проверка схемы БД один раз при первом использовании."""
@@ -156,7 +233,12 @@ class LevelingSystem(LevelingServiceContract):
             self._schema_checked = True
 
     async def _add_experience_db(
-        self, member: discord.Member, user_id: str, guild_id: str, current_time: datetime
+        self,
+        member: discord.Member,
+        user_id: int,
+        guild_id: int,
+        current_time: datetime,
+        gate: Optional[Awaitable[bool]] = None,
     ) -> Tuple[bool, Optional[int]]:
         """Добавление опыта пользователю через базу данных.
 
@@ -165,6 +247,7 @@ class LevelingSystem(LevelingServiceContract):
             user_id: ID пользователя
             guild_id: ID сервера
             current_time: Текущее время
+            gate: Вердикт автомодерации
 
         Returns:
             Tuple[bool, Optional[int]]: (Было ли повышение уровня, Новый уровень)
@@ -175,13 +258,16 @@ class LevelingSystem(LevelingServiceContract):
         xp_gain = random.randint(15, 25)
 
         # Проверяем, есть ли пользователь в базе
-        user_data = await self.repository.get_user_level_xp(int(user_id), int(guild_id))
+        user_data = await self.repository.get_user_level_xp(user_id, guild_id)
+
+        if gate is not None and not await gate:
+            return False, None
 
         if not user_data:
             # Если пользователя нет, добавляем его
             await self.repository.create_user(
-                int(user_id),
-                int(guild_id),
+                user_id,
+                guild_id,
                 xp_gain,
                 0,
                 current_time.isoformat(),
@@ -195,8 +281,8 @@ class LevelingSystem(LevelingServiceContract):
 
         # Обновляем данные в базе с проверкой наличия колонки last_message_time
         await self.repository.update_user(
-            int(user_id),
-            int(guild_id),
+            user_id,
+            guild_id,
             current_xp,
             new_level,
             current_time.isoformat(),
@@ -215,7 +301,11 @@ class LevelingSystem(LevelingServiceContract):
         return False, None
 
     async def _add_experience_file(
-        self, member: discord.Member, user_id: str, guild_id: str
+        self,
+        member: discord.Member,
+        user_id: str,
+        guild_id: str,
+        gate: Optional[Awaitable[bool]] = None,
     ) -> Tuple[bool, Optional[int]]:
         """Добавление опыта пользователю через файловую систему.
 
@@ -223,10 +313,14 @@ class LevelingSystem(LevelingServiceContract):
             member: Пользователь
             user_id: ID пользователя
             guild_id: ID сервера
+            gate: Вердикт автомодерации
 
         Returns:
             Tuple[bool, Optional[int]]: (Было ли повышение уровня, Новый уровень)
         """
+        if gate is not None and not await gate:
+            return False, None
+
         if guild_id not in self.data:
             self.data[guild_id] = {}
 
@@ -241,7 +335,7 @@ class LevelingSystem(LevelingServiceContract):
 
         if new_level > self.data[guild_id][user_id]["level"]:
             self.data[guild_id][user_id]["level"] = new_level
-            self.save_data()
+            self.save_user_data(guild_id, user_id)
 
             await self._send_level_up_notification(member, new_level)
 
@@ -249,7 +343,7 @@ class LevelingSystem(LevelingServiceContract):
 
             return True, new_level
 
-        self.save_data()
+        self.save_user_data(guild_id, user_id)
         return False, None
 
     async def _send_level_up_notification(self, member: discord.Member, new_level: int) -> None:
@@ -301,6 +395,8 @@ class LevelingSystem(LevelingServiceContract):
                 return 0, 0
             except Exception as e:
                 logger.error(f"Ошибка при получении уровня из БД: {e}")
+                if not self.file_fallback:
+                    raise
                 # Если произошла ошибка, используем файловую систему
                 self.use_db = False
 
@@ -338,9 +434,7 @@ class LevelingSystem(LevelingServiceContract):
             cached = redis_client.get(cache_key)
             if cached:
                 try:
-                    import json
-
-                    return json.loads(cached.decode("utf-8"))
+                    return get_codec().loads(cached)
                 except Exception as e:
                     logger.warning(f"Failed to load cached leaderboard: {e}")
         # Use DB if available
@@ -349,14 +443,14 @@ class LevelingSystem(LevelingServiceContract):
                 result = await self.repository.get_leaderboard(int(guild_id), limit)
                 if redis_client:
                     try:
-                        import json
-
-                        redis_client.setex(cache_key, 60, json.dumps(result))
+                        redis_client.setex(cache_key, 60, get_codec().dumps(result, pretty=False))
                     except Exception as e:
                         logger.warning(f"Failed to cache leaderboard: {e}")
                 return result
             except Exception as e:
                 logger.error(f"Ошибка при получении таблицы лидеров из БД: {e}")
+                if not self.file_fallback:
+                    raise
                 # Если произошла ошибка, используем файловую систему
                 self.use_db = False
         # Use file system as fallback
@@ -372,12 +466,19 @@ class LevelingSystem(LevelingServiceContract):
         if not self.use_db:
             return
 
-        # Проверяем, есть ли колонка last_message_time в таблице
         try:
-            await self.repository.migrate_from_json(self.data)
+            if self.migrations is None:
+                await self.repository.migrate_from_json(self.data)
+            else:
+                await self.migrations.run(
+                    "levels_json",
+                    self.store.source_paths,
+                    lambda: self.repository.migrate_from_json(self.data),
+                )
         except Exception as e:
             logger.error(f"Ошибка при проверке схемы таблицы levels: {e}")
-            self.use_db = False  # Используем файловую систему при ошибке
+            if self.file_fallback:
+                self.use_db = False  # Используем файловую систему при ошибке
 
 
 leveling: Optional[LevelingSystem] = None
@@ -387,17 +488,21 @@ def init_leveling(
     bot,
     repository: LevelsRepositoryContract,
     store: LevelsStore,
+    migrations: Optional[DataMigrationRunner] = None,
+    file_fallback: bool = True,
 ) -> LevelingSystem:
     """Инициализация системы уровней.
 
     Args:
         bot: Экземпляр бота
+        migrations: Журнал миграций данных
+        file_fallback: Переходить на `levels.json` при ошибке БД
 
     Returns:
         LevelingSystem: Экземпляр системы уровней
     """
     global leveling
-    leveling = LevelingSystem(bot, repository, store)
+    leveling = LevelingSystem(bot, repository, store, migrations, file_fallback)
 
     return leveling
 
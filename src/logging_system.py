@@ -1,28 +1,48 @@
 import discord
 from discord import app_commands
-import json
-from pathlib import Path
 from datetime import datetime
+from typing import Optional
 
 from application.contracts import LoggingServiceContract
+from application.guild_settings import GuildSettingsService
+from application.voice_activity import VoiceActivityAggregator, VoiceSummary
+from infrastructure.cache import AuditLogCache, CachedMessage, MessageContentCache
+from infrastructure.workers.log_outbox import HIGH, LOW, MAX_EMBED_CHARS, LogOutbox
 
+# Сколько сообщений массового удаления показывать в логе (лимит полей embed — 25)
+BULK_DELETE_FIELDS = 10
+# Запас под заголовок и подвал: текст всех полей делит оставшийся лимит embed
+BULK_DELETE_MARGIN = 500
 
-class LoggingSystem(LoggingServiceContract):
-    def __init__(self, bot):
-        self.bot = bot
-        self.config_file = Path("data") / "logging_config.json"
-        self.load_config()
 
-    def load_config(self):
-        if self.config_file.exists():
-            with open(self.config_file, "r") as f:
-                self.config = json.load(f)
-        else:
-            self.config = {}
+def _format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours} ч {minutes} мин"
+    if minutes:
+        return f"{minutes} мин"
+    return f"{seconds} с"
 
-    def save_config(self):
-        with open(self.config_file, "w") as f:
-            json.dump(self.config, f, indent=4)
+
+class LoggingSystem(LoggingServiceContract):
+    def __init__(
+        self,
+        bot,
+        settings: GuildSettingsService,
+        message_cache: Optional[MessageContentCache] = None,
+        outbox: Optional[LogOutbox] = None,
+        audit_log: Optional[AuditLogCache] = None,
+        voice_activity: Optional[VoiceActivityAggregator] = None,
+    ):
+        self.bot = bot
+        self.settings = settings
+        # Пустой кэш ложен (__len__), поэтому сравнение с None
+        self.message_cache = MessageContentCache() if message_cache is None else message_cache
+        self.outbox = LogOutbox() if outbox is None else outbox
+        self.audit_log = AuditLogCache() if audit_log is None else audit_log
+        # Без агрегатора каждый вход и выход из голосового канала логируется отдельно
+        self.voice_activity = voice_activity
 
     async def setup(self):
         @self.bot.tree.command(name="setlogs", description="Установить канал для логов")
@@ -44,9 +64,7 @@ class LoggingSystem(LoggingServiceContract):
                 )
                 return
 
-            guild_id = str(interaction.guild.id)
-            self.config[guild_id] = channel.id
-            self.save_config()
+            await self.settings.update(interaction.guild.id, logs_channel_id=channel.id)
 
             embed = discord.Embed(
                 title="✅ Настройка логов",
@@ -56,12 +74,27 @@ class LoggingSystem(LoggingServiceContract):
             await interaction.response.send_message(embed=embed)
 
     async def log_event(
-        self, guild, title, description, color=discord.Color.blue(), fields=None, author=None
+        self,
+        guild,
+        title,
+        description,
+        color=discord.Color.blue(),
+        fields=None,
+        author=None,
+        kind="event",
+        priority=HIGH,
     ):
-        if str(guild.id) not in self.config:
+        """Поставить событие в очередь канала логов сервера.
+
+        Отправка идет в фоне (`LogOutbox`): события канала объединяются
+        до 10 embed в сообщение, а при перегрузке канала события с
+        приоритетом LOW отбрасываются первыми.
+        """
+        channel_id = self.settings.get(guild.id).logs_channel_id
+        if channel_id is None:
             return
 
-        channel = guild.get_channel(self.config[str(guild.id)])
+        channel = guild.get_channel(channel_id)
         if not channel:
             return
 
@@ -76,37 +109,129 @@ class LoggingSystem(LoggingServiceContract):
         if author:
             embed.set_footer(text=f"Действие выполнил: {author}")
 
-        try:
-            await channel.send(embed=embed)
-        except discord.HTTPException:
-            pass
+        self.outbox.submit(channel, embed, kind, priority)
+
+    def record_audit_log_entry(self, entry):
+        """Запомнить запись журнала аудита из gateway для атрибуции действий."""
+        self.audit_log.add(entry)
+
+    def remember_message(self, message):
+        """Запомнить автора и текст сообщения для логов удаления и редактирования.
+
+        Запоминаются только сообщения серверов с включенными логами, поэтому
+        кэш не растет за счет серверов, которым логи не нужны.
+        """
+        if not message.guild or self.settings.get(message.guild.id).logs_channel_id is None:
+            return
+        self.message_cache.remember(
+            message.id, message.author.id, message.channel.id, message.content
+        )
+
+    def _from_message(self, message) -> CachedMessage:
+        return CachedMessage(
+            message.author.id, message.channel.id, self.message_cache.truncate(message.content)
+        )
 
-    async def log_message_delete(self, message):
-        if not message.guild:
+    async def log_raw_message_delete(self, payload):
+        entry = self.message_cache.pop(payload.message_id)
+        if payload.cached_message is not None:
+            entry = self._from_message(payload.cached_message)
+        guild = self.bot.get_guild(payload.guild_id) if payload.guild_id else None
+        if not guild:
             return
 
+        if entry is None:
+            description = (
+                f"**Канал:** <#{payload.channel_id}>\n**ID сообщения:** {payload.message_id}\n"
+                "*Содержание недоступно: сообщение отправлено до запуска бота "
+                "или вытеснено из кэша*"
+            )
+        else:
+            description = (
+                f"**Канал:** <#{entry.channel_id}>\n**Автор:** <@{entry.author_id}>\n"
+                f"**Содержание:**\n{entry.content}"
+            )
+
         await self.log_event(
-            message.guild,
+            guild,
             "🗑️ Сообщение удалено",
-            f"**Канал:** {message.channel.mention}\n**Автор:** {message.author.mention}\n**Содержание:**\n{message.content}",
+            description,
+            discord.Color.red(),
+            author=self.bot.get_user(entry.author_id) if entry else None,
+            kind="message_delete",
+        )
+
+    async def log_raw_bulk_message_delete(self, payload):
+        entries = self.message_cache.pop_many(payload.message_ids)
+        for message in payload.cached_messages:
+            entries[message.id] = self._from_message(message)
+        guild = self.bot.get_guild(payload.guild_id) if payload.guild_id else None
+        if not guild:
+            return
+
+        description = (
+            f"**Канал:** <#{payload.channel_id}>\n"
+            f"**Удалено сообщений:** {len(payload.message_ids)}\n"
+            f"**Известно содержание:** {len(entries)}"
+        )
+        shown = sorted(entries)[:BULK_DELETE_FIELDS]
+        # Без ограничения 10 полей по 1000 символов превышают лимит embed (6000)
+        field_budget = (MAX_EMBED_CHARS - BULK_DELETE_MARGIN - len(description)) // max(
+            len(shown), 1
+        )
+        fields = []
+        for message_id in shown:
+            entry = entries[message_id]
+            author = self.bot.get_user(entry.author_id) or entry.author_id
+            name = f"Автор: {author}"
+            value = entry.content or "*без текста*"
+            limit = field_budget - len(name)
+            if len(value) > limit:
+                value = value[: limit - 1] + "…"
+            fields.append((name, value, False))
+
+        await self.log_event(
+            guild,
+            "🗑️ Сообщения удалены",
+            description,
             discord.Color.red(),
-            author=message.author,
+            fields=fields,
+            kind="message_bulk_delete",
         )
 
-    async def log_message_edit(self, before, after):
-        if not before.guild:
+    async def log_raw_message_edit(self, payload):
+        after = payload.message
+        previous = self.message_cache.update(payload.message_id, after.content)
+        guild = self.bot.get_guild(payload.guild_id) if payload.guild_id else None
+        if not guild:
             return
 
-        if before.content == after.content:
+        after_content = self.message_cache.truncate(after.content)
+        if payload.cached_message is not None:
+            before_content = self.message_cache.truncate(payload.cached_message.content)
+        elif previous is not None:
+            before_content = previous.content
+        elif after.author.bot or not payload.data.get("edited_timestamp"):
+            # Без прежнего текста нельзя отличить правку от подгрузки превью ссылок
+            return
+        else:
+            before_content = "*недоступно: сообщение не было в кэше*"
+
+        if before_content == after_content:
             return
 
         await self.log_event(
-            before.guild,
+            guild,
             "✏️ Сообщение изменено",
-            f"**Канал:** {before.channel.mention}\n**Автор:** {before.author.mention}",
+            f"**Канал:** <#{payload.channel_id}>\n**Автор:** {after.author.mention}",
             discord.Color.gold(),
-            fields=[("До:", before.content, False), ("После:", after.content, False)],
-            author=before.author,
+            fields=[
+                ("До:", before_content or "*без текста*", False),
+                ("После:", after_content or "*без текста*", False),
+            ],
+            author=after.author,
+            kind="message_edit",
+            priority=LOW,
         )
 
     async def log_member_join(self, member):
@@ -115,6 +240,7 @@ class LoggingSystem(LoggingServiceContract):
             "👋 Участник присоединился",
             f"**Участник:** {member.mention}\n**ID:** {member.id}",
             discord.Color.green(),
+            kind="member_join",
         )
 
     async def log_member_remove(self, member):
@@ -123,6 +249,7 @@ class LoggingSystem(LoggingServiceContract):
             "👋 Участник покинул сервер",
             f"**Участник:** {member}\n**ID:** {member.id}",
             discord.Color.red(),
+            kind="member_remove",
         )
 
     async def log_member_update(self, before, after):
@@ -141,18 +268,11 @@ class LoggingSystem(LoggingServiceContract):
                     f"**Удалены роли:** {', '.join(role.mention for role in removed_roles)}"
                 )
 
-            # Получаем информацию о том, кто изменил роли из аудит лога
-            try:
-                async for entry in after.guild.audit_logs(
-                    limit=1, action=discord.AuditLogAction.member_role_update
-                ):
-                    if entry.target.id == after.id:
-                        author = entry.user
-                        break
-                else:
-                    author = None
-            except (discord.Forbidden, discord.HTTPException):
-                author = None
+            # Кто изменил роли — из записи журнала аудита об этом участнике
+            record = await self.audit_log.find(
+                after.guild, discord.AuditLogAction.member_role_update, after.id
+            )
+            author = record.user if record else None
 
             await self.log_event(
                 after.guild,
@@ -160,10 +280,21 @@ class LoggingSystem(LoggingServiceContract):
                 description,
                 discord.Color.blue(),
                 author=author,
+                kind="member_roles",
             )
 
     async def log_voice_state_update(self, member, before, after):
-        if before.channel != after.channel:
+        if before.channel != after.channel and self.voice_activity is not None:
+            if self.settings.get(member.guild.id).logs_channel_id is not None:
+                self.voice_activity.record(
+                    member.guild.id,
+                    member.id,
+                    member.mention,
+                    str(member),
+                    before.channel.name if before.channel else None,
+                    after.channel.name if after.channel else None,
+                )
+        elif before.channel != after.channel:
             if after.channel:
                 description = (
                     f"**Участник:** {member.mention}\n**Подключился к:** {after.channel.name}"
@@ -176,23 +307,63 @@ class LoggingSystem(LoggingServiceContract):
                 title = "🎤 Отключение от голосового канала"
 
             await self.log_event(
-                member.guild, title, description, discord.Color.blue(), author=member
+                member.guild,
+                title,
+                description,
+                discord.Color.blue(),
+                author=member,
+                kind="voice_state",
+                priority=LOW,
             )
 
-    async def log_ban(self, guild, user):
-        # Получаем информацию о том, кто забанил участника
-        try:
-            async for entry in guild.audit_logs(limit=1, action=discord.AuditLogAction.ban):
-                if entry.target.id == user.id:
-                    author = entry.user
-                    reason = entry.reason
-                    break
+    async def flush_voice_activity(self, force: bool = False) -> int:
+        """Отправить сводки голосовой активности завершенных сессий.
+
+        Returns:
+            int: Количество отправленных сводок
+        """
+        if self.voice_activity is None:
+            return 0
+        summaries = self.voice_activity.due(force=force)
+        for summary in summaries:
+            guild = self.bot.get_guild(summary.guild_id)
+            if guild is None:
+                continue
+            await self.log_event(
+                guild,
+                "🎤 Голосовая активность",
+                self._voice_summary_description(summary),
+                discord.Color.blue(),
+                author=summary.name,
+                kind="voice_activity",
+                priority=LOW,
+            )
+        return len(summaries)
+
+    @staticmethod
+    def _voice_summary_description(summary: VoiceSummary) -> str:
+        lines = [f"**Участник:** {summary.mention}"]
+        for step in summary.steps:
+            at = f"<t:{int(step.at)}:T>"
+            if step.before is None:
+                lines.append(f"{at} подключился к **{step.after}**")
+            elif step.after is None:
+                lines.append(f"{at} отключился от **{step.before}**")
             else:
-                author = None
-                reason = "Причина не указана"
-        except (discord.Forbidden, discord.HTTPException):
-            author = None
-            reason = "Причина не указана"
+                lines.append(f"{at} перешел **{step.before}** → **{step.after}**")
+        if summary.started_at is not None:
+            duration = _format_duration(summary.ended_at - summary.started_at)
+            label = "В голосе уже" if summary.ongoing else "В голосе"
+            lines.append(f"**{label}:** {duration}")
+        elif summary.ongoing:
+            lines.append("*Участник все еще в голосовом канале*")
+        return "\n".join(lines)
+
+    async def log_ban(self, guild, user):
+        # Кто забанил участника и почему — из журнала аудита
+        record = await self.audit_log.find(guild, discord.AuditLogAction.ban, user.id)
+        author = record.user if record else None
+        reason = record.reason if record and record.reason else "Причина не указана"
 
         await self.log_event(
             guild,
@@ -200,19 +371,13 @@ class LoggingSystem(LoggingServiceContract):
             f"**Участник:** {user}\n**ID:** {user.id}\n**Причина:** {reason}",
             discord.Color.red(),
             author=author,
+            kind="ban",
         )
 
     async def log_unban(self, guild, user):
-        # Получаем информацию о том, кто разбанил участника
-        try:
-            async for entry in guild.audit_logs(limit=1, action=discord.AuditLogAction.unban):
-                if entry.target.id == user.id:
-                    author = entry.user
-                    break
-            else:
-                author = None
-        except (discord.Forbidden, discord.HTTPException):
-            author = None
+        # Кто разбанил участника — из журнала аудита
+        record = await self.audit_log.find(guild, discord.AuditLogAction.unban, user.id)
+        author = record.user if record else None
 
         await self.log_event(
             guild,
@@ -220,4 +385,5 @@ class LoggingSystem(LoggingServiceContract):
             f"**Участник:** {user}\n**ID:** {user.id}",
             discord.Color.green(),
             author=author,
+            kind="unban",
         )
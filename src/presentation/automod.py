@@ -24,8 +24,9 @@ class AutoModCog(commands.Cog):
 
         if action == "addword" and value:
             if value not in automod_service.config["banned_words"]:
-                automod_service.config["banned_words"].append(value)
-                automod_service.save_config()
+                automod_service.update_config(
+                    banned_words=[*automod_service.config["banned_words"], value]
+                )
                 await interaction.response.send_message(
                     f"Слово '{value}' добавлено в список запрещенных",
                     ephemeral=True,
@@ -35,8 +36,11 @@ class AutoModCog(commands.Cog):
 
         elif action == "removeword" and value:
             if value in automod_service.config["banned_words"]:
-                automod_service.config["banned_words"].remove(value)
-                automod_service.save_config()
+                automod_service.update_config(
+                    banned_words=[
+                        word for word in automod_service.config["banned_words"] if word != value
+                    ]
+                )
                 await interaction.response.send_message(
                     f"Слово '{value}' удалено из списка запрещенных",
                     ephemeral=True,
@@ -60,8 +64,7 @@ class AutoModCog(commands.Cog):
             try:
                 threshold = int(value)
                 if 1 <= threshold <= 20:
-                    automod_service.config["spam_threshold"] = threshold
-                    automod_service.save_config()
+                    automod_service.update_config(spam_threshold=threshold)
                     await interaction.response.send_message(
                         f"Порог спама установлен на {threshold} сообщений",
                         ephemeral=True,
@@ -79,8 +82,7 @@ class AutoModCog(commands.Cog):
             try:
                 interval = int(value)
                 if 1 <= interval <= 60:
-                    automod_service.config["spam_interval"] = interval
-                    automod_service.save_config()
+                    automod_service.update_config(spam_interval=interval)
                     await interaction.response.send_message(
                         f"Интервал спама установлен на {interval} секунд",
                         ephemeral=True,
@@ -98,8 +100,7 @@ class AutoModCog(commands.Cog):
             try:
                 mentions = int(value)
                 if 1 <= mentions <= 10:
-                    automod_service.config["max_mentions"] = mentions
-                    automod_service.save_config()
+                    automod_service.update_config(max_mentions=mentions)
                     await interaction.response.send_message(
                         f"Лимит упоминаний установлен на {mentions}",
                         ephemeral=True,
@@ -117,8 +118,7 @@ class AutoModCog(commands.Cog):
             try:
                 warnings = int(value)
                 if 1 <= warnings <= 10:
-                    automod_service.config["max_warnings"] = warnings
-                    automod_service.save_config()
+                    automod_service.update_config(max_warnings=warnings)
                     await interaction.response.send_message(
                         f"Максимум предупреждений установлен на {warnings}",
                         ephemeral=True,
@@ -134,8 +134,7 @@ class AutoModCog(commands.Cog):
 
         elif action == "setmute" and value:
             if re.match(r"^\d+[mhd]$", value):
-                automod_service.config["mute_duration"] = value
-                automod_service.save_config()
+                automod_service.update_config(mute_duration=value)
                 await interaction.response.send_message(
                     f"Длительность мута установлена на {value}",
                     ephemeral=True,
@@ -146,6 +145,59 @@ class AutoModCog(commands.Cog):
                     ephemeral=True,
                 )
 
+        elif action == "addregex" and value:
+            try:
+                rule = automod_service.add_regex_rule(value)
+            except re.error as e:
+                await interaction.response.send_message(
+                    f"Некорректное регулярное выражение: {e}", ephemeral=True
+                )
+                return
+            mode = "изолированный процесс" if rule["heavy"] else "инлайн"
+            await interaction.response.send_message(
+                f"Правило #{rule['id']} добавлено ({mode})",
+                ephemeral=True,
+            )
+
+        elif action == "removeregex" and value:
+            if value.isdigit() and automod_service.remove_regex_rule(int(value)):
+                await interaction.response.send_message(
+                    f"Правило #{value} удалено", ephemeral=True
+                )
+            else:
+                await interaction.response.send_message("Правило не найдено", ephemeral=True)
+
+        elif action == "enableregex" and value:
+            if value.isdigit() and automod_service.enable_regex_rule(int(value)):
+                await interaction.response.send_message(
+                    f"Правило #{value} включено", ephemeral=True
+                )
+            else:
+                await interaction.response.send_message("Правило не найдено", ephemeral=True)
+
+        elif action == "listregex":
+            rules = automod_service.config.get("regex_rules", [])
+            if rules:
+                stats = automod_service.rule_pool.get_stats()
+                lines = []
+                for rule in rules:
+                    evaluations, cpu_time, timeouts = stats.get(str(rule["id"]), (0, 0.0, 0))
+                    status = "вкл" if rule.get("enabled", True) else "выкл"
+                    lines.append(
+                        f"#{rule['id']} [{status}] {rule['pattern']} "
+                        f"(проверок: {evaluations}, CPU: {cpu_time * 1000:.1f} мс, "
+                        f"таймаутов: {timeouts})"
+                    )
+                rules_text = "\n".join(lines)
+                await interaction.response.send_message(
+                    f"Regex-правила:\n```\n{rules_text}\n```",
+                    ephemeral=True,
+                )
+            else:
+                await interaction.response.send_message(
+                    "Список regex-правил пуст", ephemeral=True
+                )
+
         else:
             await interaction.response.send_message(
                 "Неверная команда или отсутствует значение", ephemeral=True
@@ -1,24 +1,13 @@
 import discord
 from discord import app_commands
-import json
-from pathlib import Path
+
+from application.guild_settings import GuildSettingsService
 
 
 class RoleRewards:
-    def __init__(self, bot):
+    def __init__(self, bot, settings: GuildSettingsService):
         self.bot = bot
-        self.config_file = Path("data") / "role_rewards.json"
-        self.config = self.load_config()
-
-    def load_config(self):
-        if self.config_file.exists():
-            with open(self.config_file, "r") as f:
-                return json.load(f)
-        return {}
-
-    def save_config(self):
-        with open(self.config_file, "w") as f:
-            json.dump(self.config, f, indent=4)
+        self.settings = settings
 
     async def setup(self):
         @self.bot.tree.command(
@@ -26,13 +15,7 @@ class RoleRewards:
         )
         @app_commands.checks.has_permissions(manage_roles=True)
         async def addrole(interaction: discord.Interaction, role: discord.Role, level: int):
-            guild_id = str(interaction.guild.id)
-
-            if guild_id not in self.config:
-                self.config[guild_id] = {}
-
-            self.config[guild_id][str(level)] = role.id
-            self.save_config()
+            await self.settings.set_role_reward(interaction.guild.id, level, role.id)
 
             embed = discord.Embed(
                 title="Роль-награда добавлена",
@@ -44,17 +27,13 @@ class RoleRewards:
         @self.bot.tree.command(name="removerole", description="Удалить роль-награду за уровень")
         @app_commands.checks.has_permissions(manage_roles=True)
         async def removerole(interaction: discord.Interaction, level: int):
-            guild_id = str(interaction.guild.id)
-
-            if guild_id not in self.config or str(level) not in self.config[guild_id]:
+            role_id = await self.settings.remove_role_reward(interaction.guild.id, level)
+            if role_id is None:
                 await interaction.response.send_message(
                     "Для этого уровня не настроена роль-награда!", ephemeral=True
                 )
                 return
 
-            role_id = self.config[guild_id].pop(str(level))
-            self.save_config()
-
             role = interaction.guild.get_role(role_id)
             role_name = role.mention if role else "Удаленная роль"
 
@@ -69,9 +48,9 @@ class RoleRewards:
             name="listroles", description="Показать список ролей-наград за уровни"
         )
         async def listroles(interaction: discord.Interaction):
-            guild_id = str(interaction.guild.id)
+            settings = self.settings.get(interaction.guild.id)
 
-            if guild_id not in self.config or not self.config[guild_id]:
+            if not settings.role_rewards:
                 await interaction.response.send_message(
                     "На сервере нет настроенных ролей-наград!", ephemeral=True
                 )
@@ -83,7 +62,7 @@ class RoleRewards:
                 color=discord.Color.blue(),
             )
 
-            for level, role_id in sorted(self.config[guild_id].items(), key=lambda x: int(x[0])):
+            for level, role_id in settings.reward_thresholds:
                 role = interaction.guild.get_role(role_id)
                 if role:
                     embed.add_field(name=f"Уровень {level}", value=role.mention, inline=False)
@@ -91,17 +70,13 @@ class RoleRewards:
             await interaction.response.send_message(embed=embed)
 
     async def check_level_up(self, member: discord.Member, new_level: int):
-        guild_id = str(member.guild.id)
-
-        if guild_id not in self.config:
-            return
-
-        for level, role_id in self.config[guild_id].items():
-            level = int(level)
-            if new_level >= level:
-                role = member.guild.get_role(role_id)
-                if role and role not in member.roles:
-                    try:
-                        await member.add_roles(role)
-                    except discord.Forbidden:
-                        pass  # Нет прав для выдачи роли
+        for level, role_id in self.settings.get(member.guild.id).reward_thresholds:
+            # Пороги отсортированы — дальше только недостигнутые уровни
+            if level > new_level:
+                break
+            role = member.guild.get_role(role_id)
+            if role and role not in member.roles:
+                try:
+                    await member.add_roles(role)
+                except discord.Forbidden:
+                    pass  # Нет прав для выдачи роли
@@ -1,37 +1,20 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-import json
-from pathlib import Path
+
+from application.guild_settings import GuildSettingsService
 
 
 class TempVoice(commands.Cog):
-    def __init__(self, bot):
+    def __init__(self, bot, settings: GuildSettingsService):
         self.bot = bot
-        self.config_path = Path("data") / "voice_config.json"
-        self.voice_config = self.load_config()
+        self.settings = settings
         self.temp_channels = {}
 
     async def setup(self):
         """Инициализация системы временных голосовых каналов"""
         print("Система временных голосовых каналов готова к работе")
 
-    def load_config(self):
-        try:
-            with self.config_path.open("r", encoding="utf-8") as f:
-                return json.load(f)
-        except FileNotFoundError:
-            default_config = {"creation_channel": None, "temp_category": None}
-            self.config_path.parent.mkdir(parents=True, exist_ok=True)
-            with self.config_path.open("w", encoding="utf-8") as f:
-                json.dump(default_config, f, indent=4, ensure_ascii=False)
-            return default_config
-
-    def save_config(self):
-        self.config_path.parent.mkdir(parents=True, exist_ok=True)
-        with self.config_path.open("w", encoding="utf-8") as f:
-            json.dump(self.voice_config, f, indent=4, ensure_ascii=False)
-
     @app_commands.command(
         name="voice_setup", description="Настроить систему временных голосовых каналов"
     )
@@ -44,9 +27,11 @@ class TempVoice(commands.Cog):
             "➕ Создать канал", category=category
         )
 
-        self.voice_config["creation_channel"] = creation_channel.id
-        self.voice_config["temp_category"] = category.id
-        self.save_config()
+        await self.settings.update(
+            interaction.guild.id,
+            voice_creation_channel_id=creation_channel.id,
+            voice_category_id=category.id,
+        )
 
         await interaction.response.send_message(
             f"Система временных голосовых каналов настроена в категории {category.name}"
@@ -54,8 +39,9 @@ class TempVoice(commands.Cog):
 
     @commands.Cog.listener()
     async def on_voice_state_update(self, member, before, after):
-        if after.channel and after.channel.id == self.voice_config["creation_channel"]:
-            category = self.bot.get_channel(self.voice_config["temp_category"])
+        settings = self.settings.get(member.guild.id)
+        if after.channel and after.channel.id == settings.voice_creation_channel_id:
+            category = self.bot.get_channel(settings.voice_category_id)
 
             channel = await member.guild.create_voice_channel(
                 f"Канал {member.display_name}", category=category
@@ -171,4 +157,4 @@ class TempVoice(commands.Cog):
 
 
 async def setup(bot):
-    await bot.add_cog(TempVoice(bot))
+    await bot.add_cog(TempVoice(bot, bot.guild_settings))
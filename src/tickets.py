@@ -31,6 +31,14 @@ class TicketSystem(commands.Cog):
     def save_config(self):
         self.store.save(self.tickets_config)
 
+    def refresh_config(self) -> bool:
+        """Перечитать конфигурацию, если ее изменил другой процесс кластера."""
+        data = self.store.refresh()
+        if data is None:
+            return False
+        self.tickets_config = data
+        return True
+
     @app_commands.command(name="ticket_setup", description="Настроить систему тикетов")
     @app_commands.checks.has_permissions(administrator=True)
     @app_commands.describe(category="Категория для тикетов", support_role="Роль поддержки")
@@ -40,9 +48,9 @@ class TicketSystem(commands.Cog):
         category: discord.CategoryChannel,
         support_role: discord.Role,
     ):
-        self.tickets_config["ticket_category"] = category.id
-        self.tickets_config["support_role"] = support_role.id
-        self.save_config()
+        changes = {"ticket_category": category.id, "support_role": support_role.id}
+        self.tickets_config.update(changes)
+        self.store.update(changes)
         await interaction.response.send_message(
             f"Система тикетов настроена!\nКатегория: {category.name}\nРоль поддержки: {support_role.name}"
         )
@@ -56,8 +64,9 @@ class TicketSystem(commands.Cog):
                 ephemeral=True,
             )
 
-        self.tickets_config["ticket_counter"] += 1
-        ticket_number = self.tickets_config["ticket_counter"]
+        # Счетчик увеличивается в хранилище, общем для процессов кластера
+        ticket_number = self.store.next_ticket_number()
+        self.tickets_config["ticket_counter"] = ticket_number
 
         category = self.bot.get_channel(self.tickets_config["ticket_category"])
         support_role = interaction.guild.get_role(self.tickets_config["support_role"])
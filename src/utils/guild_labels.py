@@ -0,0 +1,119 @@
+"""Ограничение числа серий метрик с меткой guild_id."""
+
+from __future__ import annotations
+
+from collections import Counter, defaultdict
+from typing import Dict, FrozenSet, Iterable, Iterator, Sequence, Set, Tuple
+
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, Metric
+
+# Метка для серверов вне набора с точными метками
+OTHER = "other"
+# Значения метки, которые не являются ID сервера и не сворачиваются
+SPECIAL_LABELS = frozenset({"all", "dm", "unknown", OTHER})
+
+LabelValues = Tuple[str, ...]
+
+
+class GuildLabelPolicy:
+    """Точные метки guild_id для top-K серверов по трафику и allowlist.
+
+    Остальные серверы попадают в метку `other`, поэтому число серий не
+    растет с числом серверов. Трафик считается при каждом вызове `label`,
+    набор top-K пересчитывается `recompute` (раз в несколько минут); вес
+    прошлых периодов при этом уменьшается вдвое, чтобы набор следовал за
+    нагрузкой, но не менялся от единичного всплеска.
+
+    Точные значения по всем серверам хранятся в памяти (`count`, `set`) и
+    отдаются отдельным эндпоинтом через `GuildBreakdownCollector` только
+    по запросу.
+    """
+
+    def __init__(self, top_k: int = 20, allowlist: Iterable[str] = ()) -> None:
+        self.top_k = top_k
+        self.allowlist: FrozenSet[str] = frozenset(allowlist)
+        self._exact: FrozenSet[str] = self.allowlist
+        self._traffic: Counter = Counter()
+        self._counters: Dict[str, Counter] = defaultdict(Counter)
+        self._gauges: Dict[str, Dict[LabelValues, float]] = defaultdict(dict)
+
+    @property
+    def exact(self) -> FrozenSet[str]:
+        """Серверы, сохраняющие точную метку."""
+        return self._exact
+
+    def configure(self, top_k: int, allowlist: Iterable[str]) -> None:
+        self.top_k = top_k
+        self.allowlist = frozenset(allowlist)
+        self._exact = self.allowlist
+
+    def label(self, guild_id: str) -> str:
+        """Метка для метрики с учетом трафика сервера."""
+
+        if guild_id in SPECIAL_LABELS:
+            return guild_id
+        self._traffic[guild_id] += 1
+        return guild_id if guild_id in self._exact else OTHER
+
+    def recompute(self) -> Set[str]:
+        """Пересчитать top-K по трафику.
+
+        Returns:
+            Set[str]: Серверы, потерявшие точную метку
+        """
+
+        top = {guild_id for guild_id, _ in self._traffic.most_common(self.top_k)}
+        previous = self._exact
+        self._exact = frozenset(top) | self.allowlist
+        for guild_id in list(self._traffic):
+            self._traffic[guild_id] /= 2
+            if self._traffic[guild_id] < 1:
+                del self._traffic[guild_id]
+        return set(previous - self._exact)
+
+    def count(self, metric: str, labels: LabelValues, amount: float = 1.0) -> None:
+        """Увеличить точный счетчик сервера для отдельного эндпоинта."""
+        self._counters[metric][labels] += amount
+
+    def set(self, metric: str, labels: LabelValues, value: float) -> None:
+        """Запомнить точное значение gauge сервера для отдельного эндпоинта."""
+        self._gauges[metric][labels] = value
+
+    def folded_total(self, metric: str) -> float:
+        """Сумма gauge серверов, попадающих в метку `other`."""
+
+        return sum(
+            value
+            for (guild_id,), value in self._gauges.get(metric, {}).items()
+            if guild_id not in self._exact and guild_id not in SPECIAL_LABELS
+        )
+
+    def values(self, metric: str) -> Dict[LabelValues, float]:
+        if metric in self._gauges:
+            return dict(self._gauges[metric])
+        return dict(self._counters.get(metric, {}))
+
+
+class GuildBreakdownCollector:
+    """Точные значения метрик по всем серверам для отдельного эндпоинта.
+
+    Серии собираются только при запросе эндпоинта и не попадают в
+    основной `/metrics`.
+    """
+
+    def __init__(
+        self,
+        policy: GuildLabelPolicy,
+        metrics: Dict[str, Tuple[str, str, Sequence[str]]],
+    ) -> None:
+        # Имя метрики -> (counter | gauge, описание, имена меток)
+        self.policy = policy
+        self.metrics = metrics
+
+    def collect(self) -> Iterator[Metric]:
+        for name, (kind, documentation, labelnames) in self.metrics.items():
+            family_type = CounterMetricFamily if kind == "counter" else GaugeMetricFamily
+            family = family_type(name, documentation, labels=list(labelnames))
+            for labels, value in sorted(self.policy.values(name).items()):
+                family.add_metric(list(labels), value)
+            yield family
@@ -0,0 +1,140 @@
+"""Отчет о времени импорта модулей (разбор вывода `python -X importtime`).
+
+Запуск: `python -m utils.import_time app.bot --top 20` из каталога `src`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set
+
+# Бюджет холодного импорта `app.bot` по умолчанию (мс)
+DEFAULT_IMPORT_BUDGET_MS = 1500.0
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+
+
+@dataclass(frozen=True)
+class ImportRecord:
+    """Одна строка `-X importtime`: собственное и накопленное время в мкс."""
+
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+@dataclass
+class ImportReport:
+    """Времена импорта модуля и всех его зависимостей."""
+
+    module: str
+    records: List[ImportRecord] = field(default_factory=list)
+
+    @property
+    def total_ms(self) -> float:
+        """Накопленное время импорта целевого модуля."""
+
+        for record in reversed(self.records):
+            if record.module == self.module and record.depth == 0:
+                return record.cumulative_us / 1000
+        return sum(record.self_us for record in self.records) / 1000
+
+    @property
+    def modules(self) -> Set[str]:
+        return {record.module for record in self.records}
+
+    def slowest(self, count: int = 15) -> List[ImportRecord]:
+        """Модули с наибольшим накопленным временем."""
+
+        return sorted(self.records, key=lambda record: record.cumulative_us, reverse=True)[:count]
+
+    def by_package(self) -> Dict[str, float]:
+        """Собственное время импорта, сгруппированное по пакету верхнего уровня (мс)."""
+
+        totals: Dict[str, float] = defaultdict(float)
+        for record in self.records:
+            totals[record.module.split(".")[0]] += record.self_us / 1000
+        return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+    def format(self, count: int = 15) -> str:
+        lines = [f"Импорт {self.module}: {self.total_ms:.0f} мс, модулей {len(self.records)}"]
+        lines.append("Пакеты (собственное время):")
+        for package, ms in list(self.by_package().items())[:count]:
+            lines.append(f"  {ms:8.1f} мс  {package}")
+        lines.append("Модули (накопленное время):")
+        for record in self.slowest(count):
+            lines.append(
+                f"  {record.cumulative_us / 1000:8.1f} мс  {'  ' * record.depth}{record.module}"
+            )
+        return "\n".join(lines)
+
+
+def parse_importtime(output: str) -> List[ImportRecord]:
+    """Разобрать строки `import time: self | cumulative | module`."""
+
+    records = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:") :].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # заголовок таблицы
+        name = parts[2].rstrip()
+        stripped = name.lstrip(" ")
+        records.append(
+            ImportRecord(
+                module=stripped,
+                self_us=int(parts[0]),
+                cumulative_us=int(parts[1]),
+                depth=(len(name) - len(stripped) - 1) // 2,
+            )
+        )
+    return records
+
+
+def measure_import(
+    module: str, cwd: Optional[Path] = None, python: str = sys.executable
+) -> ImportReport:
+    """Импортировать модуль в новом интерпретаторе и вернуть отчет.
+
+    Args:
+        module: Имя модуля
+        cwd: Рабочий каталог процесса (модули бота создают `data/` относительно него)
+        python: Интерпретатор
+
+    Returns:
+        ImportReport: Времена импорта
+    """
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC_DIR), env.get("PYTHONPATH")]))
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Не удалось импортировать {module}:\n{result.stderr[-2000:]}")
+    return ImportReport(module, parse_importtime(result.stderr))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Время импорта модуля и его зависимостей")
+    parser.add_argument("module", nargs="?", default="app.bot")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args(argv)
+    print(measure_import(args.module).format(args.top))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""Оценка памяти кэшей discord.py и словарей бота по серверам."""
+
+from __future__ import annotations
+
+import sys
+import types
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# Объекты, через которые обход ушел бы во все состояние клиента
+_OPAQUE_TYPES = (type, types.ModuleType, types.FunctionType, types.MethodType, types.CodeType)
+
+# Словари бота: (атрибут сервиса на боте, атрибут словаря)
+APP_CACHES: Tuple[Tuple[str, str], ...] = (
+    ("leveling", "xp_cooldowns"),
+    ("automod", "spam_counter"),
+    ("temp_voice", "temp_channels"),
+)
+
+
+def _slots(cls: type) -> Iterable[str]:
+    for klass in cls.__mro__:
+        slots = klass.__dict__.get("__slots__", ())
+        yield from (slots,) if isinstance(slots, str) else slots
+
+
+def deep_sizeof(obj: Any, seen: Set[int]) -> int:
+    """Размер объекта со всем, на что он ссылается, в байтах.
+
+    Объекты из `seen` не учитываются (и добавляются туда по мере обхода),
+    поэтому общие объекты считаются один раз, а заранее добавленные в
+    `seen` (клиент, состояние соединения, серверы) ограничивают обход.
+    """
+
+    total = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen or isinstance(item, _OPAQUE_TYPES):
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, (str, bytes, int, float, bool)) or item is None:
+            continue
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        else:
+            attrs = getattr(item, "__dict__", None)
+            if attrs is not None:
+                stack.append(attrs)
+            for name in _slots(type(item)):
+                if name in ("__dict__", "__weakref__"):
+                    continue
+                value = getattr(item, name, None)
+                if value is not None:
+                    stack.append(value)
+    return total
+
+
+@dataclass
+class GuildMemory:
+    """Память одного сервера по кэшам (байты) и число записей."""
+
+    guild_id: int
+    name: str = ""
+    bytes: Dict[str, int] = field(default_factory=dict)
+    entries: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def total(self) -> int:
+        return sum(self.bytes.values())
+
+    def add(self, cache: str, size: int, count: int = 1) -> None:
+        self.bytes[cache] = self.bytes.get(cache, 0) + size
+        self.entries[cache] = self.entries.get(cache, 0) + count
+
+
+@dataclass
+class MemoryReport:
+    """Память кэшей по серверам и общие кэши клиента."""
+
+    guilds: List[GuildMemory] = field(default_factory=list)
+    shared: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def total(self) -> int:
+        return sum(guild.total for guild in self.guilds) + sum(self.shared.values())
+
+    def by_cache(self) -> Dict[str, int]:
+        totals: Dict[str, int] = defaultdict(int)
+        for guild in self.guilds:
+            for cache, size in guild.bytes.items():
+                totals[cache] += size
+        return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+    def largest(self, count: int = 10) -> List[GuildMemory]:
+        return sorted(self.guilds, key=lambda guild: guild.total, reverse=True)[:count]
+
+    def format(self, count: int = 10) -> str:
+        lines = [f"Всего: {_kib(self.total)}, серверов {len(self.guilds)}"]
+        if self.guilds:
+            average = sum(guild.total for guild in self.guilds) / len(self.guilds)
+            lines.append(f"В среднем на сервер: {_kib(average)}")
+        lines.append("Кэши:")
+        for cache, size in {**self.by_cache(), **self.shared}.items():
+            lines.append(f"  {cache:<14} {_kib(size):>12}")
+        lines.append("Крупнейшие серверы:")
+        for guild in self.largest(count):
+            parts = ", ".join(
+                f"{cache} {guild.entries.get(cache, 0)}"
+                for cache in guild.bytes
+                if guild.entries.get(cache)
+            )
+            lines.append(f"  {guild.guild_id} {_kib(guild.total):>12}  {parts}")
+        return "\n".join(lines)
+
+
+def _kib(size: float) -> str:
+    return f"{size / 1024:.1f} KiB"
+
+
+def _app_cache_guild(bot: Any, cache: str, key: Any) -> Optional[int]:
+    """ID сервера записи словаря бота."""
+
+    if isinstance(key, tuple) and len(key) == 2:
+        return key[1]  # (user_id, guild_id)
+    if cache == "temp_channels":
+        channel = bot.get_channel(key)
+        guild = getattr(channel, "guild", None)
+        return guild.id if guild else None
+    return None
+
+
+def build_memory_report(
+    bot: Any, sizeof: Callable[[Any, Set[int]], int] = deep_sizeof
+) -> MemoryReport:
+    """Собрать отчет по памяти кэшей бота.
+
+    Обход выполняется в event loop (кэши discord.py нельзя читать из
+    другого потока), поэтому отчет строится только по запросу. Объекты,
+    общие для нескольких серверов (пользователи), учитываются в первом.
+
+    Args:
+        bot: Экземпляр бота
+        sizeof: Функция оценки размера
+
+    Returns:
+        MemoryReport: Память по серверам
+    """
+
+    guilds = list(bot.guilds)
+    boundary = {id(bot), id(getattr(bot, "_connection", None))}
+    boundary.update(id(guild) for guild in guilds)
+    memory = {guild.id: GuildMemory(guild.id, guild.name) for guild in guilds}
+
+    messages: Dict[int, list] = defaultdict(list)
+    for message in bot.cached_messages:
+        if message.guild is not None:
+            messages[message.guild.id].append(message)
+
+    seen = set(boundary)
+    for guild in guilds:
+        entry = memory[guild.id]
+        caches = {
+            "members": getattr(guild, "_members", {}),
+            "channels": getattr(guild, "_channels", {}),
+            "threads": getattr(guild, "_threads", {}),
+            "roles": getattr(guild, "_roles", {}),
+            "emojis": guild.emojis,
+            "stickers": guild.stickers,
+            "messages": messages.get(guild.id, []),
+        }
+        for cache, items in caches.items():
+            if items:
+                entry.add(cache, sizeof(items, seen), len(items))
+
+    report = MemoryReport(guilds=list(memory.values()))
+    for service, attr in APP_CACHES:
+        data = getattr(getattr(bot, service, None), attr, None)
+        if not isinstance(data, dict) or not data:
+            continue
+        # Хеш-таблица словаря делится между серверами пропорционально записям
+        table = sys.getsizeof(data) / len(data)
+        unattributed = 0
+        for key, value in list(data.items()):
+            size = int(table) + sizeof(key, set(boundary)) + sizeof(value, set(boundary))
+            guild_id = _app_cache_guild(bot, attr, key)
+            if guild_id in memory:
+                memory[guild_id].add(attr, size)
+            else:
+                unattributed += size
+        if unattributed:
+            report.shared[attr] = unattributed
+
+    users = getattr(getattr(bot, "_connection", None), "_users", None)
+    if users:
+        # Пользователи, не попавшие в кэши серверов
+        report.shared["users"] = sizeof(users, seen)
+    return report
@@ -1,17 +1,17 @@
 """Модуль для мониторинга и отслеживания метрик бота."""
 
-import sentry_sdk
-from sentry_sdk.integrations.logging import LoggingIntegration
-from prometheus_client import start_http_server, Counter, Gauge, Histogram
+from prometheus_client import start_http_server, CollectorRegistry, Counter, Gauge, Histogram
 import time
 import os
 import platform
 import logging
 import traceback
 from functools import wraps
-from typing import Any, Callable, Dict, Optional, TypeVar, cast
+from typing import Any, Callable, Dict, Iterable, Optional, Set, TypeVar, cast
 import socket
 
+from utils.guild_labels import OTHER, GuildBreakdownCollector, GuildLabelPolicy
+
 # Настройка логгера
 logger = logging.getLogger(__name__)
 
@@ -37,6 +37,10 @@ def init_sentry(
         return
 
     try:
+        # sentry_sdk загружается только при настроенном DSN
+        import sentry_sdk
+        from sentry_sdk.integrations.logging import LoggingIntegration
+
         logging_integration = LoggingIntegration(
             level=logging.INFO,
             event_level=logging.ERROR,
@@ -70,6 +74,9 @@ def init_sentry(
         logger.error(f"Ошибка инициализации Sentry: {e}")
 
 
+# Метка guild_id: точная для top-K серверов и allowlist, остальные — "other"
+GUILD_LABELS = GuildLabelPolicy()
+
 # Prometheus метрики
 COMMANDS_TOTAL = Counter(
     "bot_commands_total", "Total commands processed", ["command", "guild_id", "success"]
@@ -102,12 +109,140 @@ MESSAGES_LATENCY = Histogram(
     "Message processing time in seconds",
     buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 0.75, 1.0, float("inf")),
 )
+MESSAGE_STAGE_LATENCY = Histogram(
+    "bot_message_stage_latency_seconds",
+    "Message pipeline stage time in seconds",
+    ["stage"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 0.75, 1.0, float("inf")),
+)
 ACTIVE_USERS = Gauge("bot_active_users", "Number of active users", ["guild_id"])
-GUILDS_COUNT = Gauge("bot_guilds_count", "Number of guilds the bot is connected to")
+# Шард обслуживается одним процессом кластера, поэтому значения процессов складываются
+GUILDS_COUNT = Gauge(
+    "bot_guilds_count",
+    "Number of guilds the bot is connected to",
+    ["shard"],
+    multiprocess_mode="livesum",
+)
+SHARD_LATENCY = Gauge(
+    "bot_shard_latency_seconds",
+    "Gateway heartbeat latency per shard",
+    ["shard"],
+    multiprocess_mode="livemax",
+)
+STARTUP_PHASE_DURATION = Gauge(
+    "bot_startup_phase_seconds",
+    "Duration of the last run of each startup phase",
+    ["phase"],
+    multiprocess_mode="liveall",
+)
+TIME_TO_READY = Gauge(
+    "bot_time_to_ready_seconds",
+    "Time from bot creation to the first READY event",
+    multiprocess_mode="livemax",
+)
 ERRORS_COUNT = Counter("bot_errors_total", "Total errors encountered", ["type", "module"])
 AUTOMOD_ACTIONS = Counter(
     "bot_automod_actions_total", "Total automod actions taken", ["action_type", "guild_id"]
 )
+AUTOMOD_RULE_CPU = Counter(
+    "bot_automod_rule_cpu_seconds_total", "CPU time spent evaluating automod rules", ["rule"]
+)
+AUTOMOD_RULE_TIMEOUTS = Counter(
+    "bot_automod_rule_timeouts_total", "Automod rule evaluations that timed out", ["rule"]
+)
+CACHE_ENTRIES = Gauge("bot_cache_entries", "Number of entries in in-memory caches", ["cache"])
+CACHE_EVICTIONS = Counter(
+    "bot_cache_evictions_total", "Entries evicted from in-memory caches", ["cache", "reason"]
+)
+JSON_SAVE_LATENCY = Histogram(
+    "bot_json_save_latency_seconds",
+    "JSON store serialisation and write time in seconds",
+    ["store"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, float("inf")),
+)
+JSON_COALESCED_WRITES = Counter(
+    "bot_json_coalesced_writes_total", "JSON store saves merged into a later write", ["store"]
+)
+# Метрики с меткой guild_id: (метрика, тип, описание, имена меток)
+GUILD_LABELLED_METRICS = {
+    "bot_commands_total": (
+        COMMANDS_TOTAL,
+        "counter",
+        "Total commands processed",
+        ("command", "guild_id", "success"),
+    ),
+    "bot_messages_processed": (
+        MESSAGES_PROCESSED,
+        "counter",
+        "Total messages processed",
+        ("guild_id",),
+    ),
+    "bot_active_users": (ACTIVE_USERS, "gauge", "Number of active users", ("guild_id",)),
+    "bot_automod_actions_total": (
+        AUTOMOD_ACTIONS,
+        "counter",
+        "Total automod actions taken",
+        ("action_type", "guild_id"),
+    ),
+}
+DISPATCH_QUEUE_DEPTH = Gauge(
+    "bot_dispatch_queue_depth",
+    "Events waiting in a guild worker queue",
+    ["worker"],
+    multiprocess_mode="liveall",
+)
+DISPATCH_QUEUE_WAIT = Histogram(
+    "bot_dispatch_queue_wait_seconds",
+    "Time an event waited in a guild worker queue",
+    ["worker"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, float("inf")),
+)
+DISPATCH_DROPPED = Counter(
+    "bot_dispatch_dropped_total", "Low-priority work shed by a saturated worker", ["worker", "kind"]
+)
+LOG_OUTBOX_BACKLOG = Gauge(
+    "bot_log_outbox_backlog",
+    "Log events waiting to be sent to log channels",
+    multiprocess_mode="livesum",
+)
+LOG_OUTBOX_LAG = Gauge(
+    "bot_log_outbox_lag_seconds",
+    "Age of the oldest undelivered log event in the durable outbox",
+    multiprocess_mode="livemax",
+)
+LOG_RETRIES = Counter(
+    "bot_log_retries_total", "Log deliveries rescheduled after a failed send", ["kind"]
+)
+LOG_DELIVERY_LATENCY = Histogram(
+    "bot_log_delivery_latency_seconds",
+    "Time from a log event to its delivery attempt",
+    buckets=(0.5, 1.0, 1.5, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, float("inf")),
+)
+LOG_BATCH_SIZE = Histogram(
+    "bot_log_embeds_per_message",
+    "Log embeds coalesced into one message",
+    buckets=(1, 2, 3, 5, 8, 10),
+)
+LOG_DROPPED = Counter(
+    "bot_log_dropped_total", "Log events dropped by an overloaded log channel queue", ["kind"]
+)
+LOG_SINK_MESSAGES = Counter(
+    "bot_log_sink_messages_total", "Log messages sent by delivery sink", ["sink"]
+)
+LOG_SINK_EMBEDS = Counter(
+    "bot_log_sink_embeds_total", "Log embeds sent by delivery sink", ["sink"]
+)
+LOG_SINK_LATENCY = Histogram(
+    "bot_log_sink_send_seconds",
+    "Duration of a log message send request by delivery sink",
+    ["sink"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf")),
+)
+AUDIT_LOG_LOOKUPS = Counter(
+    "bot_audit_log_lookups_total",
+    "Audit log attribution lookups by where the entry was found",
+    ["source"],
+)
 API_REQUESTS = Counter(
     "bot_api_requests_total",
     "Total API requests made to Discord",
@@ -156,6 +291,71 @@ def start_metrics_server(port: int = 8000) -> None:
         logger.error(f"Ошибка запуска сервера метрик: {e}")
 
 
+def configure_guild_labels(top_k: int, allowlist: Iterable[str] = ()) -> None:
+    """Настройка серверов с точной меткой guild_id.
+
+    Args:
+        top_k: Сколько серверов с наибольшим трафиком сохраняют точную метку
+        allowlist: ID серверов, всегда сохраняющих точную метку
+    """
+    GUILD_LABELS.configure(top_k, allowlist)
+
+
+def recompute_guild_labels() -> Set[str]:
+    """Пересчет top-K серверов и удаление серий выпавших из него серверов.
+
+    В multiprocess режиме (кластер) удаленные серии остаются в файлах
+    процесса до его перезапуска.
+
+    Returns:
+        Set[str]: Серверы, потерявшие точную метку
+    """
+    dropped = GUILD_LABELS.recompute()
+    if not dropped:
+        return dropped
+    for name, (metric, _, _, labelnames) in GUILD_LABELLED_METRICS.items():
+        index = labelnames.index("guild_id")
+        for labels in GUILD_LABELS.values(name):
+            if labels[index] in dropped:
+                try:
+                    metric.remove(*labels)
+                except KeyError:
+                    pass
+    logger.debug(f"Серверов без точной метки в метриках: {len(dropped)}")
+    return dropped
+
+
+def start_guild_metrics_server(port: int) -> None:
+    """Запуск отдельного эндпоинта с метриками по всем серверам.
+
+    Args:
+        port: Порт эндпоинта
+    """
+    registry = CollectorRegistry()
+    registry.register(
+        GuildBreakdownCollector(
+            GUILD_LABELS,
+            {
+                name: (kind, documentation, labelnames)
+                for name, (_, kind, documentation, labelnames) in GUILD_LABELLED_METRICS.items()
+            },
+        )
+    )
+    try:
+        start_http_server(port, registry=registry)
+        logger.info(f"Метрики по серверам доступны на порту {port}")
+    except Exception as e:
+        logger.error(f"Ошибка запуска сервера метрик по серверам: {e}")
+
+
+def _count_by_guild(metric: str, **labels: str) -> Dict[str, str]:
+    """Учесть событие в точной разбивке и вернуть метки для основной метрики."""
+
+    _, _, _, labelnames = GUILD_LABELLED_METRICS[metric]
+    GUILD_LABELS.count(metric, tuple(labels[name] for name in labelnames))
+    return {**labels, "guild_id": GUILD_LABELS.label(labels["guild_id"])}
+
+
 def monitor_command(func: Callable[..., Any]) -> Callable[..., Any]:
     """Декоратор для мониторинга выполнения команд.
 
@@ -176,8 +376,10 @@ def monitor_command(func: Callable[..., Any]) -> Callable[..., Any]:
         guild_id = str(ctx.guild.id) if ctx and hasattr(ctx, "guild") and ctx.guild else "dm"
 
         # Установка контекста для Sentry
-        with sentry_sdk.configure_scope() as scope:
-            if ctx:
+        if SENTRY_ENABLED and ctx:
+            import sentry_sdk
+
+            with sentry_sdk.configure_scope() as scope:
                 scope.set_tag("command", command_name)
                 if hasattr(ctx, "guild") and ctx.guild:
                     scope.set_tag("guild_id", guild_id)
@@ -193,16 +395,26 @@ def monitor_command(func: Callable[..., Any]) -> Callable[..., Any]:
             # Фиксация метрик
             execution_time = time.time() - start_time
             COMMANDS_LATENCY.labels(command=command_name).observe(execution_time)
-            COMMANDS_TOTAL.labels(command=command_name, guild_id=guild_id, success="true").inc()
+            COMMANDS_TOTAL.labels(
+                **_count_by_guild(
+                    "bot_commands_total", command=command_name, guild_id=guild_id, success="true"
+                )
+            ).inc()
 
             return result
         except Exception as e:
             # Фиксация ошибки
-            COMMANDS_TOTAL.labels(command=command_name, guild_id=guild_id, success="false").inc()
+            COMMANDS_TOTAL.labels(
+                **_count_by_guild(
+                    "bot_commands_total", command=command_name, guild_id=guild_id, success="false"
+                )
+            ).inc()
             ERRORS_COUNT.labels(type=type(e).__name__, module=func.__module__).inc()
 
             # Отправка ошибки в Sentry
             if SENTRY_ENABLED:
+                import sentry_sdk
+
                 extra_data = {
                     "command": command_name,
                     "guild_id": guild_id,
@@ -230,7 +442,9 @@ def track_message(guild_id: Optional[str] = None) -> None:
     Args:
         guild_id: ID гильдии, в которой было отправлено сообщение
     """
-    MESSAGES_PROCESSED.labels(guild_id=guild_id or "unknown").inc()
+    MESSAGES_PROCESSED.labels(
+        **_count_by_guild("bot_messages_processed", guild_id=guild_id or "unknown")
+    ).inc()
 
 
 def measure_message_processing_time(func: Callable[..., Any]) -> Callable[..., Any]:
@@ -255,6 +469,25 @@ def measure_message_processing_time(func: Callable[..., Any]) -> Callable[..., A
     return cast(Callable[..., Any], wrapper)
 
 
+def observe_message_latency(seconds: float) -> None:
+    """Отслеживание полного времени обработки сообщения.
+
+    Args:
+        seconds: Время обработки в секундах
+    """
+    MESSAGES_LATENCY.observe(seconds)
+
+
+def observe_message_stage(stage: str, seconds: float) -> None:
+    """Отслеживание времени стадии обработки сообщения.
+
+    Args:
+        stage: Название стадии (automod, leveling, commands)
+        seconds: Время стадии в секундах
+    """
+    MESSAGE_STAGE_LATENCY.labels(stage=stage).observe(seconds)
+
+
 def track_db_operation(operation: str, table: str) -> None:
     """Отслеживание операций с базой данных.
 
@@ -297,16 +530,52 @@ def update_active_users(count: int, guild_id: Optional[str] = None) -> None:
         count: Количество активных пользователей
         guild_id: ID гильдии (если указано)
     """
-    ACTIVE_USERS.labels(guild_id=guild_id or "all").set(count)
+    label = guild_id or "all"
+    GUILD_LABELS.set("bot_active_users", (label,), count)
+    folded = GUILD_LABELS.label(label)
+    if folded == OTHER:
+        # В "other" — сумма всех серверов без точной метки, а не последнее значение
+        count = GUILD_LABELS.folded_total("bot_active_users")
+    ACTIVE_USERS.labels(guild_id=folded).set(count)
 
 
-def update_guilds_count(count: int) -> None:
+def update_guilds_count(count: int, shard: str = "0") -> None:
     """Обновление количества серверов.
 
     Args:
         count: Количество серверов
+        shard: ID шарда
+    """
+    GUILDS_COUNT.labels(shard=shard).set(count)
+
+
+def update_shard_latency(shard: str, seconds: float) -> None:
+    """Обновление задержки heartbeat шарда.
+
+    Args:
+        shard: ID шарда
+        seconds: Задержка в секундах
+    """
+    SHARD_LATENCY.labels(shard=shard).set(seconds)
+
+
+def observe_startup_phase(phase: str, seconds: float) -> None:
+    """Отслеживание длительности фазы запуска.
+
+    Args:
+        phase: Название фазы
+        seconds: Длительность в секундах
+    """
+    STARTUP_PHASE_DURATION.labels(phase=phase).set(seconds)
+
+
+def update_time_to_ready(seconds: float) -> None:
+    """Обновление времени от создания бота до готовности.
+
+    Args:
+        seconds: Время в секундах
     """
-    GUILDS_COUNT.set(count)
+    TIME_TO_READY.set(seconds)
 
 
 def track_automod_action(action: str, guild_id: str) -> None:
@@ -316,7 +585,167 @@ def track_automod_action(action: str, guild_id: str) -> None:
         action: Тип действия
         guild_id: ID гильдии
     """
-    AUTOMOD_ACTIONS.labels(action_type=action, guild_id=guild_id).inc()
+    AUTOMOD_ACTIONS.labels(
+        **_count_by_guild("bot_automod_actions_total", action_type=action, guild_id=guild_id)
+    ).inc()
+
+
+def track_automod_rule(rule: str, cpu_seconds: float, timed_out: bool = False) -> None:
+    """Отслеживание CPU времени regex-правила автомодерации.
+
+    Args:
+        rule: Идентификатор правила
+        cpu_seconds: Затраченное CPU время в секундах
+        timed_out: Превысило ли вычисление таймаут
+    """
+    AUTOMOD_RULE_CPU.labels(rule=rule).inc(cpu_seconds)
+    if timed_out:
+        AUTOMOD_RULE_TIMEOUTS.labels(rule=rule).inc()
+
+
+def update_cache_entries(cache: str, count: int) -> None:
+    """Обновление количества записей во внутреннем кэше.
+
+    Args:
+        cache: Название кэша
+        count: Количество записей
+    """
+    CACHE_ENTRIES.labels(cache=cache).set(count)
+
+
+def track_cache_eviction(cache: str, reason: str) -> None:
+    """Отслеживание вытеснения записи из внутреннего кэша.
+
+    Args:
+        cache: Название кэша
+        reason: Причина вытеснения (expired, lru)
+    """
+    CACHE_EVICTIONS.labels(cache=cache, reason=reason).inc()
+
+
+def observe_json_save(store: str, seconds: float) -> None:
+    """Отслеживание времени записи JSON стора.
+
+    Args:
+        store: Имя файла стора
+        seconds: Время сериализации и записи в секундах
+    """
+    JSON_SAVE_LATENCY.labels(store=store).observe(seconds)
+
+
+def track_json_coalesced_write(store: str) -> None:
+    """Отслеживание сохранения, объединенного с последующей записью.
+
+    Args:
+        store: Имя файла стора
+    """
+    JSON_COALESCED_WRITES.labels(store=store).inc()
+
+
+def update_dispatch_queue_depth(worker: str, depth: int) -> None:
+    """Обновление глубины очереди воркера сообщений.
+
+    Args:
+        worker: Номер воркера
+        depth: Количество событий в очереди
+    """
+    DISPATCH_QUEUE_DEPTH.labels(worker=worker).set(depth)
+
+
+def observe_dispatch_wait(worker: str, seconds: float) -> None:
+    """Отслеживание времени ожидания события в очереди воркера.
+
+    Args:
+        worker: Номер воркера
+        seconds: Время ожидания в секундах
+    """
+    DISPATCH_QUEUE_WAIT.labels(worker=worker).observe(seconds)
+
+
+def track_dispatch_drop(worker: str, kind: str) -> None:
+    """Отслеживание сброшенной низкоприоритетной работы.
+
+    Args:
+        worker: Номер воркера
+        kind: Тип работы (leveling)
+    """
+    DISPATCH_DROPPED.labels(worker=worker, kind=kind).inc()
+
+
+def update_log_backlog(count: int) -> None:
+    """Обновление числа логов, ожидающих отправки.
+
+    Args:
+        count: Количество событий в очередях каналов логов
+    """
+    LOG_OUTBOX_BACKLOG.set(count)
+
+
+def update_log_outbox_lag(seconds: float) -> None:
+    """Обновление задержки очереди логов в БД.
+
+    Args:
+        seconds: Возраст самого старого неотправленного события
+    """
+    LOG_OUTBOX_LAG.set(seconds)
+
+
+def track_log_retry(kind: str) -> None:
+    """Отслеживание повторной попытки отправки лога.
+
+    Args:
+        kind: Тип события (message_edit, voice_state, ...)
+    """
+    LOG_RETRIES.labels(kind=kind).inc()
+
+
+def observe_log_delivery(seconds: float) -> None:
+    """Отслеживание задержки доставки лога.
+
+    Args:
+        seconds: Время от события до отправки в секундах
+    """
+    LOG_DELIVERY_LATENCY.observe(seconds)
+
+
+def observe_log_batch(embeds: int) -> None:
+    """Отслеживание числа embed в одном сообщении логов.
+
+    Args:
+        embeds: Количество embed в сообщении
+    """
+    LOG_BATCH_SIZE.observe(embeds)
+
+
+def track_log_dropped(kind: str) -> None:
+    """Отслеживание отброшенного события логов.
+
+    Args:
+        kind: Тип события (message_edit, voice_state, ...)
+    """
+    LOG_DROPPED.labels(kind=kind).inc()
+
+
+def observe_log_sink_send(sink: str, embeds: int, seconds: float) -> None:
+    """Отслеживание отправленного сообщения логов.
+
+    Args:
+        sink: Способ отправки (channel, webhook)
+        embeds: Количество embed в сообщении
+        seconds: Длительность запроса, включая ожидание лимитов
+    """
+    LOG_SINK_MESSAGES.labels(sink=sink).inc()
+    LOG_SINK_EMBEDS.labels(sink=sink).inc(embeds)
+    LOG_SINK_LATENCY.labels(sink=sink).observe(seconds)
+
+
+def track_audit_log_lookup(source: str) -> None:
+    """Отслеживание поиска записи журнала аудита.
+
+    Args:
+        source: Где найдена запись (cache, gateway, fetch) или miss
+    """
+    AUDIT_LOG_LOOKUPS.labels(source=source).inc()
 
 
 def track_api_request(endpoint: str, method: str, status_code: int) -> None:
@@ -407,6 +836,8 @@ def capture_error(error: Exception, context: Optional[Dict[str, Any]] = None) ->
 
         # Отправка в Sentry если настроен
         if SENTRY_ENABLED:
+            import sentry_sdk
+
             with sentry_sdk.configure_scope() as scope:
                 if context:
                     for key, value in context.items():
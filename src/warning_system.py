@@ -1,5 +1,7 @@
 """Модуль системы предупреждений."""
 
+import logging
+
 import discord
 from discord import app_commands
 from discord.ext import commands
@@ -9,6 +11,9 @@ from typing import Dict, List, Union
 from infrastructure.config import WarningsConfigStore, WarningsStore
 
 from application.contracts import WarningsRepositoryContract
+from application.data_migrations import DataMigrationRunner
+
+logger = logging.getLogger(__name__)
 
 
 class WarningSystem(commands.Cog):
@@ -18,9 +23,11 @@ class WarningSystem(commands.Cog):
         repository: WarningsRepositoryContract | None = None,
         store: WarningsStore | None = None,
         config_store: WarningsConfigStore | None = None,
+        migrations: DataMigrationRunner | None = None,
     ):
         self.bot = bot
         self.repository = repository
+        self.migrations = migrations
         self.store = store or WarningsStore()
         self.config_store = config_store or WarningsConfigStore()
         self.warnings = self.load_warnings()
@@ -46,18 +53,82 @@ class WarningSystem(commands.Cog):
         """
         return self.config_store.load()
 
+    def refresh_config(self) -> bool:
+        """Перечитать конфигурацию, если ее изменил другой процесс кластера.
+
+        Returns:
+            bool: True если конфигурация изменилась
+        """
+        data = self.config_store.refresh()
+        if data is None:
+            return False
+        self.config = data
+        return True
+
     async def migrate_to_db(self) -> None:
         """Миграция предупреждений из JSON в БД."""
 
         if not self.repository:
             return
 
-        await self.repository.migrate_from_json(self.warnings)
+        if self.migrations is None:
+            await self.repository.migrate_from_json(self.warnings)
+            return
+
+        # Раньше каждый запуск вставлял все предупреждения из JSON заново
+        removed = await self.migrations.run_once(
+            "warnings_dedupe", self.repository.delete_duplicates
+        )
+        if removed:
+            logger.info(f"Удалено повторно перенесенных предупреждений: {removed}")
+        await self.migrations.run(
+            "warnings_json",
+            self.store.source_paths,
+            lambda: self.repository.migrate_from_json(self.warnings),
+        )
+
+    async def fetch_user_warnings(self, guild_id: int, user_id: int) -> List[Dict]:
+        """Получение предупреждений пользователя из БД.
+
+        Когда БД подключена, она единственный источник предупреждений:
+        `warnings.json` больше не пишется и остается только источником
+        миграции, поэтому его контрольная сумма не меняется между запусками.
+
+        Args:
+            guild_id: ID сервера
+            user_id: ID пользователя
+
+        Returns:
+            List[Dict]: Предупреждения в формате `warnings.json` с полем `id` из БД
+        """
+        if not self.repository:
+            return self.get_user_warnings(guild_id, user_id)
+
+        return [
+            {
+                "id": row["id"],
+                "reason": row["reason"],
+                "moderator": row["issued_by"],
+                "timestamp": row["issued_at"],
+            }
+            for row in await self.repository.list_warnings(guild_id, user_id)
+        ]
 
     def save_warnings(self) -> None:
         """Сохранение предупреждений в файл."""
         self.store.save(self.warnings)
 
+    def save_user_warnings(self, guild_id: int, user_id: int) -> None:
+        """Сохранение предупреждений одного пользователя.
+
+        Args:
+            guild_id: ID сервера
+            user_id: ID пользователя
+        """
+        self.store.set_user_warnings(
+            str(guild_id), str(user_id), self.get_user_warnings(guild_id, user_id)
+        )
+
     def get_user_warnings(self, guild_id: int, user_id: int) -> List[Dict]:
         """Получение предупреждений пользователя.
 
@@ -85,6 +156,10 @@ class WarningSystem(commands.Cog):
         Args:
             db: Сессия базы данных
         """
+        if self.repository:
+            await self.repository.cleanup_expired(days=30)
+            return
+
         current_time = datetime.utcnow()
         expiration_time = timedelta(days=30)  # Предупреждения истекают через 30 дней
 
@@ -107,8 +182,6 @@ class WarningSystem(commands.Cog):
                 del self.warnings[guild_id]
 
         self.save_warnings()
-        if self.repository:
-            await self.repository.cleanup_expired(days=30)
 
     @commands.hybrid_command(name="warn_add", description="Выдать предупреждение участнику")
     @commands.has_permissions(kick_members=True)
@@ -142,9 +215,6 @@ class WarningSystem(commands.Cog):
             "timestamp": datetime.utcnow().isoformat(),
         }
 
-        warnings = self.get_user_warnings(ctx.guild.id, member.id)
-        warnings.append(warning)
-        self.save_warnings()
         if self.repository:
             await self.repository.add_warning(
                 ctx.guild.id,
@@ -154,8 +224,11 @@ class WarningSystem(commands.Cog):
                 warning["timestamp"],
                 None,
             )
+        else:
+            self.get_user_warnings(ctx.guild.id, member.id).append(warning)
+            self.save_user_warnings(ctx.guild.id, member.id)
 
-        warning_count = len(warnings)
+        warning_count = len(await self.fetch_user_warnings(ctx.guild.id, member.id))
 
         embed = discord.Embed(
             title="Выдано предупреждение", color=discord.Color.orange(), timestamp=datetime.utcnow()
@@ -230,7 +303,7 @@ class WarningSystem(commands.Cog):
     ):
         """Удалить предупреждение у участника."""
         is_interaction = isinstance(ctx, discord.Interaction)
-        warnings = self.get_user_warnings(ctx.guild.id, member.id)
+        warnings = await self.fetch_user_warnings(ctx.guild.id, member.id)
 
         if not warnings:
             response = "У этого участника нет предупреждений"
@@ -245,11 +318,10 @@ class WarningSystem(commands.Cog):
             )
 
         removed = warnings.pop(index - 1)
-        self.save_warnings()
         if self.repository:
-            listed = await self.repository.list_warnings(ctx.guild.id, member.id)
-            if 0 <= index - 1 < len(listed):
-                await self.repository.delete_warning(listed[index - 1]["id"])
+            await self.repository.delete_warning(removed["id"])
+        else:
+            self.save_user_warnings(ctx.guild.id, member.id)
 
         await (ctx.response.send_message if is_interaction else ctx.send)(
             f'Предупреждение #{index} было удалено у {member.mention}: "{removed["reason"]}"'
@@ -264,7 +336,7 @@ class WarningSystem(commands.Cog):
     ):
         """Показать список предупреждений участника."""
         is_interaction = isinstance(ctx, discord.Interaction)
-        warnings = self.get_user_warnings(ctx.guild.id, member.id)
+        warnings = await self.fetch_user_warnings(ctx.guild.id, member.id)
 
         if not warnings:
             response = "У этого участника нет предупреждений"
@@ -296,7 +368,7 @@ class WarningSystem(commands.Cog):
     ):
         """Очистить все предупреждения участника."""
         is_interaction = isinstance(ctx, discord.Interaction)
-        warnings = self.get_user_warnings(ctx.guild.id, member.id)
+        warnings = await self.fetch_user_warnings(ctx.guild.id, member.id)
 
         if not warnings:
             response = "У этого участника нет предупреждений"
@@ -304,10 +376,11 @@ class WarningSystem(commands.Cog):
                 response, ephemeral=True
             )
 
-        self.warnings[str(ctx.guild.id)][str(member.id)] = []
-        self.save_warnings()
         if self.repository:
             await self.repository.clear_user_warnings(ctx.guild.id, member.id)
+        else:
+            self.warnings[str(ctx.guild.id)][str(member.id)] = []
+            self.save_user_warnings(ctx.guild.id, member.id)
 
         await (ctx.response.send_message if is_interaction else ctx.send)(
             f"Все предупреждения {member.mention} были удалены"
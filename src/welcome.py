@@ -1,25 +1,13 @@
 import discord
 from discord import app_commands
-import json
-from pathlib import Path
+
+from application.guild_settings import GuildSettingsService
 
 
 class Welcome:
-    def __init__(self, bot):
+    def __init__(self, bot, settings: GuildSettingsService):
         self.bot = bot
-        self.config_file = Path("data") / "welcome_config.json"
-        self.load_config()
-
-    def load_config(self):
-        if self.config_file.exists():
-            with open(self.config_file, "r") as f:
-                self.config = json.load(f)
-        else:
-            self.config = {}
-
-    def save_config(self):
-        with open(self.config_file, "w") as f:
-            json.dump(self.config, f, indent=4)
+        self.settings = settings
 
     async def setup(self):
         @self.bot.tree.command(name="setwelcome", description="Установить канал для приветствий")
@@ -44,8 +32,7 @@ class Welcome:
                 )
                 return
 
-            self.config[str(interaction.guild.id)] = channel.id
-            self.save_config()
+            await self.settings.update(interaction.guild.id, welcome_channel_id=channel.id)
 
             embed = discord.Embed(
                 title="✅ Канал приветствий установлен",
@@ -55,10 +42,11 @@ class Welcome:
             await interaction.response.send_message(embed=embed)
 
     async def send_welcome(self, member):
-        if str(member.guild.id) not in self.config:
+        channel_id = self.settings.get(member.guild.id).welcome_channel_id
+        if channel_id is None:
             return
 
-        channel = member.guild.get_channel(self.config[str(member.guild.id)])
+        channel = member.guild.get_channel(channel_id)
         if not channel:
             return
 
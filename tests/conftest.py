@@ -5,3 +5,15 @@ ROOT = os.path.dirname(os.path.dirname(__file__))
 SRC = os.path.join(ROOT, "src")
 if SRC not in sys.path:
     sys.path.append(SRC)
+
+from unittest.mock import AsyncMock
+
+import pytest
+
+
+@pytest.fixture
+def guild_settings():
+    """Сервис настроек серверов с мок-репозиторием."""
+    from application.guild_settings import GuildSettingsService
+
+    return GuildSettingsService(AsyncMock())
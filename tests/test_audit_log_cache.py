@@ -0,0 +1,103 @@
+"""Тесты кэша записей журнала аудита."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import discord
+import pytest
+
+from infrastructure.cache import AuditLogCache
+
+BAN = discord.AuditLogAction.ban
+
+
+def make_guild(entries=(), error=None):
+    guild = MagicMock()
+    guild.id = 1
+    guild.fetches = 0
+
+    async def audit_logs(limit, action):
+        guild.fetches += 1
+        await asyncio.sleep(0)
+        if error is not None:
+            raise error
+        for entry in entries:
+            yield entry
+
+    guild.audit_logs = audit_logs
+    return guild
+
+
+def make_entry(entry_id, target_id, guild=None, action=BAN, age=0.0, reason="Spam"):
+    entry = MagicMock()
+    entry.id = entry_id
+    entry.created_at = datetime.now(timezone.utc) - timedelta(seconds=age)
+    entry.guild = guild
+    entry.action = action
+    entry.target = MagicMock(id=target_id)
+    entry.user_id = 500
+    entry.reason = reason
+    return entry
+
+
+class TestAuditLogCache:
+    """Тесты атрибуции действий по записям журнала аудита."""
+
+    async def test_gateway_entry_found_without_fetch(self):
+        guild = make_guild()
+        cache = AuditLogCache(wait=0)
+        cache.add(make_entry(10, 42, guild))
+
+        record = await cache.find(guild, BAN, 42)
+
+        assert record.entry_id == 10
+        assert record.reason == "Spam"
+        assert guild.fetches == 0
+
+    async def test_waits_for_late_gateway_entry(self):
+        guild = make_guild()
+        cache = AuditLogCache(wait=1.0)
+
+        lookup = asyncio.create_task(cache.find(guild, BAN, 42))
+        await asyncio.sleep(0)
+        cache.add(make_entry(10, 42, guild))
+
+        record = await lookup
+        assert record.entry_id == 10
+        assert guild.fetches == 0
+
+    async def test_concurrent_misses_share_one_fetch(self):
+        guild = make_guild([make_entry(10, 42), make_entry(11, 43)])
+        cache = AuditLogCache(wait=0)
+
+        first, second = await asyncio.gather(
+            cache.find(guild, BAN, 42), cache.find(guild, BAN, 43)
+        )
+
+        assert (first.entry_id, second.entry_id) == (10, 11)
+        assert guild.fetches == 1
+
+    async def test_taken_entry_not_reused(self):
+        entry = make_entry(10, 42)
+        guild = make_guild([entry])
+        cache = AuditLogCache(wait=0)
+        cache.add(make_entry(10, 42, guild))
+
+        assert (await cache.find(guild, BAN, 42)).entry_id == 10
+        # REST запрос вернет ту же запись, но она уже использована
+        assert await cache.find(guild, BAN, 42) is None
+
+    async def test_stale_entry_ignored(self):
+        guild = make_guild()
+        cache = AuditLogCache(ttl=60, wait=0)
+        cache.add(make_entry(10, 42, guild, age=120))
+
+        assert await cache.find(guild, BAN, 42) is None
+
+    async def test_forbidden_returns_none(self):
+        guild = make_guild(error=discord.Forbidden(MagicMock(), "No access"))
+        cache = AuditLogCache(wait=0)
+
+        assert await cache.find(guild, BAN, 42) is None
+        assert guild.fetches == 1
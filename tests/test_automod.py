@@ -1,5 +1,7 @@
 """Тесты для системы автомодерации."""
 
+import time
+
 import pytest
 from datetime import datetime, timedelta
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -37,16 +39,53 @@ class TestAutoModConfiguration:
 
     def test_save_config(self, automod):
         """Тест сохранения конфигурации."""
-        automod.config["spam_threshold"] = 10
-        automod.save_config()
+        previous = automod.config
+
+        automod.update_config(spam_threshold=10)
+
+        assert automod.config["spam_threshold"] == 10
+        assert automod.config.version == previous.version + 1
+        # Старый снапшот не меняется
+        assert previous["spam_threshold"] == 5
+        # В хранилище пишутся только измененные ключи
+        automod.store.update.assert_called_once_with({"spam_threshold": 10})
+
+    def test_refresh_config_publishes_new_version(self, automod):
+        """Тест публикации конфигурации, измененной другим процессом."""
+        previous = automod.config
+        automod.store.refresh.return_value = {**automod.store.load.return_value, "max_mentions": 9}
+
+        assert automod.refresh_config() is True
+        assert automod.config["max_mentions"] == 9
+        assert automod.config.version == previous.version + 1
+
+        automod.store.refresh.return_value = None
+        assert automod.refresh_config() is False
 
-        automod.store.save.assert_called_once_with(automod.config)
+    def test_config_snapshot_is_read_only(self, automod):
+        """Тест что снапшот нельзя изменить на месте."""
+        with pytest.raises(TypeError):
+            automod.config["spam_threshold"] = 10
+        with pytest.raises(AttributeError):
+            automod.config["banned_words"].append("word")
+
+    def test_banned_words_matcher_memoised_per_version(self, automod):
+        """Тест что производные структуры строятся один раз на версию."""
+        from automod import _compile_banned_words
+
+        matcher = automod.config.derive("banned_words", _compile_banned_words)
+        assert automod.config.derive("banned_words", _compile_banned_words) is matcher
+
+        automod.update_config(banned_words=["other"])
+        new_matcher = automod.config.derive("banned_words", _compile_banned_words)
+        assert new_matcher is not matcher
+        assert new_matcher.search("some other text")
 
     def test_default_config_values(self, automod):
         """Тест значений конфигурации по умолчанию."""
         assert automod.config["max_warnings"] == 3
         assert automod.config["mute_duration"] == "1h"
-        assert isinstance(automod.config["banned_words"], list)
+        assert automod.config["banned_words"] == ("badword1", "badword2")
 
 
 class TestAutoModBannedWords:
@@ -211,7 +250,7 @@ class TestAutoModSpamDetection:
         await automod.check_message(message)
         await automod.check_message(message)
 
-        user_key = f"{author.id}_{guild.id}"
+        user_key = (author.id, guild.id)
         assert len(automod.spam_counter[user_key]) == 2
 
         # Имитируем прошедшее время
@@ -332,7 +371,7 @@ class TestAutoModWarnings:
 
         await automod.add_warning(member, "Test reason")
 
-        user_key = f"{member.id}_{guild.id}"
+        user_key = (member.id, guild.id)
         assert automod.warning_counter[user_key] == 1
 
     @pytest.mark.asyncio
@@ -348,7 +387,7 @@ class TestAutoModWarnings:
         member.send = AsyncMock()
         member.timeout = AsyncMock()
 
-        user_key = f"{member.id}_{guild.id}"
+        user_key = (member.id, guild.id)
         automod.warning_counter[user_key] = 2  # Уже 2 предупреждения
 
         await automod.add_warning(member, "Third warning")
@@ -415,18 +454,19 @@ class TestAutoModCleanup:
         # Свежие записи должны остаться
         assert "user_1" in automod.spam_counter
 
-    def test_cleanup_clears_warnings_after_hour(self, automod):
-        """Тест очистки предупреждений после часа."""
-        automod.warning_counter["user_1"] = 2
-        automod.warning_counter["user_2"] = 1
+    def test_cleanup_expires_warnings_per_entry(self, automod):
+        """Тест истечения счетчиков предупреждений по собственному TTL."""
+        now = time.time()
+        automod.warning_counter.set((1, 10), 2, expires_at=now - 1)
+        automod.warning_counter.set((2, 10), 1, expires_at=now + 600)
 
-        # Устанавливаем время последней очистки более часа назад
-        automod._last_cleanup = datetime.now() - timedelta(hours=2)
+        automod._last_cleanup = datetime.now() - timedelta(minutes=6)
 
         automod._cleanup_old_entries()
 
-        # Все предупреждения должны быть очищены
-        assert len(automod.warning_counter) == 0
+        # Истекший счетчик удален, свежий остался
+        assert (1, 10) not in automod.warning_counter
+        assert automod.warning_counter[(2, 10)] == 1
 
 
 class TestAutoModBotMessages:
@@ -481,3 +521,190 @@ class TestAutoModBotMessages:
         result = await automod.check_message(message)
 
         assert result is True
+
+
+class TestAutoModRegexRules:
+    """Тесты пользовательских regex-правил."""
+
+    @pytest.fixture
+    def automod(self):
+        """Фикстура для создания системы автомодерации."""
+        bot = MagicMock()
+        store = MagicMock(spec=AutomodConfigStore)
+        store.load.return_value = {
+            "banned_words": [],
+            "spam_threshold": 5,
+            "spam_interval": 5,
+            "max_mentions": 5,
+            "max_warnings": 3,
+            "mute_duration": "1h",
+            "regex_rules": [],
+            "regex_max_timeouts": 2,
+        }
+        pool = MagicMock()
+        pool.stats = {}
+        pool.search = AsyncMock(return_value=False)
+
+        system = AutoMod(bot, store, pool)
+        return system
+
+    def test_add_regex_rule_classifies_pattern(self, automod):
+        """Тест классификации правил при добавлении."""
+        cheap = automod.add_regex_rule(r"free\s+nitro")
+        heavy = automod.add_regex_rule(r"(a+)+$")
+
+        assert cheap["heavy"] is False
+        assert heavy["heavy"] is True
+        assert heavy["id"] == cheap["id"] + 1
+        automod.store.update.assert_called()
+
+    def test_add_invalid_regex_rule_raises(self, automod):
+        """Тест отклонения некорректного выражения."""
+        import re
+
+        with pytest.raises(re.error):
+            automod.add_regex_rule(r"(unclosed")
+        assert automod.config["regex_rules"] == ()
+
+    @pytest.mark.asyncio
+    async def test_cheap_rule_runs_inline(self, automod):
+        """Тест инлайн-проверки простого правила."""
+        automod.add_regex_rule(r"free\s+nitro")
+
+        assert await automod.match_regex_rules("get free   nitro here") is True
+        automod.rule_pool.search.assert_not_called()
+        automod.rule_pool.record.assert_called()
+
+    @pytest.mark.asyncio
+    async def test_heavy_rule_dispatched_to_pool(self, automod):
+        """Тест отправки тяжелого правила в пул."""
+        automod.add_regex_rule(r"(a+)+$")
+        automod.rule_pool.search.return_value = True
+
+        assert await automod.match_regex_rules("aaaa") is True
+        automod.rule_pool.search.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_rule_disabled_after_repeated_timeouts(self, automod):
+        """Тест авто-отключения правила после таймаутов."""
+        from infrastructure.workers import RegexTimeoutError, RuleStats
+
+        automod.add_regex_rule(r"(a+)+$")
+        automod.rule_pool.search.side_effect = RegexTimeoutError()
+        automod.rule_pool.stats["1"] = RuleStats(timeouts=5, consecutive_timeouts=1)
+
+        assert await automod.match_regex_rules("aaaa") is False
+        assert automod.config["regex_rules"][0]["enabled"] is True
+
+        automod.rule_pool.stats["1"].consecutive_timeouts = 2
+        assert await automod.match_regex_rules("aaaa") is False
+        assert automod.config["regex_rules"][0]["enabled"] is False
+
+        automod.rule_pool.search.reset_mock()
+        await automod.match_regex_rules("aaaa")
+        automod.rule_pool.search.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_check_message_deletes_on_regex_match(self, automod):
+        """Тест удаления сообщения при срабатывании правила."""
+        automod.add_regex_rule(r"discord\.gg/\w+")
+        automod.add_warning = AsyncMock()
+
+        guild = MagicMock()
+        guild.id = 123456
+        author = MagicMock(spec=discord.Member)
+        author.bot = False
+        author.id = 789012
+
+        message = MagicMock(spec=discord.Message)
+        message.content = "join discord.gg/abc"
+        message.author = author
+        message.guild = guild
+        message.mentions = []
+        message.delete = AsyncMock()
+
+        assert await automod.check_message(message) is False
+        message.delete.assert_called_once()
+        automod.add_warning.assert_called_once()
+
+
+class TestAutoModWarningPersistence:
+    """Тесты сохранения счетчиков предупреждений в БД."""
+
+    @pytest.fixture
+    def automod(self):
+        """Фикстура для создания системы автомодерации с репозиторием."""
+        bot = MagicMock()
+        store = MagicMock(spec=AutomodConfigStore)
+        store.load.return_value = {
+            "banned_words": [],
+            "spam_threshold": 5,
+            "spam_interval": 5,
+            "max_mentions": 5,
+            "max_warnings": 3,
+            "mute_duration": "1h",
+            "warning_ttl": 600,
+        }
+        repository = MagicMock()
+        repository.load_active = AsyncMock(return_value=[])
+        repository.upsert_many = AsyncMock()
+        repository.delete_many = AsyncMock()
+        repository.delete_expired = AsyncMock()
+
+        return AutoMod(bot, store, MagicMock(), repository, warning_cache_size=2)
+
+    @pytest.mark.asyncio
+    async def test_load_restores_counters(self, automod):
+        """Тест восстановления счетчиков после рестарта."""
+        expires_at = time.time() + 100
+        automod.counters_repository.load_active.return_value = [
+            {"user_id": 1, "guild_id": 10, "count": 2, "expires_at": expires_at}
+        ]
+
+        assert await automod.load_warning_counters() == 1
+        assert automod.warning_counter[(1, 10)] == 2
+        assert automod.warning_counter.expires_at((1, 10)) == expires_at
+
+    @pytest.mark.asyncio
+    async def test_flush_writes_dirty_counters_in_batch(self, automod):
+        """Тест пакетной записи измененных счетчиков."""
+        guild = MagicMock()
+        guild.id = 10
+        for user_id in (1, 2):
+            member = MagicMock(spec=discord.Member)
+            member.id = user_id
+            member.guild = guild
+            member.send = AsyncMock()
+            await automod.add_warning(member, "reason")
+
+        assert await automod.flush_warning_counters() == 2
+        rows = automod.counters_repository.upsert_many.call_args[0][0]
+        assert sorted((row[0], row[1], row[2]) for row in rows) == [(1, 10, 1), (2, 10, 1)]
+
+        # Повторный flush без изменений ничего не пишет
+        automod.counters_repository.upsert_many.reset_mock()
+        assert await automod.flush_warning_counters() == 0
+        automod.counters_repository.upsert_many.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_flush_deletes_evicted_counters(self, automod):
+        """Тест удаления вытесненных счетчиков из БД."""
+        for user_id in (1, 2, 3):
+            automod.warning_counter[(user_id, 10)] = 1
+            automod._dirty_counters.add((user_id, 10))
+
+        await automod.flush_warning_counters()
+
+        # maxsize=2: первая запись вытеснена по LRU
+        automod.counters_repository.delete_many.assert_called_once_with([(1, 10)])
+        assert automod.warning_counter.evictions["lru"] == 1
+
+    @pytest.mark.asyncio
+    async def test_flush_keeps_dirty_keys_on_error(self, automod):
+        """Тест повторной попытки сохранения после ошибки."""
+        automod.warning_counter[(1, 10)] = 1
+        automod._dirty_counters.add((1, 10))
+        automod.counters_repository.upsert_many.side_effect = Exception("db locked")
+
+        assert await automod.flush_warning_counters() == 0
+        assert (1, 10) in automod._dirty_counters
@@ -1,5 +1,7 @@
 """Тесты для основного класса бота."""
 
+import asyncio
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 import discord
@@ -25,6 +27,10 @@ class TestBotInitialization:
         container.use_metrics = False
         container.initial_extensions = []
         container.image_generator = MagicMock()
+        container.guild_settings = MagicMock()
+        container.guild_settings.import_legacy_json = AsyncMock(return_value=0)
+        container.guild_settings.load = AsyncMock(return_value=0)
+        container.message_dispatcher = MagicMock()
 
         # Мокаем build_services
         services = MagicMock()
@@ -108,6 +114,15 @@ class TestBotSetupHook:
         container.use_metrics = False
         container.initial_extensions = []
         container.image_generator = MagicMock()
+        container.guild_settings = MagicMock()
+        container.guild_settings.import_legacy_json = AsyncMock(return_value=0)
+        container.guild_settings.load = AsyncMock(return_value=0)
+        container.message_dispatcher = MagicMock()
+        container.build_command_sync.return_value.run = AsyncMock()
+        container.image_generator.preload_fonts = AsyncMock(return_value=5)
+        container.log_outbox = MagicMock()
+        container.log_outbox.start = AsyncMock(return_value=0)
+        container.config_refresh_interval = 5.0
 
         services = MagicMock()
         services.moderation = MagicMock()
@@ -119,6 +134,7 @@ class TestBotSetupHook:
         services.leveling.migrate_to_db = AsyncMock()
 
         services.automod = MagicMock()
+        services.automod.load_warning_counters = AsyncMock(return_value=0)
         services.logging = MagicMock()
         services.tickets = MagicMock()
         services.temp_voice = MagicMock()
@@ -139,6 +155,7 @@ class TestBotSetupHook:
 
         # Проверяем что setup БД был вызван
         mock_container.db.setup.assert_called_once()
+        mock_container.build_command_sync.return_value.run.assert_awaited_once()
 
     @pytest.mark.asyncio
     async def test_setup_hook_with_extensions(self, mock_container):
@@ -155,6 +172,46 @@ class TestBotSetupHook:
         # Проверяем что БД инициализирована
         mock_container.db.setup.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_setup_hook_loads_extensions_while_database_starts(self, mock_container):
+        """Тест что коги загружаются, не дожидаясь подключения к БД."""
+        mock_container.initial_extensions = ["cogs.events"]
+        extension_loaded = asyncio.Event()
+
+        async def slow_database():
+            await asyncio.wait_for(extension_loaded.wait(), 1)
+
+        mock_container.db.setup = AsyncMock(side_effect=slow_database)
+        bot = Bot(mock_container)
+        bot.load_extension = AsyncMock(side_effect=lambda name: extension_loaded.set())
+
+        await bot.setup_hook()
+
+        bot.load_extension.assert_awaited_once_with("cogs.events")
+
+    @pytest.mark.asyncio
+    async def test_on_ready_records_time_to_ready_once(self, mock_container):
+        """Тест метрики времени до готовности."""
+        bot = Bot(mock_container)
+
+        with patch("app.bot.update_time_to_ready") as update:
+            await bot.on_ready()
+            await bot.on_ready()
+
+        update.assert_called_once()
+        assert bot.ready_after >= 0
+
+    def test_background_tasks_wait_until_ready(self):
+        """Тест что все фоновые задачи ждут готовности бота."""
+        loops = (
+            Bot.cleanup_tasks,
+            Bot.update_metrics,
+            Bot.flush_counters,
+            Bot.flush_voice_activity,
+            Bot.refresh_config,
+        )
+        assert all(loop._before_loop is Bot.before_tasks for loop in loops)
+
 
 class TestBotEventHandlers:
     """Тесты обработчиков событий бота."""
@@ -170,6 +227,10 @@ class TestBotEventHandlers:
         container.use_metrics = False
         container.initial_extensions = []
         container.image_generator = MagicMock()
+        container.guild_settings = MagicMock()
+        container.guild_settings.import_legacy_json = AsyncMock(return_value=0)
+        container.guild_settings.load = AsyncMock(return_value=0)
+        container.message_dispatcher = MagicMock()
 
         services = MagicMock()
         services.moderation = MagicMock()
@@ -217,6 +278,10 @@ class TestBotServices:
         container.use_metrics = False
         container.initial_extensions = []
         container.image_generator = MagicMock()
+        container.guild_settings = MagicMock()
+        container.guild_settings.import_legacy_json = AsyncMock(return_value=0)
+        container.guild_settings.load = AsyncMock(return_value=0)
+        container.message_dispatcher = MagicMock()
 
         # Создаем реальные моки сервисов
         services = MagicMock()
@@ -306,6 +371,10 @@ class TestBotConfiguration:
         container.metrics_port = 8000
         container.initial_extensions = ["cogs.events", "cogs.commands"]
         container.image_generator = MagicMock()
+        container.guild_settings = MagicMock()
+        container.guild_settings.import_legacy_json = AsyncMock(return_value=0)
+        container.guild_settings.load = AsyncMock(return_value=0)
+        container.message_dispatcher = MagicMock()
 
         services = MagicMock()
         services.moderation = MagicMock()
@@ -347,3 +416,100 @@ class TestBotConfiguration:
         bot = Bot(mock_container)
 
         assert bot.image_generator == mock_container.image_generator
+
+
+class TestBotShutdown:
+    """Тесты согласованной остановки бота."""
+
+    @pytest.fixture
+    def mock_container(self):
+        """Фикстура для создания мок контейнера."""
+        container = MagicMock(spec=Container)
+
+        container.db = MagicMock()
+        container.db.setup = AsyncMock()
+        container.db.checkpoint = AsyncMock(return_value=4)
+        container.db.close = AsyncMock()
+
+        container.use_metrics = False
+        container.initial_extensions = []
+        container.shutdown_timeout = 5.0
+        container.shutdown_drain_timeout = 1.0
+        container.regex_pool = MagicMock()
+        container.image_generator = MagicMock()
+        container.guild_settings = MagicMock()
+        container.message_dispatcher = MagicMock()
+        container.message_dispatcher.close = AsyncMock(return_value=0)
+        container.log_outbox = MagicMock()
+        container.log_outbox.close = AsyncMock(return_value=0)
+
+        services = MagicMock()
+        services.automod.flush_warning_counters = AsyncMock(return_value=2)
+        services.logging.flush_voice_activity = AsyncMock(return_value=0)
+        container.build_services = MagicMock(return_value=services)
+
+        return container
+
+    @pytest.mark.asyncio
+    async def test_close_flushes_before_closing_database(self, mock_container):
+        """Тест порядка остановки: очереди, буферы, Discord, checkpoint, БД."""
+        bot = Bot(mock_container)
+        order = []
+        mock_container.message_dispatcher.close.side_effect = lambda timeout: order.append(
+            "dispatcher"
+        )
+        mock_container.db.checkpoint.side_effect = lambda: order.append("checkpoint")
+        mock_container.db.close.side_effect = lambda: order.append("database")
+
+        with patch("app.bot.flush_json_stores", AsyncMock(return_value=1)):
+            with patch.object(commands.Bot, "close", AsyncMock()) as discord_close:
+                discord_close.side_effect = lambda: order.append("discord")
+                await bot.close()
+
+        assert order == ["dispatcher", "discord", "checkpoint", "database"]
+        assert bot.accepting_messages is False
+        mock_container.message_dispatcher.close.assert_awaited_once_with(timeout=1.0)
+        mock_container.regex_pool.close.assert_called_once()
+        assert bot.shutdown_report.results["json_stores"] == 1
+        assert bot.shutdown_report.results["automod_counters"] == 2
+
+    @pytest.mark.asyncio
+    async def test_close_twice_runs_once(self, mock_container):
+        """Тест что повторный вызов close (сигнал и выход из контекста) безопасен."""
+        bot = Bot(mock_container)
+
+        with patch("app.bot.flush_json_stores", AsyncMock(return_value=0)):
+            with patch.object(commands.Bot, "close", AsyncMock()):
+                await bot.close()
+                await bot.close()
+
+        mock_container.db.close.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_messages_ignored_after_close(self, mock_container):
+        """Тест что новые сообщения не обрабатываются во время остановки."""
+        bot = Bot(mock_container)
+        bot.accepting_messages = False
+        message = MagicMock()
+        message.author.bot = False
+
+        with patch.object(bot, "process_commands", AsyncMock()) as process_commands:
+            await bot.on_message(message)
+
+        process_commands.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_commands_run_outside_guild_queue(self, mock_container):
+        """Тест что команды выполняются в задаче события, а не в очереди воркера."""
+        bot = Bot(mock_container)
+        bot.message_pipeline = MagicMock()
+        bot.message_pipeline.run_commands = AsyncMock()
+        message = MagicMock()
+        message.author.bot = False
+        message.guild.id = 42
+
+        await bot.on_message(message)
+
+        job = mock_container.message_dispatcher.submit.call_args[0][1]
+        assert job.keywords == {"commands": False}
+        bot.message_pipeline.run_commands.assert_awaited_once()
@@ -0,0 +1,110 @@
+"""Тесты для профилей кэша discord.py."""
+
+import os
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import discord
+import pytest
+
+from app.bot import Bot, intents
+from app.cache_profile import CacheProfile, trim_member_cache
+from app.container import Container
+
+
+def member(member_id, in_voice=False):
+    """Участник с состоянием голоса."""
+    return SimpleNamespace(id=member_id, voice=MagicMock() if in_voice else None)
+
+
+class FakeGuild:
+    """Сервер с кэшем участников как у discord.Guild."""
+
+    def __init__(self, members):
+        self._members = {m.id: m for m in members}
+
+    def _remove_member(self, m):
+        self._members.pop(m.id, None)
+
+
+class TestCacheProfile:
+    """Тесты параметров клиента по профилю."""
+
+    def test_unknown_preset(self):
+        """Тест ошибки для неизвестного профиля."""
+        with pytest.raises(ValueError):
+            CacheProfile.preset("tiny")
+
+    def test_invalid_policy(self):
+        """Тест проверки политики кэша участников."""
+        with pytest.raises(ValueError):
+            CacheProfile(member_cache="online")
+
+    def test_lean_client_options(self):
+        """Тест параметров discord.Client для профиля lean."""
+        options = CacheProfile.preset("lean").client_options(intents)
+
+        assert options["max_messages"] is None
+        assert options["member_cache_flags"].voice is True
+        assert options["member_cache_flags"].joined is False
+        assert options["chunk_guilds_at_startup"] is False
+
+    def test_chunking_requires_members_intent(self):
+        """Тест что chunking без интента members отключается вместо ошибки."""
+        profile = CacheProfile(chunking="startup")
+
+        assert profile.effective(intents).chunking == "off"
+        assert profile.client_options(intents)["chunk_guilds_at_startup"] is False
+
+    def test_container_overrides(self):
+        """Тест переопределения профиля переменными окружения."""
+        env = {"CACHE_PROFILE": "lean", "MESSAGE_CACHE_SIZE": "0", "MEMBER_CACHE_CAP": "50"}
+        with patch.dict(os.environ, env):
+            profile = Container._cache_profile_from_env()
+
+        assert profile.name == "lean"
+        assert profile.max_messages is None
+        assert profile.member_cache_cap == 50
+        assert profile.member_cache == "voice"
+
+    def test_bot_applies_profile(self):
+        """Тест что профиль передается в состояние discord.py."""
+        container = MagicMock(spec=Container)
+        container.db = MagicMock()
+        container.use_metrics = False
+        container.initial_extensions = []
+        container.guild_settings = MagicMock()
+        container.message_dispatcher = MagicMock()
+
+        bot = Bot(container, CacheProfile(max_messages=None, member_cache="none"))
+
+        assert bot._connection.max_messages is None
+        assert bot._connection.member_cache_flags == discord.MemberCacheFlags.none()
+
+
+class TestTrimMemberCache:
+    """Тесты ограничения кэша участников."""
+
+    def test_oldest_members_evicted(self):
+        """Тест вытеснения участников, добавленных первыми."""
+        guild = FakeGuild([member(i) for i in range(5)])
+
+        removed = trim_member_cache(guild, cap=3)
+
+        assert removed == 2
+        assert list(guild._members) == [2, 3, 4]
+
+    def test_voice_members_and_bot_kept(self):
+        """Тест что участники голосовых каналов и сам бот не вытесняются."""
+        guild = FakeGuild([member(1), member(2, in_voice=True), member(3), member(4)])
+
+        trim_member_cache(guild, cap=2, keep_id=1)
+
+        assert list(guild._members) == [1, 2]
+
+    def test_no_cap(self):
+        """Тест что 0 означает без ограничения."""
+        guild = FakeGuild([member(i) for i in range(5)])
+
+        assert trim_member_cache(guild, cap=0) == 0
+        assert len(guild._members) == 5
@@ -0,0 +1,185 @@
+"""Тесты для кластера процессов бота."""
+
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+from prometheus_client import CollectorRegistry, multiprocess
+
+from app.cluster import ClusterSupervisor, cluster_env, plan_clusters, run_fake_worker
+
+
+class FakeProcess:
+    """Процесс, которым управляет тест."""
+
+    pid_counter = 1000
+
+    def __init__(self, target, args, name):
+        FakeProcess.pid_counter += 1
+        self.pid = FakeProcess.pid_counter
+        self.args = args
+        self.name = name
+        self.exitcode = None
+        self.alive = False
+
+    def start(self):
+        self.alive = True
+
+    def is_alive(self):
+        return self.alive
+
+    def crash(self, code=1):
+        self.alive = False
+        self.exitcode = code
+
+    def terminate(self):
+        self.crash(-15)
+
+    def join(self, timeout=None):
+        pass
+
+    def kill(self):
+        self.crash(-9)
+
+
+class FakeContext:
+    """Контекст multiprocessing, создающий FakeProcess."""
+
+    def __init__(self):
+        self.processes = []
+
+    def Process(self, target, args, name):
+        process = FakeProcess(target, args, name)
+        self.processes.append(process)
+        return process
+
+
+class TestPlanClusters:
+    """Тесты разбиения шардов на процессы."""
+
+    def test_contiguous_even_ranges(self):
+        """Тест непрерывных диапазонов почти равного размера."""
+        assert plan_clusters(10, 3) == [[0, 1, 2, 3], [4, 5, 6], [7, 8, 9]]
+
+    def test_more_processes_than_shards(self):
+        """Тест что лишние процессы не создаются."""
+        assert plan_clusters(2, 8) == [[0], [1]]
+
+    def test_cluster_env(self):
+        """Тест переменных окружения процесса для контейнера."""
+        env = cluster_env(1, [4, 5, 6], 10)
+
+        assert env == {
+            "SHARDING": "True",
+            "CLUSTER_ID": "1",
+            "SHARD_COUNT": "10",
+            "SHARD_IDS": "4,5,6",
+        }
+
+
+class TestClusterSupervisor:
+    """Тесты наблюдения и перезапуска процессов."""
+
+    @pytest.fixture
+    def supervisor(self):
+        """Фикстура для создания супервизора с ненастоящими процессами."""
+        supervisor = ClusterSupervisor(4, 2, restart_delay=1.0, max_restart_delay=4.0)
+        supervisor._context = FakeContext()
+        with patch.dict(os.environ):
+            yield supervisor
+
+    def test_start_spawns_each_range(self, supervisor):
+        """Тест запуска процесса на каждый диапазон шардов."""
+        supervisor.start()
+
+        args = [process.args for process in supervisor._context.processes]
+        assert args == [(0, [0, 1], 4), (1, [2, 3], 4)]
+
+    def test_start_exports_actual_cluster_size(self):
+        """Тест что процессы получают фактическое число процессов кластера."""
+        supervisor = ClusterSupervisor(2, 4)
+        supervisor._context = FakeContext()
+        with patch.dict(os.environ):
+            supervisor.start()
+            assert os.environ["CLUSTER_SIZE"] == "2"
+
+    def test_crashed_process_restarted_with_backoff(self, supervisor):
+        """Тест перезапуска упавшего процесса с растущей задержкой."""
+        supervisor.start()
+        cluster = supervisor.clusters[0]
+
+        with patch("app.cluster.time.monotonic", return_value=100.0):
+            cluster.process.crash()
+            supervisor.poll()
+        assert cluster.restart_at == 101.0
+        assert cluster.process is None
+
+        with patch("app.cluster.time.monotonic", return_value=101.0):
+            supervisor.poll()
+        assert cluster.restarts == 1
+        assert cluster.process.is_alive()
+
+        with patch("app.cluster.time.monotonic", return_value=102.0):
+            cluster.process.crash()
+            supervisor.poll()
+        assert cluster.restart_at == 104.0
+        assert cluster.exit_codes == [1, 1]
+
+    def test_stable_process_resets_backoff(self, supervisor):
+        """Тест сброса задержки после долгой работы процесса."""
+        supervisor.start()
+        cluster = supervisor.clusters[0]
+        cluster.failures = 3
+
+        with patch("app.cluster.time.monotonic", return_value=cluster.started_at + 120):
+            cluster.process.crash()
+            supervisor.poll()
+
+        assert cluster.restart_at == cluster.started_at + 121
+
+    def test_stop_does_not_restart(self, supervisor):
+        """Тест что остановленные процессы не перезапускаются."""
+        supervisor.start()
+
+        supervisor.stop()
+        supervisor.poll()
+
+        assert all(cluster.process is None for cluster in supervisor.clusters)
+        assert all(cluster.restart_at is None for cluster in supervisor.clusters)
+        assert len(supervisor._context.processes) == 2
+
+
+class TestFakeGatewayCluster:
+    """Тест кластера из настоящих процессов с имитацией gateway."""
+
+    def test_metrics_aggregated_and_crash_restarted(self, tmp_path):
+        """Тест агрегации метрик процессов и перезапуска упавшего процесса."""
+        supervisor = ClusterSupervisor(
+            4, 2, target=run_fake_worker, metrics_dir=tmp_path / "metrics", restart_delay=0.1
+        )
+        env = {"FAKE_GUILDS": "400", "FAKE_CRASH_AFTER": "0.5"}
+        with patch.dict(os.environ, env):
+            try:
+                supervisor.start()
+                deadline = time.monotonic() + 30
+                while time.monotonic() < deadline:
+                    supervisor.poll()
+                    if all(cluster.restarts for cluster in supervisor.clusters):
+                        break
+                    time.sleep(0.05)
+            finally:
+                supervisor.stop(timeout=5)
+
+        assert all(cluster.restarts >= 1 for cluster in supervisor.clusters)
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry, path=str(tmp_path / "metrics"))
+        messages = sum(
+            sample.value
+            for metric in registry.collect()
+            if metric.name == "bot_messages_processed"
+            for sample in metric.samples
+            if sample.name.endswith("_total")
+        )
+        assert messages > 0
@@ -0,0 +1,137 @@
+"""Тесты для синхронизации slash-команд по хешам."""
+
+import os
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import discord
+import pytest
+from discord import app_commands
+
+from app.command_sync import CommandSyncPlanner, command_tree_hash
+from database.db import Database
+from infrastructure.db.command_sync_repository import CommandSyncRepository
+
+
+async def callback(interaction: discord.Interaction) -> None:
+    pass
+
+
+def build_tree(*names, description="Команда"):
+    """Дерево команд без подключения к Discord."""
+    client = SimpleNamespace(
+        application_id=42, http=None, _connection=SimpleNamespace(_command_tree=None)
+    )
+    tree = app_commands.CommandTree(client)
+    for name in names:
+        tree.add_command(
+            app_commands.Command(name=name, description=description, callback=callback)
+        )
+    return tree
+
+
+@pytest.fixture
+async def repository(tmp_path):
+    """Фикстура с репозиторием поверх настоящей SQLite базы."""
+    with patch.dict(os.environ, {"DB_PATH": str(tmp_path / "bot.db"), "DB_POOL_SIZE": "1"}):
+        db = Database()
+    await db.setup()
+    yield CommandSyncRepository(db)
+    await db.close()
+
+
+class TestCommandTreeHash:
+    """Тесты хеша дерева команд."""
+
+    def test_hash_ignores_registration_order(self):
+        """Тест что порядок добавления команд не меняет хеш."""
+        assert command_tree_hash(build_tree("ping", "rank")) == command_tree_hash(
+            build_tree("rank", "ping")
+        )
+
+    def test_hash_changes_with_payload(self):
+        """Тест что изменение описания меняет хеш."""
+        assert command_tree_hash(build_tree("ping")) != command_tree_hash(
+            build_tree("ping", description="Другое описание")
+        )
+
+
+class TestCommandSyncPlanner:
+    """Тесты синхронизации только изменившихся областей."""
+
+    @pytest.mark.asyncio
+    async def test_second_boot_skips_unchanged_tree(self, repository):
+        """Тест что неизменное дерево не синхронизируется повторно."""
+        sync = AsyncMock()
+
+        first = await CommandSyncPlanner(build_tree("ping"), repository, sync=sync).run()
+        second = await CommandSyncPlanner(build_tree("ping"), repository, sync=sync).run()
+
+        assert first.synced == ["global"]
+        assert second.synced == []
+        assert second.skipped == ["global"]
+        sync.assert_awaited_once_with(None)
+
+    @pytest.mark.asyncio
+    async def test_changed_tree_is_synced(self, repository):
+        """Тест синхронизации после изменения команд."""
+        sync = AsyncMock()
+        await CommandSyncPlanner(build_tree("ping"), repository, sync=sync).run()
+
+        report = await CommandSyncPlanner(build_tree("ping", "rank"), repository, sync=sync).run()
+
+        assert report.synced == ["global"]
+        assert sync.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_force_syncs_every_scope(self, repository):
+        """Тест принудительной синхронизации без изменений."""
+        sync = AsyncMock()
+        await CommandSyncPlanner(build_tree("ping"), repository, sync=sync).run()
+
+        report = await CommandSyncPlanner(
+            build_tree("ping"), repository, force=True, sync=sync
+        ).run()
+
+        assert report.synced == ["global"]
+        assert sync.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_guild_scope_gets_copy_of_global_commands(self, repository):
+        """Тест серверной области с копией глобальных команд."""
+        tree = build_tree("ping")
+        sync = AsyncMock()
+
+        report = await CommandSyncPlanner(tree, repository, guild_ids=[123], sync=sync).run()
+
+        assert report.synced == ["global", "guild:123"]
+        assert [command.name for command in tree.get_commands(guild=discord.Object(123))] == [
+            "ping"
+        ]
+        assert sync.await_args_list[1].args[0].id == 123
+        assert set(report.timings) == {"hash", "state", "global", "guild:123"}
+
+    @pytest.mark.asyncio
+    async def test_failed_scope_retried_next_boot(self, repository):
+        """Тест что хеш неудачной синхронизации не сохраняется."""
+        failing = AsyncMock(side_effect=RuntimeError("429"))
+        report = await CommandSyncPlanner(build_tree("ping"), repository, sync=failing).run()
+        assert report.failed == ["global"]
+
+        sync = AsyncMock()
+        report = await CommandSyncPlanner(build_tree("ping"), repository, sync=sync).run()
+
+        assert report.synced == ["global"]
+
+    @pytest.mark.asyncio
+    async def test_hashes_scoped_by_application(self, repository):
+        """Тест что другое приложение синхронизируется независимо."""
+        sync = AsyncMock()
+        await CommandSyncPlanner(build_tree("ping"), repository, sync=sync).run()
+        tree = build_tree("ping")
+        tree.client.application_id = 43
+
+        report = await CommandSyncPlanner(tree, repository, sync=sync).run()
+
+        assert report.synced == ["global"]
+        assert set(await repository.load_hashes()) == {"42:global", "43:global"}
@@ -222,6 +222,26 @@ class TestServerInfoCommand:
         call_args = ctx.send.call_args
         assert "embed" in call_args.kwargs
 
+    @pytest.mark.asyncio
+    async def test_serverinfo_defers_before_lazy_chunking(self, commands_cog):
+        """Тест что ответ откладывается до загрузки участников сервера."""
+        commands_cog.bot.cache_profile.chunking = "lazy"
+        ctx = AsyncMock()
+        ctx.guild = MagicMock()
+        ctx.guild.chunked = False
+        ctx.guild.icon = None
+        ctx.guild.premium_tier = 0
+        ctx.guild.member_count = 2
+        ctx.guild.members = []
+        calls = []
+        ctx.defer = AsyncMock(side_effect=lambda: calls.append("defer"))
+        ctx.guild.chunk = AsyncMock(side_effect=lambda: calls.append("chunk"))
+
+        await commands_cog.serverinfo.callback(commands_cog, ctx)
+
+        assert calls == ["defer", "chunk"]
+        ctx.send.assert_called_once()
+
 
 class TestUserInfoCommand:
     """Тесты команды userinfo."""
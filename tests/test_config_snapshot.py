@@ -0,0 +1,71 @@
+"""Тесты для неизменяемых снапшотов конфигурации."""
+
+import pytest
+
+from infrastructure.config import ConfigSnapshot, SnapshotRef, freeze, thaw
+
+
+class TestFreeze:
+    """Тесты заморозки и разморозки данных."""
+
+    def test_freeze_is_deep(self):
+        """Тест рекурсивной заморозки вложенных структур."""
+        frozen = freeze({"rules": [{"id": 1}], "words": ["a"]})
+
+        with pytest.raises(TypeError):
+            frozen["rules"][0]["id"] = 2
+        assert frozen["words"] == ("a",)
+
+    def test_thaw_returns_independent_copy(self):
+        """Тест что размороженная копия не связана со снапшотом."""
+        frozen = freeze({"rules": [{"id": 1}]})
+
+        data = thaw(frozen)
+        data["rules"][0]["id"] = 2
+
+        assert data == {"rules": [{"id": 2}]}
+        assert frozen["rules"][0]["id"] == 1
+
+
+class TestSnapshotRef:
+    """Тесты публикации версий."""
+
+    def test_readers_keep_their_version(self):
+        """Тест что читатель видит согласованную версию после подмены."""
+        ref = SnapshotRef({"threshold": 5, "words": ["a"]})
+        reader = ref.current
+
+        ref.update(threshold=10)
+
+        assert reader["threshold"] == 5
+        assert ref.current["threshold"] == 10
+        assert ref.current["words"] == ("a",)
+        assert ref.current.version == reader.version + 1
+
+    def test_source_dict_is_not_shared(self):
+        """Тест что изменение исходного словаря не влияет на снапшот."""
+        data = {"words": ["a"]}
+        ref = SnapshotRef(data)
+
+        data["words"].append("b")
+
+        assert ref.current["words"] == ("a",)
+
+    def test_derive_memoised_per_version(self):
+        """Тест однократного вычисления производных данных на версию."""
+        calls = []
+
+        def build(data):
+            calls.append(data["words"])
+            return sorted(data["words"])
+
+        ref = SnapshotRef({"words": ["b", "a"]})
+        snapshot: ConfigSnapshot = ref.current
+
+        assert snapshot.derive("sorted", build) == ["a", "b"]
+        assert snapshot.derive("sorted", build) == ["a", "b"]
+        assert len(calls) == 1
+
+        ref.update(words=["c"])
+        assert ref.current.derive("sorted", build) == ["c"]
+        assert len(calls) == 2
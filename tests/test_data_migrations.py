@@ -0,0 +1,154 @@
+"""Тесты для журнала миграций данных из JSON в БД."""
+
+import json
+import os
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from application.data_migrations import DataMigrationRunner, source_checksum
+from database.db import Database
+from infrastructure.db.migrations_repository import DataMigrationsRepository
+from infrastructure.db.warnings_repository import WarningsRepository
+
+
+def warning(reason, timestamp):
+    """Предупреждение в формате warnings.json."""
+    return {"reason": reason, "moderator": 111, "timestamp": timestamp}
+
+
+@pytest.fixture
+async def database(tmp_path):
+    """Фикстура с настоящей SQLite базой во временной директории."""
+    with patch.dict(os.environ, {"DB_PATH": str(tmp_path / "bot.db"), "DB_POOL_SIZE": "1"}):
+        db = Database()
+    await db.setup()
+    yield db
+    await db.close()
+
+
+@pytest.fixture
+def runner(database):
+    """Фикстура для создания журнала миграций поверх SQLite."""
+    return DataMigrationRunner(DataMigrationsRepository(database))
+
+
+async def count_warnings(database):
+    row = await database.fetch_one("SELECT COUNT(*) AS count FROM warnings")
+    return row["count"]
+
+
+class TestSourceChecksum:
+    """Тесты контрольной суммы файлов-источников."""
+
+    def test_missing_sources(self, tmp_path):
+        """Тест что без файлов контрольной суммы нет."""
+        assert source_checksum([tmp_path / "levels.json"]) is None
+
+    def test_journal_changes_checksum(self, tmp_path):
+        """Тест что журнал JSON хранилища входит в контрольную сумму."""
+        snapshot = tmp_path / "levels.json"
+        journal = tmp_path / "levels.json.journal"
+        snapshot.write_text("{}")
+        before = source_checksum([snapshot, journal])
+
+        journal.write_text('{"op": "set"}\n')
+
+        assert source_checksum([snapshot, journal]) != before
+
+    def test_read_in_blocks(self, tmp_path):
+        """Тест что размер блока чтения не влияет на результат."""
+        source = tmp_path / "warnings.json"
+        source.write_bytes(b"x" * 10_000)
+
+        assert source_checksum([source], block_size=7) == source_checksum([source])
+
+
+class TestDataMigrationRunner:
+    """Тесты однократного переноса предупреждений."""
+
+    @pytest.mark.asyncio
+    async def test_unchanged_source_is_skipped(self, database, runner, tmp_path):
+        """Тест что повторный запуск не вставляет предупреждения заново."""
+        source = tmp_path / "warnings.json"
+        data = {"1": {"2": [warning("spam", "2026-01-01T00:00:00")]}}
+        source.write_text(json.dumps(data))
+        repository = WarningsRepository(database)
+
+        first = await runner.run(
+            "warnings_json", [source], lambda: repository.migrate_from_json(data)
+        )
+        second = await runner.run(
+            "warnings_json", [source], lambda: repository.migrate_from_json(data)
+        )
+
+        assert first == 1
+        assert second is None
+        assert await count_warnings(database) == 1
+
+    @pytest.mark.asyncio
+    async def test_changed_source_imports_only_new_rows(self, database, runner, tmp_path):
+        """Тест что измененный источник дописывает только новые предупреждения."""
+        source = tmp_path / "warnings.json"
+        repository = WarningsRepository(database)
+        data = {"1": {"2": [warning("spam", "2026-01-01T00:00:00")]}}
+        source.write_text(json.dumps(data))
+        await runner.run("warnings_json", [source], lambda: repository.migrate_from_json(data))
+
+        data["1"]["2"].append(warning("flood", None))
+        source.write_text(json.dumps(data))
+        rows = await runner.run(
+            "warnings_json", [source], lambda: repository.migrate_from_json(data)
+        )
+
+        assert rows == 2
+        assert await count_warnings(database) == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_migration_not_recorded(self, runner, tmp_path):
+        """Тест что упавшая миграция повторится при следующем запуске."""
+        source = tmp_path / "levels.json"
+        source.write_text("{}")
+
+        with pytest.raises(RuntimeError):
+            await runner.run("levels_json", [source], AsyncMock(side_effect=RuntimeError()))
+        migrate = AsyncMock(return_value=0)
+        await runner.run("levels_json", [source], migrate)
+
+        migrate.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_duplicates_removed_once(self, database, runner):
+        """Тест очистки предупреждений, вставленных прошлыми запусками."""
+        repository = WarningsRepository(database)
+        row = (2, 1, "spam", 111, "2026-01-01T00:00:00", None)
+        await database.execute_many(
+            "INSERT INTO warnings (user_id, guild_id, reason, issued_by, issued_at, expires_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [row, row, row],
+        )
+
+        removed = await runner.run_once("warnings_dedupe", repository.delete_duplicates)
+        again = await runner.run_once("warnings_dedupe", repository.delete_duplicates)
+
+        assert removed == 2
+        assert again is None
+        assert await count_warnings(database) == 1
+
+    @pytest.mark.asyncio
+    async def test_large_import_in_chunks(self, database):
+        """Тест переноса частями без потери записей."""
+        repository = WarningsRepository(database)
+        data = {
+            "1": {
+                str(user_id): [warning("spam", f"2026-01-01T00:00:{user_id:02d}")]
+                for user_id in range(25)
+            }
+        }
+
+        with patch.object(database, "execute_many", wraps=database.execute_many) as execute_many:
+            rows = await repository.migrate_from_json(data, chunk_size=10)
+
+        assert rows == 25
+        assert execute_many.await_count == 3
+        assert await count_warnings(database) == 25
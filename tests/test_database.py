@@ -159,6 +159,19 @@ class TestDatabaseOperations:
         results = await database.fetch_all("SELECT * FROM test")
         assert results == []
 
+    @pytest.mark.asyncio
+    async def test_execute_many_inserts_batch(self, database):
+        """Тест пакетного выполнения запроса."""
+        await database.execute(
+            "CREATE TABLE test (id INTEGER PRIMARY KEY, name TEXT)"
+        )
+        await database.execute_many(
+            "INSERT INTO test (name) VALUES (?)", [("a",), ("b",), ("c",)]
+        )
+
+        results = await database.fetch_all("SELECT name FROM test ORDER BY id")
+        assert [r["name"] for r in results] == ["a", "b", "c"]
+
     @pytest.mark.asyncio
     async def test_execute_with_error_logs_and_raises(self, database):
         """Тест что execute логирует и пробрасывает ошибку."""
@@ -212,6 +225,46 @@ class TestDatabaseConnectionPool:
 
         assert database.pool == []
 
+    @pytest.mark.asyncio
+    async def test_connection_not_returned_after_close(self, database):
+        """Тест что соединение, взятое до закрытия, не возвращается в пул."""
+        async with database.get_connection():
+            await database.close()
+
+        assert database.pool == []
+
+
+class TestDatabaseShutdown:
+    """Тесты сохранения базы данных при остановке."""
+
+    @pytest.mark.asyncio
+    async def test_checkpoint_truncates_wal(self, tmp_path):
+        """Тест переноса WAL в основной файл БД."""
+        path = tmp_path / "bot.db"
+        with patch.dict(os.environ, {"DB_PATH": str(path), "DB_POOL_SIZE": "1"}):
+            db = Database()
+        await db.setup()
+        await db.execute("INSERT INTO warnings (user_id, guild_id) VALUES (?, ?)", (1, 2))
+
+        flushed = await db.checkpoint()
+        wal_size = os.path.getsize(f"{path}-wal")
+        await db.close()
+
+        assert flushed > 0
+        assert wal_size == 0
+
+    @pytest.mark.asyncio
+    async def test_close_closes_redis(self):
+        """Тест закрытия клиента Redis."""
+        db = Database()
+        client = MagicMock()
+        db.redis = client
+
+        await db.close()
+
+        client.close.assert_called_once()
+        assert db.redis is None
+
 
 class TestDatabaseSchemaManagement:
     """Тесты управления схемой базы данных."""
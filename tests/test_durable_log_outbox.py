@@ -0,0 +1,278 @@
+"""Тесты очереди логов в SQLite."""
+
+import asyncio
+import os
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import discord
+import pytest
+
+from database.db import Database
+from infrastructure.db import LogOutboxRepository
+from infrastructure.workers import DurableLogOutbox
+from infrastructure.workers.log_outbox import LOW, MAX_EMBEDS
+
+
+@pytest.fixture
+async def db(tmp_path):
+    """БД SQLite во временном каталоге."""
+    with patch.dict(os.environ, {"DB_PATH": str(tmp_path / "bot.db"), "DB_POOL_SIZE": "2"}):
+        database = Database()
+    await database.setup()
+    yield database
+    await database.close()
+
+
+def channel(channel_id=1):
+    """Канал логов с отправкой сообщений."""
+    return SimpleNamespace(id=channel_id, send=AsyncMock())
+
+
+def resolver(*channels):
+    by_id = {target.id: target for target in channels}
+    return by_id.get
+
+
+def http_error(status):
+    return discord.HTTPException(MagicMock(status=status), "error")
+
+
+def outbox_for(db, **options):
+    options.setdefault("window", 0.01)
+    return DurableLogOutbox(LogOutboxRepository(db), **options)
+
+
+async def rows(db):
+    return await db.fetch_all("SELECT * FROM log_outbox")
+
+
+async def wait_until(predicate, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+
+
+class TestDurableLogOutbox:
+    """Тесты записи, отправки и повторов."""
+
+    @pytest.mark.asyncio
+    async def test_burst_written_once_and_coalesced(self, db):
+        """Тест что всплеск записывается одной вставкой и уходит пачками."""
+        target = channel()
+        outbox = outbox_for(db)
+        repository = outbox._repository
+        with patch.object(repository, "append_many", wraps=repository.append_many) as append:
+            await outbox.start(resolver(target))
+            for number in range(25):
+                outbox.submit(target, discord.Embed(title=str(number)), "voice_state")
+            assert outbox.backlog == 25
+
+            await wait_until(lambda: target.send.await_count == 3)
+            await outbox.close()
+
+        append.assert_awaited_once()
+        sizes = [len(call.kwargs["embeds"]) for call in target.send.await_args_list]
+        assert sizes == [MAX_EMBEDS, MAX_EMBEDS, 5]
+        titles = [
+            embed.title for call in target.send.await_args_list for embed in call.kwargs["embeds"]
+        ]
+        assert titles == [str(number) for number in range(25)]
+        assert outbox.backlog == 0
+        assert await rows(db) == []
+
+    @pytest.mark.asyncio
+    async def test_events_survive_restart(self, db):
+        """Тест что события, не отправленные до остановки, отправляются после запуска."""
+        target = channel()
+        first = outbox_for(db)
+        first.submit(target, discord.Embed(title="до остановки"), "ban")
+
+        assert await first.close() == 0
+        assert len(await rows(db)) == 1
+
+        second = outbox_for(db)
+        assert await second.start(resolver(target)) == 1
+        await wait_until(lambda: target.send.await_count == 1)
+        await second.close()
+
+        assert target.send.await_args.kwargs["embeds"][0].title == "до остановки"
+        assert await rows(db) == []
+
+    @pytest.mark.asyncio
+    async def test_failed_send_retried_with_backoff(self, db):
+        """Тест повтора после ошибки Discord."""
+        target = channel()
+        target.send.side_effect = [http_error(503), None]
+        outbox = outbox_for(db, base_backoff=0.05)
+        await outbox.start(resolver(target))
+        outbox.submit(target, discord.Embed(title="1"), "ban")
+
+        await wait_until(lambda: target.send.await_count == 1)
+        await asyncio.sleep(0.02)
+        [row] = await rows(db)
+        assert row["attempts"] == 1
+
+        await wait_until(lambda: target.send.await_count == 2)
+        await outbox.close()
+        assert await rows(db) == []
+
+    @pytest.mark.asyncio
+    async def test_rejected_batch_dropped_without_retry(self, db):
+        """Тест что пачка, отклоненная ответом 400, не повторяется."""
+        target = channel()
+        target.send.side_effect = [http_error(400), None]
+        outbox = outbox_for(db, base_backoff=0.01)
+        await outbox.start(resolver(target))
+        for number in range(MAX_EMBEDS + 1):
+            outbox.submit(target, discord.Embed(title=str(number)), "message_bulk_delete")
+
+        await wait_until(lambda: outbox.backlog == 0)
+        await outbox.close()
+
+        assert target.send.await_count == 2
+        assert [embed.title for embed in target.send.await_args.kwargs["embeds"]] == [
+            str(MAX_EMBEDS)
+        ]
+        assert await rows(db) == []
+
+    @pytest.mark.asyncio
+    async def test_summary_reserved_and_kept_after_rejected_batch(self, db):
+        """Тест что сводка занимает место в пачке и не теряется с отклоненной пачкой."""
+        target = channel()
+        target.send.side_effect = [http_error(400), None]
+        outbox = outbox_for(db, shed_threshold=0)
+        await outbox.start(resolver(target))
+        assert outbox.submit(target, discord.Embed(), "voice_state", priority=LOW) is False
+        for number in range(MAX_EMBEDS):
+            outbox.submit(target, discord.Embed(title=str(number)), "ban")
+
+        await wait_until(lambda: outbox.backlog == 0)
+        await outbox.close()
+
+        first, second = [call.kwargs["embeds"] for call in target.send.await_args_list]
+        assert len(first) == MAX_EMBEDS
+        assert "пропущено 1" in first[-1].description
+        assert [embed.title for embed in second[:-1]] == [str(MAX_EMBEDS - 1)]
+        assert "пропущено 1" in second[-1].description
+        assert not outbox._dropped
+
+    @pytest.mark.asyncio
+    async def test_summary_kept_for_retry(self, db):
+        """Тест что сводка повторяется вместе с пачкой после сетевой ошибки."""
+        target = channel()
+        target.send.side_effect = [http_error(503), None]
+        outbox = outbox_for(db, shed_threshold=0, base_backoff=0.01)
+        await outbox.start(resolver(target))
+        outbox.submit(target, discord.Embed(), "voice_state", priority=LOW)
+        outbox.submit(target, discord.Embed(title="1"), "ban")
+
+        await wait_until(lambda: outbox.backlog == 0)
+        await outbox.close()
+
+        assert target.send.await_count == 2
+        for call in target.send.await_args_list:
+            assert "пропущено 1" in call.kwargs["embeds"][-1].description
+        assert not outbox._dropped
+
+    @pytest.mark.asyncio
+    async def test_rows_of_removed_processes_reclaimed(self, db):
+        """Тест что после уменьшения кластера строки отключенных процессов не теряются."""
+        now = 0.0
+        await LogOutboxRepository(db).append_many(
+            [(owner, 1, "ban", "{}", now, now) for owner in range(4)]
+        )
+
+        never = asyncio.Event().wait
+        first = outbox_for(db, owner=1, owners=2)
+        assert await first.start(resolver(), ready=never) == 2
+        await first.close(timeout=0.05)
+        second = outbox_for(db, owner=0, owners=2)
+        assert await second.start(resolver(), ready=never) == 2
+        await second.close(timeout=0.05)
+
+        assert sorted(row["owner"] for row in await rows(db)) == [0, 0, 1, 1]
+
+    @pytest.mark.parametrize("status", [429, 502])
+    def test_retryable_statuses(self, status):
+        """Тест что повторяются только 429 и 5xx."""
+        from infrastructure.workers.durable_log_outbox import is_retryable
+
+        assert is_retryable(http_error(status)) is True
+        assert is_retryable(http_error(413)) is False
+        assert is_retryable(asyncio.TimeoutError()) is True
+
+    @pytest.mark.asyncio
+    async def test_retry_keeps_channel_order(self, db):
+        """Тест что повтор не меняет порядок событий канала."""
+        target = channel()
+        target.send.side_effect = [http_error(503), None, None]
+        outbox = outbox_for(db, base_backoff=0.2)
+        await outbox.start(resolver(target))
+        for number in range(3):
+            outbox.submit(target, discord.Embed(title=str(number)), "ban")
+
+        await wait_until(lambda: target.send.await_count == 1)
+        await asyncio.sleep(0.02)
+        retried = await rows(db)
+        assert len({row["next_attempt_at"] for row in retried}) == 1
+
+        # Новое событие канала ждет повтора более ранних
+        outbox.submit(target, discord.Embed(title="3"), "ban")
+        await wait_until(lambda: outbox.backlog == 0)
+        await outbox.close()
+
+        sent = [
+            embed.title
+            for call in target.send.await_args_list[1:]
+            for embed in call.kwargs["embeds"]
+        ]
+        assert sent == ["0", "1", "2", "3"]
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_attempts(self, db):
+        """Тест что событие отбрасывается после исчерпания попыток."""
+        target = channel()
+        target.send.side_effect = http_error(500)
+        outbox = outbox_for(db, max_attempts=2, base_backoff=0.01)
+        await outbox.start(resolver(target))
+        outbox.submit(target, discord.Embed(title="1"), "ban")
+
+        await wait_until(lambda: target.send.await_count == 2)
+        await wait_until(lambda: outbox.backlog == 0)
+        await outbox.close()
+        assert await rows(db) == []
+
+    @pytest.mark.asyncio
+    async def test_forbidden_and_missing_channel_dropped(self, db):
+        """Тест что события без доступа к каналу не повторяются."""
+        forbidden = channel(1)
+        forbidden.send.side_effect = discord.Forbidden(MagicMock(status=403), "Missing Access")
+        outbox = outbox_for(db)
+        await outbox.start(resolver(forbidden))
+        outbox.submit(forbidden, discord.Embed(title="1"), "ban")
+        outbox.submit(channel(2), discord.Embed(title="2"), "ban")
+
+        await wait_until(lambda: outbox.backlog == 0)
+        await outbox.close()
+
+        forbidden.send.assert_awaited_once()
+        assert await rows(db) == []
+
+    @pytest.mark.asyncio
+    async def test_low_priority_shed_counts_stored_rows(self, db):
+        """Тест что ограничение очереди учитывает строки в БД."""
+        target = channel()
+        first = outbox_for(db, shed_threshold=2)
+        for number in range(2):
+            first.submit(target, discord.Embed(title=str(number)), "ban")
+        await first.close()
+
+        second = outbox_for(db, shed_threshold=2)
+        await second.start(resolver(), ready=asyncio.Event().wait)
+
+        assert second.submit(target, discord.Embed(), "voice_state", priority=LOW) is False
+        assert second.submit(target, discord.Embed(), "ban") is True
+        await second.close(timeout=0.05)
+        assert len(await rows(db)) == 3
@@ -62,28 +62,46 @@ class TestEventsMessageEvents:
         """Фикстура для создания Events cog."""
         bot = MagicMock()
         bot.logging = MagicMock()
-        bot.logging.log_message_delete = AsyncMock()
-        bot.logging.log_message_edit = AsyncMock()
+        bot.logging.log_raw_message_delete = AsyncMock()
+        bot.logging.log_raw_bulk_message_delete = AsyncMock()
+        bot.logging.log_raw_message_edit = AsyncMock()
         return Events(bot)
 
     @pytest.mark.asyncio
-    async def test_on_message_delete(self, events_cog):
+    async def test_on_raw_message_delete(self, events_cog):
         """Тест обработки удаления сообщения."""
-        message = MagicMock(spec=discord.Message)
+        payload = MagicMock(spec=discord.RawMessageDeleteEvent)
 
-        await events_cog.on_message_delete(message)
+        await events_cog.on_raw_message_delete(payload)
 
-        events_cog.bot.logging.log_message_delete.assert_called_once_with(message)
+        events_cog.bot.logging.log_raw_message_delete.assert_called_once_with(payload)
 
     @pytest.mark.asyncio
-    async def test_on_message_edit(self, events_cog):
+    async def test_on_raw_bulk_message_delete(self, events_cog):
+        """Тест обработки массового удаления сообщений."""
+        payload = MagicMock(spec=discord.RawBulkMessageDeleteEvent)
+
+        await events_cog.on_raw_bulk_message_delete(payload)
+
+        events_cog.bot.logging.log_raw_bulk_message_delete.assert_called_once_with(payload)
+
+    @pytest.mark.asyncio
+    async def test_on_raw_message_edit(self, events_cog):
         """Тест обработки редактирования сообщения."""
-        before = MagicMock(spec=discord.Message)
-        after = MagicMock(spec=discord.Message)
+        payload = MagicMock(spec=discord.RawMessageUpdateEvent)
+
+        await events_cog.on_raw_message_edit(payload)
+
+        events_cog.bot.logging.log_raw_message_edit.assert_called_once_with(payload)
+
+    @pytest.mark.asyncio
+    async def test_on_audit_log_entry_create(self, events_cog):
+        """Тест передачи записи журнала аудита в кэш атрибуции."""
+        entry = MagicMock(spec=discord.AuditLogEntry)
 
-        await events_cog.on_message_edit(before, after)
+        await events_cog.on_audit_log_entry_create(entry)
 
-        events_cog.bot.logging.log_message_edit.assert_called_once_with(before, after)
+        events_cog.bot.logging.record_audit_log_entry.assert_called_once_with(entry)
 
 
 class TestEventsMemberEvents:
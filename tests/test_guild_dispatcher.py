@@ -0,0 +1,142 @@
+"""Тесты для очередей событий по серверам."""
+
+import asyncio
+from collections import Counter
+from unittest.mock import patch
+
+import pytest
+
+from infrastructure.workers import GuildDispatcher
+
+
+def guild(worker: int, workers: int = 2) -> int:
+    """ID сервера, который попадает на заданный воркер."""
+    probe = GuildDispatcher(workers=workers)
+    return next(
+        guild_id
+        for guild_id in ((1000 + n) << 22 for n in range(1000))
+        if probe.worker_for(guild_id) == worker
+    )
+
+
+@pytest.fixture
+async def dispatcher():
+    """Фикстура для создания диспетчера на два воркера."""
+    dispatcher = GuildDispatcher(workers=2, queue_size=4, shed_ratio=0.5)
+    yield dispatcher
+    await dispatcher.close(timeout=0.1)
+
+
+class TestGuildDispatcher:
+    """Тесты порядка, изоляции и backpressure."""
+
+    def test_worker_for_is_stable(self, dispatcher):
+        """Тест что сервер всегда закреплен за одним воркером."""
+        assert dispatcher.worker_for(guild(0)) == 0
+        assert dispatcher.worker_for(guild(1)) == 1
+        assert dispatcher.worker_for(guild(1)) == dispatcher.worker_for(guild(1))
+        assert dispatcher.worker_for(None) == 0
+
+    def test_single_shard_spreads_across_workers(self):
+        """Тест что серверы одного шарда распределяются по всем воркерам."""
+        shard_count, shard_id = 16, 3
+        dispatcher = GuildDispatcher(workers=4)
+        guild_ids = [((n * shard_count + shard_id) << 22) | n for n in range(400)]
+        assert {(guild_id >> 22) % shard_count for guild_id in guild_ids} == {shard_id}
+
+        per_worker = Counter(dispatcher.worker_for(guild_id) for guild_id in guild_ids)
+
+        assert set(per_worker) == {0, 1, 2, 3}
+        assert min(per_worker.values()) > len(guild_ids) // 8
+
+    @pytest.mark.asyncio
+    async def test_preserves_order_within_guild(self, dispatcher):
+        """Тест что события одного сервера выполняются по порядку."""
+        seen = []
+
+        async def job(value):
+            await asyncio.sleep(0.001 * (3 - value))
+            seen.append(value)
+
+        for value in range(3):
+            dispatcher.submit(guild(0), lambda value=value: job(value))
+        await dispatcher.close()
+
+        assert seen == [0, 1, 2]
+
+    @pytest.mark.asyncio
+    async def test_busy_guild_does_not_block_other_worker(self, dispatcher):
+        """Тест что зависший сервер не задерживает серверы другого воркера."""
+        release = asyncio.Event()
+        done = asyncio.Event()
+
+        async def set_done():
+            done.set()
+
+        dispatcher.submit(guild(0), release.wait)
+        dispatcher.submit(guild(1), set_done)
+
+        await asyncio.wait_for(done.wait(), timeout=1)
+        release.set()
+
+    @pytest.mark.asyncio
+    async def test_full_queue_sheds_without_waiting(self, dispatcher):
+        """Тест что в полную очередь задача не ставится и не ждет места."""
+        release = asyncio.Event()
+        assert dispatcher.submit(guild(0), release.wait) is True
+        await asyncio.sleep(0)  # воркер забирает первую задачу
+        for _ in range(dispatcher.queue_size):
+            assert dispatcher.submit(guild(0), release.wait) is True
+
+        with patch("infrastructure.workers.guild_dispatcher.track_dispatch_drop") as drop:
+            assert dispatcher.submit(guild(0), release.wait) is False
+            assert dispatcher.submit(guild(1), release.wait) is True
+        drop.assert_called_once_with("0", "message")
+        assert dispatcher.depth(guild(0)) == dispatcher.queue_size
+        release.set()
+
+    @pytest.mark.asyncio
+    async def test_admit_sheds_low_priority_work(self, dispatcher):
+        """Тест сброса низкоприоритетной работы при перегрузке."""
+        release = asyncio.Event()
+        dispatcher.submit(guild(0), release.wait)
+        await asyncio.sleep(0)
+        assert dispatcher.admit(guild(0), "leveling") is True
+
+        for _ in range(dispatcher.shed_threshold):
+            dispatcher.submit(guild(0), release.wait)
+
+        with patch("infrastructure.workers.guild_dispatcher.track_dispatch_drop") as drop:
+            assert dispatcher.admit(guild(0), "leveling") is False
+            assert dispatcher.admit(guild(1), "leveling") is True
+        drop.assert_called_once_with("0", "leveling")
+        release.set()
+
+    @pytest.mark.asyncio
+    async def test_failing_job_does_not_stop_worker(self, dispatcher):
+        """Тест что ошибка задачи не останавливает воркер."""
+        done = asyncio.Event()
+
+        async def fail():
+            raise RuntimeError("boom")
+
+        async def set_done():
+            done.set()
+
+        with patch("infrastructure.workers.guild_dispatcher.capture_error") as capture:
+            dispatcher.submit(guild(0), fail)
+            dispatcher.submit(guild(0), set_done)
+            await asyncio.wait_for(done.wait(), timeout=1)
+
+        capture.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_close_reports_unfinished_jobs(self):
+        """Тест что close возвращает число невыполненных задач."""
+        dispatcher = GuildDispatcher(workers=1, queue_size=4)
+        never = asyncio.Event()
+        dispatcher.submit(guild(0), never.wait)
+        await asyncio.sleep(0)
+        dispatcher.submit(guild(0), never.wait)
+
+        assert await dispatcher.close(timeout=0.01) == 1
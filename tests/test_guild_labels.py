@@ -0,0 +1,110 @@
+"""Тесты ограничения меток guild_id в метриках."""
+
+import pytest
+from prometheus_client import REGISTRY, CollectorRegistry, generate_latest
+
+import utils.monitoring as monitoring
+from utils.guild_labels import OTHER, GuildBreakdownCollector, GuildLabelPolicy
+
+
+class TestGuildLabelPolicy:
+    """Тесты выбора серверов с точной меткой."""
+
+    def test_unknown_guilds_folded_into_other(self):
+        policy = GuildLabelPolicy(top_k=2)
+
+        assert policy.label("1") == OTHER
+        assert policy.label("dm") == "dm"
+        assert policy.label("all") == "all"
+
+    def test_top_k_by_traffic(self):
+        policy = GuildLabelPolicy(top_k=2)
+        for guild_id, messages in (("1", 5), ("2", 3), ("3", 1)):
+            for _ in range(messages):
+                policy.label(guild_id)
+
+        assert policy.recompute() == set()
+        assert policy.exact == {"1", "2"}
+        assert policy.label("1") == "1"
+        assert policy.label("3") == OTHER
+
+    def test_past_traffic_decays(self):
+        policy = GuildLabelPolicy(top_k=1)
+        for _ in range(10):
+            policy.label("1")
+        policy.recompute()
+
+        for _ in range(8):
+            policy.label("2")
+        dropped = policy.recompute()
+
+        assert policy.exact == {"2"}
+        assert dropped == {"1"}
+
+    def test_allowlist_always_exact(self):
+        policy = GuildLabelPolicy(top_k=0, allowlist=["7"])
+        for _ in range(100):
+            policy.label("1")
+
+        policy.recompute()
+
+        assert policy.label("7") == "7"
+        assert policy.label("1") == OTHER
+
+    def test_breakdown_collector_exposes_every_guild(self):
+        policy = GuildLabelPolicy(top_k=0)
+        for guild_id in ("1", "2", "2"):
+            policy.count("bot_messages_processed", (guild_id,))
+        registry = CollectorRegistry()
+        registry.register(
+            GuildBreakdownCollector(
+                policy, {"bot_messages_processed": ("counter", "Messages", ("guild_id",))}
+            )
+        )
+
+        output = generate_latest(registry).decode()
+
+        assert 'bot_messages_processed_total{guild_id="1"} 1.0' in output
+        assert 'bot_messages_processed_total{guild_id="2"} 2.0' in output
+
+
+class TestGuildLabelledMetrics:
+    """Тесты метрик с ограниченной меткой guild_id."""
+
+    @pytest.fixture(autouse=True)
+    def policy(self, monkeypatch):
+        policy = GuildLabelPolicy(top_k=1)
+        monkeypatch.setattr(monitoring, "GUILD_LABELS", policy)
+        return policy
+
+    @staticmethod
+    def messages(guild_id):
+        return REGISTRY.get_sample_value("bot_messages_processed_total", {"guild_id": guild_id})
+
+    def test_series_bounded_and_breakdown_exact(self, policy):
+        for index in range(50):
+            monitoring.track_message(str(9_100 + index))
+
+        assert self.messages("9100") is None
+        assert policy.values("bot_messages_processed")[("9100",)] == 1
+
+    def test_recompute_removes_series_of_dropped_guild(self, policy):
+        for _ in range(5):
+            monitoring.track_message("9200")
+        monitoring.recompute_guild_labels()
+        monitoring.track_message("9200")
+        assert self.messages("9200") == 1
+
+        for _ in range(20):
+            monitoring.track_message("9201")
+        monitoring.recompute_guild_labels()
+
+        assert self.messages("9200") is None
+        assert policy.exact == {"9201"}
+
+    def test_folded_gauge_is_sum(self, policy):
+        monitoring.update_active_users(3, "9300")
+        monitoring.update_active_users(4, "9301")
+
+        value = REGISTRY.get_sample_value("bot_active_users", {"guild_id": OTHER})
+        assert value == 7
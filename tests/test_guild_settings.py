@@ -0,0 +1,165 @@
+"""Тесты для сервиса настроек серверов."""
+
+import json
+import os
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from application.guild_settings import GuildSettings, GuildSettingsService
+from database.db import Database
+from infrastructure.db.settings_repository import GuildSettingsRepository
+
+
+@pytest.fixture
+async def database(tmp_path):
+    """Фикстура с настоящей SQLite базой во временной директории."""
+    with patch.dict(os.environ, {"DB_PATH": str(tmp_path / "bot.db"), "DB_POOL_SIZE": "1"}):
+        db = Database()
+    await db.setup()
+    yield db
+    await db.close()
+
+
+@pytest.fixture
+def service(database, tmp_path):
+    """Фикстура для создания сервиса поверх SQLite."""
+    return GuildSettingsService(GuildSettingsRepository(database), data_dir=tmp_path)
+
+
+class TestGuildSettingsService:
+    """Тесты кэша и записи настроек."""
+
+    @pytest.mark.asyncio
+    async def test_get_unknown_guild_returns_defaults(self, service):
+        """Тест пустых настроек для ненастроенного сервера."""
+        settings = service.get(123456)
+
+        assert settings == GuildSettings()
+        assert 123456 not in service.cache
+
+    @pytest.mark.asyncio
+    async def test_update_writes_through_and_survives_reload(self, service):
+        """Тест что изменение сразу попадает в БД и переживает перезапуск."""
+        await service.update(123456, logs_channel_id=111)
+        await service.update(123456, welcome_channel_id=222)
+
+        assert service.get(123456).logs_channel_id == 111
+
+        reloaded = GuildSettingsService(service.repository)
+        assert await reloaded.load() == 1
+        settings = reloaded.get(123456)
+        assert settings.logs_channel_id == 111
+        assert settings.welcome_channel_id == 222
+
+    @pytest.mark.asyncio
+    async def test_update_rejects_unknown_field(self, service):
+        """Тест отказа для неизвестной настройки."""
+        with pytest.raises(ValueError):
+            await service.update(123456, prefix="?")
+
+    @pytest.mark.asyncio
+    async def test_role_rewards_round_trip(self, service):
+        """Тест добавления, замены и удаления ролей-наград."""
+        await service.set_role_reward(123456, 5, 111)
+        await service.set_role_reward(123456, 10, 222)
+        # Та же роль на другой уровень переезжает, а не дублируется
+        await service.set_role_reward(123456, 15, 111)
+
+        assert service.get(123456).role_rewards == {10: 222, 15: 111}
+
+        assert await service.remove_role_reward(123456, 10) == 222
+        assert await service.remove_role_reward(123456, 10) is None
+
+        reloaded = GuildSettingsService(service.repository)
+        await reloaded.load()
+        assert reloaded.get(123456).role_rewards == {15: 111}
+
+    @pytest.mark.asyncio
+    async def test_update_publishes_new_snapshot(self, service):
+        """Тест что изменение не трогает снапшот, который уже получили читатели."""
+        await service.set_role_reward(123456, 10, 222)
+        reader = service.get(123456)
+
+        await service.set_role_reward(123456, 5, 111)
+
+        assert reader.role_rewards == {10: 222}
+        assert service.get(123456).version > reader.version
+        with pytest.raises(TypeError):
+            service.get(123456).role_rewards[1] = 1
+
+    @pytest.mark.asyncio
+    async def test_reward_thresholds_sorted_and_memoised(self, service):
+        """Тест отсортированных порогов, вычисляемых один раз на версию."""
+        await service.set_role_reward(123456, 15, 333)
+        await service.set_role_reward(123456, 5, 111)
+
+        settings = service.get(123456)
+
+        assert settings.reward_thresholds == ((5, 111), (15, 333))
+        assert settings.reward_thresholds is settings.reward_thresholds
+
+    @pytest.mark.asyncio
+    async def test_failed_write_does_not_touch_cache(self):
+        """Тест что кэш не меняется, если запись в БД не удалась."""
+        repository = AsyncMock()
+        repository.upsert.side_effect = RuntimeError("db is locked")
+        service = GuildSettingsService(repository)
+
+        with pytest.raises(RuntimeError):
+            await service.update(123456, logs_channel_id=111)
+
+        assert 123456 not in service.cache
+
+
+class TestGuildSettingsImport:
+    """Тесты однократного импорта старых JSON файлов."""
+
+    @pytest.mark.asyncio
+    async def test_imports_legacy_files(self, service, tmp_path):
+        """Тест переноса всех старых конфигов в БД."""
+        (tmp_path / "welcome_config.json").write_text(json.dumps({"123456": 111}))
+        (tmp_path / "logging_config.json").write_text(json.dumps({"123456": 222, "789012": 333}))
+        (tmp_path / "role_rewards.json").write_text(json.dumps({"123456": {"5": 444}}))
+        (tmp_path / "voice_config.json").write_text(
+            json.dumps({"creation_channel": 555, "temp_category": 666})
+        )
+        resolve = AsyncMock(return_value=789012)
+
+        assert await service.import_legacy_json(resolve) == 4
+        await service.load()
+
+        assert service.get(123456) == GuildSettings(
+            welcome_channel_id=111, logs_channel_id=222, role_rewards={5: 444}
+        )
+        assert service.get(789012) == GuildSettings(
+            logs_channel_id=333, voice_creation_channel_id=555, voice_category_id=666
+        )
+        resolve.assert_awaited_once_with(555)
+        assert not (tmp_path / "welcome_config.json").exists()
+        assert (tmp_path / "welcome_config.json.imported").exists()
+
+        # Повторный запуск ничего не делает
+        assert await service.import_legacy_json(resolve) == 0
+
+    @pytest.mark.asyncio
+    async def test_import_keeps_existing_values(self, service, tmp_path):
+        """Тест что импорт не затирает уже сохраненные настройки."""
+        await service.update(123456, welcome_channel_id=999)
+        (tmp_path / "logging_config.json").write_text(json.dumps({"123456": 222}))
+
+        await service.import_legacy_json()
+        await service.load()
+
+        assert service.get(123456).welcome_channel_id == 999
+        assert service.get(123456).logs_channel_id == 222
+
+    @pytest.mark.asyncio
+    async def test_voice_import_retried_when_guild_unknown(self, service, tmp_path):
+        """Тест что голосовой конфиг остается до успешного определения сервера."""
+        voice_file = tmp_path / "voice_config.json"
+        voice_file.write_text(json.dumps({"creation_channel": 555, "temp_category": 666}))
+        resolve = AsyncMock(side_effect=RuntimeError("gateway unavailable"))
+
+        assert await service.import_legacy_json(resolve) == 0
+        assert voice_file.exists()
@@ -6,7 +6,7 @@ import discord
 from io import BytesIO
 from PIL import Image
 
-from image_generator import ImageGenerator
+from image_generator import FONT_SIZES, ImageGenerator, load_font
 
 
 class TestImageGeneratorInitialization:
@@ -24,6 +24,17 @@ class TestImageGeneratorInitialization:
         """Тест инициализации генератора."""
         assert image_gen.font_path is not None
 
+    @pytest.mark.asyncio
+    async def test_preload_fonts_loads_each_size_once(self, image_gen):
+        """Тест что шрифты читаются с диска один раз на размер."""
+        load_font.cache_clear()
+        with patch('image_generator.ImageFont.truetype') as truetype:
+            assert await image_gen.preload_fonts() == len(FONT_SIZES)
+            load_font(48)
+
+        assert truetype.call_count == len(FONT_SIZES)
+        load_font.cache_clear()
+
 
 class TestImageGeneratorDownloadAvatar:
     """Тесты загрузки аватаров."""
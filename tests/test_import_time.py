@@ -0,0 +1,54 @@
+"""Тесты для бюджета времени холодного импорта бота."""
+
+import os
+
+import pytest
+
+from utils.import_time import DEFAULT_IMPORT_BUDGET_MS, measure_import, parse_importtime
+
+# Подсистемы, которые загружаются только при первом использовании
+LAZY_MODULES = ("PIL", "sentry_sdk", "redis", "sqlalchemy", "image_generator")
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _json
+import time:       900 |       1020 | json
+"""
+
+
+class TestParseImporttime:
+    """Тесты разбора вывода -X importtime."""
+
+    def test_records_and_depth(self):
+        """Тест разбора строк и вложенности."""
+        records = parse_importtime(SAMPLE)
+
+        assert [(record.module, record.depth) for record in records] == [
+            ("_json", 1),
+            ("json", 0),
+        ]
+        assert records[1].cumulative_us == 1020
+
+
+@pytest.fixture(scope="module")
+def report(tmp_path_factory):
+    """Отчет об импорте (каталог data/ создается во временной директории)."""
+    return measure_import("app.bot", cwd=tmp_path_factory.mktemp("import"))
+
+
+class TestColdImport:
+    """Тесты холодного импорта `app.bot` в отдельном интерпретаторе."""
+
+    def test_heavy_subsystems_not_imported(self, report):
+        """Тест что тяжелые редко используемые подсистемы загружаются лениво."""
+        assert report.modules.isdisjoint(LAZY_MODULES)
+
+    def test_within_budget(self, report, tmp_path):
+        """Тест бюджета времени импорта (IMPORT_TIME_BUDGET_MS)."""
+        budget = float(os.getenv("IMPORT_TIME_BUDGET_MS", DEFAULT_IMPORT_BUDGET_MS))
+        total = report.total_ms
+        if total > budget:
+            # Один повтор сглаживает случайную нагрузку на машину
+            total = min(total, measure_import("app.bot", cwd=tmp_path).total_ms)
+
+        assert total <= budget, report.format()
@@ -0,0 +1,129 @@
+"""Тесты JSON хранилища с журналом изменений."""
+
+import json
+
+import pytest
+
+from infrastructure.config import JournaledJsonStore, WarningsStore
+
+
+@pytest.fixture
+def make_store(tmp_path):
+    """Фабрика сторов в tmp_path."""
+
+    def factory(**kwargs):
+        store = JournaledJsonStore("test.json", dict, **kwargs)
+        store.path = tmp_path / "test.json"
+        return store
+
+    return factory
+
+
+class TestJournaledJsonStore:
+    """Тесты журналирования, восстановления и компакции."""
+
+    def test_changes_are_appended_to_journal(self, make_store):
+        store = make_store()
+        store.load()
+        snapshot = store.path.read_text(encoding="utf-8")
+
+        store.set(["1", "2"], [{"reason": "spam"}])
+        store.set(["1", "3"], [])
+
+        # Снапшот не переписывается, изменения только в журнале
+        assert store.path.read_text(encoding="utf-8") == snapshot
+        lines = store.journal_path.read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 2
+        assert json.loads(lines[0]) == {"op": "set", "k": ["1", "2"], "v": [{"reason": "spam"}]}
+
+    def test_state_rebuilt_from_snapshot_and_journal(self, make_store):
+        store = make_store()
+        store.load()
+        store.set(["1", "2"], {"xp": 10, "level": 0})
+        store.set(["1", "3"], {"xp": 5, "level": 0})
+        store.delete(["1", "3"])
+        store.flush_sync()
+
+        restored = make_store().load()
+
+        assert restored == {"1": {"2": {"xp": 10, "level": 0}}}
+
+    def test_delete_removes_empty_parents(self, make_store):
+        store = make_store()
+        data = store.load()
+        store.set(["1", "2"], 1)
+        store.delete(["1", "2"])
+
+        assert data == {}
+
+    def test_torn_last_line_is_skipped(self, make_store):
+        store = make_store()
+        store.load()
+        store.set(["1", "2"], 1)
+        store.flush_sync()
+        with store.journal_path.open("a", encoding="utf-8") as f:
+            f.write('{"op": "set", "k": ["1", "3"')
+
+        assert make_store().load() == {"1": {"2": 1}}
+
+    def test_sync_compaction_when_journal_exceeds_ratio(self, make_store):
+        store = make_store(compact_ratio=1.0, min_compact_bytes=0)
+        store.load()
+        for i in range(20):
+            store.set(["g", str(i)], i)
+
+        assert store.compactions >= 1
+        with store.path.open("r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+        assert snapshot["g"]["0"] == 0
+        assert not store.compacting_path.exists()
+        assert make_store().load() == store.load()
+
+    @pytest.mark.asyncio
+    async def test_background_compaction(self, make_store):
+        store = make_store(compact_ratio=1.0, min_compact_bytes=0)
+        store.load()
+        for i in range(20):
+            store.set(["g", str(i)], i)
+
+        await store.flush()
+
+        assert store.compactions >= 1
+        assert make_store().load() == {"g": {str(i): i for i in range(20)}}
+
+    def test_interrupted_compaction_is_recovered(self, make_store):
+        store = make_store()
+        store.load()
+        store.set(["1", "2"], [{"reason": "a"}])
+        store.flush_sync()
+        # Имитируем падение между ротацией журнала и записью снапшота
+        store.journal_path.rename(store.compacting_path)
+
+        restored = make_store()
+
+        assert restored.load() == {"1": {"2": [{"reason": "a"}]}}
+        assert not restored.compacting_path.exists()
+
+
+class TestWarningsStoreJournal:
+    """Тесты WarningsStore в режиме журнала."""
+
+    def test_set_user_warnings_uses_journal(self, tmp_path):
+        store = WarningsStore(journal=True)
+        store._store.path = tmp_path / "warnings.json"
+        store.load()
+
+        store.set_user_warnings("1", "2", [{"reason": "spam"}])
+
+        assert store._store.journal_path.exists()
+        assert store._store.load() == {"1": {"2": [{"reason": "spam"}]}}
+
+    def test_set_user_warnings_plain_mode_rewrites_file(self, tmp_path):
+        store = WarningsStore()
+        store._store.path = tmp_path / "warnings.json"
+        store.load()
+
+        store.set_user_warnings("1", "2", [{"reason": "spam"}])
+
+        with (tmp_path / "warnings.json").open("r", encoding="utf-8") as f:
+            assert json.load(f) == {"1": {"2": [{"reason": "spam"}]}}
@@ -0,0 +1,119 @@
+"""Тесты для JSON кодеков хранилищ."""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from infrastructure.config import JournaledJsonStore, JsonStore, configure_json_codec, get_codec
+from infrastructure.config import json_codec
+from infrastructure.config.json_codec import CODECS, JsonCodec, create_codec
+
+
+DATA = {"123456": {"789012": {"xp": 150, "level": 2, "name": "Тест/пользователь"}}}
+
+
+@pytest.fixture(autouse=True)
+def restore_codec():
+    """Вернуть кодек по умолчанию после теста."""
+    previous = json_codec._codec
+    yield
+    json_codec._codec = previous
+
+
+@pytest.fixture(params=list(CODECS))
+def codec_name(request):
+    """Имя кодека (пропускается, если библиотека не установлена)."""
+    if request.param != "json":
+        pytest.importorskip(request.param)
+    return request.param
+
+
+class TestJsonCodecs:
+    """Тесты совместимости кодеков."""
+
+    @pytest.mark.parametrize("pretty", [False, True])
+    def test_round_trip(self, codec_name, pretty):
+        """Тест что кодек читает то, что записал, и результат — валидный JSON."""
+        codec = create_codec(codec_name, pretty=pretty)
+
+        payload = codec.dumps(DATA)
+
+        assert isinstance(payload, bytes)
+        assert codec.loads(payload) == DATA
+        assert json.loads(payload.decode("utf-8")) == DATA
+        assert ("\n" in payload.decode("utf-8")) is pretty
+
+    def test_compact_has_no_whitespace(self, codec_name):
+        """Тест компактного режима для файлов на диске."""
+        payload = create_codec(codec_name).dumps({"a": [1, 2]})
+
+        assert payload == b'{"a":[1,2]}'
+
+    def test_non_string_keys_become_strings(self, codec_name):
+        """Тест приведения числовых ключей к строкам, как в stdlib json."""
+        codec = create_codec(codec_name)
+
+        assert codec.loads(codec.dumps({1: "a"})) == {"1": "a"}
+
+    def test_invalid_input_raises_value_error(self, codec_name):
+        """Тест единого типа ошибки разбора."""
+        with pytest.raises(ValueError):
+            create_codec(codec_name).loads(b'{"broken": ')
+
+    def test_pretty_override_per_call(self, codec_name):
+        """Тест явного выбора режима при вызове."""
+        codec = create_codec(codec_name, pretty=True)
+
+        assert b"\n" not in codec.dumps(DATA, pretty=False)
+
+
+class TestCodecSelection:
+    """Тесты выбора кодека при запуске."""
+
+    def test_auto_prefers_fastest_installed(self):
+        """Тест что auto выбирает первый доступный кодек."""
+        pytest.importorskip("orjson")
+
+        assert create_codec("auto").name == "orjson"
+
+    def test_missing_library_falls_back_to_stdlib(self):
+        """Тест отката на stdlib json, если библиотека не установлена."""
+        with patch.dict("sys.modules", {"orjson": None}):
+            codec = create_codec("orjson")
+
+        assert type(codec) is JsonCodec
+
+    def test_unknown_codec_raises(self):
+        """Тест ошибки для неизвестного имени."""
+        with pytest.raises(ValueError):
+            create_codec("yaml")
+
+    def test_configure_changes_store_format(self, tmp_path):
+        """Тест что выбранный кодек используется хранилищами."""
+        configure_json_codec("json", pretty=False)
+        assert get_codec().name == "json"
+
+        store = JsonStore("levels.json", dict)
+        store.path = tmp_path / "levels.json"
+        store.save(DATA)
+
+        assert b"\n" not in store.path.read_bytes()
+        assert store.load() == DATA
+
+    def test_journal_lines_stay_compact_in_pretty_mode(self, codec_name, tmp_path):
+        """Тест что журнал пишет одну строку на запись при любом режиме."""
+        configure_json_codec(codec_name, pretty=True)
+        store = JournaledJsonStore("warnings.json", dict)
+        store.path = tmp_path / "warnings.json"
+        store.load()
+
+        store.set(["123456", "789012"], [{"reason": "спам"}])
+        store.flush_sync()
+
+        lines = store.journal_path.read_bytes().splitlines()
+        assert len(lines) == 1
+
+        reloaded = JournaledJsonStore("warnings.json", dict)
+        reloaded.path = store.path
+        assert reloaded.load() == {"123456": {"789012": [{"reason": "спам"}]}}
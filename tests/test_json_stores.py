@@ -1,11 +1,14 @@
 """Тесты для JSON сторов конфигурации."""
 
+import asyncio
+import threading
+
 import pytest
 from unittest.mock import MagicMock, patch, mock_open
 import json
 from pathlib import Path
 
-from infrastructure.config.json_store import JsonStore
+from infrastructure.config.json_store import JsonStore, flush_json_stores
 from infrastructure.config.automod_store import AutomodConfigStore
 from infrastructure.config.levels_store import LevelsStore
 from infrastructure.config.tickets_store import TicketsConfigStore
@@ -375,3 +378,114 @@ class TestJsonStoreEdgeCases:
         # Второй load читает обновленные данные
         data2 = store.load()
         assert data2 == {"counter": 5}
+
+
+class TestJsonStoreWriteBehind:
+    """Тесты отложенной атомарной записи JsonStore."""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        """Фикстура стора с окном объединения записей."""
+        store = JsonStore("test.json", dict, debounce=0.05)
+        store.path = tmp_path / "test.json"
+        return store
+
+    @pytest.mark.asyncio
+    async def test_save_is_deferred_and_coalesced(self, store):
+        """Тест объединения нескольких сохранений в одну запись."""
+        data = {"count": 0}
+        for i in range(5):
+            data["count"] = i
+            store.save(data)
+
+        assert store.dirty
+        assert not store.path.exists()
+        assert store.coalesced_writes == 4
+
+        await asyncio.sleep(0.2)
+
+        assert not store.dirty
+        with store.path.open("r", encoding="utf-8") as f:
+            assert json.load(f) == {"count": 4}
+
+    @pytest.mark.asyncio
+    async def test_flush_writes_immediately(self, store):
+        """Тест немедленной записи при flush (остановка бота)."""
+        store.save({"key": "value"})
+
+        assert await store.flush() is True
+        assert await store.flush() is False
+        with store.path.open("r", encoding="utf-8") as f:
+            assert json.load(f) == {"key": "value"}
+
+    @pytest.mark.asyncio
+    async def test_flush_writes_state_at_flush_time(self, store):
+        """Тест что изменения во время записи в потоке не попадают в файл."""
+        data = {"guild": {"user": {"xp": 1}}}
+        store.save(data)
+        started = threading.Event()
+        release = threading.Event()
+        serialise = store._serialise
+
+        def slow_serialise(value):
+            started.set()
+            release.wait(2)
+            return serialise(value)
+
+        with patch.object(store, "_serialise", side_effect=slow_serialise):
+            flush = asyncio.create_task(store.flush())
+            await asyncio.get_running_loop().run_in_executor(None, started.wait, 2)
+            data["guild"]["user"]["xp"] = 2
+            data["guild"]["other"] = {"xp": 3}
+            release.set()
+            await flush
+
+        with store.path.open("r", encoding="utf-8") as f:
+            assert json.load(f) == {"guild": {"user": {"xp": 1}}}
+
+    @pytest.mark.asyncio
+    async def test_flush_json_stores_flushes_all_dirty(self, tmp_path):
+        """Тест общего сброса всех сторов."""
+        first = JsonStore("a.json", dict, debounce=10)
+        first.path = tmp_path / "a.json"
+        second = JsonStore("b.json", dict, debounce=10)
+        second.path = tmp_path / "b.json"
+        first.save({"a": 1})
+        second.save({"b": 2})
+
+        assert await flush_json_stores() >= 2
+        assert first.path.exists() and second.path.exists()
+
+    @pytest.mark.asyncio
+    async def test_load_returns_pending_data(self, store):
+        """Тест что load видит еще не записанные изменения."""
+        store.save({"pending": True})
+
+        assert store.load() == {"pending": True}
+        await store.flush()
+
+    def test_save_without_loop_is_synchronous(self, store):
+        """Тест синхронной записи вне event loop."""
+        store.save({"sync": True})
+
+        assert not store.dirty
+        assert store.path.exists()
+
+    def test_save_leaves_no_temp_files(self, tmp_path):
+        """Тест атомарной записи через временный файл."""
+        store = JsonStore("test.json", dict)
+        store.path = tmp_path / "test.json"
+
+        store.save({"a": 1})
+        store.save({"a": 2})
+
+        assert [p.name for p in tmp_path.iterdir()] == ["test.json"]
+
+    def test_flush_sync_writes_pending(self, store):
+        """Тест синхронного сброса при выходе процесса."""
+        store._pending = {"exit": True}
+
+        assert store.flush_sync() is True
+        with store.path.open("r", encoding="utf-8") as f:
+            assert json.load(f) == {"exit": True}
+
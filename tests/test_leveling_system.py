@@ -1,5 +1,6 @@
 """Тесты для системы уровней."""
 
+import asyncio
 import pytest
 from datetime import datetime, timedelta
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -208,7 +209,7 @@ class TestLevelingSystemMessageProcessing:
         message.guild.id = 789012
 
         # Устанавливаем кулдаун
-        cooldown_key = f"{message.author.id}_{message.guild.id}"
+        cooldown_key = (message.author.id, message.guild.id)
         leveling_system.xp_cooldowns[cooldown_key] = datetime.now()
 
         leveled_up, new_level = await leveling_system.process_message(message)
@@ -273,6 +274,73 @@ class TestLevelingSystemMessageProcessing:
         call_args = leveling_system.repository.update_user.call_args[0]
         assert call_args[2] > 50  # XP должен увеличиться (50 + 15-25)
 
+    @staticmethod
+    def _member():
+        guild = MagicMock()
+        guild.id = 789012
+        member = MagicMock(spec=discord.Member)
+        member.id = 123456
+        member.guild = guild
+        return member
+
+    @staticmethod
+    def _verdict(allowed):
+        verdict = asyncio.get_running_loop().create_future()
+        verdict.set_result(allowed)
+        return verdict
+
+    @pytest.mark.asyncio
+    async def test_vetoed_message_does_not_consume_cooldown(self, leveling_system):
+        """Тест что сообщение, отклоненное автомодерацией, не ставит кулдаун."""
+        member = self._member()
+
+        await leveling_system.add_experience(member, gate=self._verdict(False))
+
+        assert (member.id, member.guild.id) not in leveling_system.xp_cooldowns
+        leveling_system.repository.create_user.assert_not_called()
+
+        await leveling_system.add_experience(member, gate=self._verdict(True))
+
+        leveling_system.repository.create_user.assert_called_once()
+        assert (member.id, member.guild.id) in leveling_system.xp_cooldowns
+
+    @pytest.mark.asyncio
+    async def test_db_write_failure_falls_back_to_file(self, leveling_system):
+        """Тест что после ошибки записи в БД опыт начисляется в файл."""
+        member = self._member()
+        leveling_system.repository.create_user = AsyncMock(side_effect=RuntimeError("locked"))
+        leveling_system.save_user_data = MagicMock()
+
+        await leveling_system.add_experience(member, gate=self._verdict(True))
+
+        assert leveling_system.use_db is False
+        assert leveling_system.data[str(member.guild.id)][str(member.id)]["xp"] > 0
+        leveling_system.save_user_data.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_db_write_failure_without_file_fallback(self, leveling_system):
+        """Тест что процесс кластера не переходит на общий levels.json."""
+        member = self._member()
+        leveling_system.file_fallback = False
+        leveling_system.repository.create_user = AsyncMock(side_effect=RuntimeError("locked"))
+        leveling_system.save_user_data = MagicMock()
+
+        result = await leveling_system.add_experience(member, gate=self._verdict(True))
+
+        assert result == (False, None)
+        assert leveling_system.use_db is True
+        leveling_system.save_user_data.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_allowed_message_keeps_cooldown(self, leveling_system):
+        """Тест что разрешенное сообщение расходует кулдаун."""
+        member = self._member()
+
+        await leveling_system.add_experience(member, gate=self._verdict(True))
+        await leveling_system.add_experience(member, gate=self._verdict(True))
+
+        leveling_system.repository.create_user.assert_called_once()
+
 
 class TestLevelingSystemDataManagement:
     """Тесты управления данными."""
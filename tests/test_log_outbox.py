@@ -0,0 +1,164 @@
+"""Тесты для очереди отправки логов по каналам."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import discord
+import pytest
+
+from infrastructure.cache import MessageContentCache
+from infrastructure.workers.log_outbox import LOW, MAX_EMBED_CHARS, MAX_EMBEDS, LogOutbox
+from logging_system import LoggingSystem
+
+
+def channel(channel_id=1):
+    """Канал логов с отправкой сообщений."""
+    return SimpleNamespace(id=channel_id, send=AsyncMock())
+
+
+def embed(number, size=10):
+    """Embed с описанием заданной длины."""
+    return discord.Embed(title=str(number), description="x" * size)
+
+
+class TestLogOutbox:
+    """Тесты объединения и сброса событий."""
+
+    @pytest.mark.asyncio
+    async def test_burst_coalesced_into_messages(self):
+        """Тест что всплеск из 25 событий уходит тремя сообщениями."""
+        outbox = LogOutbox(window=0.01)
+        target = channel()
+
+        for number in range(25):
+            outbox.submit(target, embed(number), "voice_state")
+        assert outbox.backlog == 25
+        await asyncio.sleep(0.05)
+
+        sizes = [len(call.kwargs["embeds"]) for call in target.send.await_args_list]
+        assert sizes == [MAX_EMBEDS, MAX_EMBEDS, 5]
+        assert outbox.backlog == 0
+
+    @pytest.mark.asyncio
+    async def test_embed_character_budget(self):
+        """Тест что сообщение не превышает 6000 символов в embed."""
+        outbox = LogOutbox(window=0)
+        target = channel()
+
+        for number in range(3):
+            outbox.submit(target, embed(number, size=2500), "message_edit")
+        await outbox.close()
+
+        sizes = [len(call.kwargs["embeds"]) for call in target.send.await_args_list]
+        assert sizes == [2, 1]
+
+    @pytest.mark.asyncio
+    async def test_low_priority_shed_with_summary(self):
+        """Тест сброса низкоприоритетных событий со сводкой."""
+        outbox = LogOutbox(window=10, shed_threshold=2, max_backlog=3)
+        target = channel()
+
+        results = [outbox.submit(target, embed(n), "voice_state", LOW) for n in range(4)]
+        high = outbox.submit(target, embed(4), "ban")
+        overflow = outbox.submit(target, embed(5), "ban")
+        await outbox.close()
+
+        assert results == [True, True, False, False]
+        assert high is True
+        assert overflow is False
+        embeds = target.send.await_args.kwargs["embeds"]
+        assert len(embeds) == 4
+        assert "пропущено 3" in embeds[-1].description
+        assert "voice_state: 2" in embeds[-1].description
+
+    @pytest.mark.asyncio
+    async def test_summary_size_is_reserved(self):
+        """Тест что сводка не выводит сообщение за 6000 символов и 10 embed."""
+        outbox = LogOutbox(window=10, shed_threshold=0, max_backlog=MAX_EMBEDS)
+        target = channel()
+
+        for number in range(3):
+            outbox.submit(target, embed(number, size=1990), "message_edit")
+        for number in range(MAX_EMBEDS - 3):
+            outbox.submit(target, embed(number, size=1), "message_edit")
+        outbox.submit(target, embed(99), "voice_state", LOW)
+        await outbox.close()
+
+        messages = [call.kwargs["embeds"] for call in target.send.await_args_list]
+        assert all(len(embeds) <= MAX_EMBEDS for embeds in messages)
+        assert all(sum(len(e) for e in embeds) <= MAX_EMBED_CHARS for embeds in messages)
+        assert "пропущено 1" in messages[0][-1].description
+        assert sum(len(embeds) for embeds in messages) == MAX_EMBEDS + 1
+
+    @pytest.mark.asyncio
+    async def test_summary_kept_until_sent(self):
+        """Тест что неотправленная сводка повторяется со следующей пачкой."""
+        outbox = LogOutbox(window=0, shed_threshold=1)
+        target = channel()
+        error = discord.HTTPException(MagicMock(), "Error")
+        target.send.side_effect = [error, error, None]
+
+        outbox.submit(target, embed(1), "ban")
+        outbox.submit(target, embed(2), "voice_state", LOW)
+        await outbox.close()
+        # Пачка и отдельная сводка не отправились, счетчик сохранен
+        assert target.send.await_count == 2
+        outbox.submit(target, embed(3), "ban")
+        await outbox.close()
+
+        embeds = target.send.await_args.kwargs["embeds"]
+        assert [e.title for e in embeds[:-1]] == ["3"]
+        assert "пропущено 1" in embeds[-1].description
+
+    @pytest.mark.asyncio
+    async def test_channels_are_independent(self):
+        """Тест отдельных очередей для каналов."""
+        outbox = LogOutbox(window=0)
+        first, second = channel(1), channel(2)
+
+        outbox.submit(first, embed(1), "ban")
+        outbox.submit(second, embed(2), "ban")
+        await outbox.close()
+
+        first.send.assert_awaited_once()
+        second.send.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_close_skips_window_and_survives_errors(self):
+        """Тест что остановка отправляет логи сразу, а ошибка HTTP не теряет очередь."""
+        outbox = LogOutbox(window=60)
+        target = channel()
+        target.send.side_effect = [discord.HTTPException(MagicMock(), "Error"), None]
+
+        for number in range(MAX_EMBEDS + 1):
+            outbox.submit(target, embed(number), "ban")
+        pending = await asyncio.wait_for(outbox.close(), 1)
+
+        assert pending == 0
+        assert target.send.await_count == 2
+
+
+class TestLoggingSystemOutbox:
+    """Тесты подключения очереди к системе логирования."""
+
+    @pytest.mark.asyncio
+    async def test_log_event_does_not_wait_for_send(self, guild_settings):
+        """Тест что log_event возвращается до отправки сообщения."""
+        from application.guild_settings import GuildSettings
+
+        outbox = LogOutbox(window=60)
+        cache = MessageContentCache()
+        system = LoggingSystem(MagicMock(), guild_settings, cache, outbox)
+        target = channel(789012)
+        guild = MagicMock(id=123456)
+        guild.get_channel.return_value = target
+        guild_settings.cache[123456] = GuildSettings(logs_channel_id=789012)
+
+        await system.log_event(guild, "Test", "Description")
+
+        assert system.message_cache is cache
+        target.send.assert_not_awaited()
+        assert outbox.backlog == 1
+        await outbox.close()
+        target.send.assert_awaited_once()
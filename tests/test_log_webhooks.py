@@ -0,0 +1,110 @@
+"""Тесты отправки логов через webhook канала."""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import discord
+import pytest
+
+from infrastructure.workers import WebhookSink
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_channel(manage_webhooks=True, existing=()):
+    """Канал логов, где бот может управлять webhook."""
+    me = SimpleNamespace(
+        id=1, display_name="Bot", display_avatar=SimpleNamespace(url="https://avatar")
+    )
+    webhook = MagicMock()
+    webhook.send = AsyncMock()
+    channel = MagicMock()
+    channel.id = 10
+    channel.guild = SimpleNamespace(me=me)
+    channel.send = AsyncMock()
+    channel.permissions_for.return_value = SimpleNamespace(manage_webhooks=manage_webhooks)
+    channel.webhooks = AsyncMock(return_value=list(existing))
+    channel.create_webhook = AsyncMock(return_value=webhook)
+    return channel, webhook
+
+
+def own_webhook(user_id=1, token="token"):
+    webhook = MagicMock()
+    webhook.user = SimpleNamespace(id=user_id)
+    webhook.token = token
+    webhook.send = AsyncMock()
+    return webhook
+
+
+class TestWebhookSink:
+    """Тесты получения webhook и отправки в канал при его отсутствии."""
+
+    @pytest.mark.asyncio
+    async def test_creates_and_caches_webhook(self):
+        """Тест что webhook создается один раз и используется для всех пачек."""
+        channel, webhook = make_channel()
+        sink = WebhookSink()
+        embeds = [discord.Embed(title="1")]
+
+        await sink(channel, embeds)
+        await sink(channel, embeds)
+
+        channel.create_webhook.assert_awaited_once()
+        assert webhook.send.await_count == 2
+        assert webhook.send.await_args.kwargs["embeds"] == embeds
+        assert webhook.send.await_args.kwargs["username"] == "Bot"
+        channel.send.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_reuses_own_existing_webhook(self):
+        """Тест что используется webhook бота, а не чужой."""
+        foreign = own_webhook(user_id=2)
+        mine = own_webhook()
+        channel, _ = make_channel(existing=[foreign, mine])
+
+        await WebhookSink()(channel, [discord.Embed()])
+
+        mine.send.assert_awaited_once()
+        foreign.send.assert_not_called()
+        channel.create_webhook.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_falls_back_without_permission(self):
+        """Тест отправки в канал без права Manage Webhooks."""
+        clock = FakeClock()
+        channel, _ = make_channel(manage_webhooks=False)
+        sink = WebhookSink(retry_after=60, clock=clock)
+
+        await sink(channel, [discord.Embed()])
+        channel.permissions_for.return_value.manage_webhooks = True
+        await sink(channel, [discord.Embed()])
+
+        assert channel.send.await_count == 2
+        channel.create_webhook.assert_not_called()
+
+        clock.now += 61
+        await sink(channel, [discord.Embed()])
+        channel.create_webhook.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_deleted_webhook_falls_back_and_reprovisions(self):
+        """Тест что удаленный webhook забывается, а пачка уходит в канал."""
+        channel, webhook = make_channel()
+        webhook.send.side_effect = [
+            discord.NotFound(MagicMock(status=404), "Unknown Webhook"),
+            None,
+        ]
+        sink = WebhookSink()
+
+        await sink(channel, [discord.Embed()])
+        channel.send.assert_awaited_once()
+
+        await sink(channel, [discord.Embed()])
+        assert channel.create_webhook.await_count == 2
+        assert webhook.send.await_count == 2
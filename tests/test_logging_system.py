@@ -2,60 +2,26 @@
 
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
 import discord
-from pathlib import Path
-import json
 
+from application.guild_settings import GuildSettings
+from application.voice_activity import VoiceActivityAggregator
+from infrastructure.cache import AuditLogCache, MessageContentCache
 from logging_system import LoggingSystem
 
 
-class TestLoggingSystemConfiguration:
-    """Тесты конфигурации системы логирования."""
-
-    @pytest.fixture
-    def logging_system(self, tmp_path):
-        """Фикстура для создания системы логирования."""
-        bot = MagicMock()
-        system = LoggingSystem(bot)
-        system.config_file = tmp_path / "logging_config.json"
-        system.config = {}
-        return system
-
-    def test_load_config_creates_empty_if_not_exists(self, logging_system):
-        """Тест создания пустой конфигурации если файл не существует."""
-        logging_system.load_config()
-        assert logging_system.config == {}
-
-    def test_load_config_reads_existing_file(self, logging_system):
-        """Тест чтения существующего файла конфигурации."""
-        test_config = {"123456": 789012}
-        logging_system.config_file.write_text(json.dumps(test_config))
-
-        logging_system.load_config()
-
-        assert logging_system.config == test_config
-
-    def test_save_config_writes_to_file(self, logging_system):
-        """Тест сохранения конфигурации в файл."""
-        logging_system.config = {"123456": 789012}
-
-        logging_system.save_config()
-
-        saved_data = json.loads(logging_system.config_file.read_text())
-        assert saved_data == {"123456": 789012}
-
-
 class TestLoggingSystemSetup:
     """Тесты настройки канала логов."""
 
     @pytest.fixture
-    def logging_system(self, tmp_path):
+    def logging_system(self, guild_settings):
         """Фикстура для создания системы логирования."""
         bot = MagicMock()
         bot.tree = MagicMock()
-        system = LoggingSystem(bot)
-        system.config_file = tmp_path / "logging_config.json"
-        system.config = {}
+        system = LoggingSystem(bot, guild_settings)
         return system
 
     @pytest.mark.asyncio
@@ -70,12 +36,10 @@ class TestLoggingSystemLogEvent:
     """Тесты базового метода логирования событий."""
 
     @pytest.fixture
-    def logging_system(self, tmp_path):
+    def logging_system(self, guild_settings):
         """Фикстура для создания системы логирования."""
         bot = MagicMock()
-        system = LoggingSystem(bot)
-        system.config_file = tmp_path / "logging_config.json"
-        system.config = {}
+        system = LoggingSystem(bot, guild_settings)
         return system
 
     @pytest.mark.asyncio
@@ -95,7 +59,7 @@ class TestLoggingSystemLogEvent:
         guild.id = 123456
         guild.get_channel = MagicMock(return_value=None)
 
-        logging_system.config = {"123456": 789012}
+        logging_system.settings.cache[123456] = GuildSettings(logs_channel_id=789012)
 
         await logging_system.log_event(guild, "Test", "Description")
 
@@ -110,7 +74,7 @@ class TestLoggingSystemLogEvent:
         channel = AsyncMock()
         guild.get_channel = MagicMock(return_value=channel)
 
-        logging_system.config = {"123456": 789012}
+        logging_system.settings.cache[123456] = GuildSettings(logs_channel_id=789012)
 
         await logging_system.log_event(
             guild,
@@ -119,10 +83,11 @@ class TestLoggingSystemLogEvent:
             discord.Color.blue()
         )
 
+        await logging_system.outbox.close()
+
         channel.send.assert_called_once()
         call_args = channel.send.call_args
-        assert "embed" in call_args.kwargs
-        embed = call_args.kwargs["embed"]
+        embed = call_args.kwargs["embeds"][0]
         assert embed.title == "Test Title"
         assert embed.description == "Test Description"
 
@@ -135,7 +100,7 @@ class TestLoggingSystemLogEvent:
         channel = AsyncMock()
         guild.get_channel = MagicMock(return_value=channel)
 
-        logging_system.config = {"123456": 789012}
+        logging_system.settings.cache[123456] = GuildSettings(logs_channel_id=789012)
 
         fields = [("Field 1", "Value 1", False), ("Field 2", "Value 2", True)]
 
@@ -146,9 +111,11 @@ class TestLoggingSystemLogEvent:
             fields=fields
         )
 
+        await logging_system.outbox.close()
+
         channel.send.assert_called_once()
         call_args = channel.send.call_args
-        embed = call_args.kwargs["embed"]
+        embed = call_args.kwargs["embeds"][0]
         assert len(embed.fields) == 2
 
     @pytest.mark.asyncio
@@ -160,7 +127,7 @@ class TestLoggingSystemLogEvent:
         channel = AsyncMock()
         guild.get_channel = MagicMock(return_value=channel)
 
-        logging_system.config = {"123456": 789012}
+        logging_system.settings.cache[123456] = GuildSettings(logs_channel_id=789012)
 
         author = MagicMock()
         author.__str__ = MagicMock(return_value="TestUser")
@@ -172,9 +139,11 @@ class TestLoggingSystemLogEvent:
             author=author
         )
 
+        await logging_system.outbox.close()
+
         channel.send.assert_called_once()
         call_args = channel.send.call_args
-        embed = call_args.kwargs["embed"]
+        embed = call_args.kwargs["embeds"][0]
         assert "TestUser" in embed.footer.text
 
     @pytest.mark.asyncio
@@ -187,134 +156,176 @@ class TestLoggingSystemLogEvent:
         channel.send = AsyncMock(side_effect=discord.HTTPException(MagicMock(), "Error"))
         guild.get_channel = MagicMock(return_value=channel)
 
-        logging_system.config = {"123456": 789012}
+        logging_system.settings.cache[123456] = GuildSettings(logs_channel_id=789012)
 
         # Не должно быть исключения
         await logging_system.log_event(guild, "Test", "Description")
+        assert await logging_system.outbox.close() == 0
 
 
 class TestLoggingSystemMessageEvents:
-    """Тесты логирования событий сообщений."""
+    """Тесты логирования событий сообщений по raw событиям."""
 
     @pytest.fixture
-    def logging_system(self, tmp_path):
+    def logging_system(self, guild_settings):
         """Фикстура для создания системы логирования."""
         bot = MagicMock()
-        system = LoggingSystem(bot)
-        system.config_file = tmp_path / "logging_config.json"
-        system.config = {"123456": 789012}
+        bot.get_guild.return_value = MagicMock(id=123456)
+        bot.get_user.return_value = None
+        guild_settings.cache[123456] = GuildSettings(logs_channel_id=789012)
+        system = LoggingSystem(bot, guild_settings, MessageContentCache(maxsize=10))
         system.log_event = AsyncMock()
         return system
 
-    @pytest.mark.asyncio
-    async def test_log_message_delete(self, logging_system):
-        """Тест логирования удаления сообщения."""
-        guild = MagicMock()
-        guild.id = 123456
-
-        channel = MagicMock()
-        channel.mention = "#test-channel"
-
-        author = MagicMock()
-        author.mention = "@user"
-
+    def message(self, message_id=1, guild_id=123456, content="Test message", bot=False):
+        """Сообщение пользователя на сервере."""
         message = MagicMock(spec=discord.Message)
-        message.guild = guild
-        message.channel = channel
-        message.author = author
-        message.content = "Test message"
+        message.id = message_id
+        message.guild = MagicMock(id=guild_id) if guild_id else None
+        message.channel = MagicMock(id=555)
+        message.author = MagicMock(id=42, bot=bot, mention="<@42>")
+        message.content = content
+        return message
+
+    def test_remember_only_with_logs_enabled(self, logging_system):
+        """Тест что текст запоминается только на серверах с логами."""
+        logging_system.remember_message(self.message(1))
+        logging_system.remember_message(self.message(2, guild_id=999))
+        logging_system.remember_message(self.message(3, guild_id=None))
+
+        assert 1 in logging_system.message_cache
+        assert len(logging_system.message_cache) == 1
 
-        await logging_system.log_message_delete(message)
+    @pytest.mark.asyncio
+    async def test_delete_from_own_cache(self, logging_system):
+        """Тест лога удаления без кэша сообщений discord.py."""
+        logging_system.remember_message(self.message(1))
+        payload = SimpleNamespace(
+            message_id=1, channel_id=555, guild_id=123456, cached_message=None
+        )
+
+        await logging_system.log_raw_message_delete(payload)
 
-        logging_system.log_event.assert_called_once()
         call_args = logging_system.log_event.call_args[0]
         assert "удалено" in call_args[1].lower()
         assert "Test message" in call_args[2]
+        assert "<@42>" in call_args[2]
+        assert 1 not in logging_system.message_cache
 
     @pytest.mark.asyncio
-    async def test_log_message_delete_no_guild(self, logging_system):
-        """Тест что DM сообщения не логируются."""
-        message = MagicMock(spec=discord.Message)
-        message.guild = None
+    async def test_delete_unknown_message(self, logging_system):
+        """Тест что удаление неизвестного сообщения логируется без текста."""
+        payload = SimpleNamespace(
+            message_id=7, channel_id=555, guild_id=123456, cached_message=None
+        )
 
-        await logging_system.log_message_delete(message)
+        await logging_system.log_raw_message_delete(payload)
 
-        logging_system.log_event.assert_not_called()
+        assert "недоступно" in logging_system.log_event.call_args[0][2]
 
     @pytest.mark.asyncio
-    async def test_log_message_edit(self, logging_system):
-        """Тест логирования редактирования сообщения."""
-        guild = MagicMock()
-        guild.id = 123456
-
-        channel = MagicMock()
-        channel.mention = "#test-channel"
+    async def test_delete_in_dm_ignored(self, logging_system):
+        """Тест что DM сообщения не логируются."""
+        payload = SimpleNamespace(message_id=7, channel_id=555, guild_id=None, cached_message=None)
 
-        author = MagicMock()
-        author.mention = "@user"
+        await logging_system.log_raw_message_delete(payload)
 
-        before = MagicMock(spec=discord.Message)
-        before.guild = guild
-        before.channel = channel
-        before.author = author
-        before.content = "Old content"
+        logging_system.log_event.assert_not_called()
 
-        after = MagicMock(spec=discord.Message)
-        after.guild = guild
-        after.channel = channel
-        after.author = author
-        after.content = "New content"
+    @pytest.mark.asyncio
+    async def test_bulk_delete(self, logging_system):
+        """Тест одного лога на массовое удаление."""
+        for message_id in (1, 2):
+            logging_system.remember_message(self.message(message_id, content=f"text {message_id}"))
+        payload = SimpleNamespace(
+            message_ids={1, 2, 3}, channel_id=555, guild_id=123456, cached_messages=[]
+        )
 
-        await logging_system.log_message_edit(before, after)
+        await logging_system.log_raw_bulk_message_delete(payload)
 
         logging_system.log_event.assert_called_once()
-        call_args = logging_system.log_event.call_args
-        assert "изменено" in call_args[0][1].lower()
+        kwargs = logging_system.log_event.call_args.kwargs
+        assert [value for _, value, _ in kwargs["fields"]] == ["text 1", "text 2"]
+        assert "3" in logging_system.log_event.call_args[0][2]
+        assert len(logging_system.message_cache) == 0
 
     @pytest.mark.asyncio
-    async def test_log_message_edit_same_content(self, logging_system):
-        """Тест что не логируется если контент не изменился."""
-        guild = MagicMock()
-        guild.id = 123456
+    async def test_bulk_delete_of_long_messages_fits_embed_limit(self, logging_system):
+        """Тест что массовое удаление длинных сообщений укладывается в лимит embed."""
+        for message_id in range(1, 11):
+            logging_system.remember_message(self.message(message_id, content="x" * 2000))
+        payload = SimpleNamespace(
+            message_ids=set(range(1, 13)), channel_id=555, guild_id=123456, cached_messages=[]
+        )
 
-        before = MagicMock(spec=discord.Message)
-        before.guild = guild
-        before.content = "Same content"
+        await logging_system.log_raw_bulk_message_delete(payload)
+
+        title, description = logging_system.log_event.call_args[0][1:3]
+        embed = discord.Embed(title=title, description=description)
+        for name, value, inline in logging_system.log_event.call_args.kwargs["fields"]:
+            embed.add_field(name=name, value=value, inline=inline)
+            assert value.endswith("…")
+        embed.set_footer(text="Действие выполнил: moderator#0001")
+        assert len(embed.fields) == 10
+        assert len(embed) <= 6000
+
+    def edit_payload(self, content, edited=True, message_id=1):
+        """Raw событие редактирования."""
+        return SimpleNamespace(
+            message_id=message_id,
+            channel_id=555,
+            guild_id=123456,
+            cached_message=None,
+            message=self.message(message_id, content=content),
+            data={"edited_timestamp": "2026-01-01T00:00:00+00:00" if edited else None},
+        )
 
-        after = MagicMock(spec=discord.Message)
-        after.guild = guild
-        after.content = "Same content"
+    @pytest.mark.asyncio
+    async def test_edit_from_own_cache(self, logging_system):
+        """Тест лога редактирования с прежним текстом из кэша."""
+        logging_system.remember_message(self.message(1, content="Old content"))
 
-        await logging_system.log_message_edit(before, after)
+        await logging_system.log_raw_message_edit(self.edit_payload("New content"))
 
-        logging_system.log_event.assert_not_called()
+        fields = logging_system.log_event.call_args.kwargs["fields"]
+        assert fields[0][1] == "Old content"
+        assert fields[1][1] == "New content"
+        assert logging_system.message_cache.get(1).content == "New content"
 
     @pytest.mark.asyncio
-    async def test_log_message_edit_no_guild(self, logging_system):
-        """Тест что DM сообщения не логируются."""
-        before = MagicMock(spec=discord.Message)
-        before.guild = None
-        before.content = "Old"
+    async def test_edit_same_content(self, logging_system):
+        """Тест что не логируется если контент не изменился (превью ссылок)."""
+        logging_system.remember_message(self.message(1, content="Same content"))
 
-        after = MagicMock(spec=discord.Message)
-        after.guild = None
-        after.content = "New"
+        await logging_system.log_raw_message_edit(self.edit_payload("Same content"))
 
-        await logging_system.log_message_edit(before, after)
+        logging_system.log_event.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_unknown_message_embed_update_ignored(self, logging_system):
+        """Тест что подгрузка превью неизвестного сообщения не логируется."""
+        await logging_system.log_raw_message_edit(self.edit_payload("Text", edited=False))
 
         logging_system.log_event.assert_not_called()
 
+    @pytest.mark.asyncio
+    async def test_unknown_message_edit_logged(self, logging_system):
+        """Тест лога правки сообщения, которого нет в кэше."""
+        await logging_system.log_raw_message_edit(self.edit_payload("New content"))
+
+        fields = logging_system.log_event.call_args.kwargs["fields"]
+        assert "недоступно" in fields[0][1]
+
 
 class TestLoggingSystemMemberEvents:
     """Тесты логирования событий участников."""
 
     @pytest.fixture
-    def logging_system(self, tmp_path):
+    def logging_system(self, guild_settings):
         """Фикстура для создания системы логирования."""
         bot = MagicMock()
-        system = LoggingSystem(bot)
-        system.config_file = tmp_path / "logging_config.json"
-        system.config = {"123456": 789012}
+        guild_settings.cache[123456] = GuildSettings(logs_channel_id=789012)
+        system = LoggingSystem(bot, guild_settings, audit_log=AuditLogCache(wait=0))
         system.log_event = AsyncMock()
         return system
 
@@ -449,12 +460,11 @@ class TestLoggingSystemVoiceEvents:
     """Тесты логирования голосовых событий."""
 
     @pytest.fixture
-    def logging_system(self, tmp_path):
+    def logging_system(self, guild_settings):
         """Фикстура для создания системы логирования."""
         bot = MagicMock()
-        system = LoggingSystem(bot)
-        system.config_file = tmp_path / "logging_config.json"
-        system.config = {"123456": 789012}
+        guild_settings.cache[123456] = GuildSettings(logs_channel_id=789012)
+        system = LoggingSystem(bot, guild_settings)
         system.log_event = AsyncMock()
         return system
 
@@ -531,16 +541,97 @@ class TestLoggingSystemVoiceEvents:
         logging_system.log_event.assert_not_called()
 
 
+class TestLoggingSystemVoiceActivity:
+    """Тесты сводок голосовой активности."""
+
+    @pytest.fixture
+    def clock(self):
+        return SimpleNamespace(now=1_700_000_000.0)
+
+    @pytest.fixture
+    def logging_system(self, guild_settings, clock):
+        """Система логирования с агрегацией голосовых событий."""
+        guild = MagicMock()
+        guild.id = 123456
+        bot = MagicMock()
+        bot.get_guild.return_value = guild
+        guild_settings.cache[123456] = GuildSettings(logs_channel_id=789012)
+        aggregator = VoiceActivityAggregator(settle=60, clock=lambda: clock.now)
+        system = LoggingSystem(bot, guild_settings, voice_activity=aggregator)
+        system.log_event = AsyncMock()
+        return system
+
+    @staticmethod
+    def voice_state(name):
+        channel = MagicMock()
+        channel.name = name
+        return SimpleNamespace(channel=channel if name else None)
+
+    async def hop(self, logging_system, clock, member, path):
+        """Пройти по голосовым каналам `path` (None — вне голоса) с шагом в минуту."""
+        for before, after in zip(path, path[1:]):
+            await logging_system.log_voice_state_update(
+                member, self.voice_state(before), self.voice_state(after)
+            )
+            clock.now += 60
+
+    @pytest.fixture
+    def member(self):
+        member = MagicMock(spec=discord.Member)
+        member.guild = SimpleNamespace(id=123456)
+        member.id = 42
+        member.mention = "@user"
+        return member
+
+    @pytest.mark.asyncio
+    async def test_session_logged_once_after_settle(self, logging_system, clock, member):
+        """Тест что вход, переходы и выход попадают в одну запись."""
+        await self.hop(logging_system, clock, member, [None, "A", "B", "C", None])
+
+        logging_system.log_event.assert_not_called()
+        assert await logging_system.flush_voice_activity() == 1
+
+        logging_system.log_event.assert_called_once()
+        description = logging_system.log_event.call_args[0][2]
+        assert "подключился к **A**" in description
+        assert "**A** → **B**" in description
+        assert "**B** → **C**" in description
+        assert "отключился от **C**" in description
+        assert "**В голосе:** 3 мин" in description
+        assert logging_system.log_event.call_args.kwargs["kind"] == "voice_activity"
+
+    @pytest.mark.asyncio
+    async def test_quick_rejoin_stays_in_session(self, logging_system, clock, member):
+        """Тест что переподключение до `settle` не завершает сессию."""
+        await self.hop(logging_system, clock, member, [None, "A", None])
+        clock.now -= 30
+        await self.hop(logging_system, clock, member, [None, "A"])
+
+        assert await logging_system.flush_voice_activity() == 0
+        assert await logging_system.flush_voice_activity(force=True) == 1
+        description = logging_system.log_event.call_args[0][2]
+        assert description.count("подключился к **A**") == 2
+        assert "**В голосе уже:**" in description
+
+    @pytest.mark.asyncio
+    async def test_guild_without_logs_not_tracked(self, logging_system, clock, member):
+        """Тест что сессии серверов без канала логов не хранятся."""
+        member.guild = SimpleNamespace(id=999)
+
+        await self.hop(logging_system, clock, member, [None, "A"])
+
+        assert len(logging_system.voice_activity) == 0
+
+
 class TestLoggingSystemModerationEvents:
     """Тесты логирования событий модерации."""
 
     @pytest.fixture
-    def logging_system(self, tmp_path):
+    def logging_system(self, guild_settings):
         """Фикстура для создания системы логирования."""
         bot = MagicMock()
-        system = LoggingSystem(bot)
-        system.config_file = tmp_path / "logging_config.json"
-        system.config = {"123456": 789012}
+        guild_settings.cache[123456] = GuildSettings(logs_channel_id=789012)
+        system = LoggingSystem(bot, guild_settings, audit_log=AuditLogCache(wait=0))
         system.log_event = AsyncMock()
         return system
 
@@ -558,6 +649,8 @@ class TestLoggingSystemModerationEvents:
         user.__str__ = MagicMock(return_value="BannedUser")
 
         audit_entry = MagicMock()
+        audit_entry.id = 1
+        audit_entry.created_at = datetime.now(timezone.utc)
         audit_entry.target = user
         audit_entry.user = moderator
         audit_entry.reason = "Spam"
@@ -574,6 +667,32 @@ class TestLoggingSystemModerationEvents:
         assert "забанен" in call_args[1].lower()
         assert "Spam" in call_args[2]
 
+    @pytest.mark.asyncio
+    async def test_log_ban_from_gateway_entry(self, logging_system):
+        """Запись из gateway события атрибутирует бан без REST запроса."""
+        guild = MagicMock()
+        guild.id = 123456
+        guild.audit_logs = MagicMock(side_effect=AssertionError("REST запрос"))
+
+        user = MagicMock()
+        user.id = 789012
+
+        audit_entry = MagicMock()
+        audit_entry.id = 3
+        audit_entry.created_at = datetime.now(timezone.utc)
+        audit_entry.guild = guild
+        audit_entry.action = discord.AuditLogAction.ban
+        audit_entry.target = user
+        audit_entry.reason = "Raid"
+
+        logging_system.record_audit_log_entry(audit_entry)
+        await logging_system.log_ban(guild, user)
+
+        call = logging_system.log_event.call_args
+        assert "Raid" in call.args[2]
+        assert call.kwargs["author"] is audit_entry.user
+        guild.audit_logs.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_log_ban_no_audit_log(self, logging_system):
         """Тест логирования бана без audit log."""
@@ -630,8 +749,11 @@ class TestLoggingSystemModerationEvents:
         user.__str__ = MagicMock(return_value="UnbannedUser")
 
         audit_entry = MagicMock()
+        audit_entry.id = 2
+        audit_entry.created_at = datetime.now(timezone.utc)
         audit_entry.target = user
         audit_entry.user = moderator
+        audit_entry.reason = None
 
         async def mock_audit_logs(*args, **kwargs):
             yield audit_entry
@@ -0,0 +1,101 @@
+"""Тесты для отчета о памяти кэшей."""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import discord
+
+from utils.memory_report import build_memory_report, deep_sizeof
+
+
+def member_data(user_id):
+    """Участник в формате gateway."""
+    return {
+        "user": {
+            "id": str(user_id),
+            "username": f"user{user_id}",
+            "discriminator": "0",
+            "avatar": None,
+        },
+        "roles": [],
+        "joined_at": "2024-01-01T00:00:00+00:00",
+        "deaf": False,
+        "mute": False,
+        "flags": 0,
+    }
+
+
+def add_guild(client, guild_id, members):
+    """Добавить сервер с участниками в состояние клиента."""
+    data = {
+        "id": str(guild_id),
+        "name": f"guild{guild_id}",
+        "members": [member_data(guild_id * 1000 + i) for i in range(members)],
+        "channels": [],
+        "roles": [],
+        "emojis": [],
+        "stickers": [],
+        "member_count": members,
+    }
+    return client._connection._add_guild_from_data(data)
+
+
+class TestDeepSizeof:
+    """Тесты оценки размера объектов."""
+
+    def test_shared_objects_counted_once(self):
+        """Тест что общий объект учитывается один раз."""
+        shared = "x" * 1000
+        seen = set()
+
+        first = deep_sizeof([shared], seen)
+        second = deep_sizeof([shared], seen)
+
+        assert first > 1000
+        assert second < 100
+
+    def test_boundary_objects_skipped(self):
+        """Тест что объекты из seen ограничивают обход."""
+        state = SimpleNamespace(payload="x" * 10_000)
+        obj = SimpleNamespace(state=state)
+
+        assert deep_sizeof(obj, {id(state)}) < 1000
+
+
+class TestBuildMemoryReport:
+    """Тесты отчета по серверам."""
+
+    async def test_bytes_per_guild(self):
+        """Тест что больший сервер занимает больше памяти и состояние не учитывается."""
+        intents = discord.Intents.default()
+        intents.members = True
+        client = discord.Client(intents=intents)
+        add_guild(client, 1, members=10)
+        add_guild(client, 2, members=100)
+
+        report = build_memory_report(client)
+        sizes = {guild.guild_id: guild for guild in report.guilds}
+
+        assert sizes[2].entries["members"] == 100
+        assert sizes[2].total > sizes[1].total * 5
+        # Порядка килобайта на участника, а не все состояние клиента
+        assert sizes[2].total < 100 * 4096
+
+    async def test_app_caches_attributed_to_guilds(self):
+        """Тест распределения словарей бота по серверам."""
+        bot = MagicMock()
+        bot.guilds = [SimpleNamespace(id=1, name="a", emojis=(), stickers=())]
+        bot.cached_messages = []
+        bot._connection._users = {}
+        bot.leveling.xp_cooldowns = {(10, 1): 1.0, (11, 1): 2.0, (12, 99): 3.0}
+        bot.automod.spam_counter = {}
+        bot.temp_voice.temp_channels = {555: 10}
+        bot.get_channel.return_value = SimpleNamespace(guild=SimpleNamespace(id=1))
+
+        report = build_memory_report(bot)
+
+        guild = report.guilds[0]
+        assert guild.entries["xp_cooldowns"] == 2
+        assert guild.entries["temp_channels"] == 1
+        assert report.shared["xp_cooldowns"] > 0
+        assert "Крупнейшие серверы" in report.format()
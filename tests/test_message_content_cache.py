@@ -0,0 +1,48 @@
+"""Тесты для компактного кэша текста сообщений."""
+
+from infrastructure.cache import CachedMessage, MessageContentCache
+
+
+class TestMessageContentCache:
+    """Тесты ограничения размера и обновления записей."""
+
+    def test_oldest_evicted(self):
+        """Тест LRU-вытеснения при превышении размера."""
+        cache = MessageContentCache(maxsize=2)
+        for message_id in (1, 2, 3):
+            cache.remember(message_id, 42, 555, f"text {message_id}")
+
+        assert 1 not in cache
+        assert cache.get(3) == CachedMessage(42, 555, "text 3")
+        assert len(cache) == 2
+
+    def test_content_truncated(self):
+        """Тест обрезки длинного текста."""
+        cache = MessageContentCache(content_limit=10)
+        cache.remember(1, 42, 555, "x" * 100)
+
+        assert len(cache.get(1).content) == 10
+        assert cache.get(1).content.endswith("…")
+
+    def test_update_returns_previous(self):
+        """Тест что правка возвращает прежний текст и сохраняет новый."""
+        cache = MessageContentCache()
+        cache.remember(1, 42, 555, "old")
+
+        previous = cache.update(1, "new")
+
+        assert previous.content == "old"
+        assert cache.get(1).content == "new"
+        assert cache.update(2, "new") is None
+        assert 2 not in cache
+
+    def test_pop_many(self):
+        """Тест удаления пакета сообщений."""
+        cache = MessageContentCache()
+        cache.remember(1, 42, 555, "a")
+        cache.remember(2, 42, 555, "b")
+
+        found = cache.pop_many([1, 2, 3])
+
+        assert set(found) == {1, 2}
+        assert len(cache) == 0
@@ -0,0 +1,89 @@
+"""Тесты для предразобранного сообщения."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from automod import AutoMod
+from domain import MessageContext
+from infrastructure.config import AutomodConfigStore
+
+
+def make_message(content="Hello World", guild_id=333, mentions=0):
+    """Создать мок сообщения."""
+    message = MagicMock()
+    message.author.id = 222
+    message.author.bot = False
+    message.channel.id = 111
+    message.content = content
+    message.mentions = [MagicMock() for _ in range(mentions)]
+    if guild_id is None:
+        message.guild = None
+    else:
+        message.guild.id = guild_id
+    return message
+
+
+class TestMessageContext:
+    """Тесты полей контекста."""
+
+    def test_fields_computed_once(self):
+        """Тест нормализованного текста, ключа и упоминаний."""
+        context = MessageContext(make_message("Hello World", mentions=2))
+
+        assert context.content == "hello world"
+        assert context.key == (222, 333)
+        assert context.mention_count == 2
+        assert context.guild_label == "333"
+        assert context.channel_id == 111
+
+    def test_direct_message_label(self):
+        """Тест метки метрик для личных сообщений."""
+        context = MessageContext(make_message(guild_id=None))
+
+        assert context.guild_id is None
+        assert context.guild_label == "dm"
+
+    def test_uses_slots(self):
+        """Тест что контекст не создает словарь атрибутов."""
+        context = MessageContext(make_message())
+
+        assert not hasattr(context, "__dict__")
+        with pytest.raises(AttributeError):
+            context.extra = 1
+
+
+class TestAutomodWithContext:
+    """Тесты автомодерации с переданным контекстом."""
+
+    @pytest.fixture
+    def automod(self):
+        """Фикстура для создания автомодерации."""
+        store = MagicMock(spec=AutomodConfigStore)
+        store.load.return_value = {
+            "banned_words": ["badword"],
+            "spam_threshold": 5,
+            "spam_interval": 5,
+            "max_mentions": 5,
+        }
+        automod = AutoMod(MagicMock(), store)
+        automod.add_warning = AsyncMock()
+        return automod
+
+    @pytest.mark.asyncio
+    async def test_banned_word_found_in_normalised_content(self, automod):
+        """Тест поиска запрещенных слов по уже приведенному тексту."""
+        message = make_message("BadWord here")
+        message.delete = AsyncMock()
+
+        assert await automod.check_message(message, MessageContext(message)) is False
+        message.delete.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_spam_counter_keyed_by_context(self, automod):
+        """Тест что счетчик спама использует целочисленный ключ контекста."""
+        message = make_message("hello")
+        context = MessageContext(message)
+
+        assert await automod.check_message(message, context) is True
+        assert automod.spam_counter[context.key] == [context.received_at]
@@ -0,0 +1,178 @@
+"""Тесты для конвейера обработки сообщений."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import discord
+import pytest
+
+from application.message_pipeline import MessagePipeline
+from domain.message_context import MessageContext
+from infrastructure.config import LevelsStore
+from leveling_system import LevelingSystem
+
+
+@pytest.fixture
+def message():
+    """Фикстура для создания разобранного сообщения."""
+    message = MagicMock()
+    message.channel.id = 111
+    message.author.id = 222
+    message.author.bot = False
+    message.guild.id = 333
+    message.content = "Hello"
+    message.mentions = []
+    return MessageContext(message)
+
+
+class GatedLeveling:
+    """Заглушка уровней, которая ждет вердикт автомодерации."""
+
+    def __init__(self):
+        self.awarded = None
+
+    async def process_message(self, message, gate=None, context=None):
+        self.awarded = await gate
+
+
+class TestMessagePipeline:
+    """Тесты параллельного запуска стадий."""
+
+    @pytest.mark.asyncio
+    async def test_stages_run_concurrently(self, message):
+        """Тест что команды не ждут окончания автомодерации."""
+        commands_started = asyncio.Event()
+
+        async def check_message(msg, context):
+            # При последовательном запуске событие никогда не наступит
+            await commands_started.wait()
+            return True
+
+        async def process_commands(msg):
+            commands_started.set()
+
+        automod = MagicMock()
+        automod.check_message = check_message
+        leveling = GatedLeveling()
+        pipeline = MessagePipeline(automod, leveling, process_commands)
+
+        timings = await asyncio.wait_for(pipeline.process(message), timeout=1)
+
+        assert set(timings) == {"automod", "leveling", "commands"}
+        assert leveling.awarded is True
+
+    @pytest.mark.asyncio
+    async def test_automod_verdict_blocks_experience(self, message):
+        """Тест что удаленное автомодерацией сообщение не дает опыта."""
+        automod = MagicMock()
+        automod.check_message = AsyncMock(return_value=False)
+        leveling = GatedLeveling()
+        pipeline = MessagePipeline(automod, leveling, AsyncMock())
+
+        await pipeline.process(message)
+
+        assert leveling.awarded is False
+
+    @pytest.mark.asyncio
+    async def test_automod_error_is_isolated(self, message):
+        """Тест что ошибка автомодерации не мешает командам и запрещает опыт."""
+        automod = MagicMock()
+        automod.check_message = AsyncMock(side_effect=RuntimeError("boom"))
+        leveling = GatedLeveling()
+        process_commands = AsyncMock()
+        pipeline = MessagePipeline(automod, leveling, process_commands)
+
+        with patch("application.message_pipeline.capture_error") as capture:
+            timings = await pipeline.process(message)
+
+        process_commands.assert_awaited_once_with(message.message)
+        assert leveling.awarded is False
+        assert "automod" in timings
+        assert capture.call_args[0][1]["stage"] == "automod"
+
+    @pytest.mark.asyncio
+    async def test_without_automod_experience_allowed(self, message):
+        """Тест начисления опыта, когда автомодерация отключена."""
+        leveling = GatedLeveling()
+        pipeline = MessagePipeline(None, leveling, AsyncMock())
+
+        timings = await pipeline.process(message)
+
+        assert leveling.awarded is True
+        assert "automod" not in timings
+
+    @pytest.mark.asyncio
+    async def test_shed_experience_skips_leveling(self, message):
+        """Тест что при перегрузке опыт не начисляется, а проверка идет."""
+        automod = MagicMock()
+        automod.check_message = AsyncMock(return_value=True)
+        leveling = GatedLeveling()
+        pipeline = MessagePipeline(automod, leveling, AsyncMock())
+
+        timings = await pipeline.process(message, award_xp=False)
+
+        automod.check_message.assert_awaited_once_with(message.message, message)
+        assert leveling.awarded is None
+        assert "leveling" not in timings
+
+    @pytest.mark.asyncio
+    async def test_commands_run_separately(self, message):
+        """Тест запуска команд отдельно от очереди воркера."""
+        automod = MagicMock()
+        automod.check_message = AsyncMock(return_value=True)
+        process_commands = AsyncMock()
+        pipeline = MessagePipeline(automod, None, process_commands)
+
+        timings = await pipeline.process(message, commands=False)
+        assert set(timings) == {"automod"}
+        process_commands.assert_not_awaited()
+
+        assert await pipeline.run_commands(message) >= 0
+        process_commands.assert_awaited_once_with(message.message)
+
+    @pytest.mark.asyncio
+    async def test_latency_observed(self, message):
+        """Тест записи общей задержки и задержек стадий."""
+        pipeline = MessagePipeline(None, None, AsyncMock())
+
+        with patch("application.message_pipeline.observe_message_latency") as latency, patch(
+            "application.message_pipeline.observe_message_stage"
+        ) as stage:
+            await pipeline.process(message)
+
+        latency.assert_called_once()
+        stage.assert_called_once()
+        assert stage.call_args[0][0] == "commands"
+
+
+class TestLevelingGate:
+    """Тесты вердикта автомодерации внутри системы уровней."""
+
+    @pytest.mark.asyncio
+    async def test_gate_false_skips_write(self):
+        """Тест что запрещенное сообщение не пишет опыт в БД."""
+        repository = MagicMock()
+        repository.get_user_level_xp = AsyncMock(
+            return_value={"user_id": 222, "guild_id": 333, "xp": 50, "level": 0}
+        )
+        repository.update_user = AsyncMock()
+        repository.create_user = AsyncMock()
+        store = MagicMock(spec=LevelsStore)
+        store.load.return_value = {}
+        system = LevelingSystem(MagicMock(), repository, store)
+        system.use_db = True
+
+        author = MagicMock(spec=discord.Member)
+        author.bot = False
+        author.id = 222
+        author.guild.id = 333
+        msg = MagicMock(spec=discord.Message)
+        msg.author = author
+        msg.guild = author.guild
+
+        gate = asyncio.get_running_loop().create_future()
+        gate.set_result(False)
+        await system.process_message(msg, gate=gate)
+
+        repository.update_user.assert_not_called()
+        repository.create_user.assert_not_called()
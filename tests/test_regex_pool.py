@@ -0,0 +1,65 @@
+"""Тесты изолированного пула regex-правил."""
+
+import pytest
+
+from infrastructure.workers import RegexTimeoutError, RegexWorkerPool, is_heavy_pattern
+
+
+class TestIsHeavyPattern:
+    """Тесты классификации паттернов."""
+
+    def test_simple_patterns_are_inline(self):
+        assert is_heavy_pattern(r"b[a@]d\s*word") is False
+        assert is_heavy_pattern(r"discord\.gg/\w+") is False
+
+    def test_quantified_group_is_heavy(self):
+        assert is_heavy_pattern(r"(a+)+$") is True
+
+    def test_backreference_and_lookaround_are_heavy(self):
+        assert is_heavy_pattern(r"(\w)\1") is True
+        assert is_heavy_pattern(r"foo(?!bar)") is True
+
+    def test_long_pattern_is_heavy(self):
+        assert is_heavy_pattern("a" * 300) is True
+
+
+class TestRegexWorkerPool:
+    """Тесты пула процессов."""
+
+    @pytest.fixture
+    def pool(self):
+        pool = RegexWorkerPool(size=1, timeout=0.5)
+        yield pool
+        pool.close()
+
+    @pytest.mark.asyncio
+    async def test_search_matches_in_worker(self, pool):
+        assert await pool.search("1", r"(ab)+c", "xxABABc") is True
+        assert await pool.search("1", r"(ab)+c", "nothing") is False
+
+        evaluations, cpu_time, timeouts = pool.get_stats()["1"]
+        assert evaluations == 2
+        assert cpu_time >= 0
+        assert timeouts == 0
+
+    @pytest.mark.asyncio
+    async def test_catastrophic_pattern_times_out_and_worker_recovers(self, pool):
+        with pytest.raises(RegexTimeoutError):
+            await pool.search("evil", r"(a+)+$", "a" * 40 + "b")
+
+        assert pool.get_stats()["evil"][2] == 1
+        # Воркер пересоздается и продолжает обслуживать правила
+        assert await pool.search("ok", r"(x)+", "xx") is True
+
+    def test_successful_evaluation_resets_consecutive_timeouts(self, pool):
+        pool.record("1", 0.5, timed_out=True)
+        pool.record("1", 0.5, timed_out=True)
+        assert pool.stats["1"].consecutive_timeouts == 2
+
+        pool.record("1", 0.01)
+        assert pool.stats["1"].consecutive_timeouts == 0
+        assert pool.stats["1"].timeouts == 2
+
+    @pytest.mark.asyncio
+    async def test_invalid_pattern_does_not_match(self, pool):
+        assert await pool.search("bad", r"(unclosed", "unclosed") is False
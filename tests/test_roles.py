@@ -3,58 +3,20 @@
 import pytest
 from unittest.mock import AsyncMock, MagicMock
 import discord
-from pathlib import Path
-import json
 
+from application.guild_settings import GuildSettings
 from roles import RoleRewards
 
 
-class TestRoleRewardsConfiguration:
-    """Тесты конфигурации системы ролей-наград."""
-
-    @pytest.fixture
-    def role_rewards(self, tmp_path):
-        """Фикстура для создания системы ролей-наград."""
-        bot = MagicMock()
-        system = RoleRewards(bot)
-        system.config_file = tmp_path / "role_rewards.json"
-        return system
-
-    def test_load_config_creates_empty_if_not_exists(self, role_rewards):
-        """Тест создания пустой конфигурации если файл не существует."""
-        config = role_rewards.load_config()
-        assert config == {}
-
-    def test_load_config_reads_existing_file(self, role_rewards):
-        """Тест чтения существующего файла конфигурации."""
-        test_config = {"123456": {"5": 789012, "10": 111111}}
-        role_rewards.config_file.write_text(json.dumps(test_config))
-
-        config = role_rewards.load_config()
-
-        assert config == test_config
-
-    def test_save_config_writes_to_file(self, role_rewards):
-        """Тест сохранения конфигурации в файл."""
-        role_rewards.config = {"123456": {"5": 789012}}
-
-        role_rewards.save_config()
-
-        saved_data = json.loads(role_rewards.config_file.read_text())
-        assert saved_data == role_rewards.config
-
-
 class TestRoleRewardsSetup:
     """Тесты настройки команд."""
 
     @pytest.fixture
-    def role_rewards(self, tmp_path):
+    def role_rewards(self, guild_settings):
         """Фикстура для создания системы ролей-наград."""
         bot = MagicMock()
         bot.tree = MagicMock()
-        system = RoleRewards(bot)
-        system.config_file = tmp_path / "role_rewards.json"
-        system.config = {}
+        system = RoleRewards(bot, guild_settings)
         return system
 
     @pytest.mark.asyncio
@@ -70,7 +32,7 @@ class TestRoleRewardsAddRole:
     """Тесты добавления ролей-наград."""
 
     @pytest.fixture
-    def role_rewards(self, tmp_path):
+    def role_rewards(self, guild_settings):
         """Фикстура для создания системы ролей-наград."""
         bot = MagicMock()
 
@@ -85,9 +47,7 @@ class TestRoleRewardsAddRole:
 
         bot.tree.command = mock_command
 
-        system = RoleRewards(bot)
-        system.config_file = tmp_path / "role_rewards.json"
-        system.config = {}
+        system = RoleRewards(bot, guild_settings)
         system._registered_commands = registered_commands
         return system
 
@@ -112,10 +72,11 @@ class TestRoleRewardsAddRole:
 
         await addrole_func(interaction, role, 5)
 
-        # Проверяем что роль добавлена в конфиг
-        assert "123456" in role_rewards.config
-        assert "5" in role_rewards.config["123456"]
-        assert role_rewards.config["123456"]["5"] == 789012
+        # Проверяем что роль добавлена в настройки и записана в БД
+        assert role_rewards.settings.get(123456).role_rewards == {5: 789012}
+        role_rewards.settings.repository.set_role_reward.assert_awaited_once_with(
+            123456, 5, 789012
+        )
 
         # Проверяем что отправлен embed
         interaction.response.send_message.assert_called_once()
@@ -143,13 +104,13 @@ class TestRoleRewardsAddRole:
         await addrole_func(interaction, role, 10)
 
         # Проверяем что создан конфиг для гильдии
-        assert "999999" in role_rewards.config
-        assert "10" in role_rewards.config["999999"]
+        assert 999999 in role_rewards.settings.cache
+        assert 10 in role_rewards.settings.get(999999).role_rewards
 
     @pytest.mark.asyncio
     async def test_addrole_command_overwrites_existing(self, role_rewards):
         """Тест перезаписи существующей роли для уровня."""
-        role_rewards.config = {"123456": {"5": 111111}}
+        role_rewards.settings.cache = {123456: GuildSettings(role_rewards={5: 111111})}
 
         await role_rewards.setup()
 
@@ -169,14 +130,14 @@ class TestRoleRewardsAddRole:
         await addrole_func(interaction, role, 5)
 
         # Проверяем что роль перезаписана
-        assert role_rewards.config["123456"]["5"] == 789012
+        assert role_rewards.settings.get(123456).role_rewards[5] == 789012
 
 
 class TestRoleRewardsRemoveRole:
     """Тесты удаления ролей-наград."""
 
     @pytest.fixture
-    def role_rewards(self, tmp_path):
+    def role_rewards(self, guild_settings):
         """Фикстура для создания системы ролей-наград."""
         bot = MagicMock()
 
@@ -191,9 +152,8 @@ class TestRoleRewardsRemoveRole:
 
         bot.tree.command = mock_command
 
-        system = RoleRewards(bot)
-        system.config_file = tmp_path / "role_rewards.json"
-        system.config = {"123456": {"5": 789012, "10": 111111}}
+        guild_settings.cache[123456] = GuildSettings(role_rewards={5: 789012, 10: 111111})
+        system = RoleRewards(bot, guild_settings)
         system._registered_commands = registered_commands
         return system
 
@@ -219,8 +179,9 @@ class TestRoleRewardsRemoveRole:
         await removerole_func(interaction, 5)
 
         # Проверяем что роль удалена из конфига
-        assert "5" not in role_rewards.config["123456"]
-        assert "10" in role_rewards.config["123456"]  # Другая роль осталась
+        assert 5 not in role_rewards.settings.get(123456).role_rewards
+        assert 10 in role_rewards.settings.get(123456).role_rewards  # Другая роль осталась
+        role_rewards.settings.repository.delete_role_reward.assert_awaited_once_with(123456, 5)
 
         # Проверяем что отправлен embed
         interaction.response.send_message.assert_called_once()
@@ -250,7 +211,7 @@ class TestRoleRewardsRemoveRole:
     @pytest.mark.asyncio
     async def test_removerole_command_no_guild_config(self, role_rewards):
         """Тест удаления роли когда нет конфига для гильдии."""
-        role_rewards.config = {}
+        role_rewards.settings.cache = {}
 
         await role_rewards.setup()
 
@@ -287,7 +248,7 @@ class TestRoleRewardsRemoveRole:
         await removerole_func(interaction, 5)
 
         # Проверяем что роль удалена из конфига
-        assert "5" not in role_rewards.config["123456"]
+        assert 5 not in role_rewards.settings.get(123456).role_rewards
 
         # Проверяем что отправлен embed с "Удаленная роль"
         interaction.response.send_message.assert_called_once()
@@ -297,7 +258,7 @@ class TestRoleRewardsListRoles:
     """Тесты списка ролей-наград."""
 
     @pytest.fixture
-    def role_rewards(self, tmp_path):
+    def role_rewards(self, guild_settings):
         """Фикстура для создания системы ролей-наград."""
         bot = MagicMock()
 
@@ -312,9 +273,8 @@ class TestRoleRewardsListRoles:
 
         bot.tree.command = mock_command
 
-        system = RoleRewards(bot)
-        system.config_file = tmp_path / "role_rewards.json"
-        system.config = {"123456": {"5": 789012, "10": 111111, "15": 222222}}
+        guild_settings.cache[123456] = GuildSettings(role_rewards={5: 789012, 10: 111111, 15: 222222})
+        system = RoleRewards(bot, guild_settings)
         system._registered_commands = registered_commands
         return system
 
@@ -367,7 +327,7 @@ class TestRoleRewardsListRoles:
     @pytest.mark.asyncio
     async def test_listroles_command_no_roles(self, role_rewards):
         """Тест списка когда нет ролей."""
-        role_rewards.config = {}
+        role_rewards.settings.cache = {}
 
         await role_rewards.setup()
 
@@ -389,7 +349,7 @@ class TestRoleRewardsListRoles:
     @pytest.mark.asyncio
     async def test_listroles_command_empty_guild_config(self, role_rewards):
         """Тест списка когда конфиг гильдии пустой."""
-        role_rewards.config = {"123456": {}}
+        role_rewards.settings.cache = {123456: GuildSettings(role_rewards={})}
 
         await role_rewards.setup()
 
@@ -412,7 +372,7 @@ class TestRoleRewardsListRoles:
     async def test_listroles_command_sorted_by_level(self, role_rewards):
         """Тест что роли отсортированы по уровню."""
         # Специально создаем неотсортированный конфиг
-        role_rewards.config = {"123456": {"15": 222222, "5": 789012, "10": 111111}}
+        role_rewards.settings.cache = {123456: GuildSettings(role_rewards={15: 222222, 5: 789012, 10: 111111})}
 
         await role_rewards.setup()
 
@@ -459,12 +419,11 @@ class TestRoleRewardsCheckLevelUp:
     """Тесты автоматической выдачи ролей при повышении уровня."""
 
     @pytest.fixture
-    def role_rewards(self, tmp_path):
+    def role_rewards(self, guild_settings):
         """Фикстура для создания системы ролей-наград."""
         bot = MagicMock()
-        system = RoleRewards(bot)
-        system.config_file = tmp_path / "role_rewards.json"
-        system.config = {"123456": {"5": 789012, "10": 111111, "15": 222222}}
+        guild_settings.cache[123456] = GuildSettings(role_rewards={5: 789012, 10: 111111, 15: 222222})
+        system = RoleRewards(bot, guild_settings)
         return system
 
     @pytest.mark.asyncio
@@ -0,0 +1,138 @@
+"""Тесты для шардированного режима бота."""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from discord.ext import commands
+
+from app.bot import Bot, ShardedBot, create_bot
+from app.cache_profile import CacheProfile
+from app.container import Container
+from app.sharding import IdentifyScheduler, shard_guild_counts, shard_latencies
+
+
+@pytest.fixture
+def container():
+    """Фикстура для создания мок контейнера."""
+    container = MagicMock(spec=Container)
+    container.db = MagicMock()
+    container.use_metrics = False
+    container.initial_extensions = []
+    container.image_generator = MagicMock()
+    container.guild_settings = MagicMock()
+    container.message_dispatcher = MagicMock()
+    container.sharding = False
+    container.shard_count = None
+    container.shard_ids = None
+    container.shard_max_concurrency = 1
+    container.cache_profile = CacheProfile()
+    container.build_services = MagicMock(return_value=MagicMock())
+    return container
+
+
+class TestIdentifyScheduler:
+    """Тесты очередности IDENTIFY."""
+
+    def test_buckets_identify_together(self):
+        """Тест что шарды разных бакетов не ждут друг друга."""
+        scheduler = IdentifyScheduler(max_concurrency=2, interval=5.0)
+
+        delays = [scheduler.delay_for(shard_id) for shard_id in range(5)]
+
+        assert delays[0] == 0 and delays[1] == 0
+        assert delays[2] == pytest.approx(5.0, abs=0.1)
+        assert delays[3] == pytest.approx(5.0, abs=0.1)
+        assert delays[4] == pytest.approx(10.0, abs=0.1)
+
+    def test_single_concurrency_is_sequential(self):
+        """Тест стандартного интервала при max_concurrency=1."""
+        scheduler = IdentifyScheduler(max_concurrency=1, interval=5.0)
+
+        delays = [scheduler.delay_for(shard_id) for shard_id in range(3)]
+
+        assert delays == pytest.approx([0.0, 5.0, 10.0], abs=0.1)
+
+    @pytest.mark.asyncio
+    async def test_wait_sleeps_for_reserved_slot(self):
+        """Тест что ожидание использует зарезервированную задержку."""
+        scheduler = IdentifyScheduler(max_concurrency=1, interval=5.0)
+
+        with patch("app.sharding.asyncio.sleep", new=AsyncMock()) as sleep:
+            await scheduler.wait(0)
+            await scheduler.wait(1)
+
+        sleep.assert_awaited_once()
+        assert sleep.await_args[0][0] == pytest.approx(5.0, abs=0.1)
+
+    def test_slots_shared_between_schedulers(self, tmp_path):
+        """Тест общих слотов для процессов кластера через SQLite."""
+        path = str(tmp_path / "identify.db")
+        first = IdentifyScheduler(max_concurrency=1, interval=5.0, slots_path=path)
+        second = IdentifyScheduler(max_concurrency=1, interval=5.0, slots_path=path)
+
+        assert first.delay_for(0) == pytest.approx(0.0, abs=0.1)
+        # Другой процесс с другим шардом того же бакета ждет слот первого
+        assert second.delay_for(4) == pytest.approx(5.0, abs=0.1)
+
+
+class TestShardStats:
+    """Тесты статистики шардов."""
+
+    def test_guild_counts_include_empty_shards(self):
+        """Тест подсчета серверов по шардам."""
+        guilds = [SimpleNamespace(shard_id=shard_id) for shard_id in (0, 0, 2)]
+
+        assert shard_guild_counts(guilds, [0, 1, 2]) == {0: 2, 1: 0, 2: 1}
+
+    def test_latencies_for_single_connection(self):
+        """Тест задержки нешардированного бота как шарда 0."""
+        bot = SimpleNamespace(shard_id=None, latency=0.05)
+
+        assert shard_latencies(bot) == ((0, 0.05),)
+
+    def test_latencies_for_sharded_bot(self):
+        """Тест задержек AutoShardedBot."""
+        bot = SimpleNamespace(latencies=[(0, 0.05), (1, 0.07)])
+
+        assert shard_latencies(bot) == ((0, 0.05), (1, 0.07))
+
+
+class TestCreateBot:
+    """Тесты выбора режима через контейнер."""
+
+    def test_single_connection_by_default(self, container):
+        """Тест обычного бота без шардирования."""
+        bot = create_bot(container)
+
+        assert type(bot) is Bot
+        assert not isinstance(bot, commands.AutoShardedBot)
+
+    def test_sharded_mode(self, container):
+        """Тест AutoShardedBot с шардами из контейнера."""
+        container.sharding = True
+        container.shard_count = 4
+        container.shard_ids = [2, 3]
+        container.shard_max_concurrency = 2
+
+        bot = create_bot(container)
+
+        assert isinstance(bot, ShardedBot)
+        assert isinstance(bot, commands.AutoShardedBot)
+        assert bot.shard_count == 4
+        assert bot.shard_ids == [2, 3]
+        assert bot.identify_scheduler is container.build_identify_scheduler.return_value
+
+    def test_update_shard_metrics(self, container):
+        """Тест обновления метрик по шардам."""
+        bot = create_bot(container)
+
+        with patch.object(Bot, "guilds", [SimpleNamespace(shard_id=0)]), patch.object(
+            Bot, "latency", 0.05
+        ), patch("app.bot.update_guilds_count") as guilds, patch(
+            "app.bot.update_shard_latency"
+        ) as latency:
+            bot.update_shard_metrics()
+
+        guilds.assert_called_once_with(1, "0")
+        latency.assert_called_once_with("0", 0.05)
@@ -0,0 +1,96 @@
+"""Тесты для согласованной остановки бота."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from app.shutdown import ShutdownManager
+
+
+class TestShutdownManager:
+    """Тесты выполнения шагов остановки."""
+
+    @pytest.mark.asyncio
+    async def test_steps_run_in_order(self):
+        """Тест порядка шагов и результатов в отчете."""
+        calls = []
+
+        async def step(name, result=None):
+            calls.append(name)
+            return result
+
+        shutdown = ShutdownManager()
+        shutdown.add("intake", lambda: step("intake"))
+        shutdown.add("stores", lambda: step("stores", 3))
+        shutdown.add("database", lambda: step("database"))
+
+        report = await shutdown.run()
+
+        assert calls == ["intake", "stores", "database"]
+        assert report.results["stores"] == 3
+        assert report.clean
+        assert shutdown.report is report
+
+    @pytest.mark.asyncio
+    async def test_failed_step_does_not_stop_others(self):
+        """Тест что ошибка шага не мешает сохранить остальное."""
+        calls = []
+
+        async def fail():
+            raise RuntimeError("disk full")
+
+        async def flush():
+            calls.append("flush")
+
+        shutdown = ShutdownManager()
+        shutdown.add("stores", fail)
+        shutdown.add("database", flush)
+
+        with patch("app.shutdown.capture_error") as capture_error:
+            report = await shutdown.run()
+
+        assert calls == ["flush"]
+        assert report.errors == {"stores": "disk full"}
+        assert not report.clean
+        capture_error.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_step_timeout(self):
+        """Тест что зависший шаг прерывается по своему лимиту."""
+        shutdown = ShutdownManager(deadline=5)
+        shutdown.add("dispatcher", lambda: asyncio.sleep(10), timeout=0.01)
+        shutdown.add("database", lambda: asyncio.sleep(0))
+
+        report = await shutdown.run()
+
+        assert report.timed_out == ["dispatcher"]
+        assert "database" in report.results
+
+    @pytest.mark.asyncio
+    async def test_deadline_shared_by_steps(self):
+        """Тест что шаги вместе не превышают общий дедлайн."""
+        shutdown = ShutdownManager(deadline=0.05)
+        shutdown.add("first", lambda: asyncio.sleep(10))
+        shutdown.add("second", lambda: asyncio.sleep(10))
+
+        report = await asyncio.wait_for(shutdown.run(), 1)
+
+        assert report.timed_out == ["first", "second"]
+
+    @pytest.mark.asyncio
+    async def test_run_is_idempotent(self):
+        """Тест что повторная остановка дожидается первой."""
+        calls = []
+
+        async def flush():
+            calls.append("flush")
+            await asyncio.sleep(0.01)
+
+        shutdown = ShutdownManager()
+        shutdown.add("stores", flush)
+
+        first, second = await asyncio.gather(shutdown.run(), shutdown.run())
+
+        assert calls == ["flush"]
+        assert first is second
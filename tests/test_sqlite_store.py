@@ -0,0 +1,136 @@
+"""Тесты общих для процессов кластера конфигов в SQLite."""
+
+import json
+import multiprocessing
+import os
+
+import pytest
+
+from infrastructure.config import AutomodConfigStore, SqliteDocumentStore, TicketsConfigStore
+
+
+def _take_ticket_numbers(root, count, barrier, numbers):
+    """Процесс кластера: дождаться соседа и выдать `count` номеров тикетов."""
+    os.chdir(root)
+    store = TicketsConfigStore(db_path="data/bot.db")
+    store.load()
+    barrier.wait(timeout=30)
+    for _ in range(count):
+        numbers.put(store.next_ticket_number())
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """Путь к БД в tmp_path (`data/` — текущий каталог данных)."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    return str(tmp_path / "data" / "bot.db")
+
+
+class TestSqliteDocumentStore:
+    """Тесты документа в таблице config_documents."""
+
+    def test_default_document_created(self, db_path):
+        store = SqliteDocumentStore(db_path, "doc", lambda: {"key": "value"})
+
+        assert store.load() == {"key": "value"}
+        assert SqliteDocumentStore(db_path, "doc", dict).load() == {"key": "value"}
+
+    def test_seeds_from_json_once(self, db_path, tmp_path):
+        """Тест импорта старого JSON файла и его переименования."""
+        (tmp_path / "data" / "doc.json").write_text('{"key": "legacy"}', encoding="utf-8")
+
+        store = SqliteDocumentStore(db_path, "doc", dict, seed_path="doc.json")
+
+        assert store.load() == {"key": "legacy"}
+        assert not (tmp_path / "data" / "doc.json").exists()
+        assert (tmp_path / "data" / "doc.json.imported").exists()
+
+        # Новый файл после импорта не перезаписывает документ
+        (tmp_path / "data" / "doc.json").write_text('{"key": "new"}', encoding="utf-8")
+        assert SqliteDocumentStore(db_path, "doc", dict, seed_path="doc.json").load() == {
+            "key": "legacy"
+        }
+
+    def test_refresh_returns_changes_of_other_process(self, db_path):
+        first = SqliteDocumentStore(db_path, "doc", dict)
+        second = SqliteDocumentStore(db_path, "doc", dict)
+        first.load()
+        second.load()
+
+        assert first.refresh() is None
+        second.save({"key": "changed"})
+
+        assert first.refresh() == {"key": "changed"}
+        assert first.refresh() is None
+
+    def test_refresh_after_update_includes_merged_changes(self, db_path):
+        """Тест что после своей записи процесс получает и чужие изменения."""
+        first = SqliteDocumentStore(db_path, "doc", dict)
+        second = SqliteDocumentStore(db_path, "doc", dict)
+        first.load()
+        second.load()
+
+        second.update(lambda data: data.update(a=1))
+        first.update(lambda data: data.update(b=2))
+
+        assert first.refresh() == {"a": 1, "b": 2}
+
+    def test_failed_update_is_rolled_back(self, db_path):
+        store = SqliteDocumentStore(db_path, "doc", lambda: {"key": "value"})
+        store.load()
+
+        def fail(data):
+            data["key"] = "broken"
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            store.update(fail)
+
+        assert store.load() == {"key": "value"}
+
+
+class TestSharedConfigStores:
+    """Тесты конфигов автомодерации и тикетов в БД."""
+
+    def test_automod_updates_do_not_overwrite_each_other(self, db_path):
+        first = AutomodConfigStore(db_path=db_path)
+        second = AutomodConfigStore(db_path=db_path)
+        first.load()
+        second.load()
+
+        first.update({"banned_words": ["spam"]})
+        second.update({"spam_threshold": 10})
+
+        data = AutomodConfigStore(db_path=db_path).load()
+        assert data["banned_words"] == ["spam"]
+        assert data["spam_threshold"] == 10
+
+    def test_tickets_seeded_from_json(self, db_path, tmp_path):
+        (tmp_path / "data" / "tickets_config.json").write_text(
+            json.dumps({"ticket_category": 1, "support_role": 2, "ticket_counter": 41}),
+            encoding="utf-8",
+        )
+        store = TicketsConfigStore(db_path=db_path)
+
+        assert store.next_ticket_number() == 42
+        assert store.load()["ticket_category"] == 1
+
+    def test_two_processes_get_unique_ticket_numbers(self, db_path, tmp_path):
+        """Тест что два процесса кластера не выдают одинаковые номера тикетов."""
+        context = multiprocessing.get_context("spawn")
+        barrier = context.Barrier(2)
+        numbers = context.Queue()
+        processes = [
+            context.Process(target=_take_ticket_numbers, args=(str(tmp_path), 20, barrier, numbers))
+            for _ in range(2)
+        ]
+        for process in processes:
+            process.start()
+        taken = [numbers.get(timeout=60) for _ in range(40)]
+        for process in processes:
+            process.join(60)
+
+        assert [process.exitcode for process in processes] == [0, 0]
+        assert sorted(taken) == list(range(1, 41))
+        assert TicketsConfigStore(db_path=db_path).load()["ticket_counter"] == 40
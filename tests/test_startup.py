@@ -0,0 +1,126 @@
+"""Тесты для графа фаз запуска бота."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from app.startup import StartupGraph
+
+
+class TestStartupGraph:
+    """Тесты порядка, параллельности и ошибок фаз запуска."""
+
+    @pytest.mark.asyncio
+    async def test_independent_phases_run_concurrently(self):
+        """Тест что независимые фазы не ждут друг друга."""
+        first_started = asyncio.Event()
+        second_started = asyncio.Event()
+
+        async def first():
+            first_started.set()
+            await asyncio.wait_for(second_started.wait(), 1)
+
+        async def second():
+            second_started.set()
+            await asyncio.wait_for(first_started.wait(), 1)
+
+        graph = StartupGraph()
+        graph.add("first", first)
+        graph.add("second", second)
+
+        durations = await graph.run()
+
+        assert set(durations) == {"first", "second"}
+
+    @pytest.mark.asyncio
+    async def test_dependent_phase_waits(self):
+        """Тест что фаза стартует после своих зависимостей."""
+        order = []
+
+        async def phase(name, delay=0.0):
+            await asyncio.sleep(delay)
+            order.append(name)
+
+        graph = StartupGraph()
+        graph.add("database", lambda: phase("database", 0.02))
+        graph.add("extensions", lambda: phase("extensions"))
+        graph.add("sync", lambda: phase("sync"), after=["database", "extensions"])
+
+        await graph.run()
+
+        assert order == ["extensions", "database", "sync"]
+
+    @pytest.mark.asyncio
+    async def test_non_critical_failure_does_not_stop_startup(self):
+        """Тест что ошибка некритической фазы только логируется."""
+        ran = []
+
+        async def fonts():
+            raise OSError("arial.ttf")
+
+        async def tasks():
+            ran.append("tasks")
+
+        graph = StartupGraph()
+        graph.add("fonts", fonts, critical=False)
+        graph.add("tasks", tasks, after=["fonts"])
+
+        with patch("app.startup.capture_error") as capture:
+            durations = await graph.run()
+
+        assert ran == ["tasks"]
+        assert "fonts" in durations
+        capture.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_critical_failure_cancels_and_raises(self):
+        """Тест что ошибка критической фазы прерывает запуск."""
+        ran = []
+        slow_cancelled = asyncio.Event()
+
+        async def database():
+            raise RuntimeError("database is locked")
+
+        async def slow():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                slow_cancelled.set()
+                raise
+
+        async def tasks():
+            ran.append("tasks")
+
+        graph = StartupGraph()
+        graph.add("database", database)
+        graph.add("slow", slow)
+        graph.add("tasks", tasks, after=["database"])
+
+        with pytest.raises(RuntimeError):
+            await graph.run()
+
+        assert ran == []
+        assert slow_cancelled.is_set()
+
+    @pytest.mark.asyncio
+    async def test_durations_exported(self):
+        """Тест экспорта длительности каждой фазы в метрики."""
+
+        async def noop():
+            pass
+
+        graph = StartupGraph()
+        graph.add("database", noop)
+
+        with patch("app.startup.observe_startup_phase") as observe:
+            await graph.run()
+
+        assert observe.call_args[0][0] == "database"
+
+    def test_unknown_dependency_rejected(self):
+        """Тест что зависимость должна быть добавлена раньше."""
+        graph = StartupGraph()
+
+        with pytest.raises(ValueError):
+            graph.add("sync", lambda: None, after=["extensions"])
@@ -4,73 +4,37 @@ import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 import discord
 from discord.ext import commands
-from pathlib import Path
-import json
 
+from application.guild_settings import GuildSettings
 from temp_voice import TempVoice
 
 
-class TestTempVoiceConfiguration:
-    """Тесты конфигурации временных голосовых каналов."""
+class TestTempVoiceInitialization:
+    """Тесты инициализации временных голосовых каналов."""
 
-    @pytest.fixture
-    def temp_voice(self, tmp_path):
-        """Фикстура для создания системы временных каналов."""
-        bot = MagicMock()
-        system = TempVoice(bot)
-        system.config_path = tmp_path / "voice_config.json"
-        return system
-
-    def test_load_config_creates_default_if_not_exists(self, temp_voice):
-        """Тест создания конфигурации по умолчанию."""
-        config = temp_voice.load_config()
-
-        assert "creation_channel" in config
-        assert "temp_category" in config
-        assert config["creation_channel"] is None
-        assert config["temp_category"] is None
-
-    def test_load_config_reads_existing_file(self, temp_voice):
-        """Тест чтения существующего файла конфигурации."""
-        test_config = {"creation_channel": 123456, "temp_category": 789012}
-        temp_voice.config_path.parent.mkdir(parents=True, exist_ok=True)
-        temp_voice.config_path.write_text(json.dumps(test_config))
-
-        config = temp_voice.load_config()
-
-        assert config == test_config
-
-    def test_save_config_writes_to_file(self, temp_voice):
-        """Тест сохранения конфигурации в файл."""
-        temp_voice.voice_config = {"creation_channel": 123456, "temp_category": 789012}
-
-        temp_voice.save_config()
-
-        saved_data = json.loads(temp_voice.config_path.read_text())
-        assert saved_data == temp_voice.voice_config
-
-    def test_initialization(self, temp_voice):
+    def test_initialization(self, guild_settings):
         """Тест инициализации системы."""
+        temp_voice = TempVoice(MagicMock(), guild_settings)
+
         assert temp_voice.temp_channels == {}
-        assert temp_voice.voice_config is not None
+        assert temp_voice.settings is guild_settings
 
 
 class TestTempVoiceSetup:
     """Тесты настройки системы временных каналов."""
 
     @pytest.fixture
-    def temp_voice(self, tmp_path):
+    def temp_voice(self, guild_settings):
         """Фикстура для создания системы временных каналов."""
         bot = MagicMock()
-        system = TempVoice(bot)
-        system.config_path = tmp_path / "voice_config.json"
-        system.voice_config = {}
+        system = TempVoice(bot, guild_settings)
         return system
 
     @pytest.mark.asyncio
     async def test_setup_voice_creates_channel(self, temp_voice):
         """Тест создания канала для создания временных каналов."""
         guild = MagicMock()
+        guild.id = 555555
         guild.create_voice_channel = AsyncMock()
 
         created_channel = MagicMock()
@@ -88,8 +52,12 @@ class TestTempVoiceSetup:
         await temp_voice.setup_voice.callback(temp_voice, interaction, category)
 
         guild.create_voice_channel.assert_called_once()
-        assert temp_voice.voice_config["creation_channel"] == 123456
-        assert temp_voice.voice_config["temp_category"] == 789012
+        settings = temp_voice.settings.get(555555)
+        assert settings.voice_creation_channel_id == 123456
+        assert settings.voice_category_id == 789012
+        temp_voice.settings.repository.upsert.assert_awaited_once_with(
+            555555, {"voice_creation_channel_id": 123456, "voice_category_id": 789012}
+        )
         interaction.response.send_message.assert_called_once()
 
 
@@ -97,13 +65,14 @@ class TestTempVoiceChannelCreation:
     """Тесты создания временных каналов."""
 
     @pytest.fixture
-    def temp_voice(self, tmp_path):
+    def temp_voice(self, guild_settings):
         """Фикстура для создания системы временных каналов."""
         bot = MagicMock()
         bot.get_channel = MagicMock()
-        system = TempVoice(bot)
-        system.config_path = tmp_path / "voice_config.json"
-        system.voice_config = {"creation_channel": 123456, "temp_category": 789012}
+        guild_settings.cache[555555] = GuildSettings(
+            voice_creation_channel_id=123456, voice_category_id=789012
+        )
+        system = TempVoice(bot, guild_settings)
         system.temp_channels = {}
         return system
 
@@ -116,6 +85,7 @@ class TestTempVoiceChannelCreation:
         member.move_to = AsyncMock()
 
         guild = MagicMock()
+        guild.id = 555555
         guild.create_voice_channel = AsyncMock()
 
         created_channel = MagicMock()
@@ -198,12 +168,10 @@ class TestTempVoiceChannelManagement:
     """Тесты управления временными каналами."""
 
     @pytest.fixture
-    def temp_voice(self, tmp_path):
+    def temp_voice(self, guild_settings):
         """Фикстура для создания системы временных каналов."""
         bot = MagicMock()
-        system = TempVoice(bot)
-        system.config_path = tmp_path / "voice_config.json"
-        system.voice_config = {}
+        system = TempVoice(bot, guild_settings)
         system.temp_channels = {999999: 111111}
         return system
 
@@ -328,12 +296,10 @@ class TestTempVoiceChannelLocking:
     """Тесты блокировки/разблокировки каналов."""
 
     @pytest.fixture
-    def temp_voice(self, tmp_path):
+    def temp_voice(self, guild_settings):
         """Фикстура для создания системы временных каналов."""
         bot = MagicMock()
-        system = TempVoice(bot)
-        system.config_path = tmp_path / "voice_config.json"
-        system.voice_config = {}
+        system = TempVoice(bot, guild_settings)
         system.temp_channels = {999999: 111111}
         return system
 
@@ -470,12 +436,10 @@ class TestTempVoiceCleanup:
     """Тесты очистки неактивных каналов."""
 
     @pytest.fixture
-    def temp_voice(self, tmp_path):
+    def temp_voice(self, guild_settings):
         """Фикстура для создания системы временных каналов."""
         bot = MagicMock()
-        system = TempVoice(bot)
-        system.config_path = tmp_path / "voice_config.json"
-        system.voice_config = {}
+        system = TempVoice(bot, guild_settings)
         return system
 
     @pytest.mark.asyncio
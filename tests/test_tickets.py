@@ -1,5 +1,7 @@
 """Тесты для системы тикетов."""
 
+import itertools
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 import discord
@@ -42,6 +44,18 @@ class TestTicketSystemConfiguration:
 
         ticket_system.store.save.assert_called_once_with(ticket_system.tickets_config)
 
+    def test_refresh_config(self, ticket_system):
+        """Тест получения конфигурации, измененной другим процессом."""
+        ticket_system.store.refresh.return_value = {
+            "ticket_category": 1, "support_role": 2, "ticket_counter": 5
+        }
+
+        assert ticket_system.refresh_config() is True
+        assert ticket_system.tickets_config["ticket_counter"] == 5
+
+        ticket_system.store.refresh.return_value = None
+        assert ticket_system.refresh_config() is False
+
     @pytest.mark.asyncio
     async def test_setup(self, ticket_system):
         """Тест инициализации системы."""
@@ -81,7 +95,9 @@ class TestTicketSystemSetup:
 
         assert ticket_system.tickets_config["ticket_category"] == 123456
         assert ticket_system.tickets_config["support_role"] == 789012
-        ticket_system.store.save.assert_called_once()
+        ticket_system.store.update.assert_called_once_with(
+            {"ticket_category": 123456, "support_role": 789012}
+        )
         interaction.response.send_message.assert_called_once()
 
 
@@ -103,6 +119,7 @@ class TestTicketSystemCreateTicket:
             "support_role": 789012,
             "ticket_counter": 0
         }
+        store.next_ticket_number.side_effect = itertools.count(1)
 
         system = TicketSystem(bot, repository, store)
         return system
@@ -171,8 +188,8 @@ class TestTicketSystemCreateTicket:
         # Проверяем что пользователю отправлен ответ
         interaction.response.send_message.assert_called_once()
 
-        # Проверяем что конфиг сохранен
-        ticket_system.store.save.assert_called()
+        # Проверяем что номер выдан общим счетчиком хранилища
+        ticket_system.store.next_ticket_number.assert_called_once()
 
     @pytest.mark.asyncio
     async def test_create_ticket_with_default_reason(self, ticket_system):
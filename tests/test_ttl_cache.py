@@ -0,0 +1,67 @@
+"""Тесты TTL-кэша."""
+
+from infrastructure.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache:
+    """Тесты истечения и вытеснения записей."""
+
+    def test_set_and_get(self):
+        cache = TTLCache(ttl=10, maxsize=10, name="test")
+        cache[(1, 2)] = 5
+
+        assert cache[(1, 2)] == 5
+        assert (1, 2) in cache
+        assert len(cache) == 1
+
+    def test_entry_expires_after_ttl(self):
+        clock = FakeClock()
+        cache = TTLCache(ttl=10, maxsize=10, name="test", clock=clock)
+        cache[(1, 2)] = 5
+
+        clock.now += 11
+
+        assert cache.get((1, 2)) is None
+        assert len(cache) == 0
+        assert cache.evictions["expired"] == 1
+
+    def test_rewrite_refreshes_ttl(self):
+        clock = FakeClock()
+        cache = TTLCache(ttl=10, maxsize=10, name="test", clock=clock)
+        cache[(1, 2)] = 1
+        clock.now += 8
+        cache[(1, 2)] = 2
+        clock.now += 8
+
+        assert cache[(1, 2)] == 2
+
+    def test_lru_eviction_on_overflow(self):
+        cache = TTLCache(ttl=10, maxsize=2, name="test")
+        cache[(1, 1)] = 1
+        cache[(2, 2)] = 2
+        # Обращение делает запись недавно использованной
+        assert cache[(1, 1)] == 1
+        cache[(3, 3)] = 3
+
+        assert (2, 2) not in cache
+        assert (1, 1) in cache
+        assert (3, 3) in cache
+        assert cache.evictions["lru"] == 1
+
+    def test_purge_expired(self):
+        clock = FakeClock()
+        cache = TTLCache(ttl=10, maxsize=10, name="test", clock=clock)
+        cache[(1, 1)] = 1
+        cache.set((2, 2), 2, expires_at=clock.now + 100)
+        clock.now += 20
+
+        assert cache.purge_expired() == 1
+        assert list(cache.items()) == [((2, 2), 2, 1100.0)]
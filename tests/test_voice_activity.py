@@ -0,0 +1,84 @@
+"""Тесты агрегации голосовой активности."""
+
+from application.voice_activity import VoiceActivityAggregator
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def record(aggregator, before, after, member_id=1):
+    aggregator.record(10, member_id, f"<@{member_id}>", f"user{member_id}", before, after)
+
+
+class TestVoiceActivityAggregator:
+    """Тесты сессий участников в голосовых каналах."""
+
+    def test_session_waits_for_settle(self):
+        clock = FakeClock()
+        aggregator = VoiceActivityAggregator(settle=60, clock=clock)
+        record(aggregator, None, "A")
+        record(aggregator, "A", None)
+
+        clock.now += 59
+        assert aggregator.due() == []
+
+        clock.now += 1
+        [summary] = aggregator.due()
+        assert [(step.before, step.after) for step in summary.steps] == [(None, "A"), ("A", None)]
+        assert summary.ongoing is False
+        assert summary.started_at == 1000.0
+        assert len(aggregator) == 0
+
+    def test_long_session_reported_by_interval(self):
+        clock = FakeClock()
+        aggregator = VoiceActivityAggregator(interval=300, clock=clock)
+        record(aggregator, None, "A")
+        clock.now += 100
+        record(aggregator, "A", "B")
+
+        clock.now += 200
+        [first] = aggregator.due()
+        assert first.ongoing is True
+        assert len(first.steps) == 2
+
+        # Сессия продолжается, следующая сводка — только новые шаги
+        clock.now += 10
+        record(aggregator, "B", None)
+        clock.now += 60
+        [second] = aggregator.due()
+        assert [(step.before, step.after) for step in second.steps] == [("B", None)]
+        assert second.started_at == 1000.0
+
+    def test_full_session_flushed_early(self):
+        clock = FakeClock()
+        aggregator = VoiceActivityAggregator(max_steps=4, clock=clock)
+        record(aggregator, None, "A")
+        for _ in range(3):
+            record(aggregator, "A", "B")
+
+        [summary] = aggregator.due()
+        assert len(summary.steps) == 4
+        assert len(aggregator) == 1
+
+    def test_member_already_in_voice_has_unknown_start(self):
+        aggregator = VoiceActivityAggregator(clock=FakeClock())
+        record(aggregator, "A", "B")
+
+        [summary] = aggregator.due(force=True)
+        assert summary.started_at is None
+
+    def test_members_tracked_separately(self):
+        clock = FakeClock()
+        aggregator = VoiceActivityAggregator(settle=0, clock=clock)
+        record(aggregator, None, "A", member_id=1)
+        record(aggregator, None, "A", member_id=2)
+        record(aggregator, "A", None, member_id=2)
+
+        [summary] = aggregator.due()
+        assert summary.member_id == 2
+        assert len(aggregator) == 1
@@ -10,6 +10,30 @@ from warning_system import WarningSystem
 from infrastructure.config import WarningsConfigStore, WarningsStore
 
 
+def warnings_table(*rows):
+    """Репозиторий-заглушка с таблицей предупреждений в памяти."""
+    table = [
+        {"id": index, "guild_id": guild_id, "user_id": user_id, "reason": reason,
+         "issued_by": 111111, "issued_at": "2026-04-07T00:00:00"}
+        for index, (guild_id, user_id, reason) in enumerate(rows, 1)
+    ]
+
+    async def add_warning(guild_id, user_id, reason, issued_by, issued_at, expires_at):
+        table.append({"id": len(table) + 1, "guild_id": guild_id, "user_id": user_id,
+                      "reason": reason, "issued_by": issued_by, "issued_at": issued_at})
+
+    async def list_warnings(guild_id, user_id):
+        return [row for row in table if (row["guild_id"], row["user_id"]) == (guild_id, user_id)]
+
+    repository = MagicMock()
+    repository.table = table
+    repository.add_warning = AsyncMock(side_effect=add_warning)
+    repository.list_warnings = AsyncMock(side_effect=list_warnings)
+    repository.delete_warning = AsyncMock()
+    repository.clear_user_warnings = AsyncMock()
+    return repository
+
+
 class TestWarningSystemConfiguration:
     """Тесты конфигурации системы предупреждений."""
 
@@ -43,6 +67,16 @@ class TestWarningSystemConfiguration:
         assert "punishments" in warning_system.config
         assert warning_system.config["punishments"]["3"] == "mute_1h"
 
+    def test_refresh_config(self, warning_system):
+        """Тест получения конфигурации, измененной другим процессом."""
+        warning_system.config_store.refresh.return_value = {"punishments": {"2": "kick"}}
+
+        assert warning_system.refresh_config() is True
+        assert warning_system.config["punishments"] == {"2": "kick"}
+
+        warning_system.config_store.refresh.return_value = None
+        assert warning_system.refresh_config() is False
+
     def test_save_warnings(self, warning_system):
         """Тест сохранения предупреждений."""
         warning_system.warnings = {"123": {"456": []}}
@@ -50,6 +84,16 @@ class TestWarningSystemConfiguration:
 
         warning_system.store.save.assert_called_once()
 
+    def test_save_user_warnings_writes_single_user(self, warning_system):
+        """Тест сохранения предупреждений одного пользователя."""
+        warning_system.warnings = {"123": {"456": [{"reason": "spam"}]}}
+        warning_system.save_user_warnings(123, 456)
+
+        warning_system.store.set_user_warnings.assert_called_once_with(
+            "123", "456", [{"reason": "spam"}]
+        )
+        warning_system.store.save.assert_not_called()
+
 
 class TestWarningSystemGetUserWarnings:
     """Тесты получения предупреждений пользователя."""
@@ -108,8 +152,7 @@ class TestWarningSystemAddWarning:
     def warning_system(self):
         """Фикстура для создания системы предупреждений."""
         bot = MagicMock()
-        repository = MagicMock()
-        repository.add_warning = AsyncMock()
+        repository = warnings_table()
 
         store = MagicMock(spec=WarningsStore)
         config_store = MagicMock(spec=WarningsConfigStore)
@@ -212,15 +255,41 @@ class TestWarningSystemAddWarning:
 
         await warning_system.add_warning.callback(warning_system, ctx, member, "Test reason")
 
-        # Проверяем что предупреждение добавлено
-        warnings = warning_system.get_user_warnings(789012, 123456)
+        # Проверяем что предупреждение добавлено в БД, а JSON не переписан
+        warnings = await warning_system.fetch_user_warnings(789012, 123456)
         assert len(warnings) == 1
         assert warnings[0]["reason"] == "Test reason"
         assert warnings[0]["moderator"] == 111111
+        warning_system.store.set_user_warnings.assert_not_called()
+        assert warning_system.warnings == {}
 
         # Проверяем что был вызван send
         ctx.send.assert_called()
 
+    @pytest.mark.asyncio
+    async def test_add_warning_without_repository_writes_json(self, warning_system):
+        """Тест что без БД предупреждение сохраняется в JSON."""
+        warning_system.repository = None
+        guild = MagicMock()
+        guild.id = 789012
+
+        member = MagicMock(spec=discord.Member)
+        member.bot = False
+        member.id = 123456
+        member.guild = guild
+        member.top_role = MagicMock(position=5)
+        member.top_role.__ge__ = lambda self, other: self.position >= other.position
+
+        ctx = MagicMock()
+        ctx.guild = guild
+        ctx.user = MagicMock(id=111111, top_role=MagicMock(position=10))
+        ctx.send = AsyncMock()
+
+        await warning_system.add_warning.callback(warning_system, ctx, member, "Test reason")
+
+        assert warning_system.get_user_warnings(789012, 123456)[0]["reason"] == "Test reason"
+        warning_system.store.set_user_warnings.assert_called_once()
+
 
 class TestWarningSystemRemoveWarning:
     """Тесты удаления предупреждений."""
@@ -229,12 +298,7 @@ class TestWarningSystemRemoveWarning:
     def warning_system(self):
         """Фикстура для создания системы предупреждений."""
         bot = MagicMock()
-        repository = MagicMock()
-        repository.delete_warning = AsyncMock()
-        repository.list_warnings = AsyncMock(return_value=[
-            {"id": 1, "reason": "Warning 1"},
-            {"id": 2, "reason": "Warning 2"}
-        ])
+        repository = warnings_table((789012, 123456, "Warning 1"), (789012, 123456, "Warning 2"))
 
         store = MagicMock(spec=WarningsStore)
         config_store = MagicMock(spec=WarningsConfigStore)
@@ -304,15 +368,14 @@ class TestWarningSystemRemoveWarning:
         ctx.guild = guild
         ctx.send = AsyncMock()
 
-        initial_count = len(warning_system.get_user_warnings(789012, 123456))
+        await warning_system.remove_warning.callback(warning_system, ctx, member, 2)
 
-        await warning_system.remove_warning.callback(warning_system, ctx, member, 1)
-
-        # Проверяем что предупреждение удалено
-        warnings = warning_system.get_user_warnings(789012, 123456)
-        assert len(warnings) == initial_count - 1
+        # Проверяем что удалена строка БД с этим номером, а JSON не переписан
+        warning_system.repository.delete_warning.assert_awaited_once_with(2)
+        warning_system.store.set_user_warnings.assert_not_called()
 
         ctx.send.assert_called_once()
+        assert "Warning 2" in ctx.send.call_args[0][0]
 
 
 class TestWarningSystemCleanup:
@@ -352,9 +415,18 @@ class TestWarningSystemCleanup:
 
         await warning_system.cleanup_expired_warnings(db)
 
-        # Проверяем что был вызван cleanup в репозитории
-        if warning_system.repository:
-            warning_system.repository.cleanup_expired.assert_called_once_with(days=30)
+        # Проверяем что был вызван cleanup в репозитории, а JSON не переписан
+        warning_system.repository.cleanup_expired.assert_called_once_with(days=30)
+        warning_system.store.save.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_cleanup_without_repository_prunes_json(self, warning_system):
+        """Тест очистки JSON, когда БД не подключена."""
+        warning_system.repository = None
+
+        await warning_system.cleanup_expired_warnings(MagicMock())
+
+        warning_system.store.save.assert_called_once()
 
 
 class TestWarningSystemMigration:
@@ -392,6 +464,23 @@ class TestWarningSystemMigration:
             warning_system.warnings
         )
 
+    @pytest.mark.asyncio
+    async def test_migrate_to_db_with_ledger(self, warning_system):
+        """Тест миграции через журнал: очистка дубликатов и перенос JSON."""
+        warning_system.migrations = MagicMock()
+        warning_system.migrations.run_once = AsyncMock(return_value=3)
+        warning_system.migrations.run = AsyncMock(return_value=None)
+
+        await warning_system.migrate_to_db()
+
+        warning_system.migrations.run_once.assert_awaited_once_with(
+            "warnings_dedupe", warning_system.repository.delete_duplicates
+        )
+        name, sources, _ = warning_system.migrations.run.await_args[0]
+        assert name == "warnings_json"
+        assert sources is warning_system.store.source_paths
+        warning_system.repository.migrate_from_json.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_migrate_to_db_no_repository(self):
         """Тест миграции когда репозиторий не установлен."""
@@ -415,8 +504,7 @@ class TestWarningSystemPunishments:
     def warning_system(self):
         """Фикстура для создания системы предупреждений."""
         bot = MagicMock()
-        repository = MagicMock()
-        repository.add_warning = AsyncMock()
+        repository = warnings_table()
 
         store = MagicMock(spec=WarningsStore)
         config_store = MagicMock(spec=WarningsConfigStore)
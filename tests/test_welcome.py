@@ -3,53 +3,16 @@
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 import discord
-from pathlib import Path
-import json
 
+from application.guild_settings import GuildSettings
 from welcome import Welcome
 
 
-class TestWelcomeConfiguration:
-    """Тесты конфигурации системы приветствий."""
-
-    @pytest.fixture
-    def welcome_system(self, tmp_path):
-        """Фикстура для создания системы приветствий."""
-        bot = MagicMock()
-        bot.image_generator = MagicMock()
-        system = Welcome(bot)
-        system.config_file = tmp_path / "welcome_config.json"
-        return system
-
-    def test_load_config_creates_empty_if_not_exists(self, welcome_system):
-        """Тест создания пустой конфигурации если файл не существует."""
-        welcome_system.load_config()
-        assert welcome_system.config == {}
-
-    def test_load_config_reads_existing_file(self, welcome_system):
-        """Тест чтения существующего файла конфигурации."""
-        test_config = {"123456": 789012}
-        welcome_system.config_file.write_text(json.dumps(test_config))
-
-        welcome_system.load_config()
-
-        assert welcome_system.config == test_config
-
-    def test_save_config_writes_to_file(self, welcome_system):
-        """Тест сохранения конфигурации в файл."""
-        welcome_system.config = {"123456": 789012}
-
-        welcome_system.save_config()
-
-        saved_data = json.loads(welcome_system.config_file.read_text())
-        assert saved_data == {"123456": 789012}
-
-
 class TestWelcomeSetup:
     """Тесты настройки канала приветствий."""
 
     @pytest.fixture
-    def welcome_system(self, tmp_path):
+    def welcome_system(self, guild_settings):
         """Фикстура для создания системы приветствий."""
         bot = MagicMock()
 
@@ -65,9 +28,7 @@ class TestWelcomeSetup:
         bot.tree.command = mock_command
 
         bot.image_generator = MagicMock()
-        system = Welcome(bot)
-        system.config_file = tmp_path / "welcome_config.json"
-        system.config = {}
+        system = Welcome(bot, guild_settings)
         system._registered_commands = registered_commands
         return system
 
@@ -105,8 +66,11 @@ class TestWelcomeSetup:
 
         await setwelcome_func(interaction, channel)
 
-        # Проверяем что канал сохранен в конфиге
-        assert welcome_system.config["123456"] == 789012
+        # Проверяем что канал сохранен в настройках
+        assert welcome_system.settings.get(123456).welcome_channel_id == 789012
+        welcome_system.settings.repository.upsert.assert_awaited_once_with(
+            123456, {"welcome_channel_id": 789012}
+        )
 
         # Проверяем что отправлен embed
         interaction.response.send_message.assert_called_once()
@@ -140,7 +104,7 @@ class TestWelcomeSetup:
         await setwelcome_func(interaction, channel)
 
         # Проверяем что канал НЕ сохранен
-        assert "123456" not in welcome_system.config
+        assert welcome_system.settings.get(123456).welcome_channel_id is None
 
         # Проверяем что отправлено сообщение об ошибке
         interaction.response.send_message.assert_called_once()
@@ -174,7 +138,7 @@ class TestWelcomeSetup:
         await setwelcome_func(interaction, channel)
 
         # Проверяем что канал НЕ сохранен
-        assert "123456" not in welcome_system.config
+        assert welcome_system.settings.get(123456).welcome_channel_id is None
 
         # Проверяем что отправлено сообщение об ошибке
         interaction.response.send_message.assert_called_once()
@@ -186,14 +150,13 @@ class TestWelcomeSendWelcome:
     """Тесты отправки приветственных сообщений."""
 
     @pytest.fixture
-    def welcome_system(self, tmp_path):
+    def welcome_system(self, guild_settings):
         """Фикстура для создания системы приветствий."""
         bot = MagicMock()
         bot.image_generator = MagicMock()
         bot.image_generator.create_welcome_card = AsyncMock()
-        system = Welcome(bot)
-        system.config_file = tmp_path / "welcome_config.json"
-        system.config = {"123456": 789012}
+        guild_settings.cache[123456] = GuildSettings(welcome_channel_id=789012)
+        system = Welcome(bot, guild_settings)
         return system
 
     @pytest.mark.asyncio
@@ -277,17 +240,14 @@ class TestWelcomeMultipleGuilds:
     """Тесты работы с несколькими серверами."""
 
     @pytest.fixture
-    def welcome_system(self, tmp_path):
+    def welcome_system(self, guild_settings):
         """Фикстура для создания системы приветствий."""
         bot = MagicMock()
         bot.image_generator = MagicMock()
         bot.image_generator.create_welcome_card = AsyncMock()
-        system = Welcome(bot)
-        system.config_file = tmp_path / "welcome_config.json"
-        system.config = {
-            "123456": 111111,
-            "789012": 222222
-        }
+        guild_settings.cache[123456] = GuildSettings(welcome_channel_id=111111)
+        guild_settings.cache[789012] = GuildSettings(welcome_channel_id=222222)
+        system = Welcome(bot, guild_settings)
         return system
 
     @pytest.mark.asyncio